@@ -19,6 +19,7 @@ from .models import (
     Period,
     StudentGrade,
     Subject,
+    SubjectPeriodFinal,
     TeacherAssignment,
     CommissionRuleConfig,
     Commission,
@@ -224,6 +225,18 @@ class AchievementGradeAdmin(admin.ModelAdmin):
     autocomplete_fields = ("gradesheet", "enrollment", "achievement")
 
 
+@admin.register(SubjectPeriodFinal)
+class SubjectPeriodFinalAdmin(admin.ModelAdmin):
+    list_display = ("enrollment", "teacher_assignment", "period", "score", "computed_at")
+    list_filter = ("period__academic_year", "period", "teacher_assignment__group")
+    search_fields = (
+        "enrollment__student__user__first_name",
+        "enrollment__student__user__last_name",
+        "teacher_assignment__academic_load__subject__name",
+    )
+    readonly_fields = ("enrollment", "teacher_assignment", "period", "score", "computed_at")
+
+
 @admin.register(Dimension)
 class DimensionAdmin(admin.ModelAdmin):
     list_display = ("name", "percentage", "academic_year", "is_active")
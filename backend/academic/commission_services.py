@@ -1,21 +1,15 @@
 from __future__ import annotations
 
 from collections import Counter
-from collections import defaultdict
 from dataclasses import dataclass
-from decimal import Decimal
-from typing import Dict, List
+from typing import List
 
 from django.db.models import QuerySet
 
-from academic.promotion import (
-    PASSING_SCORE_DEFAULT,
-    _compute_subject_final_for_enrollments,
-    compute_promotions_for_year,
-)
+from academic.standing import get_academic_standing
 from students.models import Enrollment
 
-from .models import Commission, CommissionRuleConfig, CommissionStudentDecision, TeacherAssignment
+from .models import Commission, CommissionRuleConfig, CommissionStudentDecision
 
 
 @dataclass(frozen=True)
@@ -98,80 +92,25 @@ def compute_difficulties_for_commission(commission: Commission) -> List[Commissi
         return []
 
     if commission.commission_type == Commission.TYPE_PROMOTION:
-        computed = compute_promotions_for_year(academic_year=commission.academic_year, passing_score=Decimal(PASSING_SCORE_DEFAULT))
-        out: List[CommissionDifficultyResult] = []
-        for enrollment in enrollments:
-            comp = computed.get(int(enrollment.id))
-            failed_subjects_count = len(getattr(comp, "failed_subject_ids", []) or [])
-            failed_areas_count = len(getattr(comp, "failed_area_ids", []) or [])
-            out.append(
-                CommissionDifficultyResult(
-                    enrollment_id=int(enrollment.id),
-                    failed_subjects_count=failed_subjects_count,
-                    failed_areas_count=failed_areas_count,
-                    is_flagged=_is_flagged(
-                        failed_subjects_count=failed_subjects_count,
-                        failed_areas_count=failed_areas_count,
-                        operator=operator,
-                        subjects_threshold=subjects_threshold,
-                        areas_threshold=areas_threshold,
-                    ),
-                )
-            )
-        return out
-
-    if commission.period_id is None:
+        # Year-wide SIEE evaluation, shared by every promotion commission of the year.
+        standing = get_academic_standing(academic_year=commission.academic_year)
+    elif commission.period_id is None:
         return []
-
-    enrollment_ids_by_group: Dict[int, List[int]] = defaultdict(list)
-    for enrollment in enrollments:
-        if enrollment.group_id:
-            enrollment_ids_by_group[int(enrollment.group_id)].append(int(enrollment.id))
-
-    failed_subject_ids_by_enrollment: Dict[int, set[int]] = defaultdict(set)
-    failed_area_ids_by_enrollment: Dict[int, set[int]] = defaultdict(set)
-
-    assignments = (
-        TeacherAssignment.objects.filter(
-            academic_year_id=commission.academic_year_id,
-            academic_load__isnull=False,
-            academic_load__subject__isnull=False,
-        )
-        .select_related("academic_load__subject__area")
-        .only("id", "group_id", "academic_load__subject_id", "academic_load__subject__area_id")
-    )
-    if commission.group_id:
-        assignments = assignments.filter(group_id=commission.group_id)
-
-    passing_score = Decimal(PASSING_SCORE_DEFAULT)
-
-    for assignment in assignments:
-        group_enrollment_ids = enrollment_ids_by_group.get(int(assignment.group_id), [])
-        if not group_enrollment_ids:
-            continue
-
-        finals = _compute_subject_final_for_enrollments(
-            teacher_assignment=assignment,
+    else:
+        standing = get_academic_standing(
+            academic_year=commission.academic_year,
             period=commission.period,
-            enrollment_ids=group_enrollment_ids,
+            group_ids=[commission.group_id] if commission.group_id else None,
         )
-        subject_id = int(assignment.academic_load.subject_id)
-        area_id = int(assignment.academic_load.subject.area_id)
-
-        for enrollment_id, score in finals.items():
-            score_decimal = Decimal(score)
-            if score_decimal < passing_score:
-                failed_subject_ids_by_enrollment[int(enrollment_id)].add(subject_id)
-                failed_area_ids_by_enrollment[int(enrollment_id)].add(area_id)
 
     out: List[CommissionDifficultyResult] = []
     for enrollment in enrollments:
-        eid = int(enrollment.id)
-        failed_subjects_count = len(failed_subject_ids_by_enrollment.get(eid, set()))
-        failed_areas_count = len(failed_area_ids_by_enrollment.get(eid, set()))
+        item = standing.get(int(enrollment.id))
+        failed_subjects_count = len(getattr(item, "failed_subject_ids", []) or [])
+        failed_areas_count = len(getattr(item, "failed_area_ids", []) or [])
         out.append(
             CommissionDifficultyResult(
-                enrollment_id=eid,
+                enrollment_id=int(enrollment.id),
                 failed_subjects_count=failed_subjects_count,
                 failed_areas_count=failed_areas_count,
                 is_flagged=_is_flagged(
@@ -47,14 +47,13 @@ from .models import (
     CommissionRuleConfig,
     CommissionStudentDecision,
     CommitmentActa,
-    TeacherAssignment,
 )
-from .promotion import PASSING_SCORE_DEFAULT, _compute_subject_final_for_enrollments
 from .reports import (
     build_commitment_acta_context,
     build_commission_group_acta_context,
     get_failed_subject_names_for_decision,
 )
+from .standing import get_academic_standing
 from .tasks import generate_commission_observer_annotations_task
 
 
@@ -1200,28 +1199,15 @@ class TeacherCommissionViewSet(viewsets.ReadOnlyModelViewSet):
         from decimal import Decimal
         enrollment_ids_list = [d.enrollment_id for d in decisions_list]
         scores_by_enrollment: dict[int, list[Decimal]] = {eid: [] for eid in enrollment_ids_list}
-        assignments = (
-            TeacherAssignment.objects.filter(
-                academic_year_id=commission.academic_year_id,
-                group_id=commission.group_id,
-                academic_load__subject__isnull=False,
-            )
-            .select_related("academic_load", "academic_load__subject")
-            .only("id", "academic_load__subject_id")
+        standing = get_academic_standing(
+            academic_year=commission.academic_year,
+            period=commission.period,
+            group_ids=[commission.group_id] if commission.group_id else None,
         )
-        for assignment in assignments:
-            finals = _compute_subject_final_for_enrollments(
-                teacher_assignment=assignment,
-                period=commission.period,
-                enrollment_ids=enrollment_ids_list,
-            )
-            for eid, score in finals.items():
-                if eid not in scores_by_enrollment or score is None:
-                    continue
-                try:
-                    scores_by_enrollment[eid].append(Decimal(str(score)))
-                except Exception:
-                    pass
+        for eid in enrollment_ids_list:
+            item = standing.get(int(eid))
+            if item is not None:
+                scores_by_enrollment[eid].extend(item.subject_finals.values())
 
         enrollment_average: dict[int, float] = {}
         for eid, scores in scores_by_enrollment.items():
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional, Set, Tuple
+
+from .models import AchievementActivityColumn, AchievementActivityGrade, AchievementGrade, GradeSheet
+
+
+class GradebookCompletionTracker:
+    """Completitud (celdas diligenciadas / celdas esperadas) de una planilla.
+
+    Se construye con las matrículas activas, los logros válidos y las celdas ya
+    diligenciadas. ``apply`` incorpora las celdas recién escritas, así que el estado
+    "después" de un guardado sale del delta sin volver a contar en la base de datos.
+
+    En modo actividades, los logros con columnas activas cuentan por sus notas de
+    actividad (que este tracker no modifica) y los logros sin columnas cuentan por la
+    celda del logro, igual que en la planilla.
+    """
+
+    def __init__(
+        self,
+        *,
+        active_enrollment_ids: Iterable[int],
+        achievement_ids: Iterable[int],
+        cell_achievement_ids: Iterable[int],
+        filled_cells: Iterable[Tuple[int, int]],
+        activity_columns_count: int = 0,
+        activity_filled: int = 0,
+    ):
+        self._active_enrollment_ids: Set[int] = {int(e) for e in active_enrollment_ids}
+        self._cell_achievement_ids: Set[int] = {int(a) for a in cell_achievement_ids}
+        self._has_achievements = bool(list(achievement_ids))
+        self._activity_columns_count = int(activity_columns_count)
+        self._activity_filled = int(activity_filled)
+        self._filled_cells: Set[Tuple[int, int]] = {
+            (int(e), int(a)) for e, a in filled_cells if self._counts(int(e), int(a))
+        }
+
+    def _counts(self, enrollment_id: int, achievement_id: int) -> bool:
+        return enrollment_id in self._active_enrollment_ids and achievement_id in self._cell_achievement_ids
+
+    @classmethod
+    def from_grades(
+        cls,
+        *,
+        gradesheet: GradeSheet,
+        active_enrollment_ids: Iterable[int],
+        achievement_ids: Iterable[int],
+        grades: Iterable[Tuple[int, int, Optional[object]]],
+    ) -> "GradebookCompletionTracker":
+        """Tracker a partir de las celdas ``(enrollment_id, achievement_id, score)`` ya cargadas.
+
+        Solo consulta la base de datos en modo actividades (columnas y notas de actividad).
+        """
+
+        active_enrollment_ids = [int(e) for e in active_enrollment_ids]
+        achievement_ids = [int(a) for a in achievement_ids]
+        cell_achievement_ids = achievement_ids
+        activity_columns_count = 0
+        activity_filled = 0
+
+        if (
+            achievement_ids
+            and active_enrollment_ids
+            and gradesheet.grading_mode == GradeSheet.GRADING_MODE_ACTIVITIES
+        ):
+            column_ids_by_achievement: dict[int, list[int]] = {}
+            for col_id, achievement_id in AchievementActivityColumn.objects.filter(
+                gradesheet=gradesheet,
+                achievement_id__in=achievement_ids,
+                is_active=True,
+            ).values_list("id", "achievement_id"):
+                column_ids_by_achievement.setdefault(int(achievement_id), []).append(int(col_id))
+
+            # Fallback to logro cell when an achievement has no activity columns.
+            cell_achievement_ids = [a for a in achievement_ids if a not in column_ids_by_achievement]
+            all_column_ids = [col_id for col_ids in column_ids_by_achievement.values() for col_id in col_ids]
+            activity_columns_count = len(all_column_ids)
+            if all_column_ids:
+                activity_filled = AchievementActivityGrade.objects.filter(
+                    column_id__in=all_column_ids,
+                    enrollment_id__in=active_enrollment_ids,
+                    score__isnull=False,
+                ).count()
+
+        return cls(
+            active_enrollment_ids=active_enrollment_ids,
+            achievement_ids=achievement_ids,
+            cell_achievement_ids=cell_achievement_ids,
+            filled_cells=[(e, a) for e, a, score in grades if score is not None],
+            activity_columns_count=activity_columns_count,
+            activity_filled=activity_filled,
+        )
+
+    @classmethod
+    def for_gradesheet(
+        cls,
+        *,
+        gradesheet: GradeSheet,
+        active_enrollment_ids: Iterable[int],
+        achievement_ids: Iterable[int],
+    ) -> "GradebookCompletionTracker":
+        """Tracker leyendo de la base de datos las celdas diligenciadas de la planilla."""
+
+        active_enrollment_ids = [int(e) for e in active_enrollment_ids]
+        achievement_ids = [int(a) for a in achievement_ids]
+        grades = []
+        if achievement_ids and active_enrollment_ids:
+            grades = AchievementGrade.objects.filter(
+                gradesheet=gradesheet,
+                enrollment_id__in=active_enrollment_ids,
+                achievement_id__in=achievement_ids,
+                score__isnull=False,
+            ).values_list("enrollment_id", "achievement_id", "score")
+        return cls.from_grades(
+            gradesheet=gradesheet,
+            active_enrollment_ids=active_enrollment_ids,
+            achievement_ids=achievement_ids,
+            grades=grades,
+        )
+
+    def apply(self, cells: Iterable[Tuple[int, int, Optional[object]]]) -> None:
+        """Incorpora celdas de logro escritas: ``(enrollment_id, achievement_id, score)``."""
+
+        for enrollment_id, achievement_id, score in cells:
+            key = (int(enrollment_id), int(achievement_id))
+            if not self._counts(*key):
+                continue
+            if score is None:
+                self._filled_cells.discard(key)
+            else:
+                self._filled_cells.add(key)
+
+    def stats(self) -> dict:
+        students_count = len(self._active_enrollment_ids)
+        total = 0
+        filled = 0
+        if self._has_achievements and students_count > 0:
+            total = students_count * (len(self._cell_achievement_ids) + self._activity_columns_count)
+            filled = self._activity_filled + len(self._filled_cells)
+
+        percent = int(round((filled / total) * 100)) if total > 0 else 0
+        is_complete = total > 0 and filled >= total
+        return {
+            "filled": filled,
+            "total": total,
+            "percent": percent,
+            "is_complete": is_complete,
+        }
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Mapping, Optional, Sequence, Tuple
+from itertools import accumulate
+from time import monotonic
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
 
 from .models import EvaluationScale
 
@@ -67,25 +74,271 @@ def final_grade_from_achievement_scores(
     return final_grade_from_dimensions(dim_items)
 
 
+_DEFAULT_EMPTY_CENTS = 100
+
+
+def _round_half_even_div(numerator: int, denominator: int) -> int:
+    """``numerator / denominator`` redondeado al entero más cercano (empates a par).
+
+    Equivale a ``Decimal.quantize`` con el contexto por defecto (ROUND_HALF_EVEN) cuando
+    las cantidades están expresadas en centésimas.
+    """
+
+    q, r = divmod(numerator, denominator)
+    twice = 2 * r
+    if twice > denominator or (twice == denominator and q % 2):
+        q += 1
+    return q
+
+
+# Las notas válidas son pocas (1.00..5.00 en centésimas): cachear su conversión evita
+# operar con Decimal en cada celda.
+_CENTS_BY_SCORE: Dict[Decimal, Optional[int]] = {}
+_CENTS_BY_SCORE_MAX = 4096
+
+
+def _score_to_cents(score: Decimal) -> Optional[int]:
+    """Centésimas exactas de una nota, o None si tiene más de dos decimales."""
+
+    try:
+        return _CENTS_BY_SCORE[score]
+    except KeyError:
+        pass
+    value = Decimal(score).scaleb(2)
+    cents = int(value) if value == value.to_integral_value() else None
+    if len(_CENTS_BY_SCORE) < _CENTS_BY_SCORE_MAX:
+        _CENTS_BY_SCORE[score] = cents
+    return cents
+
+
+class FinalGradePlan:
+    """Cálculo de definitivas para muchas matrículas con los mismos logros.
+
+    ``final_grade_from_achievement_scores`` reagrupa los logros por dimensión en cada
+    llamada. El plan lo hace una sola vez y evalúa cada fila de notas con aritmética
+    entera en centésimas; el redondeo por dimensión y el final reproducen exactamente
+    el ``quantize(Decimal("0.01"))`` del cálculo escalar, incluido NULL → 1.00.
+    """
+
+    def __init__(
+        self,
+        achievements: Sequence[Tuple[Optional[int], Optional[int]]],
+        *,
+        dimension_percentage_by_id: Mapping[int, int],
+    ):
+        # achievements: (dimension_id, percentage) en el orden de las columnas de notas.
+        self._achievements = [(dimension_id, percentage) for dimension_id, percentage in achievements]
+        self._dimension_percentage_by_id = dimension_percentage_by_id
+
+        columns_by_dimension: Dict[int, List[Tuple[int, int]]] = {}
+        for col, (dimension_id, percentage) in enumerate(self._achievements):
+            if not dimension_id:
+                continue
+            columns_by_dimension.setdefault(int(dimension_id), []).append((col, int(percentage) if percentage else 1))
+
+        self._dimensions: List[Tuple[List[Tuple[int, int]], int, int]] = [
+            (
+                columns,
+                sum(weight for _, weight in columns),
+                int(dimension_percentage_by_id.get(dim_id, 0) or 0),
+            )
+            for dim_id, columns in columns_by_dimension.items()
+        ]
+        self._total_percentage = sum(percentage for _, _, percentage in self._dimensions)
+
+    def __len__(self) -> int:
+        return len(self._achievements)
+
+    def final_cents(self, cents: Sequence[int]) -> int:
+        """Definitiva en centésimas para una fila ya convertida (sin NULL)."""
+
+        if not self._dimensions or self._total_percentage <= 0:
+            return _DEFAULT_EMPTY_CENTS
+
+        total = 0
+        for columns, total_weight, percentage in self._dimensions:
+            if total_weight <= 0:
+                dimension_cents = _DEFAULT_EMPTY_CENTS
+            else:
+                dimension_cents = _round_half_even_div(
+                    sum(cents[col] * weight for col, weight in columns), total_weight
+                )
+            total += dimension_cents * percentage
+        return _round_half_even_div(total, self._total_percentage)
+
+    def final_for_row(self, scores: Sequence[Optional[Decimal]]) -> Decimal:
+        cents: List[int] = []
+        for score in scores:
+            if score is None:
+                cents.append(_DEFAULT_EMPTY_CENTS)
+                continue
+            value = _CENTS_BY_SCORE.get(score)
+            if value is None:
+                value = _score_to_cents(score)
+            if value is None:
+                # Más de dos decimales: se delega al cálculo Decimal para no perder precisión.
+                return final_grade_from_achievement_scores(
+                    [(dim_id, pct, s) for (dim_id, pct), s in zip(self._achievements, scores)],
+                    dimension_percentage_by_id=self._dimension_percentage_by_id,
+                )
+            cents.append(value)
+        return Decimal(self.final_cents(cents)).scaleb(-2)
+
+    def finals_for_rows(self, rows: Iterable[Sequence[Optional[Decimal]]]) -> List[Decimal]:
+        return [self.final_for_row(row) for row in rows]
+
+
+def final_grades_for_enrollments(
+    achievements: Sequence[Tuple[int, Optional[int], Optional[int]]],
+    enrollment_ids: Iterable[int],
+    score_by_cell: Mapping[Tuple[int, int], Optional[Decimal]],
+    *,
+    dimension_percentage_by_id: Mapping[int, int],
+) -> Dict[int, Decimal]:
+    """Definitivas de todas las matrículas de una planilla.
+
+    ``achievements`` son tuplas ``(achievement_id, dimension_id, percentage)`` y
+    ``score_by_cell`` la matriz dispersa ``(enrollment_id, achievement_id) -> score``;
+    las celdas ausentes cuentan como NULL.
+    """
+
+    plan = FinalGradePlan(
+        [(dimension_id, percentage) for _, dimension_id, percentage in achievements],
+        dimension_percentage_by_id=dimension_percentage_by_id,
+    )
+    achievement_ids = [achievement_id for achievement_id, _, _ in achievements]
+    return {
+        enrollment_id: plan.final_for_row([score_by_cell.get((enrollment_id, a_id)) for a_id in achievement_ids])
+        for enrollment_id in enrollment_ids
+    }
+
+
 @dataclass(frozen=True)
 class EvaluationScaleMatch:
     name: str
     description: str
 
 
-def match_scale(academic_year_id: int, score: Decimal) -> Optional[EvaluationScaleMatch]:
-    scale = (
-        EvaluationScale.objects.filter(
-            academic_year_id=academic_year_id,
-            min_score__lte=score,
-            max_score__gte=score,
+class EvaluationScaleIndex:
+    """Índice en memoria de las escalas de valoración de un año lectivo.
+
+    Reproduce la semántica de la consulta original (``min_score <= score <= max_score``,
+    la escala de menor ``min_score`` gana) con dos búsquedas binarias, para que los
+    consumidores que recorren cientos de matrículas no hagan una consulta por nota.
+    """
+
+    def __init__(self, scales: Iterable[Tuple[Decimal, Decimal, str, str]]):
+        rows = sorted(
+            (Decimal(min_score), Decimal(max_score), name, description)
+            for min_score, max_score, name, description in scales
+            if min_score is not None and max_score is not None
         )
-        .order_by("min_score")
-        .first()
-    )
-    if not scale:
-        return None
-    return EvaluationScaleMatch(name=scale.name, description=scale.description)
+        self._mins: List[Decimal] = [row[0] for row in rows]
+        # Máximo acumulado de max_score: es monótono, así que admite bisect y permite
+        # encontrar la primera escala (por min_score) que cubre la nota aun con rangos
+        # solapados.
+        self._running_max: List[Decimal] = list(accumulate((row[1] for row in rows), max))
+        self._matches: List[EvaluationScaleMatch] = [
+            EvaluationScaleMatch(name=row[2], description=row[3]) for row in rows
+        ]
+
+    @classmethod
+    def for_academic_year(cls, academic_year_id: int) -> "EvaluationScaleIndex":
+        return cls(
+            EvaluationScale.objects.filter(
+                academic_year_id=academic_year_id,
+                min_score__isnull=False,
+                max_score__isnull=False,
+            )
+            .order_by("min_score", "id")
+            .values_list("min_score", "max_score", "name", "description")
+        )
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def match(self, score: Optional[Decimal]) -> Optional[EvaluationScaleMatch]:
+        if score is None or not self._matches:
+            return None
+        score = Decimal(score)
+        upper = bisect_right(self._mins, score)
+        if upper == 0:
+            return None
+        idx = bisect_left(self._running_max, score, 0, upper)
+        if idx >= upper:
+            return None
+        return self._matches[idx]
+
+    def name_for(self, score: Optional[Decimal]) -> str:
+        match = self.match(score)
+        return match.name if match else ""
+
+    def fingerprint(self) -> Tuple:
+        """Valor comparable que cambia cuando cambia cualquier escala del índice."""
+
+        return tuple(zip(self._mins, self._running_max, (m.name for m in self._matches)))
+
+
+_SCALE_INDEX_VERSION_KEY = "academic:evaluation_scale_index:version"
+# Cada cuánto un proceso vuelve a consultar la versión compartida. Los cambios hechos
+# en el mismo proceso invalidan de inmediato; los de otros workers tardan a lo sumo esto.
+_SCALE_INDEX_VERSION_CHECK_SECONDS = 2.0
+# (versión, construido en, índice) por año.
+_scale_index_by_year: Dict[int, Tuple[Optional[str], float, EvaluationScaleIndex]] = {}
+_scale_index_version_state: Dict[str, object] = {"value": None, "checked_at": None}
+
+
+def _scale_index_version() -> Optional[str]:
+    now = monotonic()
+    checked_at = _scale_index_version_state["checked_at"]
+    if checked_at is not None and now - float(checked_at) < _SCALE_INDEX_VERSION_CHECK_SECONDS:
+        return _scale_index_version_state["value"]  # type: ignore[return-value]
+    try:
+        value = cache.get(_SCALE_INDEX_VERSION_KEY)
+    except Exception:
+        value = None
+    _scale_index_version_state["value"] = value
+    _scale_index_version_state["checked_at"] = now
+    return value
+
+
+def get_scale_index(academic_year_id: int) -> EvaluationScaleIndex:
+    """Índice de escalas del año, cacheado por proceso (worker).
+
+    El índice se reconstruye cuando cambia la versión compartida en cache, que se
+    renueva desde las señales de ``EvaluationScale`` (ver ``academic.signals``), o
+    cuando supera ``KAMPUS_PROCESS_CACHE_MAX_AGE_SECONDS``: con LocMemCache la versión
+    no se comparte entre procesos y la edad máxima es lo único que propaga el cambio.
+    """
+
+    academic_year_id = int(academic_year_id)
+    version = _scale_index_version()
+    now = monotonic()
+    cached = _scale_index_by_year.get(academic_year_id)
+    if cached is not None and cached[0] == version and now - cached[1] < _scale_index_max_age():
+        return cached[2]
+
+    index = EvaluationScaleIndex.for_academic_year(academic_year_id)
+    _scale_index_by_year[academic_year_id] = (version, now, index)
+    return index
+
+
+def _scale_index_max_age() -> float:
+    return float(getattr(settings, "KAMPUS_PROCESS_CACHE_MAX_AGE_SECONDS", 60))
+
+
+def invalidate_scale_index() -> None:
+    _scale_index_by_year.clear()
+    _scale_index_version_state["checked_at"] = None
+    try:
+        cache.set(_SCALE_INDEX_VERSION_KEY, uuid4().hex, timeout=None)
+    except Exception:
+        # Sin cache compartida, al menos este proceso queda consistente.
+        pass
+
+
+def match_scale(academic_year_id: int, score: Decimal) -> Optional[EvaluationScaleMatch]:
+    return get_scale_index(academic_year_id).match(score)
 
 
 def achievement_queryset_for_assignment_period(teacher_assignment, period):
@@ -105,3 +358,28 @@ def achievement_queryset_for_assignment_period(teacher_assignment, period):
     if group_specific.exists():
         return group_specific
     return base.filter(group__isnull=True)
+
+
+def achievements_for_assignment_period(teacher_assignment, period, *, select_related: Sequence[str] = ()):
+    """Igual que ``achievement_queryset_for_assignment_period`` pero en una sola consulta.
+
+    Trae los logros del grupo y los globales juntos y aplica la misma regla en memoria.
+    Devuelve una lista ordenada por id.
+    """
+    from django.db.models import Q
+
+    from .models import Achievement
+
+    candidates = list(
+        Achievement.objects.filter(
+            academic_load_id=teacher_assignment.academic_load_id,
+            period=period,
+        )
+        .filter(Q(group_id=teacher_assignment.group_id) | Q(group__isnull=True))
+        .select_related(*select_related)
+        .order_by("id")
+    )
+    group_specific = [a for a in candidates if a.group_id is not None]
+    if group_specific:
+        return group_specific
+    return candidates
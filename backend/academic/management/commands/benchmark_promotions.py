@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import random
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from academic.models import (
+    AcademicLevel,
+    AcademicLoad,
+    AcademicYear,
+    Achievement,
+    AchievementGrade,
+    Area,
+    Dimension,
+    Grade,
+    GradeSheet,
+    Group,
+    Period,
+    Subject,
+    TeacherAssignment,
+)
+from academic.promotion import (
+    PASSING_SCORE_DEFAULT,
+    _compute_subject_final_for_enrollments,
+    _get_periods_for_year,
+    compute_promotions_for_year,
+)
+
+
+def seed_synthetic_school(
+    *,
+    groups: int,
+    students_per_group: int,
+    subjects: int,
+    periods: int,
+    achievements_per_subject: int,
+    fill_ratio: float = 0.9,
+    seed: int = 7,
+) -> AcademicYear:
+    """Create a throwaway academic year with grades for benchmarking.
+
+    Everything is inserted with bulk_create; callers are expected to run inside a
+    transaction and roll it back afterwards.
+    """
+
+    rng = random.Random(seed)
+    token = uuid.uuid4().hex[:8]
+    User = get_user_model()
+
+    used_years = set(AcademicYear.objects.values_list("year", flat=True))
+    year_value = next(y for y in range(9000, 10000) if y not in used_years)
+    year = AcademicYear.objects.create(year=year_value, status=AcademicYear.STATUS_ACTIVE)
+
+    start = date(year_value, 1, 15)
+    period_objs = Period.objects.bulk_create(
+        [
+            Period(
+                academic_year=year,
+                name=f"P{i + 1}",
+                start_date=start + timedelta(days=70 * i),
+                end_date=start + timedelta(days=70 * i + 60),
+                is_closed=True,
+            )
+            for i in range(periods)
+        ]
+    )
+
+    dimensions = Dimension.objects.bulk_create(
+        [
+            Dimension(academic_year=year, name="Cognitivo", percentage=50, is_active=True),
+            Dimension(academic_year=year, name="Procedimental", percentage=30, is_active=True),
+            Dimension(academic_year=year, name="Actitudinal", percentage=20, is_active=True),
+        ]
+    )
+
+    level = AcademicLevel.objects.create(name=f"Bench {token}", level_type="SECONDARY")
+    grade = Grade.objects.create(name=f"Bench {token}", level=level)
+
+    teacher = User.objects.create(username=f"bench_teacher_{token}", role="TEACHER")
+    group_objs = Group.objects.bulk_create(
+        [Group(name=f"B{i + 1}-{token}", grade=grade, academic_year=year, director=teacher) for i in range(groups)]
+    )
+
+    area_objs = Area.objects.bulk_create([Area(name=f"Área {i + 1} {token}") for i in range(max(1, subjects // 2))])
+    subject_objs = Subject.objects.bulk_create(
+        [
+            Subject(name=f"Asignatura {i + 1} {token}", area=area_objs[i % len(area_objs)])
+            for i in range(subjects)
+        ]
+    )
+    load_objs = AcademicLoad.objects.bulk_create([AcademicLoad(subject=s, grade=grade) for s in subject_objs])
+
+    assignments = TeacherAssignment.objects.bulk_create(
+        [
+            TeacherAssignment(teacher=teacher, academic_load=load, group=group, academic_year=year)
+            for group in group_objs
+            for load in load_objs
+        ]
+    )
+
+    # Global achievements (group=NULL) shared by every group.
+    achievement_objs = Achievement.objects.bulk_create(
+        [
+            Achievement(
+                academic_load=load,
+                subject=load.subject,
+                period=period,
+                dimension=dimensions[i % len(dimensions)],
+                description=f"Logro {i + 1}",
+                percentage=rng.choice([1, 20, 30, 50]),
+            )
+            for load in load_objs
+            for period in period_objs
+            for i in range(achievements_per_subject)
+        ]
+    )
+    achievements_by_load_period = defaultdict(list)
+    for a in achievement_objs:
+        achievements_by_load_period[(a.academic_load_id, a.period_id)].append(a)
+
+    users = User.objects.bulk_create(
+        [
+            User(username=f"bench_{token}_{g}_{n}", role="STUDENT", last_name=f"Estudiante {g:03d}-{n:03d}")
+            for g in range(groups)
+            for n in range(students_per_group)
+        ]
+    )
+    from students.models import Enrollment, Student
+
+    students = Student.objects.bulk_create(
+        [Student(user=u, document_number=f"BENCH-{token}-{idx}") for idx, u in enumerate(users)]
+    )
+    enrollments = Enrollment.objects.bulk_create(
+        [
+            Enrollment(
+                student=student,
+                academic_year=year,
+                grade=grade,
+                group=group_objs[idx // students_per_group],
+                status="ACTIVE",
+            )
+            for idx, student in enumerate(students)
+        ]
+    )
+    enrollments_by_group = defaultdict(list)
+    for e in enrollments:
+        enrollments_by_group[e.group_id].append(e)
+
+    gradesheets = GradeSheet.objects.bulk_create(
+        [GradeSheet(teacher_assignment=ta, period=p) for ta in assignments for p in period_objs]
+    )
+    ta_by_id = {ta.id: ta for ta in assignments}
+
+    batch: list[AchievementGrade] = []
+    for gs in gradesheets:
+        ta = ta_by_id[gs.teacher_assignment_id]
+        for e in enrollments_by_group[ta.group_id]:
+            for a in achievements_by_load_period[(ta.academic_load_id, gs.period_id)]:
+                if rng.random() > fill_ratio:
+                    continue
+                score = Decimal(rng.randint(100, 500)) / Decimal(100)
+                batch.append(AchievementGrade(gradesheet=gs, enrollment=e, achievement=a, score=score))
+        if len(batch) >= 5000:
+            AchievementGrade.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        AchievementGrade.objects.bulk_create(batch)
+
+    return year
+
+
+def _per_pair_subject_finals(academic_year: AcademicYear) -> dict[int, dict[int, Decimal]]:
+    """Reference path: one _compute_subject_final_for_enrollments call per (assignment, period)."""
+
+    from students.models import Enrollment
+
+    periods = _get_periods_for_year(academic_year.id)
+    enrollment_ids_by_group: dict[int, list[int]] = defaultdict(list)
+    for enrollment_id, group_id in Enrollment.objects.filter(
+        academic_year_id=academic_year.id, status="ACTIVE"
+    ).values_list("id", "group_id"):
+        enrollment_ids_by_group[int(group_id)].append(int(enrollment_id))
+
+    sums: dict[tuple[int, int], Decimal] = defaultdict(lambda: Decimal("0.00"))
+    counts: dict[tuple[int, int], int] = defaultdict(int)
+    assignments = TeacherAssignment.objects.filter(academic_year_id=academic_year.id).select_related(
+        "academic_load__subject"
+    )
+    for ta in assignments:
+        group_enrollment_ids = enrollment_ids_by_group.get(int(ta.group_id), [])
+        if not ta.academic_load_id or not group_enrollment_ids:
+            continue
+        for period in periods:
+            finals = _compute_subject_final_for_enrollments(
+                teacher_assignment=ta,
+                period=period,
+                enrollment_ids=group_enrollment_ids,
+            )
+            for enrollment_id, final_score in finals.items():
+                key = (int(enrollment_id), int(ta.academic_load.subject_id))
+                sums[key] += Decimal(final_score)
+                counts[key] += 1
+
+    out: dict[int, dict[int, Decimal]] = defaultdict(dict)
+    for (enrollment_id, subject_id), total in sums.items():
+        out[enrollment_id][subject_id] = (total / Decimal(counts[(enrollment_id, subject_id)])).quantize(Decimal("0.01"))
+    return out
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a synthetic school inside a rolled-back transaction and reports wall time and "
+        "query count of the per-pair subject-final path versus compute_promotions_for_year, "
+        "with an empty and with a filled SubjectPeriodFinal table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--groups", type=int, default=40)
+        parser.add_argument("--students-per-group", type=int, default=38)
+        parser.add_argument("--subjects", type=int, default=12)
+        parser.add_argument("--periods", type=int, default=4)
+        parser.add_argument("--achievements-per-subject", type=int, default=3)
+        parser.add_argument(
+            "--skip-per-pair",
+            action="store_true",
+            help="Only time the set-based engine (the per-pair path can take minutes on large schools).",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Commit the seeded data instead of rolling it back.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            t0 = time.perf_counter()
+            year = seed_synthetic_school(
+                groups=options["groups"],
+                students_per_group=options["students_per_group"],
+                subjects=options["subjects"],
+                periods=options["periods"],
+                achievements_per_subject=options["achievements_per_subject"],
+            )
+            self.stdout.write(
+                f"Seeded year={year.year}: {options['groups'] * options['students_per_group']} enrollments "
+                f"in {time.perf_counter() - t0:.2f}s"
+            )
+
+            reference = None
+            if not options["skip_per_pair"]:
+                with CaptureQueriesContext(connection) as ctx:
+                    t0 = time.perf_counter()
+                    reference = _per_pair_subject_finals(year)
+                    elapsed = time.perf_counter() - t0
+                self.stdout.write(f"{'per-pair:':<13} {elapsed:8.3f}s  queries={len(ctx.captured_queries)}")
+
+            # First run fills SubjectPeriodFinal; the second one only reads the materialized table.
+            for label in ("set-based:", "materialized:"):
+                with CaptureQueriesContext(connection) as ctx:
+                    t0 = time.perf_counter()
+                    computed = compute_promotions_for_year(academic_year=year, passing_score=PASSING_SCORE_DEFAULT)
+                    elapsed = time.perf_counter() - t0
+                self.stdout.write(f"{label:<13} {elapsed:8.3f}s  queries={len(ctx.captured_queries)}")
+
+            if reference is not None:
+                mismatches = [
+                    eid for eid, comp in computed.items() if dict(comp.subject_finals) != dict(reference.get(eid, {}))
+                ]
+                if mismatches:
+                    self.stdout.write(self.style.ERROR(f"Mismatched subject finals for {len(mismatches)} enrollments."))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"Subject finals match for {len(computed)} enrollments."))
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
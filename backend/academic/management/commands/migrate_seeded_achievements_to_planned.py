@@ -8,6 +8,7 @@ from django.db import transaction
 
 from academic.grading import DEFAULT_EMPTY_SCORE, weighted_average
 from academic.models import Achievement, AchievementGrade
+from academic.subject_finals import invalidate_subject_finals_for_gradesheets
 
 
 DEFAULT_SEED_DESCRIPTIONS = {
@@ -150,6 +151,7 @@ class Command(BaseCommand):
 
             # Delete old seeded grade cells (they are now merged)
             deleted_cells, _ = AchievementGrade.objects.filter(achievement_id__in=seeded_ids).delete()
+            invalidate_subject_finals_for_gradesheets({gradesheet_id for gradesheet_id, _, _ in bucket.keys()})
 
             deleted_achievements = 0
             if delete_seeded:
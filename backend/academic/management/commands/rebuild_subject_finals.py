@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academic.models import AcademicYear
+from academic.subject_finals import rebuild_subject_finals, verify_subject_finals
+
+
+class Command(BaseCommand):
+    help = "Recalcula la tabla materializada de definitivas por periodo (SubjectPeriodFinal)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, help="Año lectivo (ej. 2025). Por defecto, el año activo.")
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Solo compara lo almacenado con el cálculo en vivo, sin reconstruir.",
+        )
+
+    def handle(self, *args, **options):
+        year_value = options.get("year")
+        if year_value:
+            academic_year = AcademicYear.objects.filter(year=year_value).first()
+        else:
+            academic_year = AcademicYear.objects.filter(status=AcademicYear.STATUS_ACTIVE).order_by("-year").first()
+        if academic_year is None:
+            raise CommandError("No se encontró el año lectivo.")
+
+        if not options["verify"]:
+            written = rebuild_subject_finals(academic_year_id=academic_year.id)
+            self.stdout.write(f"Año {academic_year.year}: {written} definitivas recalculadas.")
+
+        problems = verify_subject_finals(academic_year_id=academic_year.id)
+        if problems:
+            for item in problems[:20]:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"- asignación {item['teacher_assignment_id']} periodo {item['period_id']} "
+                        f"matrícula {item['enrollment_id']}: almacenada={item['stored']} en vivo={item['live']}"
+                    )
+                )
+            raise CommandError(f"{len(problems)} definitivas no coinciden con el cálculo en vivo.")
+        self.stdout.write(self.style.SUCCESS(f"Año {academic_year.year}: definitivas consistentes."))
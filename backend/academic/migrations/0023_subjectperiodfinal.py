@@ -0,0 +1,32 @@
+# Generated by Django 5.2.12 on 2026-10-16 19:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0022_remove_periodtopic_uniq_period_topic_order_per_load'),
+        ('students', '0011_private_identity_storage_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubjectPeriodFinal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('enrollment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_period_finals', to='students.enrollment')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_period_finals', to='academic.period')),
+                ('teacher_assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_period_finals', to='academic.teacherassignment')),
+            ],
+            options={
+                'verbose_name': 'Definitiva por Periodo',
+                'verbose_name_plural': 'Definitivas por Periodo',
+                'indexes': [models.Index(fields=['teacher_assignment', 'period'], name='idx_spfinal_assign_period'), models.Index(fields=['period', 'enrollment'], name='idx_spfinal_period_enr')],
+                'constraints': [models.UniqueConstraint(fields=('enrollment', 'teacher_assignment', 'period'), name='uniq_subject_period_final')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.12 on 2026-10-16 20:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0023_subjectperiodfinal'),
+        ('students', '0011_private_identity_storage_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='achievementactivitygrade',
+            index=models.Index(fields=['column', 'updated_at'], name='idx_activitygrade_col_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='achievementgrade',
+            index=models.Index(fields=['gradesheet', 'updated_at'], name='idx_achgrade_sheet_updated'),
+        ),
+    ]
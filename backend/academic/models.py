@@ -1065,6 +1065,7 @@ class AchievementGrade(models.Model):
             models.Index(fields=["gradesheet", "enrollment"], name="idx_achgrade_sheet_enr"),
             models.Index(fields=["gradesheet", "achievement"], name="idx_achgrade_sheet_ach"),
             models.Index(fields=["enrollment"], name="idx_achgrade_enrollment"),
+            models.Index(fields=["gradesheet", "updated_at"], name="idx_achgrade_sheet_updated"),
         ]
         verbose_name = "Nota por Logro"
         verbose_name_plural = "Notas por Logro"
@@ -1073,6 +1074,42 @@ class AchievementGrade(models.Model):
         return f"{self.enrollment} - {self.achievement}: {self.score}"
 
 
+class SubjectPeriodFinal(models.Model):
+    """Nota definitiva materializada por (matrícula, asignación docente, periodo).
+
+    Es un derivado de AchievementGrade + Achievement + Dimension que se mantiene desde
+    academic.subject_finals; los reportes la leen en una sola consulta en lugar de
+    recalcularla. Si falta una fila, los lectores la calculan y la guardan.
+    """
+
+    enrollment = models.ForeignKey(
+        "students.Enrollment", related_name="subject_period_finals", on_delete=models.CASCADE
+    )
+    teacher_assignment = models.ForeignKey(
+        TeacherAssignment, related_name="subject_period_finals", on_delete=models.CASCADE
+    )
+    period = models.ForeignKey(Period, related_name="subject_period_finals", on_delete=models.CASCADE)
+    score = models.DecimalField(max_digits=4, decimal_places=2)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["enrollment", "teacher_assignment", "period"],
+                name="uniq_subject_period_final",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["teacher_assignment", "period"], name="idx_spfinal_assign_period"),
+            models.Index(fields=["period", "enrollment"], name="idx_spfinal_period_enr"),
+        ]
+        verbose_name = "Definitiva por Periodo"
+        verbose_name_plural = "Definitivas por Periodo"
+
+    def __str__(self) -> str:
+        return f"{self.enrollment} - {self.teacher_assignment} - {self.period}: {self.score}"
+
+
 class AchievementActivityColumn(models.Model):
     """Columnas de actividades definidas por el docente para un logro dentro de una planilla (GradeSheet).
 
@@ -1139,6 +1176,7 @@ class AchievementActivityGrade(models.Model):
         indexes = [
             models.Index(fields=["column", "enrollment"], name="idx_activitygrade_col_enr"),
             models.Index(fields=["enrollment"], name="idx_activitygrade_enrollment"),
+            models.Index(fields=["column", "updated_at"], name="idx_activitygrade_col_updated"),
         ]
         verbose_name = "Nota de actividad (logro)"
         verbose_name_plural = "Notas de actividad (logro)"
@@ -3,17 +3,20 @@ from __future__ import annotations
 from collections import defaultdict
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
 from django.db import transaction
+from django.db.models import Q
 
 from .grading import (
     DEFAULT_EMPTY_SCORE,
     achievement_queryset_for_assignment_period as _achievement_queryset_for_assignment_period,
-    final_grade_from_achievement_scores,
+    FinalGradePlan,
+    final_grades_for_enrollments,
 )
 from .models import (
     AcademicYear,
+    Achievement,
     AchievementGrade,
     Dimension,
     GradeSheet,
@@ -90,17 +93,106 @@ def _compute_subject_final_for_enrollments(
         )
         score_by_cell = {(g.enrollment_id, g.achievement_id): g.score for g in existing_grades}
 
-    finals: Dict[int, Decimal] = {}
-    for enrollment_id in enrollment_ids:
-        finals[enrollment_id] = final_grade_from_achievement_scores(
-            [
-                (a.dimension_id, a.percentage, score_by_cell.get((enrollment_id, a.id)))
-                for a in achievements
-            ],
-            dimension_percentage_by_id=dim_percentage_by_id,
-        )
+    return final_grades_for_enrollments(
+        [(a.id, a.dimension_id, a.percentage) for a in achievements],
+        enrollment_ids,
+        score_by_cell,
+        dimension_percentage_by_id=dim_percentage_by_id,
+    )
+
+
+def iter_subject_period_finals(
+    *,
+    academic_year_id: int,
+    assignments: Iterable[TeacherAssignment],
+    periods: List[Period],
+    enrollment_ids_by_group: Mapping[int, List[int]],
+) -> Iterator[Tuple[TeacherAssignment, Period, int, Decimal]]:
+    """Set-based version of ``_compute_subject_final_for_enrollments``.
+
+    Loads achievements, dimensions and gradesheets once, and AchievementGrades once
+    per period, for every (assignment, period) pair and yields
+    ``(teacher_assignment, period, enrollment_id, final)`` with the same values the
+    per-pair helper would return.
+    """
 
-    return finals
+    assignments = [ta for ta in assignments if ta.academic_load_id]
+    if not assignments or not periods:
+        return
+
+    period_ids = [p.id for p in periods]
+    load_ids = sorted({int(ta.academic_load_id) for ta in assignments})
+    group_ids = {int(ta.group_id) for ta in assignments}
+
+    # REGLA: grupo-específico si existe; global si no. Versión batch de
+    # achievement_queryset_for_assignment_period(); mantener ambas en sincronía.
+    achievements_by_key: Dict[Tuple[int, int, Optional[int]], List[Tuple[int, Optional[int], Optional[int]]]] = (
+        defaultdict(list)
+    )
+    for ach_id, load_id, period_id, group_id, dimension_id, percentage in (
+        Achievement.objects.filter(academic_load_id__in=load_ids, period_id__in=period_ids)
+        .filter(Q(group_id__in=group_ids) | Q(group__isnull=True))
+        .order_by("id")
+        .values_list("id", "academic_load_id", "period_id", "group_id", "dimension_id", "percentage")
+    ):
+        achievements_by_key[(load_id, period_id, group_id)].append((ach_id, dimension_id, percentage))
+
+    dim_percentage_by_id = {
+        d_id: int(pct)
+        for d_id, pct in Dimension.objects.filter(academic_year_id=academic_year_id).values_list("id", "percentage")
+    }
+
+    gradesheet_id_by_ta_period: Dict[Tuple[int, int], int] = {}
+    for gs_id, ta_id, period_id in (
+        GradeSheet.objects.filter(teacher_assignment_id__in=[ta.id for ta in assignments], period_id__in=period_ids)
+        .order_by("id")
+        .values_list("id", "teacher_assignment_id", "period_id")
+    ):
+        gradesheet_id_by_ta_period.setdefault((ta_id, period_id), gs_id)
+
+    plan_by_achievements: Dict[Tuple[int, int, Optional[int]], FinalGradePlan] = {}
+    for period in periods:
+        # Grades are loaded one period at a time so peak memory stays bounded by the
+        # size of a single period, not the whole year.
+        period_gradesheet_ids = [
+            gs_id for (_ta_id, period_id), gs_id in gradesheet_id_by_ta_period.items() if period_id == period.id
+        ]
+        scores_by_gradesheet: Dict[int, Dict[Tuple[int, int], Optional[Decimal]]] = defaultdict(dict)
+        if period_gradesheet_ids:
+            grades = AchievementGrade.objects.filter(gradesheet_id__in=period_gradesheet_ids).values_list(
+                "gradesheet_id", "enrollment_id", "achievement_id", "score"
+            )
+            for gs_id, enrollment_id, achievement_id, score in grades.iterator(chunk_size=5000):
+                scores_by_gradesheet[gs_id][(enrollment_id, achievement_id)] = score
+
+        for ta in assignments:
+            group_enrollment_ids = enrollment_ids_by_group.get(int(ta.group_id), [])
+            if not group_enrollment_ids:
+                continue
+
+            achievement_key = (ta.academic_load_id, period.id, ta.group_id)
+            if not achievements_by_key.get(achievement_key):
+                achievement_key = (ta.academic_load_id, period.id, None)
+            achievements = achievements_by_key.get(achievement_key, [])
+            if not achievements:
+                for enrollment_id in group_enrollment_ids:
+                    yield ta, period, enrollment_id, DEFAULT_EMPTY_SCORE
+                continue
+
+            gs_id = gradesheet_id_by_ta_period.get((ta.id, period.id))
+            score_by_cell = scores_by_gradesheet.get(gs_id, {}) if gs_id is not None else {}
+            # Global achievements are shared by every group of the load: compile once.
+            plan = plan_by_achievements.get(achievement_key)
+            if plan is None:
+                plan = plan_by_achievements[achievement_key] = FinalGradePlan(
+                    [(dimension_id, percentage) for _, dimension_id, percentage in achievements],
+                    dimension_percentage_by_id=dim_percentage_by_id,
+                )
+            achievement_ids = [ach_id for ach_id, _, _ in achievements]
+            for enrollment_id in group_enrollment_ids:
+                yield ta, period, enrollment_id, plan.final_for_row(
+                    [score_by_cell.get((enrollment_id, ach_id)) for ach_id in achievement_ids]
+                )
 
 
 def compute_promotions_for_year(
@@ -117,7 +209,7 @@ def compute_promotions_for_year(
 
     from students.models import Enrollment
 
-    enrollments = (
+    enrollments = list(
         Enrollment.objects.filter(academic_year_id=academic_year.id, status="ACTIVE")
         .select_related("group", "grade", "grade__level")
         .only("id", "group_id", "grade_id", "grade__level__level_type")
@@ -134,11 +226,11 @@ def compute_promotions_for_year(
         )
 
     # Prepare accumulators: enrollment -> subject -> (sum, count)
-    subject_sum: Dict[Tuple[int, int], Decimal] = defaultdict(lambda: Decimal("0.00"))
-    subject_count: Dict[Tuple[int, int], int] = defaultdict(int)
+    subject_sum: Dict[int, Dict[int, Decimal]] = defaultdict(dict)
+    subject_count: Dict[int, Dict[int, int]] = defaultdict(dict)
     subject_area_id: Dict[int, int] = {}
 
-    assignments = (
+    assignments = list(
         TeacherAssignment.objects.filter(academic_year_id=academic_year.id)
         .select_related("group", "academic_load__subject__area")
         .only(
@@ -156,27 +248,28 @@ def compute_promotions_for_year(
     for enrollment_id, group_id in group_id_by_enrollment.items():
         enrollment_ids_by_group[int(group_id)].append(int(enrollment_id))
 
+    for ta in assignments:
+        if ta.academic_load_id:
+            subject_area_id[int(ta.academic_load.subject_id)] = int(ta.academic_load.subject.area_id)
+
+    from .subject_finals import get_subject_period_finals
+
+    finals = get_subject_period_finals(
+        academic_year_id=academic_year.id,
+        assignments=assignments,
+        periods=periods,
+        enrollment_ids_by_group=enrollment_ids_by_group,
+    )
     for ta in assignments:
         if not ta.academic_load_id:
             continue
         subj_id = int(ta.academic_load.subject_id)
-        area_id = int(ta.academic_load.subject.area_id)
-        subject_area_id[subj_id] = area_id
-
-        group_enrollment_ids = enrollment_ids_by_group.get(int(ta.group_id), [])
-        if not group_enrollment_ids:
-            continue
-
-        for period in periods:
-            finals = _compute_subject_final_for_enrollments(
-                teacher_assignment=ta,
-                period=period,
-                enrollment_ids=group_enrollment_ids,
-            )
-            for enrollment_id, final_score in finals.items():
-                key = (int(enrollment_id), subj_id)
-                subject_sum[key] += Decimal(final_score)
-                subject_count[key] += 1
+        for enrollment_id in enrollment_ids_by_group.get(int(ta.group_id), []):
+            sums = subject_sum[enrollment_id]
+            counts = subject_count[enrollment_id]
+            for period in periods:
+                sums[subj_id] = sums.get(subj_id, Decimal("0.00")) + Decimal(finals[(ta.id, period.id, enrollment_id)])
+                counts[subj_id] = counts.get(subj_id, 0) + 1
 
     result: Dict[int, EnrollmentPromotionComputation] = {}
 
@@ -185,14 +278,12 @@ def compute_promotions_for_year(
         level_type = grade_level_type_by_enrollment.get(eid)
 
         # Build subject finals for this enrollment
-        finals_by_subject: Dict[int, Decimal] = {}
-        for (enrollment_id, subject_id), total in subject_sum.items():
-            if enrollment_id != eid:
-                continue
-            count = subject_count.get((enrollment_id, subject_id), 0)
-            if count <= 0:
-                continue
-            finals_by_subject[int(subject_id)] = (total / Decimal(count)).quantize(Decimal("0.01"))
+        counts = subject_count.get(eid, {})
+        finals_by_subject: Dict[int, Decimal] = {
+            int(subject_id): (total / Decimal(counts[subject_id])).quantize(Decimal("0.01"))
+            for subject_id, total in subject_sum.get(eid, {}).items()
+            if counts.get(subject_id, 0) > 0
+        }
 
         # Preescolar: promoción automática (pasan al siguiente grado)
         if level_type == "PRESCHOOL":
@@ -7,8 +7,9 @@ from typing import Any
 from django.db.models import Q
 from django.utils import timezone
 
-from academic.promotion import PASSING_SCORE_DEFAULT, _compute_subject_final_for_enrollments, compute_promotions_for_year
 from academic.models import Group, Period, TeacherAssignment
+from academic.promotion import PASSING_SCORE_DEFAULT, _compute_subject_final_for_enrollments
+from academic.standing import get_academic_standing
 from core.models import Institution
 from discipline.models import DisciplineCase
 from students.models import Enrollment, FamilyMember, ObserverAnnotation
@@ -104,41 +105,52 @@ def _build_commitment_reason_text(*, student_name: str, period_name: str, grade_
 	return base
 
 
+def _failed_period_subject_ids(*, enrollment: Enrollment, period: Period) -> set[int]:
+	assignments = (
+		TeacherAssignment.objects.filter(
+			academic_year_id=period.academic_year_id,
+			group_id=enrollment.group_id,
+			academic_load__subject__isnull=False,
+		)
+		.select_related("academic_load")
+		.only("id", "academic_load__subject_id")
+	)
+	passing_score = Decimal(PASSING_SCORE_DEFAULT)
+	failed_subject_ids: set[int] = set()
+	for assignment in assignments:
+		finals = _compute_subject_final_for_enrollments(
+			teacher_assignment=assignment,
+			period=period,
+			enrollment_ids=[int(enrollment.id)],
+		)
+		score = finals.get(int(enrollment.id))
+		if score is not None and Decimal(score) < passing_score:
+			failed_subject_ids.add(int(assignment.academic_load.subject_id))
+	return failed_subject_ids
+
+
 def get_failed_subject_names_for_decision(decision: CommissionStudentDecision) -> list[str]:
 	commission = decision.commission
 	enrollment = decision.enrollment
 	failed_subject_ids: set[int] = set()
 
 	if commission.commission_type == Commission.TYPE_PROMOTION:
-		computed = compute_promotions_for_year(
-			academic_year=commission.academic_year,
-			passing_score=Decimal(PASSING_SCORE_DEFAULT),
-		)
-		result = computed.get(int(enrollment.id))
-		for subject_id in getattr(result, "failed_subject_ids", []) or []:
-			failed_subject_ids.add(int(subject_id))
+		standing = get_academic_standing(academic_year=commission.academic_year)
 	elif commission.commission_type == Commission.TYPE_EVALUATION and commission.period_id:
-		assignments = (
-			TeacherAssignment.objects.filter(
-				academic_year_id=commission.academic_year_id,
-				group_id=enrollment.group_id,
-				academic_load__subject__isnull=False,
-			)
-			.select_related("academic_load", "academic_load__subject")
-			.only("id", "academic_load__subject_id")
+		standing = get_academic_standing(
+			academic_year=commission.academic_year,
+			period=commission.period,
+			group_ids=[enrollment.group_id],
 		)
-		passing_score = Decimal(PASSING_SCORE_DEFAULT)
-		for assignment in assignments:
-			finals = _compute_subject_final_for_enrollments(
-				teacher_assignment=assignment,
-				period=commission.period,
-				enrollment_ids=[int(enrollment.id)],
-			)
-			score = finals.get(int(enrollment.id))
-			if score is None:
-				continue
-			if Decimal(score) < passing_score:
-				failed_subject_ids.add(int(assignment.academic_load.subject_id))
+	else:
+		standing = {}
+
+	result = standing.get(int(enrollment.id))
+	if result is None and commission.commission_type == Commission.TYPE_EVALUATION and commission.period_id:
+		# Standings only cover ACTIVE enrollments; decisions may outlive that status.
+		failed_subject_ids.update(_failed_period_subject_ids(enrollment=enrollment, period=commission.period))
+	for subject_id in getattr(result, "failed_subject_ids", []) or []:
+		failed_subject_ids.add(int(subject_id))
 
 	if not failed_subject_ids:
 		return []
@@ -192,41 +204,21 @@ def build_commission_performance_snapshot(*, commission: Commission) -> dict[str
 	)
 	enrollment_ids = [int(item.id) for item in enrollments]
 
-	passing_score = Decimal(PASSING_SCORE_DEFAULT)
 	scores_by_enrollment: dict[int, list[Decimal]] = {int(item.id): [] for item in enrollments}
 	failed_subject_ids_by_enrollment: dict[int, set[int]] = {int(item.id): set() for item in enrollments}
 
 	if commission.commission_type == Commission.TYPE_EVALUATION and commission.period_id and enrollment_ids:
-		assignments = (
-			TeacherAssignment.objects.filter(
-				academic_year_id=commission.academic_year_id,
-				group_id=getattr(group, "id", None),
-				academic_load__subject__isnull=False,
-			)
-			.select_related("academic_load", "academic_load__subject")
-			.only("id", "academic_load__subject_id")
+		standing = get_academic_standing(
+			academic_year=commission.academic_year,
+			period=commission.period,
+			group_ids=[getattr(group, "id", None)],
 		)
-		for assignment in assignments:
-			subject_id = int(getattr(assignment.academic_load, "subject_id", 0) or 0)
-			if not subject_id:
+		for enrollment_id in enrollment_ids:
+			item = standing.get(enrollment_id)
+			if item is None:
 				continue
-			finals = _compute_subject_final_for_enrollments(
-				teacher_assignment=assignment,
-				period=commission.period,
-				enrollment_ids=enrollment_ids,
-			)
-			for enrollment_id, score in finals.items():
-				if enrollment_id not in scores_by_enrollment:
-					continue
-				if score is None:
-					continue
-				try:
-					score_decimal = Decimal(str(score))
-				except Exception:
-					continue
-				scores_by_enrollment[enrollment_id].append(score_decimal)
-				if score_decimal < passing_score:
-					failed_subject_ids_by_enrollment[enrollment_id].add(subject_id)
+			scores_by_enrollment[enrollment_id].extend(item.subject_finals.values())
+			failed_subject_ids_by_enrollment[enrollment_id].update(item.failed_subject_ids)
 
 	all_failed_subject_ids = {
 		subject_id
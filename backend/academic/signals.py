@@ -2,11 +2,29 @@ from __future__ import annotations
 
 import logging
 
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
-from academic.models import GradeSheet
+from academic.grading import invalidate_scale_index
+from academic.models import (
+    AcademicYear,
+    Achievement,
+    AchievementGrade,
+    Dimension,
+    EvaluationScale,
+    GradeSheet,
+    Period,
+    Subject,
+    TeacherAssignment,
+)
+from academic.standing import invalidate_academic_standing
+from academic.subject_finals import (
+    invalidate_subject_finals,
+    invalidate_subject_finals_for_achievement_scope,
+    invalidate_subject_finals_for_gradesheets,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -46,3 +64,114 @@ def _gradesheet_post_save(sender, instance: GradeSheet, created: bool, **kwargs)
         maybe_generate_group_period_annotations(gradesheet_id=int(instance.pk))
     except Exception:
         logger.exception("Error handling GradeSheet publish automation")
+
+
+@receiver(post_save, sender=EvaluationScale)
+@receiver(post_delete, sender=EvaluationScale)
+def _evaluation_scale_changed(sender, instance: EvaluationScale, **kwargs):
+    invalidate_scale_index()
+
+
+@receiver(post_save, sender=AcademicYear)
+def _academic_year_saved(sender, instance: AcademicYear, created: bool, **kwargs):
+    # A reused primary key must never inherit a stale scale index or standing.
+    if created:
+        invalidate_scale_index()
+        invalidate_academic_standing()
+
+
+# --- Materialized subject finals (SubjectPeriodFinal) -----------------------------
+# Structural changes drop the affected rows; readers recompute and store them again.
+
+
+@receiver(pre_save, sender=Achievement)
+def _achievement_pre_save(sender, instance: Achievement, **kwargs):
+    instance._old_final_scope = None  # type: ignore[attr-defined]
+    if not instance.pk:
+        return
+    instance._old_final_scope = (  # type: ignore[attr-defined]
+        Achievement.objects.filter(pk=instance.pk).values_list("academic_load_id", "period_id", "group_id").first()
+    )
+
+
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+def _achievement_changed(sender, instance: Achievement, **kwargs):
+    scopes = {(instance.academic_load_id, instance.period_id, instance.group_id)}
+    old_scope = getattr(instance, "_old_final_scope", None)
+    if old_scope:
+        scopes.add(tuple(old_scope))
+    for academic_load_id, period_id, group_id in scopes:
+        invalidate_subject_finals_for_achievement_scope(
+            academic_load_id=academic_load_id,
+            period_id=period_id,
+            group_id=group_id,
+        )
+
+
+@receiver(pre_save, sender=Dimension)
+def _dimension_pre_save(sender, instance: Dimension, **kwargs):
+    instance._old_percentage = None  # type: ignore[attr-defined]
+    if instance.pk:
+        instance._old_percentage = (  # type: ignore[attr-defined]
+            Dimension.objects.filter(pk=instance.pk).values_list("percentage", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Dimension)
+def _dimension_post_save(sender, instance: Dimension, created: bool, **kwargs):
+    old_percentage = getattr(instance, "_old_percentage", None)
+    if created or old_percentage is None or int(old_percentage) == int(instance.percentage):
+        return
+
+    # Every final of the year depends on dimension weights: drop them now (readers fall
+    # back to live computation) and warm the table again in the background.
+    invalidate_subject_finals(academic_year_id=instance.academic_year_id)
+    academic_year_id = int(instance.academic_year_id)
+    transaction.on_commit(lambda: _enqueue_subject_finals_rebuild(academic_year_id))
+
+
+def _enqueue_subject_finals_rebuild(academic_year_id: int) -> None:
+    try:
+        from academic.tasks import rebuild_subject_finals_task
+
+        rebuild_subject_finals_task.delay(academic_year_id)
+    except Exception:
+        logger.exception("Could not enqueue subject finals rebuild", extra={"academic_year_id": academic_year_id})
+
+
+@receiver(post_save, sender=AchievementGrade)
+@receiver(post_delete, sender=AchievementGrade)
+def _achievement_grade_changed(sender, instance: AchievementGrade, **kwargs):
+    # Bulk writers (gradebook endpoints) keep the table updated themselves; this only
+    # covers single-row saves and deletes such as the admin.
+    invalidate_subject_finals_for_gradesheets([instance.gradesheet_id], enrollment_ids=[instance.enrollment_id])
+
+
+@receiver(post_delete, sender=GradeSheet)
+def _gradesheet_deleted(sender, instance: GradeSheet, **kwargs):
+    invalidate_subject_finals(
+        teacher_assignment_ids=[instance.teacher_assignment_id],
+        period_ids=[instance.period_id],
+    )
+
+
+# --- Academic standing (academic.standing) ----------------------------------------
+# Changes to finals renew the version from academic.subject_finals; these cover the
+# structure a standing is computed over.
+
+
+@receiver(post_save, sender=Period)
+@receiver(post_delete, sender=Period)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+@receiver(post_save, sender=TeacherAssignment)
+@receiver(post_delete, sender=TeacherAssignment)
+def _standing_structure_changed(sender, instance, **kwargs):
+    invalidate_academic_standing()
+
+
+@receiver(post_save, sender="students.Enrollment")
+@receiver(post_delete, sender="students.Enrollment")
+def _standing_enrollment_changed(sender, instance, **kwargs):
+    invalidate_academic_standing()
@@ -0,0 +1,245 @@
+"""Academic standing (failed subjects and areas) shared by commissions and promotion.
+
+An evaluation commission needs the period definitives of its group; a promotion
+commission needs the SIEE result of the whole year. Both used to be recomputed on
+every preview, sync, acta and performance snapshot, and the year-wide promotion for
+every group commission. `get_academic_standing` computes a scope once and keeps it in
+the shared cache under:
+
+    (academic_year, period or whole year, group set, passing score, data version)
+
+The data version combines a token renewed whenever materialized finals are stored or
+invalidated, or enrollments / teacher assignments / subjects / periods change (see
+`academic.signals`), with a digest of the scope's active enrollments, which also
+catches bulk `update()` calls that send no signals.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+from .models import Period, TeacherAssignment
+from .promotion import PASSING_SCORE_DEFAULT, compute_promotions_for_year
+
+
+logger = logging.getLogger(__name__)
+
+_STANDING_VERSION_KEY = "academic:standing:version"
+
+
+@dataclass(frozen=True)
+class EnrollmentStanding:
+    enrollment_id: int
+    # subject_id -> definitive (period scope) or year average (year scope).
+    subject_finals: Dict[int, Decimal] = field(default_factory=dict)
+    failed_subject_ids: List[int] = field(default_factory=list)
+    failed_area_ids: List[int] = field(default_factory=list)
+    # SIEE decision; only set for whole-year standings.
+    decision: Optional[str] = None
+
+    @property
+    def average(self) -> Optional[Decimal]:
+        if not self.subject_finals:
+            return None
+        return sum(self.subject_finals.values()) / Decimal(len(self.subject_finals))
+
+
+def _renew_standing_version() -> None:
+    try:
+        cache.set(_STANDING_VERSION_KEY, uuid4().hex, timeout=None)
+    except Exception:
+        logger.warning("academic_standing.invalidate_failed", exc_info=True)
+
+
+def invalidate_academic_standing() -> None:
+    _renew_standing_version()
+    # Renew the version again once committed: a standing computed by another process
+    # from the pre-commit rows in between would otherwise be cached under the new one.
+    transaction.on_commit(_renew_standing_version)
+
+
+def _cache_timeout() -> int:
+    timeout = int(getattr(settings, "ACADEMIC_STANDING_CACHE_SECONDS", 900))
+    # A process-local cache never sees the version renewed by other processes, so a
+    # standing cached there can only be trusted for a few seconds.
+    if isinstance(caches["default"], LocMemCache):
+        return min(timeout, int(getattr(settings, "ACADEMIC_STANDING_LOCAL_CACHE_SECONDS", 10)))
+    return timeout
+
+
+def _active_enrollments(academic_year_id: int, group_ids: Optional[List[int]]) -> List[tuple[int, Optional[int]]]:
+    from students.models import Enrollment
+
+    qs = Enrollment.objects.filter(academic_year_id=academic_year_id, status="ACTIVE")
+    if group_ids is not None:
+        qs = qs.filter(group_id__in=group_ids)
+    return list(qs.order_by("id").values_list("id", "group_id"))
+
+
+def _cache_key(
+    *,
+    academic_year_id: int,
+    period_id: Optional[int],
+    group_ids: Optional[List[int]],
+    passing_score: Decimal,
+    enrollments: List[tuple[int, Optional[int]]],
+) -> str:
+    try:
+        token = cache.get(_STANDING_VERSION_KEY)
+    except Exception:
+        token = None
+    if token is None:
+        token = uuid4().hex
+        try:
+            cache.add(_STANDING_VERSION_KEY, token, timeout=None)
+            token = cache.get(_STANDING_VERSION_KEY) or token
+        except Exception:
+            pass
+
+    scope = "all" if group_ids is None else ",".join(str(g) for g in group_ids)
+    hasher = hashlib.sha256(f"{token}|{scope}|{passing_score}".encode())
+    for enrollment_id, group_id in enrollments:
+        hasher.update(f"{enrollment_id}:{group_id};".encode())
+    return f"academic:standing:{academic_year_id}:{period_id or 'year'}:{hasher.hexdigest()}"
+
+
+def _year_standing(academic_year, passing_score: Decimal) -> Dict[int, EnrollmentStanding]:
+    computed = compute_promotions_for_year(academic_year=academic_year, passing_score=passing_score)
+    return {
+        int(enrollment_id): EnrollmentStanding(
+            enrollment_id=int(enrollment_id),
+            subject_finals=dict(getattr(comp, "subject_finals", {}) or {}),
+            failed_subject_ids=list(getattr(comp, "failed_subject_ids", []) or []),
+            failed_area_ids=list(getattr(comp, "failed_area_ids", []) or []),
+            decision=getattr(comp, "decision", None),
+        )
+        for enrollment_id, comp in computed.items()
+    }
+
+
+def _period_standing(
+    *,
+    academic_year_id: int,
+    period: Period,
+    group_ids: Optional[List[int]],
+    enrollments: List[tuple[int, Optional[int]]],
+    passing_score: Decimal,
+) -> Dict[int, EnrollmentStanding]:
+    from .subject_finals import get_subject_period_finals
+
+    enrollment_ids_by_group: Dict[int, List[int]] = defaultdict(list)
+    for enrollment_id, group_id in enrollments:
+        if group_id:
+            enrollment_ids_by_group[int(group_id)].append(int(enrollment_id))
+
+    assignments = (
+        TeacherAssignment.objects.filter(
+            academic_year_id=academic_year_id,
+            academic_load__isnull=False,
+            academic_load__subject__isnull=False,
+        )
+        .select_related("academic_load__subject__area")
+        .only("id", "group_id", "academic_load__subject_id", "academic_load__subject__area_id")
+    )
+    if group_ids is not None:
+        assignments = assignments.filter(group_id__in=group_ids)
+    assignments = list(assignments)
+
+    finals_by_key = get_subject_period_finals(
+        academic_year_id=academic_year_id,
+        assignments=assignments,
+        periods=[period],
+        enrollment_ids_by_group=enrollment_ids_by_group,
+    )
+
+    subject_finals: Dict[int, Dict[int, Decimal]] = defaultdict(dict)
+    failed_subject_ids: Dict[int, set[int]] = defaultdict(set)
+    failed_area_ids: Dict[int, set[int]] = defaultdict(set)
+    for assignment in assignments:
+        subject_id = int(assignment.academic_load.subject_id)
+        area_id = int(assignment.academic_load.subject.area_id)
+        for enrollment_id in enrollment_ids_by_group.get(int(assignment.group_id), []):
+            score = Decimal(finals_by_key[(assignment.id, period.id, enrollment_id)])
+            subject_finals[enrollment_id][subject_id] = score
+            if score < passing_score:
+                failed_subject_ids[enrollment_id].add(subject_id)
+                failed_area_ids[enrollment_id].add(area_id)
+
+    return {
+        int(enrollment_id): EnrollmentStanding(
+            enrollment_id=int(enrollment_id),
+            subject_finals=subject_finals.get(int(enrollment_id), {}),
+            failed_subject_ids=sorted(failed_subject_ids.get(int(enrollment_id), set())),
+            failed_area_ids=sorted(failed_area_ids.get(int(enrollment_id), set())),
+        )
+        for enrollment_id, _group_id in enrollments
+    }
+
+
+def get_academic_standing(
+    *,
+    academic_year,
+    period: Optional[Period] = None,
+    group_ids: Optional[Iterable[int]] = None,
+    passing_score: Decimal = PASSING_SCORE_DEFAULT,
+) -> Dict[int, EnrollmentStanding]:
+    """enrollment_id -> standing for the ACTIVE enrollments of the scope.
+
+    With `period`, failures are the period definitives below `passing_score`; without
+    it, the SIEE promotion evaluation of the whole year (which always covers every
+    group: `group_ids` only narrows period standings).
+    """
+
+    academic_year_id = int(getattr(academic_year, "id", academic_year))
+    passing_score = Decimal(passing_score)
+    if period is None:
+        group_ids = None
+    elif group_ids is not None:
+        group_ids = sorted({int(g) for g in group_ids if g})
+
+    enrollments = _active_enrollments(academic_year_id, group_ids)
+    key = _cache_key(
+        academic_year_id=academic_year_id,
+        period_id=getattr(period, "id", None),
+        group_ids=group_ids,
+        passing_score=passing_score,
+        enrollments=enrollments,
+    )
+    try:
+        cached = cache.get(key)
+    except Exception:
+        cached = None
+    if cached is not None:
+        return cached
+
+    if period is None:
+        from .models import AcademicYear
+
+        if not isinstance(academic_year, AcademicYear):
+            academic_year = AcademicYear.objects.get(id=academic_year_id)
+        standing = _year_standing(academic_year, passing_score)
+    else:
+        standing = _period_standing(
+            academic_year_id=academic_year_id,
+            period=period,
+            group_ids=group_ids,
+            enrollments=enrollments,
+            passing_score=passing_score,
+        )
+
+    try:
+        cache.set(key, standing, timeout=_cache_timeout())
+    except Exception:
+        logger.warning("academic_standing.cache_set_failed", extra={"key": key}, exc_info=True)
+    return standing
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from django.db import transaction
+
+from .models import GradeSheet, Period, SubjectPeriodFinal, TeacherAssignment
+from .promotion import _compute_subject_final_for_enrollments, iter_subject_period_finals
+from .standing import invalidate_academic_standing
+
+
+# (teacher_assignment_id, period_id, enrollment_id)
+FinalKey = Tuple[int, int, int]
+
+_BULK_BATCH_SIZE = 1000
+
+
+def store_subject_finals(
+    *,
+    teacher_assignment_id: int,
+    period_id: int,
+    finals: Mapping[int, Decimal],
+) -> int:
+    """Upsert already computed finals (enrollment_id -> score) for one assignment/period."""
+
+    invalidate_academic_standing()
+    return _upsert(
+        (int(teacher_assignment_id), int(period_id), int(enrollment_id), score)
+        for enrollment_id, score in finals.items()
+    )
+
+
+def _upsert(rows: Iterable[Tuple[int, int, int, Decimal]], *, overwrite: bool = True) -> int:
+    """Store finals; with ``overwrite=False`` rows already in the table are kept as they are."""
+
+    objs = [
+        SubjectPeriodFinal(
+            teacher_assignment_id=ta_id,
+            period_id=period_id,
+            enrollment_id=enrollment_id,
+            score=Decimal(score),
+        )
+        for ta_id, period_id, enrollment_id, score in rows
+    ]
+    if not objs:
+        return 0
+    if overwrite:
+        SubjectPeriodFinal.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=["enrollment", "teacher_assignment", "period"],
+            update_fields=["score", "computed_at"],
+            batch_size=_BULK_BATCH_SIZE,
+        )
+    else:
+        SubjectPeriodFinal.objects.bulk_create(objs, ignore_conflicts=True, batch_size=_BULK_BATCH_SIZE)
+    return len(objs)
+
+
+def invalidate_subject_finals(
+    *,
+    teacher_assignment_ids: Optional[Iterable[int]] = None,
+    period_ids: Optional[Iterable[int]] = None,
+    enrollment_ids: Optional[Iterable[int]] = None,
+    academic_year_id: Optional[int] = None,
+) -> int:
+    """Drop materialized finals so readers recompute (and re-store) them on next access."""
+
+    qs = SubjectPeriodFinal.objects.all()
+    if teacher_assignment_ids is not None:
+        qs = qs.filter(teacher_assignment_id__in=list(teacher_assignment_ids))
+    if period_ids is not None:
+        qs = qs.filter(period_id__in=list(period_ids))
+    if enrollment_ids is not None:
+        qs = qs.filter(enrollment_id__in=list(enrollment_ids))
+    if academic_year_id is not None:
+        qs = qs.filter(period__academic_year_id=academic_year_id)
+    invalidate_academic_standing()
+    return qs.delete()[0]
+
+
+def invalidate_subject_finals_for_gradesheets(
+    gradesheet_ids: Iterable[int],
+    *,
+    enrollment_ids: Optional[Iterable[int]] = None,
+) -> int:
+    pairs = list(
+        GradeSheet.objects.filter(id__in=list(gradesheet_ids)).values_list("teacher_assignment_id", "period_id")
+    )
+    enrollment_ids = list(enrollment_ids) if enrollment_ids is not None else None
+    deleted = 0
+    for ta_id, period_id in pairs:
+        deleted += invalidate_subject_finals(
+            teacher_assignment_ids=[ta_id],
+            period_ids=[period_id],
+            enrollment_ids=enrollment_ids,
+        )
+    return deleted
+
+
+def invalidate_subject_finals_for_achievement_scope(
+    *,
+    academic_load_id: Optional[int],
+    period_id: Optional[int],
+    group_id: Optional[int],
+) -> int:
+    """Achievements are shared by every group of a load unless they are group-specific."""
+
+    if not academic_load_id or not period_id:
+        return 0
+    assignments = TeacherAssignment.objects.filter(
+        academic_load_id=academic_load_id,
+        academic_year_id=Period.objects.filter(id=period_id).values("academic_year_id")[:1],
+    )
+    if group_id:
+        assignments = assignments.filter(group_id=group_id)
+    invalidate_academic_standing()
+    return SubjectPeriodFinal.objects.filter(
+        teacher_assignment_id__in=assignments.values("id"),
+        period_id=period_id,
+    ).delete()[0]
+
+
+def refresh_subject_finals(
+    *,
+    teacher_assignment: TeacherAssignment,
+    period: Period,
+    enrollment_ids: Optional[Sequence[int]] = None,
+) -> Dict[int, Decimal]:
+    """Recompute one assignment/period from AchievementGrade rows and store the result."""
+
+    if enrollment_ids is None:
+        from students.models import Enrollment
+
+        enrollment_ids = list(
+            Enrollment.objects.filter(
+                academic_year_id=teacher_assignment.academic_year_id,
+                group_id=teacher_assignment.group_id,
+                status="ACTIVE",
+            ).values_list("id", flat=True)
+        )
+    finals = _compute_subject_final_for_enrollments(
+        teacher_assignment=teacher_assignment,
+        period=period,
+        enrollment_ids=list(enrollment_ids),
+    )
+    store_subject_finals(teacher_assignment_id=teacher_assignment.id, period_id=period.id, finals=finals)
+    return finals
+
+
+def get_subject_period_finals(
+    *,
+    academic_year_id: int,
+    assignments: Iterable[TeacherAssignment],
+    periods: Sequence[Period],
+    enrollment_ids_by_group: Mapping[int, Sequence[int]],
+) -> Dict[FinalKey, Decimal]:
+    """Finals for every (assignment, period, enrollment of the assignment's group).
+
+    Reads the materialized table in one query. Missing rows (never computed, or
+    invalidated by a structural change) are computed with the set-based engine and
+    stored, so the next reader gets them from the table.
+    """
+
+    assignments = [ta for ta in assignments if ta.academic_load_id]
+    if not assignments or not periods:
+        return {}
+
+    period_ids = [p.id for p in periods]
+    finals: Dict[FinalKey, Decimal] = {}
+    for ta_id, period_id, enrollment_id, score in SubjectPeriodFinal.objects.filter(
+        teacher_assignment_id__in=[ta.id for ta in assignments],
+        period_id__in=period_ids,
+    ).values_list("teacher_assignment_id", "period_id", "enrollment_id", "score"):
+        finals[(ta_id, period_id, enrollment_id)] = score
+
+    missing_assignments: Dict[int, TeacherAssignment] = {}
+    missing_period_ids = set()
+    for ta in assignments:
+        for enrollment_id in enrollment_ids_by_group.get(int(ta.group_id), []):
+            for period_id in period_ids:
+                if (ta.id, period_id, int(enrollment_id)) not in finals:
+                    missing_assignments[ta.id] = ta
+                    missing_period_ids.add(period_id)
+
+    if missing_assignments:
+        missing_rows: List[Tuple[int, int, int, Decimal]] = []
+        for ta, period, enrollment_id, score in iter_subject_period_finals(
+            academic_year_id=academic_year_id,
+            assignments=missing_assignments.values(),
+            periods=[p for p in periods if p.id in missing_period_ids],
+            enrollment_ids_by_group=enrollment_ids_by_group,
+        ):
+            key = (ta.id, period.id, int(enrollment_id))
+            if key in finals:
+                continue
+            finals[key] = score
+            missing_rows.append((ta.id, period.id, int(enrollment_id), score))
+        # A writer may have stored a fresher final since the grades were read above:
+        # readers only fill gaps and never replace an existing row.
+        _upsert(missing_rows, overwrite=False)
+
+    return finals
+
+
+def get_subject_period_finals_for_enrollment(
+    *,
+    enrollment,
+    assignments: Iterable[TeacherAssignment],
+    periods: Sequence[Period],
+) -> Dict[Tuple[int, int], Decimal]:
+    """(teacher_assignment_id, period_id) -> final for a single enrollment."""
+
+    assignments = [ta for ta in assignments if int(ta.group_id) == int(enrollment.group_id or 0)]
+    finals = get_subject_period_finals(
+        academic_year_id=enrollment.academic_year_id,
+        assignments=assignments,
+        periods=periods,
+        enrollment_ids_by_group={int(enrollment.group_id or 0): [int(enrollment.id)]},
+    )
+    return {(ta_id, period_id): score for (ta_id, period_id, _enrollment_id), score in finals.items()}
+
+
+def _active_enrollment_ids_by_group(academic_year_id: int) -> Dict[int, List[int]]:
+    from students.models import Enrollment
+
+    out: Dict[int, List[int]] = defaultdict(list)
+    for enrollment_id, group_id in Enrollment.objects.filter(
+        academic_year_id=academic_year_id,
+        status="ACTIVE",
+        group__isnull=False,
+    ).values_list("id", "group_id"):
+        out[int(group_id)].append(int(enrollment_id))
+    return out
+
+
+def rebuild_subject_finals(*, academic_year_id: int) -> int:
+    """Recompute the whole materialized table for one academic year."""
+
+    assignments = list(
+        TeacherAssignment.objects.filter(academic_year_id=academic_year_id).only(
+            "id", "group_id", "academic_load_id", "academic_year_id"
+        )
+    )
+    periods = list(Period.objects.filter(academic_year_id=academic_year_id).order_by("start_date"))
+    enrollment_ids_by_group = _active_enrollment_ids_by_group(academic_year_id)
+
+    with transaction.atomic():
+        invalidate_subject_finals(academic_year_id=academic_year_id)
+        rows: List[Tuple[int, int, int, Decimal]] = []
+        written = 0
+        for ta, period, enrollment_id, score in iter_subject_period_finals(
+            academic_year_id=academic_year_id,
+            assignments=assignments,
+            periods=periods,
+            enrollment_ids_by_group=enrollment_ids_by_group,
+        ):
+            rows.append((ta.id, period.id, int(enrollment_id), score))
+            if len(rows) >= _BULK_BATCH_SIZE:
+                written += _upsert(rows)
+                rows = []
+        written += _upsert(rows)
+    return written
+
+
+def verify_subject_finals(*, academic_year_id: int) -> List[Dict[str, object]]:
+    """Compare stored finals with the per-assignment live computation.
+
+    Returns one entry per mismatching or missing cell.
+    """
+
+    stored: Dict[FinalKey, Decimal] = {
+        (ta_id, period_id, enrollment_id): score
+        for ta_id, period_id, enrollment_id, score in SubjectPeriodFinal.objects.filter(
+            period__academic_year_id=academic_year_id
+        ).values_list("teacher_assignment_id", "period_id", "enrollment_id", "score")
+    }
+    enrollment_ids_by_group = _active_enrollment_ids_by_group(academic_year_id)
+    periods = list(Period.objects.filter(academic_year_id=academic_year_id).order_by("start_date"))
+
+    problems: List[Dict[str, object]] = []
+    for ta in TeacherAssignment.objects.filter(academic_year_id=academic_year_id, academic_load__isnull=False):
+        enrollment_ids = enrollment_ids_by_group.get(int(ta.group_id), [])
+        if not enrollment_ids:
+            continue
+        for period in periods:
+            live = _compute_subject_final_for_enrollments(
+                teacher_assignment=ta,
+                period=period,
+                enrollment_ids=enrollment_ids,
+            )
+            for enrollment_id, score in live.items():
+                current = stored.get((ta.id, period.id, int(enrollment_id)))
+                if current is None or Decimal(current) != Decimal(score):
+                    problems.append(
+                        {
+                            "teacher_assignment_id": ta.id,
+                            "period_id": period.id,
+                            "enrollment_id": int(enrollment_id),
+                            "stored": current,
+                            "live": score,
+                        }
+                    )
+    return problems
@@ -96,4 +96,11 @@ def generate_commission_observer_annotations_task(commission_id: int, closed_by_
 			)
 
 	_notify_superadmins(closed_by_user_id=closed_by_user_id, summary=summary)
-	return summary
\ No newline at end of file
+	return summary
+
+@shared_task(name="academic.rebuild_subject_finals")
+def rebuild_subject_finals_task(academic_year_id: int) -> dict:
+	from .subject_finals import rebuild_subject_finals
+
+	written = rebuild_subject_finals(academic_year_id=int(academic_year_id))
+	return {"academic_year_id": int(academic_year_id), "written": written}
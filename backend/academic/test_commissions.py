@@ -23,6 +23,7 @@ from academic.models import (
     Subject,
     TeacherAssignment,
 )
+from academic.reports import get_failed_subject_names_for_decision
 from academic.tasks import generate_commission_observer_annotations_task
 from discipline.models import DisciplineCase
 from notifications.models import Notification
@@ -942,7 +943,24 @@ class CommissionWorkflowApiTests(APITestCase):
         results = compute_difficulties_for_commission(commission_without_period)
         self.assertEqual(results, [])
 
-    @patch("academic.commission_services.compute_promotions_for_year")
+    def test_failed_subject_names_cover_enrollments_retired_after_the_commission(self):
+        failed = self._create_grades_for_assignment(suffix="Retiro", score_by_enrollment={self.enrollment: "1.50"})
+        self._create_grades_for_assignment(suffix="Aprobada", score_by_enrollment={self.enrollment: "4.50"})
+        decision = CommissionStudentDecision.objects.create(
+            commission=self.commission,
+            enrollment=self.enrollment,
+            failed_subjects_count=1,
+            failed_areas_count=1,
+            is_flagged=True,
+        )
+        Enrollment.objects.filter(id=self.enrollment.id).update(status="RETIRED")
+
+        self.assertEqual(
+            get_failed_subject_names_for_decision(decision),
+            [failed.academic_load.subject.name],
+        )
+
+    @patch("academic.standing.compute_promotions_for_year")
     def test_compute_difficulties_promotion_excludes_retired_enrollments(self, mock_promotion_compute):
         retired_student_user = get_user_model().objects.create_user(
             username="student_commission_retired",
@@ -5,7 +5,9 @@ from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework.test import APITestCase
 
@@ -21,6 +23,7 @@ from academic.models import (
     EditGrant,
     EditGrantItem,
     EditRequest,
+    EvaluationScale,
     GradeSheet,
     Grade,
     Group,
@@ -328,6 +331,175 @@ class GradebookApiTests(APITestCase):
         )
         self.assertEqual(resp.status_code, 400)
 
+    def test_gradebook_columnar_format_matches_cells(self):
+        self.client.post(
+            "/api/grade-sheets/bulk-upsert/",
+            {
+                "teacher_assignment": self.assignment.id,
+                "period": self.period.id,
+                "grades": [{"enrollment": self.enrollment.id, "achievement": self.achievement.id, "score": "3.50"}],
+            },
+            format="json",
+        )
+        params = {"teacher_assignment": self.assignment.id, "period": self.period.id}
+        cells = self.client.get("/api/grade-sheets/gradebook/", params).data
+        columnar = self.client.get("/api/grade-sheets/gradebook/", {**params, "format": "columnar"}).data
+
+        self.assertNotIn("cells", columnar)
+        self.assertEqual(columnar["layout"], "columnar")
+        grid = columnar["grid"]
+        self.assertEqual(grid["enrollment_ids"], [s["enrollment_id"] for s in cells["students"]])
+        self.assertEqual(grid["achievement_ids"], [a["id"] for a in cells["achievements"]])
+        width = len(grid["achievement_ids"])
+        for cell in cells["cells"]:
+            row = grid["enrollment_ids"].index(cell["enrollment"])
+            col = grid["achievement_ids"].index(cell["achievement"])
+            self.assertEqual(grid["scores"][row * width + col], cell["score"])
+        self.assertEqual(columnar["computed"], cells["computed"])
+
+    def test_gradebook_etag_returns_not_modified_until_grades_change(self):
+        params = {"teacher_assignment": self.assignment.id, "period": self.period.id}
+        first = self.client.get("/api/grade-sheets/gradebook/", params)
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+
+        cached = self.client.get("/api/grade-sheets/gradebook/", params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], etag)
+
+        # Representaciones distintas no comparten ETag.
+        columnar = self.client.get(
+            "/api/grade-sheets/gradebook/", {**params, "format": "columnar"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(columnar.status_code, 200)
+
+        self.client.post(
+            "/api/grade-sheets/bulk-upsert/",
+            {
+                "teacher_assignment": self.assignment.id,
+                "period": self.period.id,
+                "grades": [{"enrollment": self.enrollment.id, "achievement": self.achievement.id, "score": "4.00"}],
+            },
+            format="json",
+        )
+        changed = self.client.get("/api/grade-sheets/gradebook/", params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+        self.achievement.description = "Suma, resta y multiplicación"
+        self.achievement.save()
+        edited = self.client.get("/api/grade-sheets/gradebook/", params, HTTP_IF_NONE_MATCH=changed["ETag"])
+        self.assertEqual(edited.status_code, 200)
+
+        # Nombres de estudiantes y del periodo también forman parte de la respuesta.
+        student_user = self.enrollment.student.user
+        student_user.last_name = "Renombrado"
+        student_user.save()
+        renamed = self.client.get("/api/grade-sheets/gradebook/", params, HTTP_IF_NONE_MATCH=edited["ETag"])
+        self.assertEqual(renamed.status_code, 200)
+
+        self.period.name = "Primer periodo"
+        self.period.save()
+        period_renamed = self.client.get("/api/grade-sheets/gradebook/", params, HTTP_IF_NONE_MATCH=renamed["ETag"])
+        self.assertEqual(period_renamed.status_code, 200)
+
+    def test_gradebook_changes_returns_cells_written_since_cursor(self):
+        url = "/api/grade-sheets/gradebook/changes/"
+        params = {"teacher_assignment": self.assignment.id, "period": self.period.id}
+
+        student_user = get_user_model().objects.create_user(username="student_old", password="pass", role="STUDENT")
+        old_enrollment = Enrollment.objects.create(
+            student=Student.objects.create(user=student_user, document_number="CHANGES0001"),
+            academic_year=self.year,
+            grade=self.grade,
+            group=self.group,
+            status="ACTIVE",
+        )
+
+        first = self.client.get(url, params)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.data["full_reload"])
+        cursor = first.data["cursor"]
+
+        self.client.get("/api/grade-sheets/gradebook/", params)
+        # Celda antigua: queda fuera de la ventana del cursor.
+        gradesheet = GradeSheet.objects.get(teacher_assignment=self.assignment, period=self.period)
+        AchievementGrade.objects.create(
+            gradesheet=gradesheet, enrollment=old_enrollment, achievement=self.achievement, score=Decimal("2.00")
+        )
+        AchievementGrade.objects.filter(enrollment=old_enrollment).update(updated_at=timezone.now() - timedelta(days=1))
+        GradeSheet.objects.filter(id=gradesheet.id).update(updated_at=timezone.now() - timedelta(days=1))
+
+        self.client.post(
+            "/api/grade-sheets/bulk-upsert/",
+            {
+                "teacher_assignment": self.assignment.id,
+                "period": self.period.id,
+                "grades": [{"enrollment": self.enrollment.id, "achievement": self.achievement.id, "score": "4.40"}],
+            },
+            format="json",
+        )
+
+        resp = self.client.get(url, {**params, "since": cursor})
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(resp.data["full_reload"])
+        self.assertEqual(
+            [(c["enrollment"], c["achievement"], Decimal(str(c["score"]))) for c in resp.data["cells"]],
+            [(self.enrollment.id, self.achievement.id, Decimal("4.40"))],
+        )
+        self.assertEqual(
+            [(c["enrollment_id"], Decimal(str(c["final_score"]))) for c in resp.data["computed"]],
+            [(self.enrollment.id, Decimal("4.40"))],
+        )
+        self.assertNotEqual(resp.data["cursor"], cursor)
+
+        reset = self.client.post(f"/api/grade-sheets/{gradesheet.id}/reset/")
+        self.assertEqual(reset.status_code, 200)
+        after_reset = self.client.get(url, {**params, "since": resp.data["cursor"]})
+        self.assertTrue(after_reset.data["full_reload"])
+
+    def test_gradebook_changes_requests_full_reload_when_structure_changes(self):
+        url = "/api/grade-sheets/gradebook/changes/"
+        params = {"teacher_assignment": self.assignment.id, "period": self.period.id}
+        self.client.get("/api/grade-sheets/gradebook/", params)
+        GradeSheet.objects.filter(teacher_assignment=self.assignment).update(updated_at=timezone.now() - timedelta(days=1))
+
+        def changes_since(cursor):
+            resp = self.client.get(url, {**params, "since": cursor})
+            self.assertEqual(resp.status_code, 200)
+            return resp.data
+
+        cursor = self.client.get(url, params).data["cursor"]
+        unchanged = changes_since(cursor)
+        self.assertFalse(unchanged["full_reload"])
+
+        # Cambios de estructura que no tocan updated_at de la planilla ni de las columnas.
+        changes = [
+            lambda: Achievement.objects.filter(id=self.achievement.id).update(percentage=50),
+            lambda: Dimension.objects.filter(id=self.dimension.id).update(percentage=90),
+            lambda: Achievement.objects.create(
+                academic_load=self.load,
+                group=self.group,
+                period=self.period,
+                dimension=self.dimension,
+                description="Nuevo logro",
+                percentage=50,
+            ),
+            lambda: Enrollment.objects.filter(id=self.enrollment.id).update(status="RETIRED"),
+            lambda: EvaluationScale.objects.create(
+                academic_year=self.year, name="Superior", min_score=Decimal("4.60"), max_score=Decimal("5.00")
+            ),
+        ]
+        cursor = unchanged["cursor"]
+        for change in changes:
+            change()
+            data = changes_since(cursor)
+            self.assertTrue(data["full_reload"])
+            cursor = data["cursor"]
+            self.assertFalse(changes_since(cursor)["full_reload"])
+
+        self.assertTrue(changes_since(cursor.split("~")[0])["full_reload"])
+
     def test_teacher_cannot_access_other_assignment(self):
         resp = self.client.get(
             "/api/grade-sheets/gradebook/",
@@ -796,3 +968,111 @@ class GradebookApiTests(APITestCase):
         )
         self.assertEqual(allowed.status_code, 200)
         self.assertEqual(allowed.data.get("created"), 1)
+
+
+class GradebookAutosaveQueryCountTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.teacher = User.objects.create_user(
+            username="autosave_teacher",
+            password="pass",
+            email="autosave_t@example.com",
+            role="TEACHER",
+        )
+        self.year = AcademicYear.objects.create(year=2095, status=AcademicYear.STATUS_ACTIVE)
+        today = timezone.localdate()
+        self.period = Period.objects.create(
+            academic_year=self.year,
+            name="P1",
+            start_date=today - timedelta(days=7),
+            end_date=today + timedelta(days=30),
+            is_closed=False,
+        )
+        level = AcademicLevel.objects.create(name="Primaria", level_type="PRIMARY")
+        self.grade = Grade.objects.create(name="4", level=level)
+        self.group = Group.objects.create(name="A", grade=self.grade, academic_year=self.year, director=self.teacher)
+        area = Area.objects.create(name="Sociales")
+        subject = Subject.objects.create(name="Historia", area=area)
+        load = AcademicLoad.objects.create(subject=subject, grade=self.grade)
+        self.assignment = TeacherAssignment.objects.create(
+            teacher=self.teacher,
+            academic_load=load,
+            group=self.group,
+            academic_year=self.year,
+        )
+        cognitive = Dimension.objects.create(academic_year=self.year, name="Cognitivo", percentage=60, is_active=True)
+        attitudinal = Dimension.objects.create(academic_year=self.year, name="Actitudinal", percentage=40, is_active=True)
+        self.achievements = [
+            Achievement.objects.create(
+                academic_load=load,
+                group=self.group,
+                period=self.period,
+                dimension=dimension,
+                description=f"Logro {idx}",
+                percentage=50,
+            )
+            for idx, dimension in enumerate([cognitive, cognitive, attitudinal])
+        ]
+        self.enrollments = []
+        self.client.force_authenticate(user=self.teacher)
+
+    def _add_students(self, count):
+        User = get_user_model()
+        for _ in range(count):
+            n = len(self.enrollments) + 1
+            user = User.objects.create_user(username=f"autosave_s{n}", password="pass", role="STUDENT")
+            self.enrollments.append(
+                Enrollment.objects.create(
+                    student=Student.objects.create(user=user, document_number=f"AUTOSAVE{n:04d}"),
+                    academic_year=self.year,
+                    grade=self.grade,
+                    group=self.group,
+                    status="ACTIVE",
+                )
+            )
+
+    def _autosave(self, enrollment, achievement, score):
+        return self.client.post(
+            "/api/grade-sheets/bulk-upsert/",
+            {
+                "teacher_assignment": self.assignment.id,
+                "period": self.period.id,
+                "grades": [{"enrollment": enrollment.id, "achievement": achievement.id, "score": score}],
+            },
+            format="json",
+        )
+
+    def test_autosave_uses_constant_queries(self):
+        self._add_students(2)
+        # Primer guardado: crea la planilla y calienta el índice de escalas.
+        self._autosave(self.enrollments[0], self.achievements[0], "3.00")
+
+        with CaptureQueriesContext(connection) as small:
+            resp = self._autosave(self.enrollments[1], self.achievements[1], "4.00")
+        self.assertEqual(resp.status_code, 200)
+
+        self._add_students(20)
+        with CaptureQueriesContext(connection) as large:
+            resp = self._autosave(self.enrollments[-1], self.achievements[2], "4.50")
+        self.assertEqual(resp.status_code, 200)
+
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertLessEqual(len(large.captured_queries), 11, [q["sql"] for q in large.captured_queries])
+
+    @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+    @patch("reports.weasyprint_utils.render_pdf_bytes_from_html", return_value=b"%PDF-1.4 test")
+    def test_completion_is_tracked_from_written_cells(self, _mock_pdf):
+        self._add_students(2)
+        self.teacher.email = "autosave_t@example.com"
+        cells = [(e, a) for e in self.enrollments for a in self.achievements]
+        for enrollment, achievement in cells[:-1]:
+            self._autosave(enrollment, achievement, "4.00")
+        self.assertEqual(len(mail.outbox), 0)
+
+        # Borrar una celda no completa la planilla.
+        self._autosave(*cells[0], None)
+        self._autosave(*cells[-1], "4.00")
+        self.assertEqual(len(mail.outbox), 0)
+
+        self._autosave(*cells[0], "4.00")
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,71 @@
+import random
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from academic.grading import (
+    FinalGradePlan,
+    final_grade_from_achievement_scores,
+    final_grades_for_enrollments,
+)
+
+
+def _random_case(rng):
+    n = rng.randint(0, 8)
+    achievements = [
+        (rng.choice([None, 0, 1, 2, 3]), rng.choice([None, 0, 1, 3, 7, 20, 33, 50, 100]))
+        for _ in range(n)
+    ]
+    dimension_percentage_by_id = {
+        1: rng.choice([0, 10, 33, 50, 100]),
+        2: rng.choice([0, 20, 30, 67]),
+        3: rng.choice([0, 1, 25]),
+    }
+    if rng.random() < 0.2:
+        # Dimensión de otro año: no aparece en el mapa.
+        dimension_percentage_by_id.pop(2)
+    return achievements, dimension_percentage_by_id
+
+
+def _random_score(rng):
+    roll = rng.random()
+    if roll < 0.2:
+        return None
+    if roll < 0.25:
+        # Más de dos decimales: debe usar el camino Decimal.
+        return Decimal(rng.randint(10000, 50000)) / Decimal(10000)
+    return Decimal(rng.randint(0, 500)).scaleb(-2)
+
+
+class FinalGradePlanPropertyTests(SimpleTestCase):
+    """El cálculo por lotes debe coincidir con final_grade_from_achievement_scores."""
+
+    def test_matches_scalar_function_on_random_matrices(self):
+        rng = random.Random(20240611)
+        for _ in range(3000):
+            achievements, dimension_percentage_by_id = _random_case(rng)
+            plan = FinalGradePlan(achievements, dimension_percentage_by_id=dimension_percentage_by_id)
+            rows = [[_random_score(rng) for _ in achievements] for _ in range(rng.randint(1, 4))]
+
+            for row, batch in zip(rows, plan.finals_for_rows(rows)):
+                scalar = final_grade_from_achievement_scores(
+                    [(dim_id, pct, score) for (dim_id, pct), score in zip(achievements, row)],
+                    dimension_percentage_by_id=dimension_percentage_by_id,
+                )
+                self.assertEqual(batch, scalar, (achievements, dimension_percentage_by_id, row))
+                self.assertEqual(str(batch), str(scalar))
+
+    def test_rounding_ties_follow_decimal_quantize(self):
+        # 2.345 y 2.355 en una sola dimensión: empates que Decimal redondea a par.
+        plan = FinalGradePlan([(1, 1), (1, 1)], dimension_percentage_by_id={1: 100})
+        self.assertEqual(plan.final_for_row([Decimal("2.34"), Decimal("2.35")]), Decimal("2.34"))
+        self.assertEqual(plan.final_for_row([Decimal("2.35"), Decimal("2.36")]), Decimal("2.36"))
+
+    def test_enrollment_matrix_treats_missing_cells_as_null(self):
+        finals = final_grades_for_enrollments(
+            [(10, 1, 50), (11, 1, 50), (12, 2, None)],
+            [1, 2],
+            {(1, 10): Decimal("5.00"), (1, 11): Decimal("3.00"), (1, 12): Decimal("4.00")},
+            dimension_percentage_by_id={1: 60, 2: 40},
+        )
+        self.assertEqual(finals, {1: Decimal("4.00"), 2: Decimal("1.00")})
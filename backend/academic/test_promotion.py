@@ -1,6 +1,8 @@
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 
 from academic.models import (
@@ -19,6 +21,7 @@ from academic.models import (
     AchievementGrade,
     EnrollmentPromotionSnapshot,
 )
+from academic.promotion import _compute_subject_final_for_enrollments, compute_promotions_for_year
 from students.models import Student, Enrollment
 
 
@@ -329,3 +332,51 @@ class PromotionApiTests(APITestCase):
 
         new_enrollment = Enrollment.objects.get(student=self.student, academic_year=target_year)
         self.assertEqual(new_enrollment.group_id, g1.id)
+
+    def test_compute_promotions_matches_per_pair_finals_with_constant_queries(self):
+        self._make_subject_with_score(area_name="Matemáticas", subject_name="Algebra", score="2.00")
+        self._make_subject_with_score(area_name="Ciencias", subject_name="Biología", score="4.50")
+
+        with CaptureQueriesContext(connection) as small:
+            compute_promotions_for_year(academic_year=self.year)
+
+        # A second period (with a global achievement and no gradesheet) and more subjects
+        # must not add queries: everything is loaded for the whole year at once.
+        period2 = Period.objects.create(
+            academic_year=self.year,
+            name="P2",
+            start_date="2025-04-01",
+            end_date="2025-06-30",
+            is_closed=True,
+        )
+        algebra_load = AcademicLoad.objects.get(subject__name="Algebra")
+        Achievement.objects.create(
+            academic_load=algebra_load,
+            period=period2,
+            dimension=self.dimension,
+            description="Logro global",
+            percentage=100,
+        )
+        for idx in range(3):
+            self._make_subject_with_score(area_name=f"Área {idx}", subject_name=f"Materia {idx}", score="3.50")
+
+        with CaptureQueriesContext(connection) as large:
+            computed = compute_promotions_for_year(academic_year=self.year)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+        expected: dict[int, list[Decimal]] = {}
+        for ta in TeacherAssignment.objects.filter(academic_year=self.year).select_related("academic_load"):
+            for period in (self.period, period2):
+                finals = _compute_subject_final_for_enrollments(
+                    teacher_assignment=ta,
+                    period=period,
+                    enrollment_ids=[self.enrollment.id],
+                )
+                expected.setdefault(ta.academic_load.subject_id, []).append(finals[self.enrollment.id])
+
+        result = computed[self.enrollment.id]
+        self.assertEqual(
+            result.subject_finals,
+            {sid: (sum(vals) / Decimal(len(vals))).quantize(Decimal("0.01")) for sid, vals in expected.items()},
+        )
+        self.assertEqual(result.decision, "REPEATED")
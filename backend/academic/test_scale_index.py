@@ -0,0 +1,204 @@
+from decimal import Decimal
+
+from datetime import timedelta
+from time import monotonic
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from academic.grading import EvaluationScaleIndex, get_scale_index, match_scale
+from academic.models import (
+    AcademicLevel,
+    AcademicLoad,
+    AcademicYear,
+    Achievement,
+    Area,
+    Dimension,
+    EvaluationScale,
+    Grade,
+    Group,
+    Period,
+    Subject,
+    TeacherAssignment,
+)
+from students.models import Enrollment, Student
+
+
+def _reference_match(academic_year_id, score):
+    """La consulta original de match_scale, usada como oráculo."""
+    scale = (
+        EvaluationScale.objects.filter(
+            academic_year_id=academic_year_id,
+            min_score__lte=score,
+            max_score__gte=score,
+        )
+        .order_by("min_score", "id")
+        .first()
+    )
+    return scale.name if scale else None
+
+
+class EvaluationScaleIndexTests(TestCase):
+    def setUp(self):
+        self.year = AcademicYear.objects.create(year=2098, status=AcademicYear.STATUS_ACTIVE)
+        for name, lo, hi in [
+            ("Bajo", "1.00", "2.99"),
+            ("Básico", "3.00", "3.99"),
+            ("Alto", "4.00", "4.59"),
+            ("Superior", "4.60", "5.00"),
+        ]:
+            EvaluationScale.objects.create(
+                academic_year=self.year,
+                name=name,
+                min_score=Decimal(lo),
+                max_score=Decimal(hi),
+            )
+        # Cualitativa sin rangos: nunca debe coincidir.
+        EvaluationScale.objects.create(academic_year=self.year, name="Preescolar", scale_type="QUALITATIVE")
+
+    def test_matches_database_lookup_for_every_score(self):
+        index = get_scale_index(self.year.id)
+        for cents in range(0, 520):
+            score = (Decimal(cents) / Decimal(100)).quantize(Decimal("0.01"))
+            match = index.match(score)
+            self.assertEqual(match.name if match else None, _reference_match(self.year.id, score), score)
+
+    def test_overlapping_ranges_prefer_lowest_min_score(self):
+        index = EvaluationScaleIndex(
+            [
+                (Decimal("1.00"), Decimal("4.00"), "Amplia", ""),
+                (Decimal("3.00"), Decimal("3.50"), "Estrecha", ""),
+                (Decimal("4.50"), Decimal("5.00"), "Alta", ""),
+                (Decimal("2.00"), None, "SinTope", ""),
+            ]
+        )
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.name_for(Decimal("3.20")), "Amplia")
+        self.assertEqual(index.name_for(Decimal("4.20")), "")
+        self.assertEqual(index.name_for(Decimal("4.70")), "Alta")
+        self.assertIsNone(index.match(None))
+
+    def test_lookups_after_first_load_do_not_query(self):
+        get_scale_index(self.year.id)
+        with self.assertNumQueries(0):
+            for _ in range(50):
+                self.assertEqual(match_scale(self.year.id, Decimal("4.10")).name, "Alto")
+
+    def test_index_is_invalidated_when_scales_change(self):
+        self.assertEqual(match_scale(self.year.id, Decimal("4.70")).name, "Superior")
+
+        scale = EvaluationScale.objects.get(academic_year=self.year, name="Superior")
+        scale.name = "Excelente"
+        scale.save()
+        self.assertEqual(match_scale(self.year.id, Decimal("4.70")).name, "Excelente")
+
+        scale.delete()
+        self.assertIsNone(match_scale(self.year.id, Decimal("4.70")))
+
+    @override_settings(KAMPUS_PROCESS_CACHE_MAX_AGE_SECONDS=60)
+    def test_index_expires_without_shared_invalidation(self):
+        self.assertEqual(match_scale(self.year.id, Decimal("4.70")).name, "Superior")
+
+        # Otro proceso edita la escala y la versión no llega a este (LocMemCache).
+        EvaluationScale.objects.filter(academic_year=self.year, name="Superior").update(name="Excelente")
+        now = monotonic()
+        with patch("academic.grading.monotonic", return_value=now + 30):
+            self.assertEqual(match_scale(self.year.id, Decimal("4.70")).name, "Superior")
+        with patch("academic.grading.monotonic", return_value=now + 61):
+            self.assertEqual(match_scale(self.year.id, Decimal("4.70")).name, "Excelente")
+
+
+class GradebookScaleQueryCountTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.teacher = User.objects.create_user(
+            username="scale_teacher",
+            password="pass",
+            email="scale_t@example.com",
+            role="TEACHER",
+        )
+        self.year = AcademicYear.objects.create(year=2097, status=AcademicYear.STATUS_ACTIVE)
+        today = timezone.localdate()
+        self.period = Period.objects.create(
+            academic_year=self.year,
+            name="P1",
+            start_date=today - timedelta(days=7),
+            end_date=today + timedelta(days=30),
+            is_closed=False,
+        )
+        for name, lo, hi in [("Bajo", "1.00", "2.99"), ("Alto", "3.00", "5.00")]:
+            EvaluationScale.objects.create(
+                academic_year=self.year,
+                name=name,
+                min_score=Decimal(lo),
+                max_score=Decimal(hi),
+            )
+        level = AcademicLevel.objects.create(name="Primaria", level_type="PRIMARY")
+        self.grade = Grade.objects.create(name="2", level=level)
+        self.group = Group.objects.create(name="A", grade=self.grade, academic_year=self.year, director=self.teacher)
+        area = Area.objects.create(name="Ciencias")
+        subject = Subject.objects.create(name="Biología", area=area)
+        load = AcademicLoad.objects.create(subject=subject, grade=self.grade)
+        self.assignment = TeacherAssignment.objects.create(
+            teacher=self.teacher,
+            academic_load=load,
+            group=self.group,
+            academic_year=self.year,
+        )
+        dimension = Dimension.objects.create(academic_year=self.year, name="Cognitivo", percentage=100, is_active=True)
+        Achievement.objects.create(
+            academic_load=load,
+            group=self.group,
+            period=self.period,
+            dimension=dimension,
+            description="Célula",
+            percentage=100,
+        )
+        self._students = 0
+        self.client.force_authenticate(user=self.teacher)
+
+    def _add_students(self, count):
+        User = get_user_model()
+        for _ in range(count):
+            self._students += 1
+            user = User.objects.create_user(
+                username=f"scale_s{self._students}",
+                password="pass",
+                role="STUDENT",
+                last_name=f"Estudiante {self._students:03d}",
+            )
+            Enrollment.objects.create(
+                student=Student.objects.create(user=user, document_number=f"SCALE{self._students:04d}"),
+                academic_year=self.year,
+                grade=self.grade,
+                group=self.group,
+                status="ACTIVE",
+            )
+
+    def _gradebook_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(
+                "/api/grade-sheets/gradebook/",
+                {"teacher_assignment": self.assignment.id, "period": self.period.id},
+            )
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(all(row["scale"] == "Bajo" for row in resp.data["computed"]))
+        return [q["sql"] for q in ctx.captured_queries]
+
+    def test_gradebook_scale_lookups_do_not_scale_with_enrollments(self):
+        self._add_students(3)
+        # Primera carga: crea la planilla y calienta el índice de escalas.
+        self._gradebook_queries()
+        small = self._gradebook_queries()
+
+        self._add_students(12)
+        large = self._gradebook_queries()
+
+        self.assertEqual(len(small), len(large))
+        scale_table = EvaluationScale._meta.db_table
+        self.assertFalse([sql for sql in large if scale_table in sql])
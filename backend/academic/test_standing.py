@@ -0,0 +1,123 @@
+import tempfile
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from academic.commission_services import compute_difficulties_for_commission, sync_commission_difficulties
+from academic.management.commands.benchmark_promotions import seed_synthetic_school
+from academic.models import Commission, Group, Period, TeacherAssignment
+from academic.promotion import PASSING_SCORE_DEFAULT, compute_promotions_for_year
+from academic.reports import build_commission_performance_snapshot
+from academic.standing import (
+    _STANDING_VERSION_KEY,
+    _cache_timeout,
+    get_academic_standing,
+    invalidate_academic_standing,
+)
+from academic.subject_finals import get_subject_period_finals, store_subject_finals
+
+
+class AcademicStandingTests(TestCase):
+    def setUp(self):
+        self.year = seed_synthetic_school(
+            groups=3,
+            students_per_group=4,
+            subjects=3,
+            periods=2,
+            achievements_per_subject=2,
+            fill_ratio=0.8,
+        )
+        self.period = Period.objects.filter(academic_year=self.year).order_by("start_date").first()
+        self.groups = list(Group.objects.filter(academic_year=self.year).order_by("id"))
+        self.admin = get_user_model().objects.create_user(
+            username="standing_admin", password="p1", role=get_user_model().ROLE_ADMIN
+        )
+
+    def _commission(self, commission_type, group, period=None):
+        return Commission.objects.create(
+            commission_type=commission_type,
+            academic_year=self.year,
+            period=period,
+            group=group,
+            created_by=self.admin,
+        )
+
+    def test_promotion_commissions_share_one_year_computation(self):
+        commissions = [self._commission(Commission.TYPE_PROMOTION, group) for group in self.groups]
+
+        with patch("academic.standing.compute_promotions_for_year", wraps=compute_promotions_for_year) as compute:
+            for commission in commissions:
+                sync_commission_difficulties(commission)
+                compute_difficulties_for_commission(commission)
+
+        self.assertEqual(compute.call_count, 1)
+        expected = compute_promotions_for_year(academic_year=self.year)
+        for commission in commissions:
+            for result in compute_difficulties_for_commission(commission):
+                self.assertEqual(result.failed_subjects_count, len(expected[result.enrollment_id].failed_subject_ids))
+
+    def test_period_standing_matches_finals_and_is_reused(self):
+        group = self.groups[0]
+        commission = self._commission(Commission.TYPE_EVALUATION, group, period=self.period)
+
+        standing = get_academic_standing(academic_year=self.year, period=self.period, group_ids=[group.id])
+
+        assignments = list(TeacherAssignment.objects.filter(group=group).select_related("academic_load"))
+        finals = get_subject_period_finals(
+            academic_year_id=self.year.id,
+            assignments=assignments,
+            periods=[self.period],
+            enrollment_ids_by_group={group.id: list(standing)},
+        )
+        for enrollment_id, item in standing.items():
+            failed = sorted(
+                ta.academic_load.subject_id
+                for ta in assignments
+                if finals[(ta.id, self.period.id, enrollment_id)] < PASSING_SCORE_DEFAULT
+            )
+            self.assertEqual(item.failed_subject_ids, failed)
+
+        # Previews, syncs and the performance snapshot only read the scope's enrollments.
+        with self.assertNumQueries(1):
+            get_academic_standing(academic_year=self.year, period=self.period, group_ids=[group.id])
+        snapshot = build_commission_performance_snapshot(commission=commission)
+        self.assertIsInstance(snapshot, dict)
+
+    def test_stored_finals_renew_the_standing(self):
+        group = self.groups[0]
+        standing = get_academic_standing(academic_year=self.year, period=self.period, group_ids=[group.id])
+        enrollment_id = next(iter(standing))
+        ta = TeacherAssignment.objects.filter(group=group).select_related("academic_load").first()
+
+        store_subject_finals(teacher_assignment_id=ta.id, period_id=self.period.id, finals={enrollment_id: Decimal("1.00")})
+        renewed = get_academic_standing(academic_year=self.year, period=self.period, group_ids=[group.id])
+
+        self.assertEqual(renewed[enrollment_id].subject_finals[ta.academic_load.subject_id], Decimal("1.00"))
+        self.assertIn(ta.academic_load.subject_id, renewed[enrollment_id].failed_subject_ids)
+
+    def test_invalidation_renews_the_version_again_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            invalidate_academic_standing()
+        before_commit = cache.get(_STANDING_VERSION_KEY)
+
+        for callback in callbacks:
+            callback()
+
+        self.assertIsNotNone(before_commit)
+        self.assertNotEqual(cache.get(_STANDING_VERSION_KEY), before_commit)
+
+    @override_settings(ACADEMIC_STANDING_CACHE_SECONDS=900, ACADEMIC_STANDING_LOCAL_CACHE_SECONDS=10)
+    def test_process_local_cache_keeps_standings_for_seconds(self):
+        # Tests run on LocMemCache: other processes never see its version renewals.
+        with patch("academic.standing.cache", wraps=cache) as wrapped:
+            get_academic_standing(academic_year=self.year, period=self.period, group_ids=[self.groups[0].id])
+
+        self.assertEqual(wrapped.set.call_args.kwargs["timeout"], 10)
+
+        with tempfile.TemporaryDirectory() as location:
+            shared = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location}}
+            with override_settings(CACHES=shared):
+                self.assertEqual(_cache_timeout(), 900)
@@ -0,0 +1,262 @@
+from decimal import Decimal
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from academic.management.commands.benchmark_promotions import seed_synthetic_school
+from academic.models import (
+    AcademicLevel,
+    AcademicLoad,
+    AcademicYear,
+    Achievement,
+    AchievementGrade,
+    Area,
+    Dimension,
+    Grade,
+    Group,
+    Period,
+    Subject,
+    SubjectPeriodFinal,
+    TeacherAssignment,
+)
+from academic.subject_finals import (
+    get_subject_period_finals,
+    rebuild_subject_finals,
+    verify_subject_finals,
+)
+from students.models import Enrollment, Student
+
+
+class SubjectFinalsRebuildTests(TestCase):
+    def setUp(self):
+        self.year = seed_synthetic_school(
+            groups=2,
+            students_per_group=4,
+            subjects=3,
+            periods=2,
+            achievements_per_subject=2,
+            fill_ratio=0.7,
+        )
+
+    def test_rebuild_matches_live_computation(self):
+        written = rebuild_subject_finals(academic_year_id=self.year.id)
+        # 2 grupos x 3 asignaturas x 2 periodos x 4 estudiantes
+        self.assertEqual(written, 48)
+        self.assertEqual(verify_subject_finals(academic_year_id=self.year.id), [])
+
+    def test_dimension_percentage_change_drops_year_rows(self):
+        rebuild_subject_finals(academic_year_id=self.year.id)
+        dimension = Dimension.objects.filter(academic_year=self.year).first()
+        dimension.percentage = 70
+        dimension.save()
+
+        self.assertFalse(SubjectPeriodFinal.objects.filter(period__academic_year=self.year).exists())
+
+    def test_readers_fill_missing_rows_then_read_from_table(self):
+        assignments = list(TeacherAssignment.objects.filter(academic_year=self.year))
+        periods = list(Period.objects.filter(academic_year=self.year).order_by("start_date"))
+        enrollment_ids_by_group = {}
+        for enrollment_id, group_id in Enrollment.objects.filter(academic_year=self.year).values_list(
+            "id", "group_id"
+        ):
+            enrollment_ids_by_group.setdefault(group_id, []).append(enrollment_id)
+
+        kwargs = dict(
+            academic_year_id=self.year.id,
+            assignments=assignments,
+            periods=periods,
+            enrollment_ids_by_group=enrollment_ids_by_group,
+        )
+        cold = get_subject_period_finals(**kwargs)
+        self.assertEqual(len(cold), 48)
+        self.assertEqual(SubjectPeriodFinal.objects.count(), 48)
+
+        with self.assertNumQueries(1):
+            warm = get_subject_period_finals(**kwargs)
+        self.assertEqual(cold, warm)
+        self.assertEqual(verify_subject_finals(academic_year_id=self.year.id), [])
+
+
+    def test_readers_do_not_overwrite_finals_stored_meanwhile(self):
+        from academic import subject_finals
+
+        ta = TeacherAssignment.objects.filter(academic_year=self.year).first()
+        period = Period.objects.filter(academic_year=self.year).order_by("start_date").first()
+        enrollment_ids = list(
+            Enrollment.objects.filter(academic_year=self.year, group_id=ta.group_id).values_list("id", flat=True)
+        )
+        compute = subject_finals.iter_subject_period_finals
+
+        def _writer_stores_while_reading(**kwargs):
+            rows = list(compute(**kwargs))
+            # A gradebook save lands between the reader's computation and its insert.
+            subject_finals.store_subject_finals(
+                teacher_assignment_id=ta.id, period_id=period.id, finals={enrollment_ids[0]: Decimal("4.99")}
+            )
+            return rows
+
+        with patch("academic.subject_finals.iter_subject_period_finals", side_effect=_writer_stores_while_reading):
+            get_subject_period_finals(
+                academic_year_id=self.year.id,
+                assignments=[ta],
+                periods=[period],
+                enrollment_ids_by_group={ta.group_id: enrollment_ids},
+            )
+
+        stored = SubjectPeriodFinal.objects.get(teacher_assignment=ta, period=period, enrollment_id=enrollment_ids[0])
+        self.assertEqual(stored.score, Decimal("4.99"))
+        self.assertEqual(
+            SubjectPeriodFinal.objects.filter(teacher_assignment=ta, period=period).count(), len(enrollment_ids)
+        )
+
+
+class SubjectFinalsWritePathTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.teacher = User.objects.create_user(
+            username="spf_teacher",
+            password="pass",
+            email="spf_t@example.com",
+            role="TEACHER",
+        )
+        self.year = AcademicYear.objects.create(year=2096, status=AcademicYear.STATUS_ACTIVE)
+        today = timezone.localdate()
+        self.period = Period.objects.create(
+            academic_year=self.year,
+            name="P1",
+            start_date=today - timedelta(days=7),
+            end_date=today + timedelta(days=30),
+            is_closed=False,
+        )
+        level = AcademicLevel.objects.create(name="Primaria", level_type="PRIMARY")
+        self.grade = Grade.objects.create(name="3", level=level)
+        self.group = Group.objects.create(name="A", grade=self.grade, academic_year=self.year, director=self.teacher)
+        area = Area.objects.create(name="Lenguaje")
+        subject = Subject.objects.create(name="Castellano", area=area)
+        self.load = AcademicLoad.objects.create(subject=subject, grade=self.grade)
+        self.assignment = TeacherAssignment.objects.create(
+            teacher=self.teacher,
+            academic_load=self.load,
+            group=self.group,
+            academic_year=self.year,
+        )
+        self.dimension = Dimension.objects.create(
+            academic_year=self.year, name="Cognitivo", percentage=100, is_active=True
+        )
+        self.achievement = Achievement.objects.create(
+            academic_load=self.load,
+            group=self.group,
+            period=self.period,
+            dimension=self.dimension,
+            description="Lectura",
+            percentage=100,
+        )
+        student_user = User.objects.create_user(username="spf_s1", password="pass", role="STUDENT")
+        self.enrollment = Enrollment.objects.create(
+            student=Student.objects.create(user=student_user, document_number="SPF0001"),
+            academic_year=self.year,
+            grade=self.grade,
+            group=self.group,
+            status="ACTIVE",
+        )
+        self.client.force_authenticate(user=self.teacher)
+
+    def _stored(self):
+        return (
+            SubjectPeriodFinal.objects.filter(
+                enrollment=self.enrollment,
+                teacher_assignment=self.assignment,
+                period=self.period,
+            )
+            .values_list("score", flat=True)
+            .first()
+        )
+
+    def _bulk_upsert(self, score):
+        resp = self.client.post(
+            "/api/grade-sheets/bulk-upsert/",
+            {
+                "teacher_assignment": self.assignment.id,
+                "period": self.period.id,
+                "grades": [{"enrollment": self.enrollment.id, "achievement": self.achievement.id, "score": score}],
+            },
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+
+    def test_bulk_upsert_stores_final(self):
+        self._bulk_upsert("4.20")
+        self.assertEqual(self._stored(), Decimal("4.20"))
+
+        self._bulk_upsert("3.10")
+        self.assertEqual(self._stored(), Decimal("3.10"))
+
+    def test_bulk_upsert_final_includes_cells_written_concurrently(self):
+        self.achievement.percentage = 50
+        self.achievement.save()
+        other = Achievement.objects.create(
+            academic_load=self.load,
+            group=self.group,
+            period=self.period,
+            dimension=self.dimension,
+            description="Escritura",
+            percentage=50,
+        )
+        bulk_create = AchievementGrade.objects.bulk_create
+
+        def _concurrent_then_write(objs, **kwargs):
+            # Another teacher session saves a different cell after this request read the sheet.
+            AchievementGrade.objects.create(
+                gradesheet_id=objs[0].gradesheet_id,
+                enrollment=self.enrollment,
+                achievement=other,
+                score=Decimal("2.00"),
+            )
+            return bulk_create(objs, **kwargs)
+
+        with patch.object(AchievementGrade.objects, "bulk_create", side_effect=_concurrent_then_write):
+            self._bulk_upsert("4.00")
+
+        self.assertEqual(self._stored(), Decimal("3.00"))
+
+    def test_direct_grade_and_achievement_edits_invalidate(self):
+        self._bulk_upsert("4.00")
+        self.assertIsNotNone(self._stored())
+
+        grade = AchievementGrade.objects.get(enrollment=self.enrollment, achievement=self.achievement)
+        grade.score = Decimal("2.00")
+        grade.save()
+        self.assertIsNone(self._stored())
+
+        self._bulk_upsert("4.00")
+        Achievement.objects.create(
+            academic_load=self.load,
+            group=self.group,
+            period=self.period,
+            dimension=self.dimension,
+            description="Escritura",
+            percentage=100,
+        )
+        self.assertIsNone(self._stored())
+
+        # The next reader recomputes the missing row: (4.00 + 1.00) / 2.
+        finals = get_subject_period_finals(
+            academic_year_id=self.year.id,
+            assignments=[self.assignment],
+            periods=[self.period],
+            enrollment_ids_by_group={self.group.id: [self.enrollment.id]},
+        )
+        self.assertEqual(finals[(self.assignment.id, self.period.id, self.enrollment.id)], Decimal("2.50"))
+        self.assertEqual(self._stored(), Decimal("2.50"))
+
+    def test_deleting_a_grade_invalidates_final(self):
+        self._bulk_upsert("4.00")
+        self.assertIsNotNone(self._stored())
+
+        AchievementGrade.objects.get(enrollment=self.enrollment, achievement=self.achievement).delete()
+        self.assertIsNone(self._stored())
@@ -7,12 +7,14 @@ from django.http import HttpResponse, StreamingHttpResponse
 from django.template.loader import render_to_string
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Count, Max, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from datetime import datetime, time, timedelta
 from decimal import Decimal
 from pathlib import Path
 from difflib import SequenceMatcher
+import hashlib
 import io
 import csv
 import json
@@ -37,6 +39,23 @@ def _period_end_of_day(period: "Period"):
     return timezone.make_aware(dt, tz)
 
 
+# gradebook/changes: each cursor re-reads this much of the previous window, so rows whose
+# updated_at was set before a slow transaction committed are still delivered.
+GRADEBOOK_CHANGES_OVERLAP = timedelta(seconds=5)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``etag`` (RFC 9110 §13.1.2)."""
+
+    if not if_none_match:
+        return False
+    candidates = [item.strip() for item in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.removeprefix("W/") == opaque for candidate in candidates)
+
+
 TOPIC_IMPORT_COLUMNS = [
     "academic_year",
     "period_name",
@@ -400,14 +419,17 @@ from .serializers import (
 from .ai import AIService, AIConfigError, AIParseError, AIProviderError
 from .throttles import AcademicAIUserRateThrottle
 from .grade_ordinals import guess_ordinal
+from .gradebook_completion import GradebookCompletionTracker
 from .grading import (
     DEFAULT_EMPTY_SCORE,
     achievement_queryset_for_assignment_period,
+    achievements_for_assignment_period,
     coalesce_score,
-    final_grade_from_achievement_scores,
-    match_scale,
+    final_grades_for_enrollments,
+    get_scale_index,
 )
 from .promotion import compute_promotions_for_year, PASSING_SCORE_DEFAULT
+from .subject_finals import invalidate_subject_finals, store_subject_finals
 from communications.email_service import send_email
 from reports.models import ReportJob
 from reports.serializers import ReportJobSerializer
@@ -3070,12 +3092,17 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
 
             deleted_activity_columns = AchievementActivityColumn.objects.filter(gradesheet=gradesheet).delete()[0]
             deleted_achievement_grades = AchievementGrade.objects.filter(gradesheet=gradesheet).delete()[0]
+            invalidate_subject_finals(
+                teacher_assignment_ids=[gradesheet.teacher_assignment_id],
+                period_ids=[gradesheet.period_id],
+            )
 
             reset_mode = False
             if getattr(gradesheet, "grading_mode", None) != GradeSheet.GRADING_MODE_ACHIEVEMENT:
                 gradesheet.grading_mode = GradeSheet.GRADING_MODE_ACHIEVEMENT
-                gradesheet.save(update_fields=["grading_mode"])
                 reset_mode = True
+            # Bumping updated_at tells gradebook/changes clients that rows were deleted.
+            gradesheet.save(update_fields=["grading_mode", "updated_at"])
 
         return Response(
             {
@@ -3235,6 +3262,11 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
             unique_fields=["gradesheet", "enrollment", "achievement"],
             update_fields=["score", "updated_at"],
         )
+        invalidate_subject_finals(
+            teacher_assignment_ids=[gradesheet.teacher_assignment_id],
+            period_ids=[gradesheet.period_id],
+            enrollment_ids=enrollment_ids,
+        )
         return len(to_upsert)
 
     def _active_enrollment_ids_for_assignment(self, *, teacher_assignment: TeacherAssignment) -> set[int]:
@@ -3257,93 +3289,22 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
     ) -> dict:
         from students.models import Enrollment
 
-        enrollments_qs = Enrollment.objects.filter(
+        active_enrollment_ids = Enrollment.objects.filter(
             academic_year_id=teacher_assignment.academic_year_id,
             group_id=teacher_assignment.group_id,
             status="ACTIVE",
-        )
-        students_count = enrollments_qs.count()
+        ).values_list("id", flat=True)
 
-        achievements_qs = self._valid_achievements_for_assignment_period(
+        achievement_ids = self._valid_achievements_for_assignment_period(
             teacher_assignment=teacher_assignment,
             period=period,
-        )
-        achievement_ids = list(achievements_qs.values_list("id", flat=True))
-
-        total = 0
-        filled = 0
-
-        if achievement_ids and students_count > 0:
-            if gradesheet.grading_mode == GradeSheet.GRADING_MODE_ACTIVITIES:
-                active_columns = list(
-                    AchievementActivityColumn.objects.filter(
-                        gradesheet=gradesheet,
-                        achievement_id__in=achievement_ids,
-                        is_active=True,
-                    ).only("id", "achievement_id")
-                )
-
-                column_ids_by_achievement: dict[int, list[int]] = {}
-                for col in active_columns:
-                    column_ids_by_achievement.setdefault(int(col.achievement_id), []).append(int(col.id))
-
-                total_columns_per_student = 0
-                achievements_without_columns: list[int] = []
-                for achievement_id in achievement_ids:
-                    current_cols = column_ids_by_achievement.get(int(achievement_id), [])
-                    if current_cols:
-                        total_columns_per_student += len(current_cols)
-                    else:
-                        # Fallback to logro cell when an achievement has no activity columns.
-                        total_columns_per_student += 1
-                        achievements_without_columns.append(int(achievement_id))
-
-                total = students_count * total_columns_per_student
-
-                all_column_ids = [col_id for col_ids in column_ids_by_achievement.values() for col_id in col_ids]
-                if all_column_ids:
-                    filled += (
-                        AchievementActivityGrade.objects.filter(
-                            column_id__in=all_column_ids,
-                            enrollment__in=enrollments_qs,
-                            score__isnull=False,
-                        )
-                        .only("id")
-                        .count()
-                    )
-
-                if achievements_without_columns:
-                    filled += (
-                        AchievementGrade.objects.filter(
-                            gradesheet=gradesheet,
-                            enrollment__in=enrollments_qs,
-                            achievement_id__in=achievements_without_columns,
-                            score__isnull=False,
-                        )
-                        .only("id")
-                        .count()
-                    )
-            else:
-                total = students_count * len(achievement_ids)
-                filled = (
-                    AchievementGrade.objects.filter(
-                        gradesheet=gradesheet,
-                        enrollment__in=enrollments_qs,
-                        achievement_id__in=achievement_ids,
-                        score__isnull=False,
-                    )
-                    .only("id")
-                    .count()
-                )
+        ).values_list("id", flat=True)
 
-        percent = int(round((filled / total) * 100)) if total > 0 else 0
-        is_complete = total > 0 and filled >= total
-        return {
-            "filled": filled,
-            "total": total,
-            "percent": percent,
-            "is_complete": is_complete,
-        }
+        return GradebookCompletionTracker.for_gradesheet(
+            gradesheet=gradesheet,
+            active_enrollment_ids=active_enrollment_ids,
+            achievement_ids=achievement_ids,
+        ).stats()
 
     def _build_gradebook_payload(
         self,
@@ -3351,7 +3312,17 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
         gradesheet: GradeSheet,
         teacher_assignment: TeacherAssignment,
         period: Period,
+        layout: str = "cells",
     ) -> dict:
+        """Payload of the gradebook screen.
+
+        ``layout="cells"`` returns one object per (enrollment, achievement/column).
+        ``layout="columnar"`` replaces ``cells``/``activity_cells`` with ``grid``/``activity_grid``:
+        ordered id arrays plus a dense row-major ``scores`` array (one row per enrollment,
+        ``null`` for empty cells).
+        """
+
+        columnar = layout == "columnar"
         achievements = self._valid_achievements_for_assignment_period(
             teacher_assignment=teacher_assignment,
             period=period,
@@ -3399,16 +3370,6 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
             for e in enrollments
         ]
 
-        cell_payload = [
-            {
-                "enrollment": e.id,
-                "achievement": a.id,
-                "score": score_by_cell.get((e.id, a.id)),
-            }
-            for e in enrollments
-            for a in achievements
-        ]
-
         dimensions = (
             Dimension.objects.filter(
                 academic_year_id=teacher_assignment.academic_year_id,
@@ -3423,16 +3384,17 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
             {"id": d.id, "name": d.name, "percentage": int(d.percentage)} for d in dimensions
         ]
 
+        scale_index = get_scale_index(teacher_assignment.academic_year_id)
+        final_by_enrollment = final_grades_for_enrollments(
+            [(a.id, a.dimension_id, a.percentage) for a in achievements],
+            [e.id for e in enrollments],
+            score_by_cell,
+            dimension_percentage_by_id=dim_percentage_by_id,
+        )
         computed = []
         for e in enrollments:
-            final_score = final_grade_from_achievement_scores(
-                [
-                    (a.dimension_id, a.percentage, score_by_cell.get((e.id, a.id)))
-                    for a in achievements
-                ],
-                dimension_percentage_by_id=dim_percentage_by_id,
-            )
-            scale_match = match_scale(teacher_assignment.academic_year_id, final_score)
+            final_score = final_by_enrollment[e.id]
+            scale_match = scale_index.match(final_score)
             computed.append(
                 {
                     "enrollment_id": e.id,
@@ -3452,9 +3414,25 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
             "dimensions": dimensions_payload,
             "achievements": achievement_payload,
             "students": student_payload,
-            "cells": cell_payload,
             "computed": computed,
         }
+        if columnar:
+            payload["layout"] = "columnar"
+            payload["grid"] = {
+                "enrollment_ids": [e.id for e in enrollments],
+                "achievement_ids": [a.id for a in achievements],
+                "scores": [score_by_cell.get((e.id, a.id)) for e in enrollments for a in achievements],
+            }
+        else:
+            payload["cells"] = [
+                {
+                    "enrollment": e.id,
+                    "achievement": a.id,
+                    "score": score_by_cell.get((e.id, a.id)),
+                }
+                for e in enrollments
+                for a in achievements
+            ]
 
         if getattr(gradesheet, "grading_mode", None) == GradeSheet.GRADING_MODE_ACTIVITIES:
             activity_columns = AchievementActivityColumn.objects.filter(
@@ -3471,18 +3449,107 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
             }
 
             payload["activity_columns"] = AchievementActivityColumnSerializer(activity_columns, many=True).data
-            payload["activity_cells"] = [
-                {
-                    "enrollment": e.id,
-                    "column": c.id,
-                    "score": activity_score_by_cell.get((e.id, c.id)),
+            if columnar:
+                payload["activity_grid"] = {
+                    "enrollment_ids": [e.id for e in enrollments],
+                    "column_ids": [c.id for c in activity_columns],
+                    "scores": [
+                        activity_score_by_cell.get((e.id, c.id)) for e in enrollments for c in activity_columns
+                    ],
                 }
-                for e in enrollments
-                for c in activity_columns
-            ]
+            else:
+                payload["activity_cells"] = [
+                    {
+                        "enrollment": e.id,
+                        "column": c.id,
+                        "score": activity_score_by_cell.get((e.id, c.id)),
+                    }
+                    for e in enrollments
+                    for c in activity_columns
+                ]
 
         return payload
 
+    def _gradebook_etag(
+        self,
+        *,
+        gradesheet: GradeSheet,
+        teacher_assignment: TeacherAssignment,
+        period: Period,
+        layout: str,
+    ) -> str:
+        """Weak ETag for the gradebook payload.
+
+        Built from the gradesheet's last grade update (max ``updated_at`` and row count, so
+        deletions count too) plus cheap signatures of everything else the payload shows:
+        the period, achievements/dimensions, active enrollments and their student names,
+        activity columns and the scale index.
+        """
+
+        grades = AchievementGrade.objects.filter(gradesheet=gradesheet).aggregate(
+            last=Max("updated_at"), count=Count("id")
+        )
+        achievements = achievements_for_assignment_period(teacher_assignment, period, select_related=("dimension",))
+        parts = [
+            layout,
+            gradesheet.id,
+            gradesheet.grading_mode,
+            gradesheet.updated_at.isoformat() if gradesheet.updated_at else "",
+            period.name,
+            period.is_closed,
+            grades["last"].isoformat() if grades["last"] else "",
+            grades["count"],
+            *self._gradebook_structure_parts(teacher_assignment=teacher_assignment, achievements=achievements),
+        ]
+        if gradesheet.grading_mode == GradeSheet.GRADING_MODE_ACTIVITIES:
+            parts.append(
+                list(
+                    AchievementActivityColumn.objects.filter(gradesheet=gradesheet)
+                    .order_by("id")
+                    .values_list("id", "achievement_id", "label", "order", "is_active", "updated_at")
+                )
+            )
+            activity = AchievementActivityGrade.objects.filter(column__gradesheet=gradesheet).aggregate(
+                last=Max("updated_at"), count=Count("id")
+            )
+            parts.append((activity["last"].isoformat() if activity["last"] else "", activity["count"]))
+
+        digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+        return f'W/"gb-{digest}"'
+
+    def _gradebook_structure_parts(self, *, teacher_assignment: TeacherAssignment, achievements) -> list:
+        """Signatures of the gradebook rows and columns: achievements/dimensions (with
+        their percentages), active enrollments with student names, and the scale index.
+
+        Shared by the gradebook ETag and the ``gradebook/changes`` cursor.
+        """
+
+        from students.models import Enrollment
+
+        return [
+            [
+                (
+                    a.id,
+                    a.description,
+                    a.percentage,
+                    a.dimension_id,
+                    a.dimension.name if a.dimension else None,
+                    a.dimension.percentage if a.dimension else None,
+                )
+                for a in achievements
+            ],
+            list(
+                Enrollment.objects.filter(
+                    academic_year_id=teacher_assignment.academic_year_id,
+                    group_id=teacher_assignment.group_id,
+                    status="ACTIVE",
+                )
+                .order_by("id")
+                .values_list("id", "student_id", "student__user__first_name", "student__user__last_name")
+            ),
+            get_scale_index(teacher_assignment.academic_year_id).fingerprint(),
+        ]
+
     def _build_gradebook_filled_report_context(
         self,
         *,
@@ -3894,13 +3961,170 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
             teacher_assignment=teacher_assignment,
             period=period,
         )
-        payload = self._build_gradebook_payload(
+
+        layout = "columnar" if request.query_params.get("format") == "columnar" else "cells"
+        etag = self._gradebook_etag(
             gradesheet=gradesheet,
             teacher_assignment=teacher_assignment,
             period=period,
+            layout=layout,
         )
+        if _etag_matches(request.headers.get("If-None-Match"), etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(
+                self._build_gradebook_payload(
+                    gradesheet=gradesheet,
+                    teacher_assignment=teacher_assignment,
+                    period=period,
+                    layout=layout,
+                )
+            )
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
 
-        return Response(payload)
+    @action(detail=False, methods=["get"], url_path="gradebook/changes")
+    def gradebook_changes(self, request):
+        """Cells and finals changed since ``since`` (cursor from a previous call).
+
+        GET /api/grade-sheets/gradebook/changes/?teacher_assignment=<id>&period=<id>&since=<cursor>
+
+        The cursor overlaps the previous window by a few seconds so rows committed late are
+        not missed; clients apply cells idempotently. It also carries a fingerprint of the
+        sheet structure (achievements and percentages, active enrollments, scales).
+        ``full_reload`` is true when the cursor is missing/invalid or the structure changed
+        (fingerprint, reset, grading mode, activity columns); the client should then fetch
+        ``gradebook/`` again.
+        """
+
+        teacher_assignment_id = request.query_params.get("teacher_assignment")
+        period_id = request.query_params.get("period")
+        if not teacher_assignment_id or not period_id:
+            return Response(
+                {"error": "teacher_assignment y period son requeridos"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            teacher_assignment = self._get_teacher_assignment(int(teacher_assignment_id))
+        except TeacherAssignment.DoesNotExist:
+            return Response({"error": "TeacherAssignment no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            period = Period.objects.select_related("academic_year").get(id=int(period_id))
+        except Period.DoesNotExist:
+            return Response({"error": "Periodo no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        if period.academic_year_id != teacher_assignment.academic_year_id:
+            return Response(
+                {"error": "El periodo no corresponde al año lectivo de la asignación"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        current_resp = self._enforce_teacher_current_period(user=request.user, period=period)
+        if current_resp is not None:
+            return current_resp
+
+        # Cursor first: anything written after this instant is picked up by the next call.
+        cursor_at = (timezone.now() - GRADEBOOK_CHANGES_OVERLAP).isoformat().replace("+00:00", "Z")
+        achievements = achievements_for_assignment_period(teacher_assignment, period, select_related=("dimension",))
+        structure_parts = self._gradebook_structure_parts(teacher_assignment=teacher_assignment, achievements=achievements)
+        structure = hashlib.sha1(repr(structure_parts).encode("utf-8")).hexdigest()[:16]
+        cursor = f"{cursor_at}~{structure}"
+
+        since_raw, _, since_structure = (request.query_params.get("since") or "").partition("~")
+        try:
+            since = parse_datetime(since_raw)
+        except ValueError:
+            since = None
+        if since is not None and timezone.is_naive(since):
+            since = timezone.make_aware(since, timezone.get_current_timezone())
+
+        empty = {"cursor": cursor, "full_reload": False, "cells": [], "activity_cells": [], "computed": []}
+
+        gradesheet = GradeSheet.objects.filter(teacher_assignment=teacher_assignment, period=period).first()
+        if since is None or since_structure != structure:
+            return Response({**empty, "full_reload": True})
+        if gradesheet is None:
+            return Response(empty)
+        if gradesheet.updated_at and gradesheet.updated_at >= since:
+            return Response({**empty, "full_reload": True})
+        if AchievementActivityColumn.objects.filter(gradesheet=gradesheet, updated_at__gte=since).exists():
+            return Response({**empty, "full_reload": True})
+
+        active_enrollment_ids = {row[0] for row in structure_parts[1]}
+        achievement_ids = {a.id for a in achievements}
+
+        cells = [
+            {"enrollment": enrollment_id, "achievement": achievement_id, "score": score}
+            for enrollment_id, achievement_id, score in AchievementGrade.objects.filter(
+                gradesheet=gradesheet,
+                updated_at__gte=since,
+                achievement_id__in=achievement_ids,
+            )
+            .order_by("enrollment_id", "achievement_id")
+            .values_list("enrollment_id", "achievement_id", "score")
+            if enrollment_id in active_enrollment_ids
+        ]
+
+        activity_cells = []
+        if gradesheet.grading_mode == GradeSheet.GRADING_MODE_ACTIVITIES:
+            activity_cells = [
+                {"enrollment": enrollment_id, "column": column_id, "score": score}
+                for enrollment_id, column_id, score in AchievementActivityGrade.objects.filter(
+                    column__gradesheet=gradesheet,
+                    column__achievement_id__in=achievement_ids,
+                    updated_at__gte=since,
+                )
+                .order_by("enrollment_id", "column_id")
+                .values_list("enrollment_id", "column_id", "score")
+                if enrollment_id in active_enrollment_ids
+            ]
+
+        changed_enrollment_ids = sorted({c["enrollment"] for c in cells} | {c["enrollment"] for c in activity_cells})
+        computed = []
+        if changed_enrollment_ids:
+            score_by_cell = {
+                (enrollment_id, achievement_id): score
+                for enrollment_id, achievement_id, score in AchievementGrade.objects.filter(
+                    gradesheet=gradesheet,
+                    enrollment_id__in=changed_enrollment_ids,
+                    achievement_id__in=achievement_ids,
+                ).values_list("enrollment_id", "achievement_id", "score")
+            }
+            dim_percentage_by_id = {
+                a.dimension_id: int(a.dimension.percentage)
+                for a in achievements
+                if a.dimension_id and a.dimension.academic_year_id == teacher_assignment.academic_year_id
+            }
+            final_by_enrollment = final_grades_for_enrollments(
+                [(a.id, a.dimension_id, a.percentage) for a in achievements],
+                changed_enrollment_ids,
+                score_by_cell,
+                dimension_percentage_by_id=dim_percentage_by_id,
+            )
+            scale_index = get_scale_index(teacher_assignment.academic_year_id)
+            for enrollment_id in changed_enrollment_ids:
+                final_score = final_by_enrollment[enrollment_id]
+                scale_match = scale_index.match(final_score)
+                computed.append(
+                    {
+                        "enrollment_id": enrollment_id,
+                        "final_score": final_score,
+                        "scale": scale_match.name if scale_match else None,
+                    }
+                )
+
+        return Response(
+            {
+                "cursor": cursor,
+                "full_reload": False,
+                "cells": cells,
+                "activity_cells": activity_cells,
+                "computed": computed,
+            }
+        )
 
     @action(detail=False, methods=["get"], url_path="gradebook-filled-report")
     def gradebook_filled_report(self, request):
@@ -4493,16 +4717,17 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
         ).only("enrollment_id", "achievement_id", "score")
         score_by_cell = {(g.enrollment_id, g.achievement_id): g.score for g in existing_grades}
 
+        scale_index = get_scale_index(teacher_assignment.academic_year_id)
+        final_by_enrollment = final_grades_for_enrollments(
+            [(a.id, a.dimension_id, a.percentage) for a in achievements],
+            impacted_enrollment_ids_sorted,
+            score_by_cell,
+            dimension_percentage_by_id=dim_percentage_by_id,
+        )
         computed = []
         for enrollment_id in impacted_enrollment_ids_sorted:
-            final_score = final_grade_from_achievement_scores(
-                [
-                    (a.dimension_id, a.percentage, score_by_cell.get((enrollment_id, a.id)))
-                    for a in achievements
-                ],
-                dimension_percentage_by_id=dim_percentage_by_id,
-            )
-            scale_match = match_scale(teacher_assignment.academic_year_id, final_score)
+            final_score = final_by_enrollment[enrollment_id]
+            scale_match = scale_index.match(final_score)
             computed.append(
                 {
                     "enrollment_id": enrollment_id,
@@ -4510,6 +4735,11 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
                     "scale": scale_match.name if scale_match else None,
                 }
             )
+        store_subject_finals(
+            teacher_assignment_id=teacher_assignment.id,
+            period_id=period.id,
+            finals={row["enrollment_id"]: row["final_score"] for row in computed},
+        )
 
         completion_after = self._compute_gradebook_completion_stats(
             teacher_assignment=teacher_assignment,
@@ -4609,32 +4839,37 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
             teacher_assignment=teacher_assignment,
             period=period,
         )
-        completion_before = self._compute_gradebook_completion_stats(
-            teacher_assignment=teacher_assignment,
-            period=period,
-            gradesheet=gradesheet,
-        )
 
         from students.models import Enrollment
 
-        valid_enrollments = set(
-            Enrollment.objects.filter(
-                academic_year_id=teacher_assignment.academic_year_id,
-                group_id=teacher_assignment.group_id,
-            ).values_list("id", flat=True)
+        valid_enrollments: set[int] = set()
+        active_enrollment_ids: list[int] = []
+        for enrollment_id, enrollment_status in Enrollment.objects.filter(
+            academic_year_id=teacher_assignment.academic_year_id,
+            group_id=teacher_assignment.group_id,
+        ).values_list("id", "status"):
+            valid_enrollments.add(enrollment_id)
+            if enrollment_status == "ACTIVE":
+                active_enrollment_ids.append(enrollment_id)
+
+        # Achievements, dimensions and current cells are loaded once and reused for
+        # validation, completion tracking and the recomputed finals.
+        achievements = achievements_for_assignment_period(teacher_assignment, period, select_related=("dimension",))
+        valid_achievements = {a.id for a in achievements}
+
+        existing_grades = list(
+            AchievementGrade.objects.filter(
+                gradesheet=gradesheet,
+                achievement_id__in=valid_achievements,
+            ).values_list("enrollment_id", "achievement_id", "score")
         )
-
-        base_achievements = Achievement.objects.filter(
-            academic_load=teacher_assignment.academic_load,
-            period=period,
+        completion = GradebookCompletionTracker.from_grades(
+            gradesheet=gradesheet,
+            active_enrollment_ids=active_enrollment_ids,
+            achievement_ids=valid_achievements,
+            grades=existing_grades,
         )
-        group_achievements = base_achievements.filter(group=teacher_assignment.group)
-        if group_achievements.exists():
-            valid_achievements = set(group_achievements.values_list("id", flat=True))
-        else:
-            valid_achievements = set(
-                base_achievements.filter(group__isnull=True).values_list("id", flat=True)
-            )
+        completion_before = completion.stats()
 
         blocked = []
         allowed_by_cell: dict[tuple[int, int], AchievementGrade] = {}
@@ -4672,6 +4907,17 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
 
         to_upsert = list(allowed_by_cell.values())
 
+        # Return recomputed final scores for impacted enrollments (for live UI updates)
+        impacted_enrollment_ids = sorted({g.enrollment_id for g in to_upsert})
+
+        dim_percentage_by_id = {
+            a.dimension_id: int(a.dimension.percentage)
+            for a in achievements
+            if a.dimension_id and a.dimension.academic_year_id == teacher_assignment.academic_year_id
+        }
+        scale_index = get_scale_index(teacher_assignment.academic_year_id)
+
+        final_by_enrollment = {}
         if to_upsert:
             with transaction.atomic():
                 AchievementGrade.objects.bulk_create(
@@ -4680,47 +4926,33 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
                     unique_fields=["gradesheet", "enrollment", "achievement"],
                     update_fields=["score", "updated_at"],
                 )
-
-        # Return recomputed final scores for impacted enrollments (for live UI updates)
-        impacted_enrollment_ids = sorted({g.enrollment_id for g in to_upsert})
-
-        base_achievements = Achievement.objects.filter(
-            academic_load=teacher_assignment.academic_load,
-            period=period,
-        )
-
-        group_achievements = base_achievements.filter(group=teacher_assignment.group)
-        if group_achievements.exists():
-            achievements = group_achievements
-        else:
-            achievements = base_achievements.filter(group__isnull=True)
-
-        achievements = achievements.select_related("dimension").order_by("id")
-
-        dimensions = Dimension.objects.filter(
-            academic_year_id=teacher_assignment.academic_year_id,
-            id__in=sorted({int(a.dimension_id) for a in achievements if a.dimension_id}),
-        ).only("id", "percentage")
-        dim_percentage_by_id = {d.id: int(d.percentage) for d in dimensions}
-
-        existing_grades = AchievementGrade.objects.filter(
-            gradesheet=gradesheet,
-            enrollment_id__in=impacted_enrollment_ids,
-            achievement__in=achievements,
-        ).only("enrollment_id", "achievement_id", "score")
-
-        score_by_cell = {(g.enrollment_id, g.achievement_id): g.score for g in existing_grades}
+                # Finals are computed from the rows as stored after this write (not from
+                # the snapshot read above), so concurrent saves to other cells of the same
+                # enrollments are not overwritten in SubjectPeriodFinal.
+                score_by_cell = {
+                    (enrollment_id, achievement_id): score
+                    for enrollment_id, achievement_id, score in AchievementGrade.objects.filter(
+                        gradesheet=gradesheet,
+                        enrollment_id__in=impacted_enrollment_ids,
+                        achievement_id__in=valid_achievements,
+                    ).values_list("enrollment_id", "achievement_id", "score")
+                }
+                final_by_enrollment = final_grades_for_enrollments(
+                    [(a.id, a.dimension_id, a.percentage) for a in achievements],
+                    impacted_enrollment_ids,
+                    score_by_cell,
+                    dimension_percentage_by_id=dim_percentage_by_id,
+                )
+                store_subject_finals(
+                    teacher_assignment_id=teacher_assignment.id,
+                    period_id=period.id,
+                    finals=final_by_enrollment,
+                )
 
         computed = []
         for enrollment_id in impacted_enrollment_ids:
-            final_score = final_grade_from_achievement_scores(
-                [
-                    (a.dimension_id, a.percentage, score_by_cell.get((enrollment_id, a.id)))
-                    for a in achievements
-                ],
-                dimension_percentage_by_id=dim_percentage_by_id,
-            )
-            scale_match = match_scale(teacher_assignment.academic_year_id, final_score)
+            final_score = final_by_enrollment[enrollment_id]
+            scale_match = scale_index.match(final_score)
             computed.append(
                 {
                     "enrollment_id": enrollment_id,
@@ -4729,11 +4961,8 @@ class GradeSheetViewSet(viewsets.ModelViewSet):
                 }
             )
 
-        completion_after = self._compute_gradebook_completion_stats(
-            teacher_assignment=teacher_assignment,
-            period=period,
-            gradesheet=gradesheet,
-        )
+        completion.apply((g.enrollment_id, g.achievement_id, g.score) for g in to_upsert)
+        completion_after = completion.stats()
         transitioned_to_complete = (not completion_before["is_complete"]) and completion_after["is_complete"]
         if transitioned_to_complete and is_teacher:
             try:
@@ -5290,6 +5519,11 @@ class PreschoolGradebookViewSet(viewsets.ViewSet):
                     unique_fields=["gradesheet", "enrollment", "achievement"],
                     update_fields=["qualitative_scale", "score", "updated_at"],
                 )
+                invalidate_subject_finals(
+                    teacher_assignment_ids=[teacher_assignment.id],
+                    period_ids=[period.id],
+                    enrollment_ids=[g.enrollment_id for g in to_upsert],
+                )
 
         return Response(
             {
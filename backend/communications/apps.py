@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CommunicationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "communications"
+
+    def ready(self):
+        # Register signals.
+        from . import signals  # noqa: F401
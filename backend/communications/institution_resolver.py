@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Optional
+import logging
+from typing import Any, Dict, Iterable, Optional
+from uuid import uuid4
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.db.models import Q
 
 from academic.models import Group
@@ -11,57 +16,169 @@ from students.models import Enrollment, FamilyMember
 
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
-def resolve_institution_for_user(user: Any) -> Optional[Institution]:
-    if user is None:
-        return None
+_RESOLVER_VERSION_KEY = "communications:institution_resolver:version"
+
+
+def invalidate_institution_resolution() -> None:
+    try:
+        cache.set(_RESOLVER_VERSION_KEY, uuid4().hex, timeout=None)
+    except Exception:
+        logger.warning("institution_resolver.invalidate_failed", exc_info=True)
+
+
+def _resolver_version() -> str:
+    try:
+        token = cache.get(_RESOLVER_VERSION_KEY)
+        if token is None:
+            cache.add(_RESOLVER_VERSION_KEY, uuid4().hex, timeout=None)
+            token = cache.get(_RESOLVER_VERSION_KEY)
+    except Exception:
+        token = None
+    return str(token or "")
+
+
+def _first_by_user(rows: Iterable[tuple[int, int]], pending: set[int]) -> Dict[int, int]:
+    """user_id -> value of the first row (rows come ordered by id) of each pending user."""
 
-    institution = (
-        Institution.objects.filter(Q(rector=user) | Q(secretary=user)).order_by("id").first()
-    )
-    if institution is not None:
-        return institution
-
-    campus = (
-        Campus.objects.select_related("institution")
-        .filter(Q(director=user) | Q(campus_secretary=user) | Q(coordinator=user))
-        .order_by("id")
-        .first()
-    )
-    if campus is not None and campus.institution_id:
-        return campus.institution
-
-    group = (
-        Group.objects.select_related("campus__institution")
-        .filter(director=user)
-        .exclude(campus__institution_id__isnull=True)
-        .order_by("id")
-        .first()
-    )
-    if group is not None and group.campus and group.campus.institution_id:
-        return group.campus.institution
-
-    enrollment = (
-        Enrollment.objects.select_related("campus__institution")
-        .filter(student__user=user, status="ACTIVE")
-        .exclude(campus__institution_id__isnull=True)
-        .order_by("id")
-        .first()
-    )
-    if enrollment is not None and enrollment.campus and enrollment.campus.institution_id:
-        return enrollment.campus.institution
-
-    family_member = FamilyMember.objects.filter(user=user).order_by("id").first()
-    if family_member is not None:
-        enrollment = (
-            Enrollment.objects.select_related("campus__institution")
-            .filter(student=family_member.student, status="ACTIVE")
+    found: Dict[int, int] = {}
+    for user_id, value in rows:
+        if user_id in pending and user_id not in found:
+            found[user_id] = value
+    return found
+
+
+def _resolve_institution_ids(user_ids: set[int]) -> Dict[int, Optional[int]]:
+    """Set-based version of the per-user lookup chain; same precedence, one query per step."""
+
+    resolved: Dict[int, Optional[int]] = {}
+    pending = set(user_ids)
+
+    def _take(found: Dict[int, Optional[int]]) -> None:
+        for user_id, institution_id in found.items():
+            if institution_id:
+                resolved[user_id] = institution_id
+        pending.difference_update(found)
+
+    # Rector / secretary of an institution.
+    rows = Institution.objects.filter(Q(rector_id__in=pending) | Q(secretary_id__in=pending)).order_by("id")
+    found: Dict[int, Optional[int]] = {}
+    for institution_id, rector_id, secretary_id in rows.values_list("id", "rector_id", "secretary_id"):
+        for user_id in (rector_id, secretary_id):
+            if user_id in pending and user_id not in found:
+                found[user_id] = institution_id
+    _take(found)
+
+    # Campus roles. Only the first campus counts, as in the single-user lookup.
+    if pending:
+        rows = Campus.objects.filter(
+            Q(director_id__in=pending) | Q(campus_secretary_id__in=pending) | Q(coordinator_id__in=pending)
+        ).order_by("id")
+        found = {}
+        for institution_id, *role_user_ids in rows.values_list(
+            "institution_id", "director_id", "campus_secretary_id", "coordinator_id"
+        ):
+            for user_id in role_user_ids:
+                if user_id in pending and user_id not in found:
+                    found[user_id] = institution_id
+        # Users whose first campus has no institution keep looking further down.
+        _take({user_id: institution_id for user_id, institution_id in found.items() if institution_id})
+
+    # Group director.
+    if pending:
+        rows = (
+            Group.objects.filter(director_id__in=pending)
             .exclude(campus__institution_id__isnull=True)
             .order_by("id")
-            .first()
+            .values_list("director_id", "campus__institution_id")
         )
-        if enrollment is not None and enrollment.campus and enrollment.campus.institution_id:
-            return enrollment.campus.institution
+        _take(_first_by_user(rows, pending))
 
-    return Institution.objects.order_by("id").first()
+    # Student with an active enrollment.
+    if pending:
+        rows = (
+            Enrollment.objects.filter(student__user_id__in=pending, status="ACTIVE")
+            .exclude(campus__institution_id__isnull=True)
+            .order_by("id")
+            .values_list("student__user_id", "campus__institution_id")
+        )
+        _take(_first_by_user(rows, pending))
+
+    # Family member of a student with an active enrollment (first family link only).
+    if pending:
+        student_by_user = _first_by_user(
+            FamilyMember.objects.filter(user_id__in=pending).order_by("id").values_list("user_id", "student_id"),
+            pending,
+        )
+        if student_by_user:
+            institution_by_student: Dict[int, int] = {}
+            rows = (
+                Enrollment.objects.filter(student_id__in=set(student_by_user.values()), status="ACTIVE")
+                .exclude(campus__institution_id__isnull=True)
+                .order_by("id")
+                .values_list("student_id", "campus__institution_id")
+            )
+            for student_id, institution_id in rows:
+                institution_by_student.setdefault(student_id, institution_id)
+            _take(
+                {
+                    user_id: institution_by_student[student_id]
+                    for user_id, student_id in student_by_user.items()
+                    if student_id in institution_by_student
+                }
+            )
+
+    if pending:
+        default_id = Institution.objects.order_by("id").values_list("id", flat=True).first()
+        for user_id in pending:
+            resolved[user_id] = default_id
+    return resolved
+
+
+def resolve_institutions_for_users(users: Iterable[Any]) -> Dict[int, Optional[Institution]]:
+    """user_id -> institution for many users at once.
+
+    Resolutions are kept per user in the shared cache under a version token that is
+    renewed whenever institutions, campuses, groups, enrollments or family members
+    change (see ``communications.signals``). Misses are resolved with one set-based
+    query per step of the lookup chain, whatever the number of users.
+    """
+
+    user_ids = {int(getattr(user, "id", user)) for user in users if user is not None and getattr(user, "id", user)}
+    if not user_ids:
+        return {}
+
+    version = _resolver_version()
+    keys = {user_id: f"communications:institution_resolver:{version}:{user_id}" for user_id in user_ids}
+    try:
+        cached = cache.get_many(list(keys.values()))
+    except Exception:
+        cached = {}
+
+    institution_ids: Dict[int, Optional[int]] = {}
+    for user_id, key in keys.items():
+        if key in cached:
+            institution_ids[user_id] = cached[key] or None
+
+    missing = user_ids - set(institution_ids)
+    if missing:
+        computed = _resolve_institution_ids(missing)
+        institution_ids.update(computed)
+        # Inside a transaction the rows may still be rolled back; only cache committed reads.
+        if version and not connection.in_atomic_block:
+            timeout = int(getattr(settings, "KAMPUS_INSTITUTION_RESOLVER_CACHE_SECONDS", 3600))
+            try:
+                cache.set_many({keys[user_id]: computed[user_id] or 0 for user_id in missing}, timeout=timeout)
+            except Exception:
+                logger.warning("institution_resolver.cache_set_failed", exc_info=True)
+
+    institutions = Institution.objects.in_bulk({i for i in institution_ids.values() if i})
+    return {user_id: institutions.get(institution_id) for user_id, institution_id in institution_ids.items()}
+
+
+def resolve_institution_for_user(user: Any) -> Optional[Institution]:
+    if user is None:
+        return None
+    return resolve_institutions_for_users([user]).get(getattr(user, "id", None))
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from time import monotonic
+from typing import Dict, Optional, Tuple
+from uuid import uuid4
 
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 from django.db.utils import OperationalError, ProgrammingError
 
 from .models import MailgunSettings, WhatsAppSettings
@@ -95,12 +100,73 @@ def _build_from_env(*, environment: str | None = None) -> EffectiveMailSettings:
     )
 
 
-def get_effective_mail_settings(environment: str | None = None) -> EffectiveMailSettings:
-    resolved_environment = _resolve_environment(environment)
+_RUNTIME_SETTINGS_VERSION_KEY = "communications:runtime_settings:version"
+# How often a process re-reads the shared version. Changes saved in the same process
+# invalidate immediately; changes from other workers are picked up within this window.
+_RUNTIME_SETTINGS_VERSION_CHECK_SECONDS = 2.0
+# (version, built at, row) per (model, environment).
+_config_snapshots: Dict[Tuple[str, str], Tuple[Optional[str], float, object]] = {}
+_runtime_settings_version_state: Dict[str, object] = {"value": None, "checked_at": None}
+
+
+def _runtime_settings_version() -> Optional[str]:
+    now = monotonic()
+    checked_at = _runtime_settings_version_state["checked_at"]
+    if checked_at is not None and now - float(checked_at) < _RUNTIME_SETTINGS_VERSION_CHECK_SECONDS:
+        return _runtime_settings_version_state["value"]  # type: ignore[return-value]
     try:
-        config = MailgunSettings.objects.filter(environment=resolved_environment).order_by("-updated_at").first()
+        value = cache.get(_RUNTIME_SETTINGS_VERSION_KEY)
+    except Exception:
+        value = None
+    _runtime_settings_version_state["value"] = value
+    _runtime_settings_version_state["checked_at"] = now
+    return value
+
+
+def _load_config(model, environment: str):
+    """Latest settings row of `environment`, cached per process (worker).
+
+    Only the row is cached: env-based fallbacks keep reading Django settings. The
+    snapshot is refreshed when the shared version changes, which happens on every
+    save/delete of the settings models (see ``communications.signals``), or once it
+    is older than ``KAMPUS_PROCESS_CACHE_MAX_AGE_SECONDS``: with LocMemCache the
+    version is not shared between processes and the age is what propagates edits.
+    """
+
+    key = (model._meta.label, environment)
+    version = _runtime_settings_version()
+    now = monotonic()
+    cached = _config_snapshots.get(key)
+    if cached is not None and cached[0] == version and now - cached[1] < _snapshot_max_age():
+        return cached[2]
+
+    try:
+        config = model.objects.filter(environment=environment).order_by("-updated_at").first()
     except (OperationalError, ProgrammingError):
-        config = None
+        return None
+    # Inside a transaction the row may still be rolled back; only keep committed reads.
+    if not connection.in_atomic_block:
+        _config_snapshots[key] = (version, now, config)
+    return config
+
+
+def _snapshot_max_age() -> float:
+    return float(getattr(settings, "KAMPUS_PROCESS_CACHE_MAX_AGE_SECONDS", 60))
+
+
+def invalidate_runtime_settings() -> None:
+    _config_snapshots.clear()
+    _runtime_settings_version_state["checked_at"] = None
+    try:
+        cache.set(_RUNTIME_SETTINGS_VERSION_KEY, uuid4().hex, timeout=None)
+    except Exception:
+        # Without a shared cache at least this process stays consistent.
+        pass
+
+
+def get_effective_mail_settings(environment: str | None = None) -> EffectiveMailSettings:
+    resolved_environment = _resolve_environment(environment)
+    config = _load_config(MailgunSettings, resolved_environment)
 
     if config is None:
         return _build_from_env(environment=resolved_environment)
@@ -174,10 +240,7 @@ def _build_whatsapp_from_env(*, environment: str | None = None) -> EffectiveWhat
 
 def get_effective_whatsapp_settings(environment: str | None = None) -> EffectiveWhatsAppSettings:
     resolved_environment = _resolve_environment(environment)
-    try:
-        config = WhatsAppSettings.objects.filter(environment=resolved_environment).order_by("-updated_at").first()
-    except (OperationalError, ProgrammingError):
-        config = None
+    config = _load_config(WhatsAppSettings, resolved_environment)
 
     if config is None:
         return _build_whatsapp_from_env(environment=resolved_environment)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Institution
+
+from .institution_resolver import invalidate_institution_resolution
+from .models import MailgunSettings, WhatsAppSettings
+from .runtime_settings import invalidate_runtime_settings
+from .template_service import invalidate_institution_branding
+
+
+@receiver(post_save, sender=MailgunSettings)
+@receiver(post_delete, sender=MailgunSettings)
+@receiver(post_save, sender=WhatsAppSettings)
+@receiver(post_delete, sender=WhatsAppSettings)
+def invalidate_runtime_settings_on_change(sender, **kwargs):
+    invalidate_runtime_settings()
+    # Renew the version again once committed, so workers that re-read the row
+    # before the commit do not keep the previous values.
+    transaction.on_commit(invalidate_runtime_settings)
+
+
+@receiver(post_save, sender=Institution)
+@receiver(post_delete, sender=Institution)
+def invalidate_institution_branding_on_change(sender, **kwargs):
+    invalidate_institution_branding()
+    transaction.on_commit(invalidate_institution_branding)
+
+
+@receiver(post_save, sender=Institution)
+@receiver(post_delete, sender=Institution)
+@receiver(post_save, sender="core.Campus")
+@receiver(post_delete, sender="core.Campus")
+@receiver(post_save, sender="academic.Group")
+@receiver(post_delete, sender="academic.Group")
+@receiver(post_save, sender="students.Enrollment")
+@receiver(post_delete, sender="students.Enrollment")
+@receiver(post_save, sender="students.FamilyMember")
+@receiver(post_delete, sender="students.FamilyMember")
+def invalidate_institution_resolution_on_change(sender, **kwargs):
+    # Any of these rows can move a user to another institution.
+    invalidate_institution_resolution()
+    transaction.on_commit(invalidate_institution_resolution)
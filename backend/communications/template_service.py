@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any
+from time import monotonic
+from typing import Any, Iterable
+from uuid import uuid4
 
 from django.conf import settings
-from django.db import IntegrityError
-from django.template import Context, Engine
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.template import Context, Engine, Template
 
 from core.models import Institution
 
@@ -284,10 +289,44 @@ class RenderedEmailTemplate:
     body_html: str
 
 
-def _render_string(template_string: str, context: dict[str, Any]) -> str:
+_COMPILED_TEMPLATE_CACHE_SIZE = 256
+_compiled_templates: OrderedDict[tuple, Template] = OrderedDict()
+_compiled_templates_lock = threading.Lock()
+
+
+def _compiled_template(key: tuple, template_string: str) -> Template:
+    """Compiled template for `key`, kept in a bounded per-process LRU.
+
+    Keys carry the template's slug and `updated_at`, so an edited template gets a new
+    entry and the old one ages out.
+    """
+
+    with _compiled_templates_lock:
+        template = _compiled_templates.get(key)
+        if template is not None:
+            _compiled_templates.move_to_end(key)
+            return template
+
+    template = _TEMPLATE_ENGINE.from_string(template_string)
+    with _compiled_templates_lock:
+        _compiled_templates[key] = template
+        while len(_compiled_templates) > _COMPILED_TEMPLATE_CACHE_SIZE:
+            _compiled_templates.popitem(last=False)
+    return template
+
+
+def clear_compiled_template_cache() -> None:
+    with _compiled_templates_lock:
+        _compiled_templates.clear()
+
+
+def _render_string(template_string: str, context: dict[str, Any], *, key: tuple | None = None) -> str:
     if not template_string:
         return ""
-    template = _TEMPLATE_ENGINE.from_string(template_string)
+    if key is None:
+        template = _TEMPLATE_ENGINE.from_string(template_string)
+    else:
+        template = _compiled_template(key, template_string)
     return template.render(Context(context)).strip()
 
 
@@ -308,7 +347,70 @@ def _absolute_media_url(url: str) -> str:
     return f"{base}/{clean}"
 
 
+_BRANDING_VERSION_KEY = "communications:branding:version"
+# How often a process re-reads the shared version; Institution saves in the same
+# process invalidate immediately.
+_BRANDING_VERSION_CHECK_SECONDS = 2.0
+_branding_snapshot: dict[str, Any] = {"key": None, "value": None, "built_at": None}
+_branding_version_state: dict[str, Any] = {"value": None, "checked_at": None}
+
+
+def _branding_version() -> str | None:
+    now = monotonic()
+    checked_at = _branding_version_state["checked_at"]
+    if checked_at is not None and now - float(checked_at) < _BRANDING_VERSION_CHECK_SECONDS:
+        return _branding_version_state["value"]
+    try:
+        value = cache.get(_BRANDING_VERSION_KEY)
+    except Exception:
+        value = None
+    _branding_version_state["value"] = value
+    _branding_version_state["checked_at"] = now
+    return value
+
+
+def invalidate_institution_branding() -> None:
+    _branding_snapshot["key"] = None
+    _branding_snapshot["value"] = None
+    _branding_snapshot["built_at"] = None
+    _branding_version_state["checked_at"] = None
+    try:
+        cache.set(_BRANDING_VERSION_KEY, uuid4().hex, timeout=None)
+    except Exception:
+        # Without a shared cache at least this process stays consistent.
+        pass
+
+
 def _get_institution_branding() -> dict[str, str]:
+    """Institution name/logo/email for email templates, cached per process.
+
+    The snapshot is renewed when the shared version changes (``Institution`` saves,
+    see ``communications.signals``), the public base URL of the logo changes, or it
+    is older than ``KAMPUS_PROCESS_CACHE_MAX_AGE_SECONDS`` (with LocMemCache the
+    version is not shared between processes).
+    """
+
+    key = (
+        _branding_version(),
+        str(getattr(settings, "PUBLIC_SITE_URL", "") or ""),
+        str(getattr(settings, "KAMPUS_BACKEND_BASE_URL", "") or ""),
+    )
+    now = monotonic()
+    built_at = _branding_snapshot["built_at"]
+    max_age = float(getattr(settings, "KAMPUS_PROCESS_CACHE_MAX_AGE_SECONDS", 60))
+    if _branding_snapshot["key"] == key and built_at is not None and now - built_at < max_age:
+        return dict(_branding_snapshot["value"])
+
+    branding = _load_institution_branding()
+    # Inside a transaction the institution may still be rolled back; only keep committed reads.
+    if not connection.in_atomic_block:
+        _branding_snapshot["key"] = key
+        _branding_snapshot["value"] = dict(branding)
+        _branding_snapshot["built_at"] = now
+    return branding
+
+
+def _load_institution_branding() -> dict[str, str]:
     institution = Institution.objects.first()
     logo_url = ""
     institution_name = "Kampus"
@@ -356,11 +458,11 @@ def list_template_defaults() -> list[dict[str, Any]]:
     return [{"slug": slug, **data} for slug, data in _DEFAULT_TEMPLATES.items()]
 
 
-def render_email_template(*, slug: str, context: dict[str, Any] | None = None) -> RenderedEmailTemplate:
-    template = get_or_create_email_template(slug)
-    if template is None:
-        raise ValueError(f"No existe plantilla para slug '{slug}'.")
-
+def _render_loaded_template(
+    template: EmailTemplate,
+    context: dict[str, Any] | None,
+    branding_context: dict[str, str],
+) -> RenderedEmailTemplate:
     input_context = context or {}
     allowed = set(template.allowed_variables or [])
     filtered_context = {k: v for k, v in input_context.items() if not allowed or k in allowed}
@@ -377,7 +479,6 @@ def render_email_template(*, slug: str, context: dict[str, Any] | None = None) -
                 primary_action_url = str(value).strip()
                 break
 
-    branding_context = _get_institution_branding()
     render_context = {
         **branding_context,
         **filtered_context,
@@ -385,9 +486,10 @@ def render_email_template(*, slug: str, context: dict[str, Any] | None = None) -
         "preheader": template.name,
     }
 
-    subject = _render_string(template.subject_template, render_context)
-    body_text = _render_string(template.body_text_template, render_context)
-    html_content = _render_string(template.body_html_template, render_context)
+    version = (template.slug, template.updated_at)
+    subject = _render_string(template.subject_template, render_context, key=(*version, "subject"))
+    body_text = _render_string(template.body_text_template, render_context, key=(*version, "text"))
+    html_content = _render_string(template.body_html_template, render_context, key=(*version, "html"))
 
     if html_content:
         body_html = _render_string(
@@ -397,6 +499,7 @@ def render_email_template(*, slug: str, context: dict[str, Any] | None = None) -
                 "subject": subject,
                 "content_html": html_content,
             },
+            key=("__base_html__",),
         )
     else:
         body_html = ""
@@ -409,6 +512,33 @@ def render_email_template(*, slug: str, context: dict[str, Any] | None = None) -
     )
 
 
+def render_email_template(*, slug: str, context: dict[str, Any] | None = None) -> RenderedEmailTemplate:
+    template = get_or_create_email_template(slug)
+    if template is None:
+        raise ValueError(f"No existe plantilla para slug '{slug}'.")
+
+    return _render_loaded_template(template, context, _get_institution_branding())
+
+
+def render_email_template_batch(
+    *,
+    slug: str,
+    contexts: Iterable[dict[str, Any] | None],
+) -> list[RenderedEmailTemplate]:
+    """Render one template for many recipients.
+
+    The template row and the institution branding are loaded once and every
+    template is compiled once, whatever the number of contexts.
+    """
+
+    template = get_or_create_email_template(slug)
+    if template is None:
+        raise ValueError(f"No existe plantilla para slug '{slug}'.")
+
+    branding_context = _get_institution_branding()
+    return [_render_loaded_template(template, context, branding_context) for context in contexts]
+
+
 def send_templated_email(
     *,
     slug: str,
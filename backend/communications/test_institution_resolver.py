@@ -1,8 +1,12 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
-
-from academic.models import AcademicYear, Grade
-from communications.institution_resolver import resolve_institution_for_user
+from django.test import TestCase, TransactionTestCase
+
+from academic.models import AcademicYear, Grade, Group
+from communications.institution_resolver import (
+    invalidate_institution_resolution,
+    resolve_institution_for_user,
+    resolve_institutions_for_users,
+)
 from core.models import Campus, Institution
 from students.models import Enrollment, FamilyMember, Student
 
@@ -94,3 +98,75 @@ class ResolveInstitutionForUserTests(TestCase):
         resolved = resolve_institution_for_user(guardian_user)
 
         self.assertEqual(resolved.id, institution.id)
+
+
+class ResolveInstitutionsForUsersTests(TestCase):
+    def test_batch_matches_single_user_resolution_with_set_based_queries(self):
+        year = AcademicYear.objects.create(year=2031, status=AcademicYear.STATUS_ACTIVE)
+        grade = Grade.objects.create(name="6", ordinal=6)
+        users = {
+            name: User.objects.create_user(username=f"batch_{name}", password="pass1234", role=role)
+            for name, role in (
+                ("rector", User.ROLE_ADMIN),
+                ("director", User.ROLE_TEACHER),
+                ("group_director", User.ROLE_TEACHER),
+                ("student", User.ROLE_STUDENT),
+                ("guardian", User.ROLE_PARENT),
+                ("nobody", User.ROLE_TEACHER),
+            )
+        }
+        default = Institution.objects.create(name="Por defecto")
+        rector_institution = Institution.objects.create(name="Rectoria", rector=users["rector"])
+        campus_institution = Institution.objects.create(name="Sedes")
+        campus = Campus.objects.create(institution=campus_institution, name="Sede", director=users["director"])
+        group_institution = Institution.objects.create(name="Grupos")
+        group_campus = Campus.objects.create(institution=group_institution, name="Sede Grupos")
+        Group.objects.create(
+            name="6A", grade=grade, academic_year=year, director=users["group_director"], campus=group_campus
+        )
+        student = Student.objects.create(user=users["student"])
+        Enrollment.objects.create(student=student, academic_year=year, grade=grade, campus=campus, status="ACTIVE")
+        FamilyMember.objects.create(
+            student=student, user=users["guardian"], full_name="Acudiente", relationship="Padre"
+        )
+
+        # One query per step of the lookup chain plus the institutions themselves.
+        with self.assertNumQueries(8):
+            resolved = resolve_institutions_for_users(users.values())
+
+        self.assertEqual(
+            {name: resolved[user.id].id for name, user in users.items()},
+            {
+                "rector": rector_institution.id,
+                "director": campus_institution.id,
+                "group_director": group_institution.id,
+                "student": campus_institution.id,
+                "guardian": campus_institution.id,
+                "nobody": default.id,
+            },
+        )
+        for user in users.values():
+            self.assertEqual(resolve_institution_for_user(user), resolved[user.id])
+
+
+class InstitutionResolutionCacheTests(TransactionTestCase):
+    # TransactionTestCase: resolutions are only cached outside open transactions.
+    def setUp(self):
+        invalidate_institution_resolution()
+        self.addCleanup(invalidate_institution_resolution)
+
+    def test_cached_resolution_is_renewed_when_enrollments_change(self):
+        year = AcademicYear.objects.create(year=2032, status=AcademicYear.STATUS_ACTIVE)
+        grade = Grade.objects.create(name="7", ordinal=7)
+        first = Institution.objects.create(name="Primera")
+        second = Institution.objects.create(name="Segunda")
+        campus = Campus.objects.create(institution=second, name="Sede Segunda")
+        student_user = User.objects.create_user(username="cached_student", password="pass1234", role=User.ROLE_STUDENT)
+        student = Student.objects.create(user=student_user)
+
+        self.assertEqual(resolve_institution_for_user(student_user), first)
+        with self.assertNumQueries(1):
+            self.assertEqual(resolve_institution_for_user(student_user), first)
+
+        Enrollment.objects.create(student=student, academic_year=year, grade=grade, campus=campus, status="ACTIVE")
+        self.assertEqual(resolve_institution_for_user(student_user), second)
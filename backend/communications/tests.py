@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.test import override_settings
 from django.db.utils import OperationalError
 from django.core.management import call_command
@@ -1411,3 +1411,158 @@ class WhatsAppNotificationE2ETests(TestCase):
 		delivery.refresh_from_db()
 		self.assertEqual(delivery.status, WhatsAppDelivery.STATUS_DELIVERED)
 		self.assertEqual(WhatsAppEvent.objects.filter(provider_message_id="wamid.E2E123").count(), 1)
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class RuntimeSettingsSnapshotTests(TransactionTestCase):
+	# TransactionTestCase: snapshots are only kept outside open transactions.
+	def setUp(self):
+		from .runtime_settings import invalidate_runtime_settings
+
+		invalidate_runtime_settings()
+		self.addCleanup(invalidate_runtime_settings)
+
+	def _send(self, key):
+		from django.db import connection
+		from django.test.utils import CaptureQueriesContext
+
+		with CaptureQueriesContext(connection) as ctx:
+			send_email(recipient_email="snapshot@example.com", subject="Hola", body_text="Cuerpo", idempotency_key=key)
+		settings_queries = [q for q in ctx.captured_queries if "communications_mailgunsettings" in q["sql"]]
+		return len(ctx.captured_queries), len(settings_queries)
+
+	def test_send_email_reads_mail_settings_once_per_version(self):
+		cold_total, cold_settings = self._send("snapshot:1")
+		warm_total, warm_settings = self._send("snapshot:2")
+
+		# Before: every send looked up MailgunSettings. After: only the first one.
+		self.assertEqual(cold_settings, 1)
+		self.assertEqual(warm_settings, 0)
+		self.assertEqual(warm_total, cold_total - 1)
+
+		from .models import MailgunSettings
+
+		from django.conf import settings
+
+		MailgunSettings.objects.create(environment="development", default_from_email="kampus@example.com")
+		with patch("sys.stdout", new_callable=StringIO):
+			_total, renewed_settings = self._send("snapshot:3")
+		self.assertEqual(renewed_settings, 1)
+		self.assertEqual(settings.DEFAULT_FROM_EMAIL, "kampus@example.com")
+
+	def test_whatsapp_settings_snapshot_follows_saves(self):
+		from .runtime_settings import get_effective_whatsapp_settings
+
+		config = WhatsAppSettings.objects.create(environment="development", enabled=True, phone_number_id="111")
+		with self.assertNumQueries(1):
+			for _ in range(3):
+				self.assertEqual(get_effective_whatsapp_settings(environment="development").phone_number_id, "111")
+
+		config.phone_number_id = "222"
+		config.save()
+		self.assertEqual(get_effective_whatsapp_settings(environment="development").phone_number_id, "222")
+
+	@override_settings(KAMPUS_PROCESS_CACHE_MAX_AGE_SECONDS=60)
+	def test_snapshot_expires_without_shared_invalidation(self):
+		from time import monotonic
+
+		from .runtime_settings import get_effective_whatsapp_settings
+
+		WhatsAppSettings.objects.create(environment="development", enabled=True, phone_number_id="111")
+		self.assertEqual(get_effective_whatsapp_settings(environment="development").phone_number_id, "111")
+
+		# Edited from another process: with LocMemCache no version change reaches this one.
+		WhatsAppSettings.objects.filter(environment="development").update(phone_number_id="222")
+		now = monotonic()
+		with patch("communications.runtime_settings.monotonic", return_value=now + 30):
+			self.assertEqual(get_effective_whatsapp_settings(environment="development").phone_number_id, "111")
+		with patch("communications.runtime_settings.monotonic", return_value=now + 61):
+			self.assertEqual(get_effective_whatsapp_settings(environment="development").phone_number_id, "222")
+
+
+class EmailTemplateRenderCacheTests(TestCase):
+	def setUp(self):
+		from .template_service import clear_compiled_template_cache
+
+		clear_compiled_template_cache()
+		self.addCleanup(clear_compiled_template_cache)
+
+	def test_batch_render_compiles_each_template_once(self):
+		from .template_service import _TEMPLATE_ENGINE, render_email_template_batch
+
+		render_email_template_batch(slug="in-app-notification-generic", contexts=[])
+		contexts = [
+			{"recipient_name": f"Docente {idx}", "title": "Recordatorio", "body": "Cuerpo", "action_url": "http://k/n"}
+			for idx in range(500)
+		]
+
+		with (
+			patch.object(_TEMPLATE_ENGINE, "from_string", wraps=_TEMPLATE_ENGINE.from_string) as compile_template,
+			self.assertNumQueries(2),
+		):
+			rendered = render_email_template_batch(slug="in-app-notification-generic", contexts=contexts)
+
+		# Subject, text, HTML body and the shared base wrapper.
+		self.assertEqual(compile_template.call_count, 4)
+		self.assertEqual(len(rendered), 500)
+		self.assertIn("Docente 499", rendered[-1].body_text)
+		self.assertIn("Docente 0", rendered[0].body_html)
+
+	def test_edited_template_is_recompiled(self):
+		from .template_service import render_email_template
+
+		EmailTemplate.objects.create(
+			slug="render-cache-test",
+			name="Render cache",
+			subject_template="Asunto {{ title }}",
+			body_text_template="Texto",
+		)
+		self.assertEqual(render_email_template(slug="render-cache-test", context={"title": "A"}).subject, "Asunto A")
+
+		template = EmailTemplate.objects.get(slug="render-cache-test")
+		template.subject_template = "Nuevo {{ title }}"
+		template.save()
+
+		self.assertEqual(render_email_template(slug="render-cache-test", context={"title": "A"}).subject, "Nuevo A")
+
+
+class EmailBrandingSnapshotTests(TransactionTestCase):
+	# TransactionTestCase: snapshots are only kept outside open transactions.
+	def setUp(self):
+		from .template_service import invalidate_institution_branding
+
+		invalidate_institution_branding()
+		self.addCleanup(invalidate_institution_branding)
+
+	def test_branding_snapshot_follows_institution_saves(self):
+		from core.models import Institution
+
+		from .template_service import _get_institution_branding
+
+		institution = Institution.objects.create(name="Colegio Uno", email="uno@example.com")
+		with self.assertNumQueries(1):
+			for _ in range(3):
+				self.assertEqual(_get_institution_branding()["institution_name"], "Colegio Uno")
+
+		institution.name = "Colegio Dos"
+		institution.save()
+		self.assertEqual(_get_institution_branding()["institution_name"], "Colegio Dos")
+
+	@override_settings(KAMPUS_PROCESS_CACHE_MAX_AGE_SECONDS=60)
+	def test_branding_snapshot_expires_without_shared_invalidation(self):
+		from time import monotonic
+
+		from core.models import Institution
+
+		from .template_service import _get_institution_branding
+
+		Institution.objects.create(name="Colegio Uno", email="uno@example.com")
+		self.assertEqual(_get_institution_branding()["institution_name"], "Colegio Uno")
+
+		# Edited from another process: with LocMemCache no version change reaches this one.
+		Institution.objects.update(name="Colegio Dos")
+		now = monotonic()
+		with patch("communications.template_service.monotonic", return_value=now + 30):
+			self.assertEqual(_get_institution_branding()["institution_name"], "Colegio Uno")
+		with patch("communications.template_service.monotonic", return_value=now + 61):
+			self.assertEqual(_get_institution_branding()["institution_name"], "Colegio Dos")
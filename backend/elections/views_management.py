@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import base64
 import csv
 import json
 import logging
@@ -38,6 +37,7 @@ from students.models import Student
 from students.models import ObserverAnnotation
 from core.models import Campus
 from core.models import Institution
+from reports.asset_cache import image_file_data_uri, qr_png_data_uri
 from teachers.models import Teacher
 
 from .models import (
@@ -372,23 +372,15 @@ CONTRALOR_ACTA_OFFICE = {
 def _qr_png_data_uri(text: str) -> str:
     if not qrcode:
         return ""
-    image = qrcode.make(text)
-    buffer = BytesIO()
-    image.save(buffer, format="PNG")
-    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
-    return f"data:image/png;base64,{encoded}"
+    return qr_png_data_uri(text)
 
 
 def _image_file_to_data_uri(image_field) -> str:
     """Convert a Django ImageField to a base64 data URI. Returns empty string on failure."""
-    import mimetypes
     if not image_field or not getattr(image_field, "name", None):
         return ""
     try:
-        mime = mimetypes.guess_type(image_field.name)[0] or "image/jpeg"
-        with open(image_field.path, "rb") as fh:
-            data = base64.b64encode(fh.read()).decode("ascii")
-        return f"data:{mime};base64,{data}"
+        return image_file_data_uri(image_field.path, name=image_field.name)
     except Exception:
         return ""
 
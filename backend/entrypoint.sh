@@ -47,6 +47,13 @@ else
   echo "Skipping migrations (KAMPUS_RUN_MIGRATIONS=false)"
 fi
 
+# Calibrate the boletín layout model when the image was built without it (see Dockerfile)
+# or /app is bind-mounted over it, as in docker-compose.yml.
+if [ "${KAMPUS_CALIBRATE_REPORT_LAYOUT:-false}" = "true" ]; then
+  echo "Calibrating report layout model (if missing)..."
+  python manage.py calibrate_report_layout --if-missing
+fi
+
 # Create superuser
 if [ "${KAMPUS_CREATE_SUPERUSER:-false}" = "true" ]; then
   SUPERUSER_USERNAME="${KAMPUS_SUPERUSER_USERNAME:-admin}"
@@ -124,6 +124,8 @@ KAMPUS_FRONTEND_BASE_URL = _validate_public_base_url(
 )
 NOTIFICATIONS_EMAIL_ENABLED = (os.getenv("KAMPUS_NOTIFICATIONS_EMAIL_ENABLED") or "true").strip().lower() in {"1", "true", "yes"}
 KAMPUS_NOTIFICATIONS_OUTBOX_ONLY = (os.getenv("KAMPUS_NOTIFICATIONS_OUTBOX_ONLY") or "false").strip().lower() in {"1", "true", "yes"}
+# notify_users bulk-creates notifications and outbox rows in chunks of this size.
+KAMPUS_NOTIFICATIONS_BULK_CHUNK_SIZE = int(os.getenv("KAMPUS_NOTIFICATIONS_BULK_CHUNK_SIZE", "500"))
 
 # Auth cookie settings (JWT in HttpOnly cookies)
 AUTH_COOKIE_ACCESS_NAME = os.getenv("KAMPUS_AUTH_COOKIE_ACCESS_NAME", "kampus_access")
@@ -291,6 +293,9 @@ PRIVATE_STORAGE_ROOT = Path(
 )
 PRIVATE_REPORTS_DIR = os.getenv("KAMPUS_PRIVATE_REPORTS_DIR", "reports")
 
+# `manage.py test` keeps uploads and generated reports in a temporary directory.
+TEST_RUNNER = "kampus_backend.test_runner.KampusTestRunner"
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Django REST Framework
@@ -371,6 +376,24 @@ CELERY_TASK_EAGER_PROPAGATES = os.getenv("CELERY_TASK_EAGER_PROPAGATES", "true")
 # Hard kill after 11 min; soft signal at 10 min so the task can mark_failed cleanly.
 CELERY_TASK_SOFT_TIME_LIMIT = int(os.getenv("CELERY_TASK_SOFT_TIME_LIMIT", "600"))
 CELERY_TASK_TIME_LIMIT = int(os.getenv("CELERY_TASK_TIME_LIMIT", "660"))
+# Long report tasks: take one message at a time so queued jobs stay available to idle workers.
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv("CELERY_WORKER_PREFETCH_MULTIPLIER", "1"))
+
+# Report job lanes (see reports.lanes): interactive documents and bulk group/school
+# documents use separate queues, time limits and per-user concurrency. Only enable it
+# when workers consume both queues (see docker-compose.yml); while disabled, report
+# jobs stay on the default queue with the lanes' time limits.
+REPORT_LANES_ENABLED = (os.getenv("KAMPUS_REPORT_LANES_ENABLED") or "false").strip().lower() in {"1", "true", "yes"}
+REPORT_INTERACTIVE_QUEUE = os.getenv("KAMPUS_REPORT_INTERACTIVE_QUEUE", "reports_interactive")
+REPORT_INTERACTIVE_SOFT_TIME_LIMIT = int(os.getenv("KAMPUS_REPORT_INTERACTIVE_SOFT_TIME_LIMIT", "120"))
+REPORT_INTERACTIVE_TIME_LIMIT = int(os.getenv("KAMPUS_REPORT_INTERACTIVE_TIME_LIMIT", "150"))
+REPORT_INTERACTIVE_MAX_RUNNING_PER_USER = int(os.getenv("KAMPUS_REPORT_INTERACTIVE_MAX_RUNNING_PER_USER", "3"))
+REPORT_BULK_QUEUE = os.getenv("KAMPUS_REPORT_BULK_QUEUE", "reports_bulk")
+REPORT_BULK_SOFT_TIME_LIMIT = int(os.getenv("KAMPUS_REPORT_BULK_SOFT_TIME_LIMIT", "1200"))
+REPORT_BULK_TIME_LIMIT = int(os.getenv("KAMPUS_REPORT_BULK_TIME_LIMIT", "1260"))
+REPORT_BULK_MAX_RUNNING_PER_USER = int(os.getenv("KAMPUS_REPORT_BULK_MAX_RUNNING_PER_USER", "1"))
+# A job over its user's per-lane limit goes back on the queue after this many seconds.
+REPORT_FAIR_SHARE_DEFER_SECONDS = int(os.getenv("KAMPUS_REPORT_FAIR_SHARE_DEFER_SECONDS", "15"))
 
 KAMPUS_NOVELTIES_SLA_NOTIFY_ENABLED = (os.getenv("KAMPUS_NOVELTIES_SLA_NOTIFY_ENABLED") or "true").strip().lower() in {"1", "true", "yes"}
 KAMPUS_NOVELTIES_SLA_NOTIFY_BEAT_ENABLED = (os.getenv("KAMPUS_NOVELTIES_SLA_NOTIFY_BEAT_ENABLED") or "false").strip().lower() in {"1", "true", "yes"}
@@ -391,6 +414,11 @@ KAMPUS_NOTIFICATIONS_DISPATCH_OUTBOX_BEAT_HOUR = (os.getenv("KAMPUS_NOTIFICATION
 KAMPUS_NOTIFICATIONS_DISPATCH_OUTBOX_BEAT_DAY_OF_WEEK = (os.getenv("KAMPUS_NOTIFICATIONS_DISPATCH_OUTBOX_BEAT_DAY_OF_WEEK") or "*").strip()
 KAMPUS_NOTIFICATIONS_DISPATCH_OUTBOX_BATCH_SIZE = int(os.getenv("KAMPUS_NOTIFICATIONS_DISPATCH_OUTBOX_BATCH_SIZE", "100"))
 KAMPUS_NOTIFICATIONS_DISPATCH_OUTBOX_MAX_RETRIES = int(os.getenv("KAMPUS_NOTIFICATIONS_DISPATCH_OUTBOX_MAX_RETRIES", "5"))
+# Outbox workers lease claimed rows; leases older than this are reaped (crashed worker).
+KAMPUS_NOTIFICATIONS_DISPATCH_LEASE_SECONDS = int(os.getenv("KAMPUS_NOTIFICATIONS_DISPATCH_LEASE_SECONDS", "300"))
+# Provider calls overlapping per channel inside one worker (PostgreSQL only).
+KAMPUS_NOTIFICATIONS_DISPATCH_EMAIL_CONCURRENCY = int(os.getenv("KAMPUS_NOTIFICATIONS_DISPATCH_EMAIL_CONCURRENCY", "4"))
+KAMPUS_NOTIFICATIONS_DISPATCH_WHATSAPP_CONCURRENCY = int(os.getenv("KAMPUS_NOTIFICATIONS_DISPATCH_WHATSAPP_CONCURRENCY", "4"))
 KAMPUS_NOTIFICATIONS_DISPATCH_HEALTH_BEAT_ENABLED = (os.getenv("KAMPUS_NOTIFICATIONS_DISPATCH_HEALTH_BEAT_ENABLED") or "false").strip().lower() in {"1", "true", "yes"}
 KAMPUS_NOTIFICATIONS_DISPATCH_HEALTH_BEAT_MINUTE = (os.getenv("KAMPUS_NOTIFICATIONS_DISPATCH_HEALTH_BEAT_MINUTE") or "*/5").strip()
 KAMPUS_NOTIFICATIONS_DISPATCH_HEALTH_BEAT_HOUR = (os.getenv("KAMPUS_NOTIFICATIONS_DISPATCH_HEALTH_BEAT_HOUR") or "*").strip()
@@ -499,8 +527,43 @@ else:
         }
     }
 
+# Per-process snapshots (academic.grading scale index, communications mail/WhatsApp
+# settings and email branding) are rebuilt after at most this many seconds even when
+# no invalidation reaches the process: with LocMemCache the version keys are not
+# shared between gunicorn and Celery processes.
+KAMPUS_PROCESS_CACHE_MAX_AGE_SECONDS = int(os.getenv("KAMPUS_PROCESS_CACHE_MAX_AGE_SECONDS", "60"))
+
+# Academic standing (failed subjects/areas) shared by commissions; see academic.standing.
+# Entries are versioned, so the TTL only bounds how long unused scopes stay in cache.
+ACADEMIC_STANDING_CACHE_SECONDS = int(os.getenv("KAMPUS_ACADEMIC_STANDING_CACHE_SECONDS", "900"))
+# With LocMemCache the version is not shared between processes: cap the TTL instead.
+ACADEMIC_STANDING_LOCAL_CACHE_SECONDS = int(os.getenv("KAMPUS_ACADEMIC_STANDING_LOCAL_CACHE_SECONDS", "10"))
+# Per-user institution resolved for notification dispatch; see communications.institution_resolver.
+KAMPUS_INSTITUTION_RESOLVER_CACHE_SECONDS = int(os.getenv("KAMPUS_INSTITUTION_RESOLVER_CACHE_SECONDS", "3600"))
+
 # Reports (async PDF jobs)
 REPORT_JOBS_TTL_HOURS = int(os.getenv("KAMPUS_REPORT_JOBS_TTL_HOURS", "24"))
+# Large documents are rendered in chunks (students / carnets per WeasyPrint pass) and
+# concatenated with pypdf, so worker memory does not grow with the size of the report.
+REPORT_PDF_CHUNK_STUDENTS = int(os.getenv("KAMPUS_REPORT_PDF_CHUNK_STUDENTS", "10"))
+REPORT_PDF_CHUNK_CARDS = int(os.getenv("KAMPUS_REPORT_PDF_CHUNK_CARDS", "120"))
+# Content-addressed cache of logos/photos/QR codes embedded in reports as data URIs.
+# Shared through the default cache; a bounded per-process LRU sits in front of it.
+REPORT_ASSET_CACHE_TIMEOUT_SECONDS = int(os.getenv("KAMPUS_REPORT_ASSET_CACHE_TIMEOUT_SECONDS", str(7 * 24 * 3600)))
+REPORT_ASSET_CACHE_LOCAL_MAX_BYTES = int(os.getenv("KAMPUS_REPORT_ASSET_CACHE_LOCAL_MAX_BYTES", str(32 * 1024 * 1024)))
+REPORT_ASSET_CACHE_MAX_ENTRY_BYTES = int(os.getenv("KAMPUS_REPORT_ASSET_CACHE_MAX_ENTRY_BYTES", str(2 * 1024 * 1024)))
+# Calibrated row-height model for two-page boletín fitting (see `calibrate_report_layout`).
+# The Docker image builds it (backend/Dockerfile); KAMPUS_CALIBRATE_REPORT_LAYOUT=true makes
+# entrypoint.sh build it when missing. Without the artifact every split is measured with WeasyPrint.
+REPORT_LAYOUT_MODEL_PATH = os.getenv(
+    "KAMPUS_REPORT_LAYOUT_MODEL_PATH", str(BASE_DIR / "students" / "report_layout_model.json")
+)
+# Input-fingerprinted result reuse (see reports.fingerprints): a job whose inputs match
+# the last render of the same document links to that PDF instead of rendering again.
+# Outputs older than the max age are rendered afresh; files shared by live jobs survive
+# `cleanup_report_jobs` until the last job referencing them expires.
+REPORT_RESULT_REUSE_ENABLED = os.getenv("KAMPUS_REPORT_RESULT_REUSE_ENABLED", "true").lower() in {"1", "true", "yes"}
+REPORT_RESULT_REUSE_MAX_AGE_HOURS = int(os.getenv("KAMPUS_REPORT_RESULT_REUSE_MAX_AGE_HOURS", "24"))
 
 # Email (Mailgun)
 DEFAULT_FROM_EMAIL = (os.getenv("DEFAULT_FROM_EMAIL") or "no-reply@localhost").strip()
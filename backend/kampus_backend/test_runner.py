@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class KampusTestRunner(DiscoverRunner):
+    """Runs tests with MEDIA_ROOT and PRIVATE_STORAGE_ROOT in a temporary directory.
+
+    Uploaded photos and generated report PDFs would otherwise land in the source
+    tree (backend/media, backend/private_storage).
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._storage_dir = tempfile.TemporaryDirectory(prefix="kampus-tests-")
+        root = Path(self._storage_dir.name)
+        self._storage_settings = override_settings(
+            MEDIA_ROOT=root / "media",
+            PRIVATE_STORAGE_ROOT=root / "private_storage",
+        )
+        self._storage_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._storage_settings.disable()
+        self._storage_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
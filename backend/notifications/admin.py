@@ -20,6 +20,7 @@ class NotificationDispatchAdmin(admin.ModelAdmin):
         "status",
         "attempts",
         "next_retry_at",
+        "claimed_until",
         "created_at",
         "processed_at",
     )
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 import logging
+from typing import Iterable, Optional
 
 from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Q
 from django.utils import timezone
 
 from communications.email_service import send_email
 from communications.models import WhatsAppContact
-from communications.institution_resolver import resolve_institution_for_user
+from communications.institution_resolver import resolve_institution_for_user, resolve_institutions_for_users
 from communications.template_service import send_templated_email
 from communications.whatsapp_service import send_whatsapp_notification
 
@@ -98,7 +103,7 @@ def _process_email_dispatch(dispatch: NotificationDispatch) -> dict:
     }
 
 
-def _process_whatsapp_dispatch(dispatch: NotificationDispatch) -> dict:
+def _process_whatsapp_dispatch(dispatch: NotificationDispatch, institutions: Optional[dict] = None) -> dict:
     notification = dispatch.notification
     recipient = notification.recipient
 
@@ -109,7 +114,10 @@ def _process_whatsapp_dispatch(dispatch: NotificationDispatch) -> dict:
     if contact is None:
         return {"result": "skipped_no_active_contact", "channel_status": "SKIPPED"}
 
-    institution = resolve_institution_for_user(recipient)
+    if institutions is not None and recipient.id in institutions:
+        institution = institutions[recipient.id]
+    else:
+        institution = resolve_institution_for_user(recipient)
     absolute_url = _notification_absolute_url(notification.url)
     body_parts = [
         f"Hola {recipient.get_full_name() or recipient.username},",
@@ -140,7 +148,28 @@ def _process_whatsapp_dispatch(dispatch: NotificationDispatch) -> dict:
     }
 
 
-def process_dispatch(dispatch: NotificationDispatch, *, max_retries: int = 5) -> NotificationDispatch:
+def process_dispatch(
+    dispatch: NotificationDispatch,
+    *,
+    max_retries: int = 5,
+    institutions: Optional[dict] = None,
+) -> NotificationDispatch:
+    if dispatch.claimed_until is not None:
+        # Renew the lease right before sending. If it already expired the row may have
+        # been reaped and handed to another worker, so it must not be sent from here.
+        now = timezone.now()
+        lease_until = now + timedelta(seconds=_lease_seconds())
+        renewed = NotificationDispatch.objects.filter(
+            id=dispatch.id,
+            status=NotificationDispatch.STATUS_IN_PROGRESS,
+            claimed_until__gte=now,
+        ).update(claimed_until=lease_until, updated_at=now)
+        if not renewed:
+            logger.warning("Dispatch lease lost before sending", extra={"dispatch_id": dispatch.id})
+            dispatch.refresh_from_db()
+            return dispatch
+        dispatch.claimed_until = lease_until
+
     attempt = int(dispatch.attempts or 0) + 1
     dispatch.attempts = attempt
     dispatch.status = NotificationDispatch.STATUS_IN_PROGRESS
@@ -151,7 +180,7 @@ def process_dispatch(dispatch: NotificationDispatch, *, max_retries: int = 5) ->
         if dispatch.channel == NotificationDispatch.CHANNEL_EMAIL:
             result_payload = _process_email_dispatch(dispatch)
         elif dispatch.channel == NotificationDispatch.CHANNEL_WHATSAPP:
-            result_payload = _process_whatsapp_dispatch(dispatch)
+            result_payload = _process_whatsapp_dispatch(dispatch, institutions)
         else:
             raise ValueError(f"Unsupported channel {dispatch.channel}")
 
@@ -160,6 +189,7 @@ def process_dispatch(dispatch: NotificationDispatch, *, max_retries: int = 5) ->
         dispatch.payload = merged_payload
         dispatch.status = NotificationDispatch.STATUS_SUCCEEDED
         dispatch.next_retry_at = None
+        dispatch.claimed_until = None
         dispatch.error_message = ""
         dispatch.processed_at = timezone.now()
         dispatch.save(
@@ -167,6 +197,7 @@ def process_dispatch(dispatch: NotificationDispatch, *, max_retries: int = 5) ->
                 "payload",
                 "status",
                 "next_retry_at",
+                "claimed_until",
                 "error_message",
                 "processed_at",
                 "updated_at",
@@ -182,5 +213,164 @@ def process_dispatch(dispatch: NotificationDispatch, *, max_retries: int = 5) ->
         )
         dispatch.error_message = str(exc)[:4000]
         dispatch.next_retry_at = next_retry_at
-        dispatch.save(update_fields=["status", "error_message", "next_retry_at", "updated_at"])
+        dispatch.claimed_until = None
+        dispatch.save(update_fields=["status", "error_message", "next_retry_at", "claimed_until", "updated_at"])
         return dispatch
+
+
+def _lease_seconds() -> int:
+    return max(1, int(getattr(settings, "KAMPUS_NOTIFICATIONS_DISPATCH_LEASE_SECONDS", 300)))
+
+
+def _due_dispatch_ids(qs, batch_size: int) -> list[int]:
+    return list(qs.values_list("id", flat=True)[: max(1, int(batch_size))])
+
+
+def claim_dispatches(*, batch_size: int, ids: Optional[Iterable[int]] = None) -> list[NotificationDispatch]:
+    """Claim up to `batch_size` due dispatches for this worker.
+
+    Rows are locked with SELECT ... FOR UPDATE SKIP LOCKED (where the database
+    supports it) and moved to IN_PROGRESS with a `claimed_until` lease, so several
+    outbox workers can drain the table at the same time without sharing rows.
+    """
+
+    now = timezone.now()
+    claimable = Q(status=NotificationDispatch.STATUS_PENDING) | Q(
+        status=NotificationDispatch.STATUS_FAILED, next_retry_at__lte=now
+    )
+    qs = NotificationDispatch.objects.filter(claimable)
+    if ids is not None:
+        qs = qs.filter(id__in=list(ids))
+    qs = qs.order_by("created_at", "id")
+    lease = {
+        "status": NotificationDispatch.STATUS_IN_PROGRESS,
+        "claimed_until": now + timedelta(seconds=_lease_seconds()),
+        "updated_at": now,
+    }
+
+    with transaction.atomic():
+        skip_locked = bool(connection.features.has_select_for_update_skip_locked)
+        if skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        candidate_ids = _due_dispatch_ids(qs, batch_size)
+        if skip_locked:
+            # The candidates are locked by this transaction: nobody else can claim them.
+            NotificationDispatch.objects.filter(id__in=candidate_ids).update(**lease)
+            claimed_ids = candidate_ids
+        else:
+            # Without row locks another drainer may have read the same rows; only the
+            # rows this UPDATE still finds claimable belong to this worker.
+            claimed_ids = [
+                dispatch_id
+                for dispatch_id in candidate_ids
+                if NotificationDispatch.objects.filter(claimable, id=dispatch_id).update(**lease)
+            ]
+
+    if not claimed_ids:
+        return []
+    return list(
+        NotificationDispatch.objects.filter(id__in=claimed_ids)
+        .select_related("notification", "notification__recipient")
+        .order_by("created_at", "id")
+    )
+
+
+def reap_expired_claims(*, max_retries: int = 5) -> int:
+    """Release dispatches whose worker died while holding the lease.
+
+    Rows with attempts left become due again; the others go to the dead-letter
+    queue so a dispatch that keeps crashing its worker cannot loop forever.
+    """
+
+    now = timezone.now()
+    expired = NotificationDispatch.objects.filter(status=NotificationDispatch.STATUS_IN_PROGRESS).filter(
+        Q(claimed_until__lt=now)
+        | Q(claimed_until__isnull=True, updated_at__lt=now - timedelta(seconds=_lease_seconds()))
+    )
+    dead = expired.filter(attempts__gte=max_retries).update(
+        status=NotificationDispatch.STATUS_DEAD_LETTER,
+        claimed_until=None,
+        next_retry_at=None,
+        error_message="Lease expired while processing",
+        updated_at=now,
+    )
+    retried = expired.filter(attempts__lt=max_retries).update(
+        status=NotificationDispatch.STATUS_FAILED,
+        claimed_until=None,
+        next_retry_at=now,
+        error_message="Lease expired while processing",
+        updated_at=now,
+    )
+    return dead + retried
+
+
+def _channel_concurrency(channel: str) -> int:
+    if channel == NotificationDispatch.CHANNEL_WHATSAPP:
+        value = getattr(settings, "KAMPUS_NOTIFICATIONS_DISPATCH_WHATSAPP_CONCURRENCY", 4)
+    else:
+        value = getattr(settings, "KAMPUS_NOTIFICATIONS_DISPATCH_EMAIL_CONCURRENCY", 4)
+    return max(1, int(value))
+
+
+def _concurrent_drain_supported() -> bool:
+    # Worker threads use their own connections: they need row locks and cannot see
+    # rows of a transaction that is still open in the calling thread.
+    return bool(connection.features.has_select_for_update_skip_locked) and not connection.in_atomic_block
+
+
+def _process_in_thread(
+    dispatch: NotificationDispatch,
+    max_retries: int,
+    institutions: Optional[dict],
+) -> NotificationDispatch:
+    try:
+        return process_dispatch(dispatch, max_retries=max_retries, institutions=institutions)
+    finally:
+        connections.close_all()
+
+
+def drain_dispatches(
+    dispatches: list[NotificationDispatch],
+    *,
+    max_retries: int = 5,
+    concurrent: Optional[bool] = None,
+) -> list[NotificationDispatch]:
+    """Process claimed dispatches, overlapping provider calls on one bounded pool per channel."""
+
+    # Institutions of every WhatsApp recipient of the batch, resolved at once.
+    institutions = None
+    whatsapp_recipients = [
+        dispatch.notification.recipient
+        for dispatch in dispatches
+        if dispatch.channel == NotificationDispatch.CHANNEL_WHATSAPP
+    ]
+    if whatsapp_recipients:
+        institutions = resolve_institutions_for_users(whatsapp_recipients)
+
+    if concurrent is None:
+        concurrent = _concurrent_drain_supported()
+    if not concurrent or len(dispatches) <= 1:
+        return [
+            process_dispatch(dispatch, max_retries=max_retries, institutions=institutions) for dispatch in dispatches
+        ]
+
+    by_channel: dict[str, list[NotificationDispatch]] = defaultdict(list)
+    for dispatch in dispatches:
+        by_channel[dispatch.channel].append(dispatch)
+
+    pools = {
+        channel: ThreadPoolExecutor(
+            max_workers=min(_channel_concurrency(channel), len(items)),
+            thread_name_prefix=f"outbox-{channel.lower()}",
+        )
+        for channel, items in by_channel.items()
+    }
+    try:
+        futures = [
+            pools[dispatch.channel].submit(_process_in_thread, dispatch, max_retries, institutions)
+            for dispatch in dispatches
+        ]
+        return [future.result() for future in futures]
+    finally:
+        for pool in pools.values():
+            pool.shutdown(wait=True)
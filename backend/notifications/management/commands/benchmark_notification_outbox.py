@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from communications.models import WhatsAppContact
+from notifications.dispatch import _concurrent_drain_supported, claim_dispatches, drain_dispatches
+from notifications.models import Notification, NotificationDispatch
+
+
+def _stub_provider(latency_s: float):
+    def _send(**kwargs):
+        time.sleep(latency_s)
+        return SimpleNamespace(delivery=SimpleNamespace(status="SENT", id=None, provider_message_id=""))
+
+    return _send
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds notification dispatches, drains them against a stub email/WhatsApp provider "
+        "with a fixed latency and reports throughput of the serial and the concurrent outbox "
+        "drain. Seeded rows are committed (worker threads use their own connections) and "
+        "deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, default=100)
+        parser.add_argument("--latency-ms", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        recipients = max(1, int(options["recipients"]))
+        latency_s = max(0, int(options["latency_ms"])) / 1000
+        batch_size = max(1, int(options["batch_size"]))
+
+        User = get_user_model()
+        token = uuid.uuid4().hex[:8]
+        users = User.objects.bulk_create(
+            [
+                User(username=f"bench_outbox_{token}_{idx}", email=f"bench_outbox_{token}_{idx}@example.com", role="TEACHER")
+                for idx in range(recipients)
+            ]
+        )
+        try:
+            WhatsAppContact.objects.bulk_create(
+                [WhatsAppContact(user=user, phone_number=f"+57{token}{idx:06d}") for idx, user in enumerate(users)]
+            )
+            notifications = Notification.objects.bulk_create(
+                [Notification(recipient=user, type="BENCHMARK", title="Benchmark") for user in users]
+            )
+            dispatches = NotificationDispatch.objects.bulk_create(
+                [
+                    NotificationDispatch(
+                        notification=notification,
+                        channel=channel,
+                        idempotency_key=f"bench-outbox:{token}:{channel}:{notification.id}",
+                    )
+                    for notification in notifications
+                    for channel in (NotificationDispatch.CHANNEL_EMAIL, NotificationDispatch.CHANNEL_WHATSAPP)
+                ]
+            )
+            ids = [dispatch.id for dispatch in dispatches]
+            self.stdout.write(
+                f"Seeded {len(ids)} dispatches ({recipients} recipients x 2 channels), "
+                f"stub provider latency={latency_s * 1000:.0f}ms"
+            )
+
+            modes = [("serial", False)]
+            if _concurrent_drain_supported():
+                modes.append(("concurrent", True))
+            else:
+                self.stdout.write("concurrent: skipped (database without SKIP LOCKED support)")
+
+            stub = _stub_provider(latency_s)
+            with (
+                override_settings(NOTIFICATIONS_EMAIL_ENABLED=True, KAMPUS_WHATSAPP_ENABLED=True),
+                patch("notifications.dispatch.send_templated_email", side_effect=stub),
+                patch("notifications.dispatch.send_whatsapp_notification", side_effect=stub),
+            ):
+                for label, concurrent in modes:
+                    NotificationDispatch.objects.filter(id__in=ids).update(
+                        status=NotificationDispatch.STATUS_PENDING,
+                        attempts=0,
+                        claimed_until=None,
+                        processed_at=None,
+                    )
+                    t0 = time.perf_counter()
+                    processed = 0
+                    while True:
+                        claimed = claim_dispatches(batch_size=batch_size, ids=ids)
+                        if not claimed:
+                            break
+                        processed += len(drain_dispatches(claimed, concurrent=concurrent))
+                    elapsed = time.perf_counter() - t0
+                    self.stdout.write(
+                        f"{label + ':':<12} {elapsed:8.3f}s  processed={processed}  "
+                        f"throughput={processed / elapsed if elapsed else 0:.1f}/s"
+                    )
+        finally:
+            User.objects.filter(id__in=[user.id for user in users]).delete()
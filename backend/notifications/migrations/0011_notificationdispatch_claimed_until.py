@@ -0,0 +1,22 @@
+# Generated by Django 5.2.12 on 2026-10-16 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0010_operationalplanactivity_completed_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationdispatch',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='notificationdispatch',
+            index=models.Index(fields=['status', 'claimed_until'], name='notificatio_status_f83be6_idx'),
+        ),
+    ]
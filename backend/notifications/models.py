@@ -86,6 +86,8 @@ class NotificationDispatch(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
     attempts = models.PositiveIntegerField(default=0)
     next_retry_at = models.DateTimeField(blank=True, null=True)
+    # Lease of the outbox worker that claimed the row; expired leases are reaped.
+    claimed_until = models.DateTimeField(blank=True, null=True)
     payload = models.JSONField(default=dict, blank=True)
     error_message = models.TextField(blank=True, default="")
     processed_at = models.DateTimeField(blank=True, null=True)
@@ -104,6 +106,7 @@ class NotificationDispatch(models.Model):
         indexes = [
             models.Index(fields=["status", "next_retry_at", "created_at"]),
             models.Index(fields=["notification", "channel", "created_at"]),
+            models.Index(fields=["status", "claimed_until"]),
         ]
 
     def __str__(self) -> str:
@@ -343,6 +343,50 @@ def create_notification(
     return notification
 
 
+def _bulk_dispatch_rows(
+    *,
+    notifications: list[Notification],
+    email_channel_enabled: bool,
+    whatsapp_channel_enabled: bool,
+) -> list[NotificationDispatch]:
+    rows: list[NotificationDispatch] = []
+    for notification in notifications:
+        recipient = notification.recipient
+        recipient_email = (getattr(recipient, "email", "") or "").strip()
+        if email_channel_enabled and recipient_email:
+            rows.append(
+                NotificationDispatch(
+                    notification=notification,
+                    channel=NotificationDispatch.CHANNEL_EMAIL,
+                    idempotency_key=_notification_email_idempotency_key(
+                        recipient=recipient,
+                        dedupe_key=notification.dedupe_key,
+                        notification_id=notification.id,
+                    ),
+                    status=NotificationDispatch.STATUS_PENDING,
+                    payload={
+                        "recipient_email": recipient_email,
+                        "notification_type": notification.type,
+                    },
+                )
+            )
+        if whatsapp_channel_enabled:
+            rows.append(
+                NotificationDispatch(
+                    notification=notification,
+                    channel=NotificationDispatch.CHANNEL_WHATSAPP,
+                    idempotency_key=_notification_whatsapp_idempotency_key(
+                        recipient=recipient,
+                        dedupe_key=notification.dedupe_key,
+                        notification_id=notification.id,
+                    ),
+                    status=NotificationDispatch.STATUS_PENDING,
+                    payload={"notification_type": notification.type},
+                )
+            )
+    return rows
+
+
 def notify_users(
     *,
     recipients: Iterable[User],
@@ -353,6 +397,14 @@ def notify_users(
     dedupe_key: str = "",
     dedupe_within_seconds: Optional[int] = None,
 ) -> int:
+    """Set-based fan-out of `create_notification` to many recipients.
+
+    The notification type is resolved once and Notifications / NotificationDispatch
+    rows are bulk-created in chunks of `KAMPUS_NOTIFICATIONS_BULK_CHUNK_SIZE`, with the
+    same idempotency keys and dedupe window as `create_notification`. Instead of one
+    WhatsApp task per recipient, a single outbox wake-up is enqueued per chunk.
+    """
+
     recipients_list = list(recipients)
     if not recipients_list:
         return 0
@@ -366,22 +418,104 @@ def notify_users(
                 created_at__gte=since,
             ).values_list("recipient_id", flat=True)
         )
-        recipients_list = [u for u in recipients_list if u.id not in existing_ids]
+        # A recipient listed twice is notified once inside the dedupe window.
+        unique_recipients: list[User] = []
+        for user in recipients_list:
+            if user.id in existing_ids:
+                continue
+            existing_ids.add(user.id)
+            unique_recipients.append(user)
+        recipients_list = unique_recipients
         if not recipients_list:
             return 0
 
+    outbox_only = bool(getattr(settings, "KAMPUS_NOTIFICATIONS_OUTBOX_ONLY", False))
+    notification_type_cfg = _upsert_notification_type(type)
+
+    email_channel_enabled = bool(getattr(settings, "NOTIFICATIONS_EMAIL_ENABLED", True))
+    whatsapp_channel_enabled = bool(getattr(settings, "KAMPUS_WHATSAPP_ENABLED", False))
+    if notification_type_cfg is not None:
+        email_channel_enabled = email_channel_enabled and bool(notification_type_cfg.email_enabled)
+        whatsapp_channel_enabled = whatsapp_channel_enabled and bool(notification_type_cfg.whatsapp_enabled)
+
+    chunk_size = max(1, int(getattr(settings, "KAMPUS_NOTIFICATIONS_BULK_CHUNK_SIZE", 500)))
     created_count = 0
-    for recipient in recipients_list:
-        create_notification(
-            recipient=recipient,
-            title=title,
-            body=body,
-            url=url,
-            type=type,
-            dedupe_key=dedupe_key,
-            dedupe_within_seconds=dedupe_within_seconds,
-        )
-        created_count += 1
+    for start in range(0, len(recipients_list), chunk_size):
+        chunk = recipients_list[start : start + chunk_size]
+        with transaction.atomic():
+            notifications = Notification.objects.bulk_create(
+                [
+                    Notification(
+                        recipient=recipient,
+                        type=type,
+                        title=title,
+                        body=body,
+                        url=url,
+                        dedupe_key=dedupe_key,
+                    )
+                    for recipient in chunk
+                ]
+            )
+            # Outbox should be idempotent: rows clashing with an existing key are skipped.
+            NotificationDispatch.objects.bulk_create(
+                _bulk_dispatch_rows(
+                    notifications=notifications,
+                    email_channel_enabled=email_channel_enabled,
+                    whatsapp_channel_enabled=whatsapp_channel_enabled,
+                ),
+                ignore_conflicts=True,
+            )
+
+            whatsapp_dispatch_ids: list[int] = []
+            if whatsapp_channel_enabled and not outbox_only:
+                whatsapp_dispatch_ids = list(
+                    NotificationDispatch.objects.filter(
+                        notification__in=notifications,
+                        channel=NotificationDispatch.CHANNEL_WHATSAPP,
+                        status=NotificationDispatch.STATUS_PENDING,
+                    ).values_list("id", flat=True)
+                )
+                if whatsapp_dispatch_ids:
+                    from .tasks import process_dispatch_batch_task
+
+                    transaction.on_commit(
+                        lambda ids=whatsapp_dispatch_ids: process_dispatch_batch_task.delay(dispatch_ids=ids)
+                    )
+
+        for notification in notifications:
+            emit_notification_event(
+                logger,
+                event="notification.created",
+                notification_id=notification.id,
+                dedupe_key=notification.dedupe_key,
+                idempotency_key="",
+                channel="in_app",
+                institution_id="",
+            )
+            if not outbox_only:
+                _send_notification_email(recipient=notification.recipient, notification=notification)
+            else:
+                emit_notification_event(
+                    logger,
+                    event="notification.email.dispatch.deferred.outbox_only",
+                    notification_id=notification.id,
+                    dedupe_key=notification.dedupe_key,
+                    idempotency_key="",
+                    channel="email",
+                    institution_id="",
+                )
+        if whatsapp_dispatch_ids:
+            emit_notification_event(
+                logger,
+                event="notification.whatsapp.batch_enqueued",
+                notification_id="",
+                dedupe_key=dedupe_key,
+                idempotency_key="",
+                channel="whatsapp",
+                institution_id="",
+                dispatches=len(whatsapp_dispatch_ids),
+            )
+        created_count += len(notifications)
     return created_count
 
 
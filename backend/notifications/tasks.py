@@ -4,6 +4,7 @@ import logging
 from io import StringIO
 
 from celery import shared_task
+from django.conf import settings
 from django.core.cache import cache
 from django.core.management import call_command
 
@@ -154,11 +155,8 @@ def process_dispatch_outbox_task(
     max_retries: int = 5,
     periodic_run_id: int | None = None,
 ) -> None:
-    lock_key = "periodic-job-lock:process-notification-dispatch-outbox"
-    if not cache.add(lock_key, "1", timeout=3600):
-        logger.info("Skipping process_dispatch_outbox task because lock is active")
-        return
-
+    # No global lock: rows are claimed with SKIP LOCKED leases, so several workers
+    # can drain the outbox at the same time.
     run = PeriodicJobRun.objects.filter(id=periodic_run_id).first() if periodic_run_id else None
     buffer = StringIO()
 
@@ -183,8 +181,22 @@ def process_dispatch_outbox_task(
             )
         logger.exception("Failed executing scheduled task process_dispatch_outbox")
         raise
-    finally:
-        cache.delete(lock_key)
+
+
+@shared_task(name="notifications.process_dispatch_batch")
+def process_dispatch_batch_task(dispatch_ids: list[int], max_retries: int | None = None) -> int:
+    """Outbox wake-up for the dispatches created by one `notify_users` chunk."""
+    from notifications.dispatch import claim_dispatches, drain_dispatches
+
+    if max_retries is None:
+        max_retries = int(getattr(settings, "KAMPUS_NOTIFICATIONS_DISPATCH_OUTBOX_MAX_RETRIES", 5))
+
+    ids = list(dispatch_ids or [])
+    if not ids:
+        return 0
+    # Rows the periodic outbox already claimed are skipped.
+    claimed = claim_dispatches(batch_size=len(ids), ids=ids)
+    return len(drain_dispatches(claimed, max_retries=max(1, int(max_retries))))
 
 
 @shared_task(name="notifications.check_dispatch_outbox_health")
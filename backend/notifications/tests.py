@@ -1,6 +1,7 @@
 import json
 from datetime import date, timedelta
 from io import StringIO
+from types import SimpleNamespace
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
@@ -883,3 +884,282 @@ class OperationalPlanReminderCommandTests(TestCase):
 
         notifications = Notification.objects.filter(type="OPERATIONAL_PLAN_REMINDER", recipient=self.teacher)
         self.assertEqual(notifications.count(), 1)
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    NOTIFICATIONS_EMAIL_ENABLED=True,
+    KAMPUS_WHATSAPP_ENABLED=True,
+    KAMPUS_NOTIFICATIONS_OUTBOX_ONLY=True,
+    KAMPUS_NOTIFICATIONS_BULK_CHUNK_SIZE=10,
+)
+class NotifyUsersBulkTests(TestCase):
+    def _users(self, prefix, count):
+        return [
+            User.objects.create_user(
+                username=f"{prefix}_{idx}",
+                email=f"{prefix}_{idx}@example.com",
+                password="pass1234",
+                role=User.ROLE_TEACHER,
+            )
+            for idx in range(count)
+        ]
+
+    def test_fan_out_queries_grow_per_chunk_not_per_recipient(self):
+        small = self._users("bulk_small", 10)
+        large = self._users("bulk_large", 30)
+        NotificationType.objects.create(code="BULK_REMINDER")
+
+        def _notify(users, key):
+            return notify_users(
+                recipients=users,
+                title="Recordatorio",
+                type="BULK_REMINDER",
+                dedupe_key=key,
+                dedupe_within_seconds=3600,
+            )
+
+        # Dedupe and type lookups once, then savepoint + two inserts + release per chunk.
+        with self.assertNumQueries(2 + 4):
+            self.assertEqual(_notify(small, "bulk:small"), 10)
+        with self.assertNumQueries(2 + 3 * 4):
+            self.assertEqual(_notify(large, "bulk:large"), 30)
+
+        self.assertEqual(Notification.objects.count(), 40)
+        self.assertEqual(NotificationDispatch.objects.count(), 80)
+
+    def test_bulk_rows_keep_create_notification_idempotency_keys(self):
+        user = self._users("bulk_keys", 1)[0]
+
+        created = notify_users(recipients=[user, user], title="Aviso", type="system", dedupe_key="bulk:keys")
+
+        # Without a dedupe window both notifications exist, but the outbox keeps one row per channel.
+        self.assertEqual(created, 2)
+        reference = NotificationDispatch.objects.order_by("channel").values_list("channel", "idempotency_key")
+        self.assertEqual(len(reference), 2)
+        NotificationDispatch.objects.all().delete()
+        Notification.objects.all().delete()
+        create_notification(recipient=user, title="Aviso", type="system", dedupe_key="bulk:keys")
+        self.assertEqual(
+            list(reference),
+            list(NotificationDispatch.objects.order_by("channel").values_list("channel", "idempotency_key")),
+        )
+
+        self.assertEqual(
+            notify_users(
+                recipients=[user, user],
+                title="Aviso",
+                dedupe_key="bulk:keys",
+                dedupe_within_seconds=3600,
+            ),
+            0,
+        )
+
+    @override_settings(KAMPUS_NOTIFICATIONS_OUTBOX_ONLY=False, NOTIFICATIONS_EMAIL_ENABLED=False)
+    def test_whatsapp_fan_out_enqueues_one_wake_up_per_chunk(self):
+        users = self._users("bulk_wa", 15)
+
+        with (
+            patch("notifications.tasks.process_dispatch_batch_task.delay") as wake_up,
+            patch("notifications.tasks.send_notification_whatsapp_task.delay") as per_recipient,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            notify_users(recipients=users, title="Aviso WA", type="NOVELTY_SLA_ADMIN", dedupe_key="bulk:wa")
+
+        per_recipient.assert_not_called()
+        self.assertEqual(wake_up.call_count, 2)
+        enqueued = [id_ for call in wake_up.call_args_list for id_ in call.kwargs["dispatch_ids"]]
+        self.assertCountEqual(
+            enqueued,
+            NotificationDispatch.objects.filter(channel=NotificationDispatch.CHANNEL_WHATSAPP).values_list("id", flat=True),
+        )
+
+
+@override_settings(
+    NOTIFICATIONS_EMAIL_ENABLED=True,
+    KAMPUS_NOTIFICATIONS_DISPATCH_LEASE_SECONDS=60,
+    KAMPUS_NOTIFICATIONS_DISPATCH_EMAIL_CONCURRENCY=2,
+)
+class NotificationDispatchClaimTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="notif_claim_user",
+            email="notif_claim@example.com",
+            password="pass1234",
+            role=User.ROLE_TEACHER,
+        )
+        self.dispatches = []
+        for idx in range(4):
+            notification = Notification.objects.create(recipient=self.user, title=f"Claim {idx}")
+            self.dispatches.append(
+                NotificationDispatch.objects.create(
+                    notification=notification,
+                    channel=NotificationDispatch.CHANNEL_EMAIL,
+                    idempotency_key=f"claim:{idx}",
+                )
+            )
+
+    def test_claims_do_not_overlap_and_carry_a_lease(self):
+        from .dispatch import claim_dispatches
+
+        first = claim_dispatches(batch_size=3)
+        second = claim_dispatches(batch_size=3)
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual([d.id for d in second], [self.dispatches[3].id])
+        self.assertEqual(claim_dispatches(batch_size=3), [])
+        for dispatch in first + second:
+            self.assertEqual(dispatch.status, NotificationDispatch.STATUS_IN_PROGRESS)
+            self.assertGreater(dispatch.claimed_until, timezone.now())
+
+    def test_claim_skips_rows_taken_between_select_and_update(self):
+        from .dispatch import claim_dispatches
+
+        taken = self.dispatches[0]
+        # Another drainer claimed the row after this one read the candidate ids.
+        NotificationDispatch.objects.filter(id=taken.id).update(
+            status=NotificationDispatch.STATUS_IN_PROGRESS,
+            claimed_until=timezone.now() + timedelta(seconds=60),
+        )
+        candidate_ids = [d.id for d in self.dispatches[:2]]
+        with (
+            patch("notifications.dispatch._due_dispatch_ids", return_value=candidate_ids),
+            patch("notifications.dispatch.connection.features.has_select_for_update_skip_locked", False),
+        ):
+            claimed = claim_dispatches(batch_size=2)
+
+        self.assertEqual([d.id for d in claimed], [self.dispatches[1].id])
+
+    def test_process_skips_dispatch_whose_lease_was_lost(self):
+        from .dispatch import claim_dispatches, process_dispatch, reap_expired_claims
+
+        dispatch = claim_dispatches(batch_size=1)[0]
+        NotificationDispatch.objects.filter(id=dispatch.id).update(claimed_until=timezone.now() - timedelta(seconds=1))
+        reap_expired_claims()
+
+        with (
+            override_settings(NOTIFICATIONS_EMAIL_ENABLED=True),
+            patch("notifications.dispatch.send_templated_email") as send,
+        ):
+            result = process_dispatch(dispatch)
+
+        send.assert_not_called()
+        self.assertEqual(result.status, NotificationDispatch.STATUS_FAILED)
+
+    def test_process_renews_lease_before_sending(self):
+        from .dispatch import claim_dispatches, process_dispatch
+
+        dispatch = claim_dispatches(batch_size=1)[0]
+        NotificationDispatch.objects.filter(id=dispatch.id).update(claimed_until=timezone.now() + timedelta(seconds=1))
+        leases = []
+
+        def _send(**kwargs):
+            leases.append(NotificationDispatch.objects.get(id=dispatch.id).claimed_until)
+            return SimpleNamespace(delivery=SimpleNamespace(status="SENT", id=None, provider_message_id=""))
+
+        with (
+            override_settings(NOTIFICATIONS_EMAIL_ENABLED=True, KAMPUS_NOTIFICATIONS_DISPATCH_LEASE_SECONDS=300),
+            patch("notifications.dispatch.send_templated_email", side_effect=_send),
+        ):
+            result = process_dispatch(dispatch)
+
+        self.assertEqual(result.status, NotificationDispatch.STATUS_SUCCEEDED)
+        self.assertGreater(leases[0], timezone.now() + timedelta(seconds=200))
+
+    def test_reaper_releases_expired_leases(self):
+        from .dispatch import reap_expired_claims
+
+        expired = timezone.now() - timedelta(seconds=1)
+        NotificationDispatch.objects.filter(id=self.dispatches[0].id).update(
+            status=NotificationDispatch.STATUS_IN_PROGRESS, claimed_until=expired, attempts=1
+        )
+        NotificationDispatch.objects.filter(id=self.dispatches[1].id).update(
+            status=NotificationDispatch.STATUS_IN_PROGRESS, claimed_until=expired, attempts=3
+        )
+        NotificationDispatch.objects.filter(id=self.dispatches[2].id).update(
+            status=NotificationDispatch.STATUS_IN_PROGRESS, claimed_until=timezone.now() + timedelta(seconds=60)
+        )
+
+        self.assertEqual(reap_expired_claims(max_retries=3), 2)
+
+        statuses = dict(NotificationDispatch.objects.values_list("id", "status"))
+        self.assertEqual(statuses[self.dispatches[0].id], NotificationDispatch.STATUS_FAILED)
+        self.assertEqual(statuses[self.dispatches[1].id], NotificationDispatch.STATUS_DEAD_LETTER)
+        self.assertEqual(statuses[self.dispatches[2].id], NotificationDispatch.STATUS_IN_PROGRESS)
+
+        out = StringIO()
+        with patch("notifications.dispatch.send_templated_email") as send:
+            send.return_value.delivery.status = "SENT"
+            send.return_value.delivery.id = None
+            call_command("process_notification_dispatches", stdout=out)
+        self.assertIn("processed=2 succeeded=2", out.getvalue())
+        self.assertIsNone(NotificationDispatch.objects.get(id=self.dispatches[0].id).claimed_until)
+
+    def test_concurrent_drain_overlaps_provider_calls_within_channel_bound(self):
+        import threading
+        import time
+
+        from .dispatch import drain_dispatches
+
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def _slow_process(dispatch, *, max_retries, institutions=None):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+            dispatch.status = NotificationDispatch.STATUS_SUCCEEDED
+            return dispatch
+
+        with patch("notifications.dispatch.process_dispatch", side_effect=_slow_process):
+            results = drain_dispatches(self.dispatches, concurrent=True)
+
+        self.assertEqual([d.id for d in results], [d.id for d in self.dispatches])
+        self.assertEqual(state["peak"], 2)
+
+    def test_benchmark_command_reports_throughput(self):
+        out = StringIO()
+        call_command("benchmark_notification_outbox", recipients=3, latency_ms=0, stdout=out)
+
+        self.assertIn("Seeded 6 dispatches", out.getvalue())
+        self.assertIn("processed=6", out.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith="bench_outbox_").exists())
+
+
+@override_settings(KAMPUS_WHATSAPP_ENABLED=True)
+class NotificationDispatchInstitutionBatchTests(TestCase):
+    def test_drain_resolves_institutions_once_per_batch(self):
+        from communications.institution_resolver import resolve_institutions_for_users
+        from communications.models import WhatsAppContact
+
+        from .dispatch import claim_dispatches, drain_dispatches
+
+        for idx in range(3):
+            user = User.objects.create_user(username=f"notif_inst_{idx}", password="pass1234", role=User.ROLE_TEACHER)
+            WhatsAppContact.objects.create(user=user, phone_number=f"+57300000000{idx}")
+            notification = Notification.objects.create(recipient=user, title="Aviso")
+            NotificationDispatch.objects.create(
+                notification=notification,
+                channel=NotificationDispatch.CHANNEL_WHATSAPP,
+                idempotency_key=f"inst:{idx}",
+            )
+
+        with (
+            patch(
+                "notifications.dispatch.resolve_institutions_for_users", wraps=resolve_institutions_for_users
+            ) as resolve_many,
+            patch("notifications.dispatch.resolve_institution_for_user") as resolve_one,
+            patch("notifications.dispatch.send_whatsapp_notification") as send,
+        ):
+            send.return_value.delivery.status = "SENT"
+            send.return_value.delivery.id = None
+            send.return_value.delivery.provider_message_id = ""
+            results = drain_dispatches(claim_dispatches(batch_size=10))
+
+        self.assertEqual(resolve_many.call_count, 1)
+        resolve_one.assert_not_called()
+        self.assertEqual(send.call_count, 3)
+        self.assertTrue(all(d.status == NotificationDispatch.STATUS_SUCCEEDED for d in results))
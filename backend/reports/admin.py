@@ -1,12 +1,40 @@
 from django.contrib import admin
+from django.db.models import Count, Q
 
 from .models import ReportJob
 
 
 @admin.register(ReportJob)
 class ReportJobAdmin(admin.ModelAdmin):
-	list_display = ("id", "report_type", "status", "created_by", "created_at", "started_at", "finished_at")
-	list_filter = ("report_type", "status", "created_at")
-	search_fields = ("id", "created_by__username", "created_by__email")
+	list_display = (
+		"id",
+		"report_type",
+		"status",
+		"created_by",
+		"created_at",
+		"started_at",
+		"finished_at",
+		"reused_from",
+	)
+	list_filter = ("report_type", "status", "created_at", ("reused_from", admin.EmptyFieldListFilter))
+	search_fields = ("id", "created_by__username", "created_by__email", "input_fingerprint")
+	raw_id_fields = ("created_by", "parent", "reused_from")
 
-# Register your models here.
+	def changelist_view(self, request, extra_context=None):
+		response = super().changelist_view(request, extra_context=extra_context)
+		try:
+			queryset = response.context_data["cl"].queryset
+		except (AttributeError, KeyError):
+			return response
+
+		counts = queryset.filter(status=ReportJob.Status.SUCCEEDED, input_fingerprint__isnull=False).aggregate(
+			eligible=Count("id"),
+			reused=Count("id", filter=Q(reused_from__isnull=False)),
+		)
+		if counts["eligible"]:
+			self.message_user(
+				request,
+				f"Reutilización de resultados: {counts['reused']}/{counts['eligible']} "
+				f"({counts['reused'] / counts['eligible']:.0%}) en los trabajos filtrados.",
+			)
+		return response
@@ -0,0 +1,198 @@
+"""Content-addressed cache for images and QR codes embedded in report HTML.
+
+Reports embed logos, photos and QR codes as base64 data URIs. Building them means
+reading files, resizing with Pillow or drawing QR codes for every job, even though
+the inputs rarely change. Here every data URI is keyed by what it is derived from
+(the SHA-256 of the source file or the QR text, plus size/quality parameters):
+
+- a bounded in-process LRU serves repeated assets inside one job or worker;
+- the Django cache (Redis in production) shares them between workers, with its own
+  eviction policy and `REPORT_ASSET_CACHE_TIMEOUT_SECONDS` as TTL.
+
+Failures are never cached: builders return "" and the caller decides what to show.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import logging
+import mimetypes
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "report-asset:v1:"
+
+_local_assets: OrderedDict[str, str] = OrderedDict()
+_local_assets_bytes = 0
+_file_digests: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+_lock = threading.Lock()
+
+_FILE_DIGEST_CACHE_SIZE = 4096
+
+
+def _setting(name: str, default: int) -> int:
+    return int(getattr(settings, name, default))
+
+
+def _local_get(key: str) -> str | None:
+    with _lock:
+        value = _local_assets.get(key)
+        if value is not None:
+            _local_assets.move_to_end(key)
+        return value
+
+
+def _local_set(key: str, value: str) -> None:
+    global _local_assets_bytes
+
+    max_bytes = _setting("REPORT_ASSET_CACHE_LOCAL_MAX_BYTES", 32 * 1024 * 1024)
+    if len(value) > max_bytes:
+        return
+    with _lock:
+        previous = _local_assets.pop(key, None)
+        if previous is not None:
+            _local_assets_bytes -= len(previous)
+        _local_assets[key] = value
+        _local_assets_bytes += len(value)
+        while _local_assets_bytes > max_bytes and _local_assets:
+            _, evicted = _local_assets.popitem(last=False)
+            _local_assets_bytes -= len(evicted)
+
+
+def clear_local_asset_cache() -> None:
+    global _local_assets_bytes
+
+    with _lock:
+        _local_assets.clear()
+        _file_digests.clear()
+        _local_assets_bytes = 0
+
+
+def cached_data_uri(key_parts: tuple, build: Callable[[], str]) -> str:
+    """Return the data URI for `key_parts`, building and storing it on a miss."""
+
+    key = CACHE_KEY_PREFIX + hashlib.sha256(repr(key_parts).encode("utf-8")).hexdigest()
+
+    value = _local_get(key)
+    if value is not None:
+        return value
+
+    try:
+        value = cache.get(key)
+    except Exception:  # noqa: BLE001
+        # A cache outage must never break report generation.
+        logger.warning("report_asset_cache.get_failed", exc_info=True)
+        value = None
+
+    if value is None:
+        value = build()
+        if not value:
+            return value
+        if len(value) <= _setting("REPORT_ASSET_CACHE_MAX_ENTRY_BYTES", 2 * 1024 * 1024):
+            try:
+                cache.set(key, value, timeout=_setting("REPORT_ASSET_CACHE_TIMEOUT_SECONDS", 7 * 24 * 3600))
+            except Exception:  # noqa: BLE001
+                logger.warning("report_asset_cache.set_failed", exc_info=True)
+
+    _local_set(key, value)
+    return value
+
+
+def file_digest(path: str | Path) -> str:
+    """SHA-256 of a file's bytes, memoized per (path, mtime, size)."""
+
+    path = Path(path)
+    stat = path.stat()
+    stat_key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        digest = _file_digests.get(stat_key)
+        if digest is not None:
+            _file_digests.move_to_end(stat_key)
+            return digest
+
+    hasher = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            hasher.update(block)
+    digest = hasher.hexdigest()
+
+    with _lock:
+        _file_digests[stat_key] = digest
+        while len(_file_digests) > _FILE_DIGEST_CACHE_SIZE:
+            _file_digests.popitem(last=False)
+    return digest
+
+
+def image_file_data_uri(path: str | Path, *, name: str = "") -> str:
+    """Embed an image file as-is. Returns "" when the file cannot be read."""
+
+    try:
+        digest = file_digest(path)
+    except OSError:
+        return ""
+    mime = mimetypes.guess_type(name or str(path))[0] or "image/jpeg"
+
+    def _build() -> str:
+        try:
+            with open(path, "rb") as fh:
+                data = base64.b64encode(fh.read()).decode("ascii")
+        except OSError:
+            return ""
+        return f"data:{mime};base64,{data}"
+
+    return cached_data_uri(("file", digest, mime), _build)
+
+
+def thumbnail_data_uri(path: str | Path, *, max_w: int, max_h: int, quality: int) -> str:
+    """Embed a JPEG thumbnail (Pillow resize + re-encode) of an image file."""
+
+    try:
+        digest = file_digest(path)
+    except OSError:
+        return ""
+
+    def _build() -> str:
+        try:
+            from PIL import Image  # noqa: PLC0415
+
+            with Image.open(path) as img:
+                img = img.convert("RGB")
+                img.thumbnail((max_w, max_h), Image.LANCZOS)
+                buf = BytesIO()
+                img.save(buf, format="JPEG", quality=quality, optimize=True)
+        except Exception:  # noqa: BLE001
+            return ""
+        return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+    return cached_data_uri(("thumbnail", digest, max_w, max_h, quality), _build)
+
+
+def qr_png_data_uri(text: str, *, box_size: int = 10, border: int = 4) -> str:
+    """Embed a QR code PNG. The defaults match `qrcode.make()`."""
+
+    def _build() -> str:
+        try:
+            import qrcode  # noqa: PLC0415
+            from qrcode.constants import ERROR_CORRECT_M  # noqa: PLC0415
+
+            qr = qrcode.QRCode(error_correction=ERROR_CORRECT_M, box_size=box_size, border=border)
+            qr.add_data(text)
+            qr.make(fit=True)
+            img = qr.make_image(fill_color="black", back_color="white")
+            buf = BytesIO()
+            img.save(buf, format="PNG")
+        except Exception:  # noqa: BLE001
+            return ""
+        return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+    return cached_data_uri(("qr", text, box_size, border), _build)
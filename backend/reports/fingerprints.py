@@ -0,0 +1,169 @@
+"""Input fingerprints for report jobs whose output can be reused.
+
+A fingerprint is a SHA-256 over the job params and a compact summary of every row
+the report reads. Two jobs with the same fingerprint produce the same PDF, so
+`generate_report_job_pdf` can point the second one at the file the first rendered.
+
+Tables with an `updated_at` column (grade sheets, achievement grades, attendance)
+are summarized as `(count, max(updated_at))`: edits move the max, inserts move the
+count and the max, deletes move the count. Tables without it (achievements,
+indicators, enrollments, institution branding, scales...) are hashed row by row;
+they are small for a single group and year.
+
+The printed report date is part of the fingerprint, so outputs are only reused
+within the same local day.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from django.db.models import Count, Max, Q, QuerySet
+from django.utils import timezone
+
+from .models import ReportJob
+
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_VERSION = 1
+
+
+def _watermark(qs: QuerySet) -> list[Any]:
+    summary = qs.aggregate(rows=Count("pk"), latest=Max("updated_at"))
+    return [summary["rows"], summary["latest"]]
+
+
+def _rows_digest(qs: QuerySet, *extra: str) -> str:
+    fields = [field.attname for field in qs.model._meta.concrete_fields]
+    rows = qs.order_by("pk").values_list(*fields, *extra)
+    hasher = hashlib.sha256()
+    for row in rows:
+        hasher.update(json.dumps(row, default=str).encode("utf-8"))
+        hasher.update(b"\n")
+    return hasher.hexdigest()
+
+
+def _group_period_components(*, group_id: int, period_id: int) -> dict[str, Any] | None:
+    from academic.models import (  # noqa: PLC0415
+        AcademicLoad,
+        AcademicYear,
+        Achievement,
+        AchievementGrade,
+        Area,
+        Dimension,
+        EvaluationScale,
+        GradeSheet,
+        Group,
+        PerformanceIndicator,
+        Period,
+        Subject,
+        TeacherAssignment,
+    )
+    from attendance.models import AttendanceRecord  # noqa: PLC0415
+    from core.models import Institution  # noqa: PLC0415
+    from students.models import Enrollment  # noqa: PLC0415
+
+    group = Group.objects.filter(id=group_id).only("id", "grade_id", "academic_year_id").first()
+    period = Period.objects.filter(id=period_id).only("id", "academic_year_id").first()
+    if group is None or period is None:
+        return None
+    year_id = period.academic_year_id
+
+    achievements = Achievement.objects.filter(period__academic_year_id=year_id).filter(
+        Q(group_id=group.id) | Q(group__isnull=True)
+    )
+    loads = AcademicLoad.objects.filter(grade_id=group.grade_id)
+
+    return {
+        "gradesheets": _watermark(
+            GradeSheet.objects.filter(teacher_assignment__group_id=group.id, period__academic_year_id=year_id)
+        ),
+        "achievement_grades": _watermark(
+            AchievementGrade.objects.filter(
+                gradesheet__teacher_assignment__group_id=group.id,
+                gradesheet__period__academic_year_id=year_id,
+            )
+        ),
+        "attendance": _watermark(
+            AttendanceRecord.objects.filter(enrollment__group_id=group.id, enrollment__academic_year_id=year_id)
+        ),
+        "achievements": _rows_digest(achievements),
+        "indicators": _rows_digest(PerformanceIndicator.objects.filter(achievement__in=achievements)),
+        "enrollments": _rows_digest(
+            Enrollment.objects.filter(group_id=group.id, academic_year_id=year_id),
+            "student__document_type",
+            "student__document_number",
+            "student__photo",
+            "student__user__first_name",
+            "student__user__last_name",
+        ),
+        "assignments": _rows_digest(
+            TeacherAssignment.objects.filter(group_id=group.id, academic_year_id=year_id),
+            "teacher__first_name",
+            "teacher__last_name",
+        ),
+        "group": _rows_digest(
+            Group.objects.filter(id=group.id),
+            "grade__name",
+            "director__first_name",
+            "director__last_name",
+        ),
+        "loads": _rows_digest(loads),
+        "subjects": _rows_digest(Subject.objects.filter(academic_loads__in=loads).distinct()),
+        "areas": _rows_digest(Area.objects.filter(subjects__academic_loads__in=loads).distinct()),
+        "year": _rows_digest(AcademicYear.objects.filter(id=year_id)),
+        "periods": _rows_digest(Period.objects.filter(academic_year_id=year_id)),
+        "scales": _rows_digest(EvaluationScale.objects.filter(academic_year_id=year_id)),
+        "dimensions": _rows_digest(Dimension.objects.filter(academic_year_id=year_id)),
+        "institution": _rows_digest(Institution.objects.all()),
+    }
+
+
+def _group_report_components(job: ReportJob) -> dict[str, Any] | None:
+    params = job.params or {}
+    return _group_period_components(group_id=params.get("group_id"), period_id=params.get("period_id"))
+
+
+def _enrollment_report_components(job: ReportJob) -> dict[str, Any] | None:
+    from students.models import Enrollment  # noqa: PLC0415
+
+    params = job.params or {}
+    enrollment = Enrollment.objects.filter(id=params.get("enrollment_id")).only("id", "group_id").first()
+    if enrollment is None or enrollment.group_id is None:
+        return None
+    # The boletín shows the student's rank, which depends on the whole group.
+    return _group_period_components(group_id=enrollment.group_id, period_id=params.get("period_id"))
+
+
+FINGERPRINTED_REPORTS: dict[str, Callable[[ReportJob], dict[str, Any] | None]] = {
+    ReportJob.ReportType.ACADEMIC_PERIOD_ENROLLMENT: _enrollment_report_components,
+    ReportJob.ReportType.ACADEMIC_PERIOD_GROUP: _group_report_components,
+    ReportJob.ReportType.ACADEMIC_PERIOD_SABANA: _group_report_components,
+}
+
+
+def report_input_fingerprint(job: ReportJob) -> str | None:
+    """Return the job's input fingerprint, or None when its output must not be reused."""
+
+    builder = FINGERPRINTED_REPORTS.get(job.report_type)
+    if builder is None:
+        return None
+
+    components = builder(job)
+    if components is None:
+        return None
+
+    payload = {
+        "version": FINGERPRINT_VERSION,
+        "report_type": str(job.report_type),
+        "params": job.params or {},
+        "date": timezone.localdate().isoformat(),
+        "components": components,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
@@ -0,0 +1,172 @@
+"""Priority lanes for report jobs.
+
+Every `ReportJob.ReportType` belongs to one of two lanes:
+
+- interactive: single-student or single-case documents someone is waiting for at a
+  desk (certificates, constancias, actas, observador...);
+- bulk: group- or school-wide documents (boletines, sábanas, carnés, lotes...).
+
+Each lane has its own Celery queue, time limits and per-user concurrency, so a
+school-wide carnet job never sits in front of a certificate. Tasks built on
+`ReportLaneTask` pick their lane from the job they receive, which keeps the
+existing `generate_report_job_pdf.delay(job.id)` call sites unchanged.
+
+Per-user fair scheduling: when a user already has `max_running_per_user` jobs
+running in a lane, the task puts itself back on the queue for a few seconds, letting
+other users' jobs go first. Jobs stuck in RUNNING longer than the lane's hard time
+limit are not counted, so a crashed worker cannot block a user forever.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from celery import Task
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ReportJob
+
+
+logger = logging.getLogger(__name__)
+
+LANE_INTERACTIVE = "interactive"
+LANE_BULK = "bulk"
+LANES = (LANE_INTERACTIVE, LANE_BULK)
+
+INTERACTIVE_REPORT_TYPES = frozenset(
+    {
+        ReportJob.ReportType.DUMMY,
+        ReportJob.ReportType.ACADEMIC_PERIOD_ENROLLMENT,
+        ReportJob.ReportType.DISCIPLINE_CASE_ACTA,
+        ReportJob.ReportType.ATTENDANCE_MANUAL_SHEET,
+        ReportJob.ReportType.GRADE_REPORT_SHEET,
+        ReportJob.ReportType.CERTIFICATE_STUDIES,
+        ReportJob.ReportType.STUDY_CERTIFICATION,
+        ReportJob.ReportType.OBSERVER_REPORT,
+        ReportJob.ReportType.ACADEMIC_COMMISSION_ACTA,
+        ReportJob.ReportType.CLASS_PLAN,
+    }
+)
+
+
+@dataclass(frozen=True)
+class LaneConfig:
+    queue: str
+    soft_time_limit: int
+    time_limit: int
+    max_running_per_user: int
+
+
+def report_lane(report_type: str) -> str:
+    """Lane of a report type. Unknown types go to the bulk lane."""
+
+    return LANE_INTERACTIVE if report_type in INTERACTIVE_REPORT_TYPES else LANE_BULK
+
+
+def lane_report_types(lane: str) -> list[str]:
+    return [value for value in ReportJob.ReportType.values if report_lane(value) == lane]
+
+
+def lane_config(lane: str) -> LaneConfig:
+    prefix = "REPORT_INTERACTIVE" if lane == LANE_INTERACTIVE else "REPORT_BULK"
+    default_queue = "reports_interactive" if lane == LANE_INTERACTIVE else "reports_bulk"
+    return LaneConfig(
+        queue=str(getattr(settings, f"{prefix}_QUEUE", default_queue)),
+        soft_time_limit=int(getattr(settings, f"{prefix}_SOFT_TIME_LIMIT", settings.CELERY_TASK_SOFT_TIME_LIMIT)),
+        time_limit=int(getattr(settings, f"{prefix}_TIME_LIMIT", settings.CELERY_TASK_TIME_LIMIT)),
+        max_running_per_user=int(getattr(settings, f"{prefix}_MAX_RUNNING_PER_USER", 0)),
+    )
+
+
+def report_job_lane(job_id: int | None) -> str:
+    row = ReportJob.objects.filter(id=job_id).values("report_type", "parent_id").first() if job_id else None
+    if row is None or row["parent_id"]:
+        # Children of a batch run inside the batch's bulk lane.
+        return LANE_BULK
+    return report_lane(row["report_type"])
+
+
+def lane_task_options(lane: str) -> dict:
+    config = lane_config(lane)
+    options = {"soft_time_limit": config.soft_time_limit, "time_limit": config.time_limit}
+    if getattr(settings, "REPORT_LANES_ENABLED", False):
+        options["queue"] = config.queue
+    return options
+
+
+class ReportLaneTask(Task):
+    """Celery task whose first argument is a ReportJob id; sends it to the job's lane."""
+
+    def apply_async(self, args=None, kwargs=None, **options):
+        job_id = args[0] if args else (kwargs or {}).get("job_id")
+        try:
+            lane = report_job_lane(job_id)
+        except Exception:  # noqa: BLE001
+            logger.warning("report_job.lane_lookup_failed", extra={"job_id": job_id}, exc_info=True)
+            lane = LANE_BULK
+        for key, value in lane_task_options(lane).items():
+            options.setdefault(key, value)
+        return super().apply_async(args, kwargs, **options)
+
+
+def fair_share_delay(job: ReportJob) -> int | None:
+    """Seconds to wait before running `job`, or None when it may run now."""
+
+    if job.parent_id:
+        return None
+    lane = report_lane(job.report_type)
+    config = lane_config(lane)
+    if config.max_running_per_user <= 0:
+        return None
+
+    stale_cutoff = timezone.now() - timedelta(seconds=config.time_limit)
+    running = (
+        ReportJob.objects.filter(
+            created_by_id=job.created_by_id,
+            status=ReportJob.Status.RUNNING,
+            parent__isnull=True,
+            report_type__in=lane_report_types(lane),
+            started_at__gte=stale_cutoff,
+        )
+        .exclude(id=job.id)
+        .count()
+    )
+    if running < config.max_running_per_user:
+        return None
+    return int(getattr(settings, "REPORT_FAIR_SHARE_DEFER_SECONDS", 15))
+
+
+def lane_stats(*, now: datetime, window_start: datetime) -> dict[str, dict]:
+    """Queue depth and wait time (created → started) per lane, for the operations overview."""
+
+    stats = {
+        lane: {"queue": lane_config(lane).queue, "queue_depth": 0, "oldest_pending_seconds": None, "_waits": []}
+        for lane in LANES
+    }
+
+    pending = ReportJob.objects.filter(status=ReportJob.Status.PENDING).values_list(
+        "report_type", "parent_id", "created_at"
+    )
+    for report_type, parent_id, created_at in pending:
+        entry = stats[LANE_BULK if parent_id else report_lane(report_type)]
+        entry["queue_depth"] += 1
+        age = max(0, int((now - created_at).total_seconds()))
+        entry["oldest_pending_seconds"] = max(entry["oldest_pending_seconds"] or 0, age)
+
+    started = ReportJob.objects.filter(started_at__gte=window_start).values_list(
+        "report_type", "parent_id", "created_at", "started_at"
+    )
+    for report_type, parent_id, created_at, started_at in started:
+        entry = stats[LANE_BULK if parent_id else report_lane(report_type)]
+        entry["_waits"].append(max(0.0, (started_at - created_at).total_seconds()))
+
+    for entry in stats.values():
+        waits = sorted(entry.pop("_waits"))
+        entry["started_in_window"] = len(waits)
+        entry["wait_seconds_avg"] = round(sum(waits) / len(waits), 1) if waits else None
+        entry["wait_seconds_p95"] = round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 1) if waits else None
+        entry["wait_seconds_max"] = round(waits[-1], 1) if waits else None
+    return stats
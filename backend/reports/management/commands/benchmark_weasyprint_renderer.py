@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from academic.management.commands.benchmark_promotions import seed_synthetic_school
+from academic.models import Group, Period
+from reports.models import ReportJob
+from reports.tasks import _render_election_census_qr_html, _render_report_html
+from reports.weasyprint_utils import WeasyPrintRenderer
+
+
+def _render(renderer: WeasyPrintRenderer, html: str) -> float:
+    t0 = time.perf_counter()
+    document, options = renderer.document(html=html, base_url=str(settings.BASE_DIR), extra_css="")
+    document.write_pdf(**options)
+    return (time.perf_counter() - t0) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Renders a group boletín and an election carnet sheet repeatedly and compares cold "
+        "renders (a new WeasyPrintRenderer per document) with warm renders (one long-lived "
+        "renderer, as in a Celery worker). Seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=5)
+        parser.add_argument("--students", type=int, default=10)
+        parser.add_argument("--cards", type=int, default=60)
+
+    def handle(self, *args, **options):
+        iterations = max(1, options["iterations"])
+
+        with transaction.atomic():
+            year = seed_synthetic_school(
+                groups=1,
+                students_per_group=options["students"],
+                subjects=12,
+                periods=1,
+                achievements_per_subject=3,
+            )
+            group = Group.objects.filter(academic_year=year).first()
+            period = Period.objects.filter(academic_year=year).first()
+            user = get_user_model().objects.filter(role=get_user_model().ROLE_ADMIN).first() or (
+                get_user_model().objects.order_by("id").first()
+            )
+
+            group_job = ReportJob.objects.create(
+                created_by=user,
+                report_type=ReportJob.ReportType.ACADEMIC_PERIOD_GROUP,
+                params={"group_id": group.id, "period_id": period.id},
+            )
+            census_job = ReportJob(
+                created_by=user,
+                report_type=ReportJob.ReportType.ELECTION_CENSUS_QR,
+                params={
+                    "process_name": "Benchmark",
+                    "year_label": str(year.year),
+                    "rows_data": [
+                        {"manual_code": f"VOTE-{idx:04d}", "full_name": f"Estudiante {idx}"}
+                        for idx in range(options["cards"])
+                    ],
+                },
+            )
+            documents = {
+                "group report": _render_report_html(group_job),
+                "carnet sheet": _render_election_census_qr_html(census_job),
+            }
+            transaction.set_rollback(True)
+
+        for label, html in documents.items():
+            cold = [_render(WeasyPrintRenderer(), html) for _ in range(iterations)]
+
+            renderer = WeasyPrintRenderer()
+            _render(renderer, html)
+            warm = [_render(renderer, html) for _ in range(iterations)]
+
+            self.stdout.write(
+                f"{label:<13} cold median={statistics.median(cold):8.1f}ms  "
+                f"warm median={statistics.median(warm):8.1f}ms  "
+                f"speedup={statistics.median(cold) / max(statistics.median(warm), 1e-6):.2f}x  "
+                f"cache={renderer.stats}"
+            )
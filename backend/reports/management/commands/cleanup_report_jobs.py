@@ -56,9 +56,22 @@ class Command(BaseCommand):
         base_root = Path(settings.PRIVATE_STORAGE_ROOT)
         deleted_jobs = 0
         deleted_files = 0
+        kept_files = 0
+
+        # Jobs with the same params share an output path, and reused results point at
+        # the file another job rendered: keep any file a surviving job still serves.
+        expiring_ids = to_delete.values("id")
+        shared_relpaths = set(
+            ReportJob.objects.filter(output_relpath__isnull=False)
+            .exclude(id__in=expiring_ids)
+            .filter(output_relpath__in=to_delete.exclude(output_relpath__isnull=True).values("output_relpath"))
+            .values_list("output_relpath", flat=True)
+        )
 
         for job in to_delete.iterator():
-            if job.output_relpath:
+            if job.output_relpath and job.output_relpath in shared_relpaths:
+                kept_files += 1
+            elif job.output_relpath:
                 try:
                     abs_path = _safe_join_private(base_root, job.output_relpath)
                 except ValueError:
@@ -81,6 +94,7 @@ class Command(BaseCommand):
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"cleanup_report_jobs: jobs={deleted_jobs} files={deleted_files} dry_run={dry_run}"
+                f"cleanup_report_jobs: jobs={deleted_jobs} files={deleted_files} "
+                f"kept_shared_files={kept_files} dry_run={dry_run}"
             )
         )
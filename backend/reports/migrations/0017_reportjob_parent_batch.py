@@ -0,0 +1,24 @@
+# Generated by Django 5.2.12 on 2026-10-16 20:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0016_alter_reportjob_report_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='reports.reportjob'),
+        ),
+        migrations.AlterField(
+            model_name='reportjob',
+            name='report_type',
+            field=models.CharField(choices=[('DUMMY', 'Dummy (prueba)'), ('ACADEMIC_PERIOD_ENROLLMENT', 'Informe académico (matrícula/periodo)'), ('ACADEMIC_PERIOD_GROUP', 'Informe académico (grupo/periodo)'), ('ACADEMIC_PERIOD_SABANA', 'Sábana de notas (grupo/periodo)'), ('ACADEMIC_PERIOD_BATCH', 'Informes académicos por lote (grado/colegio)'), ('DISCIPLINE_CASE_ACTA', 'Acta de caso disciplinario'), ('ATTENDANCE_MANUAL_SHEET', 'Planilla de asistencia (manual)'), ('ENROLLMENT_LIST', 'Reporte de matriculados'), ('FAMILY_DIRECTORY_BY_GROUP', 'Directorio de padres por grados y grupos'), ('GRADE_REPORT_SHEET', 'Planilla imprimible de notas'), ('TEACHER_STATISTICS_AI', 'Estadísticas IA (docente)'), ('CERTIFICATE_STUDIES', 'Certificado de estudios'), ('STUDY_CERTIFICATION', 'Certificación académica (constancia de estudio)'), ('OBSERVER_REPORT', 'Observador del estudiante'), ('ACADEMIC_COMMISSION_ACTA', 'Acta de compromiso académico'), ('ACADEMIC_COMMISSION_GROUP_ACTA', 'Acta grupal de comisión académica'), ('CLASS_PLAN', 'Plan de clase'), ('ELECTION_CENSUS_QR', 'Carnés QR Gobierno Escolar')], max_length=64),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.12 on 2026-10-16 21:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0017_reportjob_parent_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='input_fingerprint',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='reportjob',
+            name='output_rendered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reportjob',
+            name='reused_from',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reuses', to='reports.reportjob'),
+        ),
+    ]
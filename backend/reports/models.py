@@ -16,6 +16,7 @@ class ReportJob(models.Model):
 		ACADEMIC_PERIOD_ENROLLMENT = "ACADEMIC_PERIOD_ENROLLMENT", "Informe académico (matrícula/periodo)"
 		ACADEMIC_PERIOD_GROUP = "ACADEMIC_PERIOD_GROUP", "Informe académico (grupo/periodo)"
 		ACADEMIC_PERIOD_SABANA = "ACADEMIC_PERIOD_SABANA", "Sábana de notas (grupo/periodo)"
+		ACADEMIC_PERIOD_BATCH = "ACADEMIC_PERIOD_BATCH", "Informes académicos por lote (grado/colegio)"
 		DISCIPLINE_CASE_ACTA = "DISCIPLINE_CASE_ACTA", "Acta de caso disciplinario"
 		ATTENDANCE_MANUAL_SHEET = "ATTENDANCE_MANUAL_SHEET", "Planilla de asistencia (manual)"
 		ENROLLMENT_LIST = "ENROLLMENT_LIST", "Reporte de matriculados"
@@ -35,6 +36,10 @@ class ReportJob(models.Model):
 	)
 	report_type = models.CharField(max_length=64, choices=ReportType.choices)
 	params = models.JSONField(default=dict, blank=True)
+	# Jobs hijos de un lote (ACADEMIC_PERIOD_BATCH): uno por grupo.
+	parent = models.ForeignKey(
+		"self", on_delete=models.CASCADE, null=True, blank=True, related_name="children"
+	)
 
 	status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
 	progress = models.PositiveSmallIntegerField(null=True, blank=True)
@@ -52,6 +57,14 @@ class ReportJob(models.Model):
 	error_code = models.CharField(max_length=64, null=True, blank=True)
 	error_message = models.TextField(null=True, blank=True)
 
+	# Result reuse (see reports.fingerprints): jobs with the same input fingerprint
+	# share the PDF rendered by the first one instead of rendering it again.
+	input_fingerprint = models.CharField(max_length=64, null=True, blank=True, db_index=True)
+	output_rendered_at = models.DateTimeField(null=True, blank=True)
+	reused_from = models.ForeignKey(
+		"self", on_delete=models.SET_NULL, null=True, blank=True, related_name="reuses"
+	)
+
 	def add_event(self, *, event_type: str, message: str = "", level: str = "INFO", meta: dict | None = None) -> None:
 		ReportJobEvent.objects.create(
 			job=self,
@@ -91,6 +104,10 @@ class ReportJob(models.Model):
 		self.save(update_fields=["status", "finished_at", "progress"])
 		self.add_event(event_type="CANCELED")
 
+		# Cancelling a batch reaches every child that has not finished yet.
+		for child in self.children.filter(status__in=[self.Status.PENDING, self.Status.RUNNING]):
+			child.mark_canceled()
+
 	def mark_succeeded(
 		self,
 		*,
@@ -98,9 +115,13 @@ class ReportJob(models.Model):
 		output_filename: str,
 		output_size_bytes: int | None = None,
 		content_type: str = "application/pdf",
+		reused_from: "ReportJob | None" = None,
 	) -> None:
 		self.status = self.Status.SUCCEEDED
 		self.finished_at = timezone.now()
+		self.reused_from = reused_from
+		# A reused output keeps the render time of the job that actually produced the file.
+		self.output_rendered_at = reused_from.output_rendered_at if reused_from is not None else self.finished_at
 		self.progress = 100
 		self.output_relpath = output_relpath
 		self.output_filename = output_filename
@@ -119,9 +140,14 @@ class ReportJob(models.Model):
 				"output_size_bytes",
 				"error_code",
 				"error_message",
+				"reused_from",
+				"output_rendered_at",
 			]
 		)
-		self.add_event(event_type="SUCCEEDED", meta={"output_filename": output_filename, "output_size_bytes": output_size_bytes})
+		meta = {"output_filename": output_filename, "output_size_bytes": output_size_bytes}
+		if reused_from is not None:
+			meta["reused_from"] = reused_from.id
+		self.add_event(event_type="SUCCEEDED", meta=meta)
 
 	def __str__(self) -> str:
 		return f"ReportJob({self.id}) {self.report_type} {self.status}"
@@ -114,6 +114,8 @@ class ReportJobCreateSerializer(serializers.ModelSerializer):
             period_id = params.get("period_id")
             if not group_id or not period_id:
                 raise serializers.ValidationError({"params": "group_id y period_id son requeridos"})
+            if str(params.get("format") or "pdf").lower() not in {"pdf", "xlsx"}:
+                raise serializers.ValidationError({"params": "format debe ser pdf o xlsx"})
 
             from academic.models import Group  # noqa: PLC0415
 
@@ -148,6 +150,34 @@ class ReportJobCreateSerializer(serializers.ModelSerializer):
 
             return attrs
 
+        if report_type == ReportJob.ReportType.ACADEMIC_PERIOD_BATCH:
+            period_id = params.get("period_id")
+            if not period_id:
+                raise serializers.ValidationError({"params": "period_id es requerido"})
+
+            try:
+                period = Period.objects.select_related("academic_year").get(id=period_id)
+            except Period.DoesNotExist:
+                raise serializers.ValidationError({"params": "Periodo no encontrado"})
+
+            grade_id = params.get("grade_id")
+            if grade_id:
+                from academic.models import Grade  # noqa: PLC0415
+
+                if not Grade.objects.filter(id=grade_id).exists():
+                    raise serializers.ValidationError({"params": "Grado no encontrado"})
+
+            output = params.get("output") or "zip"
+            if output not in {"zip", "pdf"}:
+                raise serializers.ValidationError({"params": "output debe ser 'zip' o 'pdf'"})
+
+            is_admin_like = role in {User.ROLE_SUPERADMIN, User.ROLE_ADMIN, User.ROLE_COORDINATOR}
+            if not is_admin_like:
+                raise serializers.ValidationError({"detail": "No tienes permisos para generar este informe."})
+
+            attrs["params"] = {**params, "output": output, "academic_year_id": period.academic_year_id}
+            return attrs
+
         if report_type == ReportJob.ReportType.DISCIPLINE_CASE_ACTA:
             case_id = params.get("case_id")
             if not case_id:
@@ -480,6 +510,7 @@ class ReportJobSerializer(serializers.ModelSerializer):
             "id",
             "report_type",
             "params",
+            "parent",
             "status",
             "progress",
             "created_at",
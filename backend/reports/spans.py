@@ -0,0 +1,205 @@
+"""Per-stage timing for the report pipeline.
+
+`generate_report_job_pdf` runs inside a `SpanRecorder`, one `stage()` block per
+step (fingerprint, html, pdf, write); batches also record each part (part, progress)
+and the final pack (collect, write). While a stage is open it collects:
+
+- ORM queries and their time, through a `connection.execute_wrapper`;
+- Django template renders (`render_to_string` below) and their time;
+- WeasyPrint passes, split into full PDF renders and layout-only measurements
+  (`layout_report_to_two_pages` page counting), reported by `weasyprint_utils`;
+- the current RSS of the process when the stage starts and ends, and the difference.
+
+The job-level `rss_process_peak_kb` is the process high-water mark (`ru_maxrss`): it
+covers every job the worker ran before, so it is reported as is and kept out of
+the per-stage metrics.
+
+The recorder is stored as a `TIMINGS` ReportJobEvent; `timing_percentiles` turns
+those events into p50/p95 per report type for the operations API (batch part events,
+tagged with `batch_part_job_id`, add stages but are not counted as jobs). Recording
+outside a stage is a no-op, so the helpers are safe to call from previews and tests.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from django.db import connection
+from django.template import loader
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+@dataclass
+class StageSpan:
+    name: str
+    wall_s: float = 0.0
+    queries: int = 0
+    query_s: float = 0.0
+    templates: int = 0
+    template_s: float = 0.0
+    pdf_renders: int = 0
+    pdf_render_s: float = 0.0
+    layout_renders: int = 0
+    layout_render_s: float = 0.0
+    rss_start_kb: int | None = None
+    rss_end_kb: int | None = None
+    rss_delta_kb: int | None = None
+
+    def as_meta(self) -> dict[str, Any]:
+        meta = asdict(self)
+        for key, value in meta.items():
+            if isinstance(value, float):
+                meta[key] = round(value, 4)
+        return meta
+
+
+_current_span: ContextVar[StageSpan | None] = ContextVar("report_stage_span", default=None)
+
+
+def _current_rss_kb() -> int | None:
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def _process_peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+    # Linux reports kilobytes.
+    return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+@dataclass
+class SpanRecorder:
+    spans: list[StageSpan] = field(default_factory=list)
+    output_size_bytes: int | None = None
+    _started: float = field(default_factory=time.monotonic)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageSpan]:
+        span = StageSpan(name=name)
+        token = _current_span.set(span)
+
+        def _time_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                span.queries += 1
+                span.query_s += time.perf_counter() - started
+
+        span.rss_start_kb = _current_rss_kb()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(_time_query):
+                yield span
+        finally:
+            span.wall_s = time.perf_counter() - started
+            span.rss_end_kb = _current_rss_kb()
+            if span.rss_start_kb is not None and span.rss_end_kb is not None:
+                span.rss_delta_kb = span.rss_end_kb - span.rss_start_kb
+            _current_span.reset(token)
+            self.spans.append(span)
+
+    def as_meta(self) -> dict[str, Any]:
+        return {
+            "total_s": round(time.monotonic() - self._started, 4),
+            "output_size_bytes": self.output_size_bytes,
+            "rss_process_peak_kb": _process_peak_rss_kb(),
+            "stages": [span.as_meta() for span in self.spans],
+        }
+
+
+def record_pdf_render(seconds: float, *, layout_only: bool = False) -> None:
+    span = _current_span.get()
+    if span is None:
+        return
+    if layout_only:
+        span.layout_renders += 1
+        span.layout_render_s += seconds
+    else:
+        span.pdf_renders += 1
+        span.pdf_render_s += seconds
+
+
+def render_to_string(template_name, context=None, request=None, using=None) -> str:
+    """`django.template.loader.render_to_string`, timed into the open stage."""
+
+    started = time.perf_counter()
+    try:
+        return loader.render_to_string(template_name, context, request=request, using=using)
+    finally:
+        span = _current_span.get()
+        if span is not None:
+            span.templates += 1
+            span.template_s += time.perf_counter() - started
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 4)
+
+
+_STAGE_METRICS = (
+    "wall_s",
+    "queries",
+    "query_s",
+    "templates",
+    "template_s",
+    "pdf_renders",
+    "pdf_render_s",
+    "layout_renders",
+    "layout_render_s",
+    "rss_end_kb",
+    "rss_delta_kb",
+)
+
+
+def timing_percentiles(rows: Iterable[tuple[str, dict]]) -> dict[str, dict]:
+    """p50/p95 per report type from `(report_type, TIMINGS meta)` rows."""
+
+    samples: dict[str, dict[str, Any]] = {}
+    for report_type, meta in rows:
+        entry = samples.setdefault(report_type, {"total_s": [], "output_size_bytes": [], "stages": {}})
+        if meta.get("batch_part_job_id") is None:
+            for key in ("total_s", "output_size_bytes"):
+                if meta.get(key) is not None:
+                    entry[key].append(meta[key])
+        for stage in meta.get("stages") or []:
+            stage_samples = entry["stages"].setdefault(stage.get("name"), {metric: [] for metric in _STAGE_METRICS})
+            for metric in _STAGE_METRICS:
+                if stage.get(metric) is not None:
+                    stage_samples[metric].append(stage[metric])
+
+    result = {}
+    for report_type, entry in samples.items():
+        result[report_type] = {
+            "jobs": len(entry["total_s"]),
+            **{
+                key: {"p50": _percentile(entry[key], 0.5), "p95": _percentile(entry[key], 0.95)}
+                for key in ("total_s", "output_size_bytes")
+            },
+            "stages": {
+                name: {
+                    metric: {"p50": _percentile(values, 0.5), "p95": _percentile(values, 0.95)}
+                    for metric, values in metrics.items()
+                }
+                for name, metrics in entry["stages"].items()
+            },
+        }
+    return result
@@ -1,48 +1,76 @@
 from __future__ import annotations
 
 import ast
-import base64
 import html as html_lib
 import logging
 import time
 import re
 import json
 import unicodedata
+import zipfile
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
 from urllib.parse import urljoin, urlparse
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import Any
 
-from celery import shared_task
+from celery import chord, shared_task
 from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_process_init
 from django.conf import settings
-from django.template.loader import render_to_string
+from django.db.models import Count
+from django.utils import timezone
 
 from academic.models import Period
 from academic.reports import build_grade_report_sheet_context
 from academic.reports import build_commitment_acta_context, build_commission_group_acta_context
 from academic.ai import AIService, AIServiceError
 from students.academic_period_report import (
+    ReportGenerationContext,
     build_academic_period_group_report_context,
     build_academic_period_report_context,
     build_preschool_academic_period_group_report_context,
     build_preschool_academic_period_report_context,
     group_report_rows_for_visual_blocks,
 )
-from students.single_page_report_fit import layout_report_to_two_pages
-from students.academic_period_sabana_report import build_academic_period_sabana_context
+from students.single_page_report_fit import (
+    LayoutMeasureStats,
+    collect_layout_measure_stats,
+    layout_report_to_two_pages,
+)
+from students.academic_period_sabana_report import (
+    SabanaMatrix,
+    build_academic_period_sabana_context,
+    load_academic_period_sabana_matrix,
+    write_academic_period_sabana_xlsx,
+)
 from students.models import Enrollment
 
 from attendance.reports import build_attendance_manual_sheet_context
 from discipline.reports import build_case_acta_context
 from students.reports import build_enrollment_list_report_context, build_family_directory_by_group_report_context
 
-from .models import ReportJob
-from .weasyprint_utils import PDF_BASE_CSS, weasyprint_url_fetcher
+from .asset_cache import image_file_data_uri, qr_png_data_uri, thumbnail_data_uri
+from .fingerprints import report_input_fingerprint
+from .lanes import ReportLaneTask, fair_share_delay
+from .models import ReportJob, ReportJobEvent
+from .spans import SpanRecorder, render_to_string
+from .weasyprint_utils import PDF_BASE_CSS, WeasyPrintUnavailableError, get_renderer, weasyprint_url_fetcher
 
 
 logger = logging.getLogger(__name__)
 
 
+@worker_process_init.connect
+def _warm_weasyprint_renderer(**_kwargs) -> None:
+    # Each prefork child builds its renderer (fonts + base stylesheet) once, before the first job.
+    try:
+        get_renderer().warm()
+    except WeasyPrintUnavailableError:
+        logger.warning("report_worker.weasyprint_unavailable")
+
+
 def _build_class_plan_pdf_filename(plan) -> str:
     topic_source = getattr(getattr(plan, "topic", None), "title", "") or getattr(plan, "title", "") or "tema"
     normalized = unicodedata.normalize("NFKD", str(topic_source or "").strip())
@@ -327,14 +355,10 @@ def _safe_join_private(root: Path, relpath: str) -> Path:
 
 def _image_file_to_data_uri(image_field) -> str:
     """Convert a Django ImageField to a base64 data URI for embedding in HTML."""
-    import mimetypes  # noqa: PLC0415
     if not image_field or not getattr(image_field, "name", None):
         return ""
     try:
-        mime = mimetypes.guess_type(image_field.name)[0] or "image/jpeg"
-        with open(image_field.path, "rb") as fh:
-            data = base64.b64encode(fh.read()).decode("ascii")
-        return f"data:{mime};base64,{data}"
+        return image_file_data_uri(image_field.path, name=image_field.name)
     except Exception:
         return ""
 
@@ -344,40 +368,31 @@ def _image_field_to_thumbnail_data_uri(image_field, max_w: int = 120, max_h: int
     if not image_field or not getattr(image_field, "name", None):
         return ""
     try:
-        from PIL import Image  # noqa: PLC0415
-        import io  # noqa: PLC0415
-        with Image.open(image_field.path) as img:
-            img = img.convert("RGB")
-            img.thumbnail((max_w, max_h), Image.LANCZOS)
-            buf = io.BytesIO()
-            img.save(buf, format="JPEG", quality=quality, optimize=True)
-            data = base64.b64encode(buf.getvalue()).decode("ascii")
-        return f"data:image/jpeg;base64,{data}"
+        return thumbnail_data_uri(image_field.path, max_w=max_w, max_h=max_h, quality=quality)
     except Exception:
         return ""
 
 
 def _qr_png_data_uri_small(text: str, box_size: int = 4, border: int = 2) -> str:
     """Generate a compact QR code PNG data URI (smaller box_size than default)."""
-    try:
-        import qrcode  # noqa: PLC0415
-        from qrcode.constants import ERROR_CORRECT_M  # noqa: PLC0415
-        from io import BytesIO  # noqa: PLC0415
-
-        qr = qrcode.QRCode(error_correction=ERROR_CORRECT_M, box_size=box_size, border=border)
-        qr.add_data(text)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-        buf = BytesIO()
-        img.save(buf, format="PNG")
-        b64 = base64.b64encode(buf.getvalue()).decode("ascii")
-        return f"data:image/png;base64,{b64}"
-    except Exception:
-        return ""
+    return qr_png_data_uri(text, box_size=box_size, border=border)
 
 
 def _render_election_census_qr_html(job: ReportJob) -> str:
     """Render carnets electorales as premium ID cards (no tables)."""
+
+    return next(_election_census_qr_html_chunks(job))
+
+
+def _election_census_qr_html_chunks(job: ReportJob, cards_per_chunk: int | None = None) -> Iterator[str]:
+    """Yield the carnet sheet as standalone HTML documents of at most `cards_per_chunk` cards."""
+
+    return _election_census_qr_documents(_election_census_qr_data(job), cards_per_chunk=cards_per_chunk)
+
+
+def _election_census_qr_data(job: ReportJob) -> dict:
+    """Bulk-loaded data of an ELECTION_CENSUS_QR job: institution, year and student photos."""
+
     from core.models import Institution  # noqa: PLC0415
     from students.models import Student  # noqa: PLC0415
     from academic.models import AcademicYear  # noqa: PLC0415
@@ -405,6 +420,42 @@ def _render_election_census_qr_html(job: ReportJob) -> str:
         for student in Student.objects.filter(user_id__in=student_ids).only("user_id", "photo", "photo_thumb"):
             students_by_id[student.user_id] = student
 
+    return {
+        "process_name": process_name,
+        "group_filter": group_filter,
+        "year_label": year_label,
+        "rows_data": rows_data,
+        "institution_name": institution_name,
+        "institution_logo_src": institution_logo_src,
+        "students_by_id": students_by_id,
+    }
+
+
+# The carnet sheet below lays out 3 columns x 4 rows of ~60 mm cards on an A4 page.
+_ELECTION_QR_CARDS_PER_PAGE = 12
+
+
+def _election_census_qr_documents(
+    data: dict,
+    *,
+    cards_per_chunk: int | None = None,
+    on_unit: Callable[[int, int], None] | None = None,
+) -> Iterator[str]:
+    """Carnet documents of at most `cards_per_chunk` cards (one document when None).
+
+    Cards (and their photo/QR data URIs) are only built for the chunk being yielded.
+    """
+
+    from django.utils import timezone as tz  # noqa: PLC0415
+
+    process_name = data["process_name"]
+    group_filter = data["group_filter"]
+    year_label = data["year_label"]
+    rows_data: list[dict] = data["rows_data"]
+    institution_name = data["institution_name"]
+    institution_logo_src = data["institution_logo_src"]
+    students_by_id = data["students_by_id"]
+
     qr_cache: dict[str, str] = {}
 
     def _get_qr(code: str) -> str:
@@ -453,8 +504,7 @@ def _render_election_census_qr_html(job: ReportJob) -> str:
     process_name_esc = html_lib.escape(process_name)
     group_label_esc = html_lib.escape(group_filter or "Todos")
 
-    cards: list[str] = []
-    for row in rows_data:
+    def _card(row: dict) -> str:
         manual_code = str(row.get("manual_code") or "")
         qr_src = _get_qr(manual_code)
 
@@ -490,7 +540,7 @@ def _render_election_census_qr_html(job: ReportJob) -> str:
         campus_line = f'<div class="line"><span class="lbl">Sede:</span> {campus_name}</div>' if campus_name else ""
         qr_block = f'<div class="qr-wrap"><img src="{qr_src}" alt=""/></div>' if qr_src else '<div class="qr-wrap"></div>'
 
-        card = (
+        return (
             '<div class="card-shell"><div class="card">'
             '<div class="top">'
             + logo_block
@@ -517,984 +567,1300 @@ def _render_election_census_qr_html(job: ReportJob) -> str:
             + '<div class="clr"></div></div>'
             + '</div></div>'
         )
-        cards.append(card)
 
-    return (
+    head = (
         "<!doctype html><html><head><meta charset='utf-8'/>"
         "<title>Carn&#233;s Gobierno Escolar</title>"
         f"<style>{css}</style>"
         "</head><body>"
+    )
+    title = (
         f"<h1 class='doc-title'>Carn&#233;s electorales &middot; {process_name_esc}</h1>"
         f"<p class='meta'>Grupo: {group_label_esc} &nbsp;&middot;&nbsp; Generado: {tz.now().strftime('%d/%m/%Y %H:%M')}</p>"
-        f"<div class='cards'>{''.join(cards)}</div>"
-        "</body></html>"
     )
+    size = cards_per_chunk or len(rows_data) or 1
+    for chunk_start in range(0, max(len(rows_data), 1), size):
+        cards = []
+        for row in rows_data[chunk_start : chunk_start + size]:
+            cards.append(_card(row))
+            if on_unit is not None:
+                on_unit(chunk_start + len(cards), len(rows_data))
+        yield (
+            head
+            + (title if chunk_start == 0 else "")
+            + f"<div class='cards'>{''.join(cards)}</div>"
+            + "</body></html>"
+        )
 
 
-def _render_report_html(job: ReportJob) -> str:
-    if job.report_type == ReportJob.ReportType.DUMMY:
-        from core.models import Institution  # noqa: PLC0415
+def _shared_report_context(
+    report_context: ReportGenerationContext | None, academic_year_id
+) -> ReportGenerationContext | None:
+    """Reuse the caller's year-level context only when it matches the job's year."""
 
-        institution = Institution.objects.first() or Institution(name="")
-        return render_to_string(
-            "reports/dummy_report.html",
-            {
-                "job": job,
-                "user": job.created_by,
-                "params": job.params,
-                "institution": institution,
-            },
-        )
+    if report_context is not None and report_context.academic_year_id == int(academic_year_id):
+        return report_context
+    return None
 
-    if job.report_type == ReportJob.ReportType.ACADEMIC_PERIOD_ENROLLMENT:
-        enrollment_id = (job.params or {}).get("enrollment_id")
-        period_id = (job.params or {}).get("period_id")
 
-        enrollment = Enrollment.objects.select_related(
+# Year-level context reused by the children of one batch that land on this worker process.
+_batch_report_contexts: dict[int, ReportGenerationContext] = {}
+
+
+def _batch_report_context(job: ReportJob) -> ReportGenerationContext | None:
+    if not job.parent_id:
+        return None
+    academic_year_id = (job.params or {}).get("academic_year_id")
+    if not academic_year_id:
+        return None
+    cached = _batch_report_contexts.get(job.parent_id)
+    if cached is None:
+        # Keep only the current batch: a worker moves on to the next one once it finishes.
+        _batch_report_contexts.clear()
+        cached = _batch_report_contexts[job.parent_id] = ReportGenerationContext(int(academic_year_id))
+    return cached
+
+
+def _academic_period_group_data(job: ReportJob, *, report_context: ReportGenerationContext | None = None) -> dict:
+    """Bulk-loaded context of an ACADEMIC_PERIOD_GROUP job (one `pages` item per student)."""
+
+    from academic.models import Group  # noqa: PLC0415
+
+    group_id = (job.params or {}).get("group_id")
+    period_id = (job.params or {}).get("period_id")
+
+    group = Group.objects.select_related("academic_year", "director", "grade", "grade__level").get(id=group_id)
+    period = Period.objects.select_related("academic_year").get(id=period_id)
+
+    group_level_type = None
+    try:
+        group_level_type = getattr(getattr(getattr(group.grade, "level", None), "level_type", None), "upper", lambda: None)()
+    except Exception:
+        group_level_type = None
+
+    is_preschool_group = group_level_type in {"PRESCHOOL", "PREESCOLAR"}
+
+    enrollments = (
+        Enrollment.objects.select_related(
             "student",
             "student__user",
             "grade",
             "grade__level",
             "group",
-            "group__grade",
-            "group__grade__level",
             "group__director",
             "academic_year",
-        ).get(id=enrollment_id)
-        period = Period.objects.select_related("academic_year").get(id=period_id)
+        )
+        .filter(group_id=group.id, academic_year_id=period.academic_year_id, status="ACTIVE")
+        .order_by("student__user__last_name", "student__user__first_name", "student__user__id")
+    )
+    if is_preschool_group:
+        ctx = build_preschool_academic_period_group_report_context(
+            enrollments=enrollments,
+            period=period,
+            report_context=_shared_report_context(report_context, period.academic_year_id),
+        )
+    else:
+        ctx = build_academic_period_group_report_context(
+            enrollments=enrollments,
+            period=period,
+            report_context=_shared_report_context(report_context, period.academic_year_id),
+        )
 
-        from verification.models import VerifiableDocument  # noqa: PLC0415
-        from verification.services import build_public_verify_url, get_or_create_for_report_job  # noqa: PLC0415
+    pages = ctx.get("pages") or []
+    return {
+        "ctx": ctx,
+        "is_preschool": is_preschool_group,
+        "pages": [page for page in pages if isinstance(page, dict)] if isinstance(pages, list) else [],
+    }
 
-        level_type = None
-        try:
-            level_type = getattr(getattr(getattr(enrollment.grade, "level", None), "level_type", None), "upper", lambda: None)()
-        except Exception:
-            level_type = None
-        if not level_type:
-            try:
-                level_type = getattr(
-                    getattr(getattr(getattr(enrollment.group, "grade", None), "level", None), "level_type", None),
-                    "upper",
-                    lambda: None,
-                )()
-            except Exception:
-                level_type = None
 
-        is_preschool = level_type in {"PRESCHOOL", "PREESCOLAR"}
-        if is_preschool:
-            ctx = build_preschool_academic_period_report_context(enrollment=enrollment, period=period)
-        else:
-            ctx = build_academic_period_report_context(enrollment=enrollment, period=period)
-
-        ctx = layout_report_to_two_pages(
-            ctx,
-            template_name=(
-                "students/reports/academic_period_report_preschool_pdf.html"
-                if is_preschool
-                else "students/reports/academic_period_report_pdf.html"
-            ),
-            is_preschool=is_preschool,
-        )
-        if not is_preschool:
-            ctx["rows_page_1"] = group_report_rows_for_visual_blocks(ctx.get("rows_page_1") or [])
-            ctx["rows_page_2"] = group_report_rows_for_visual_blocks(ctx.get("rows_page_2") or [])
+def _finish_group_report_page(job: ReportJob, page: dict, *, is_preschool: bool) -> dict:
+    """Fit one student's boletín to two pages and attach its verification token and QR."""
 
-        rows_public = []
-        for r in (ctx.get("rows") or [])[:80]:
-            if not isinstance(r, dict):
-                continue
-            if is_preschool:
-                row_type = str(r.get("row_type") or "").strip().upper()
-                if row_type in {"SUBJECT", "DIMENSION"}:
-                    rows_public.append({"row_type": row_type, "title": r.get("title", "")})
-                else:
-                    rows_public.append(
-                        {
-                            "row_type": "ACHIEVEMENT",
-                            "title": r.get("description", "") or r.get("title", ""),
-                            "label": r.get("label", ""),
-                        }
-                    )
+    from verification.models import VerifiableDocument  # noqa: PLC0415
+    from verification.payload_policy import sanitize_public_payload  # noqa: PLC0415
+    from verification.services import build_public_verify_url  # noqa: PLC0415
+
+    page = layout_report_to_two_pages(
+        page,
+        template_name=(
+            "students/reports/academic_period_report_preschool_pdf.html"
+            if is_preschool
+            else "students/reports/academic_period_report_pdf.html"
+        ),
+        is_preschool=is_preschool,
+    )
+    if not is_preschool:
+        page["rows_page_1"] = group_report_rows_for_visual_blocks(page.get("rows_page_1") or [])
+        page["rows_page_2"] = group_report_rows_for_visual_blocks(page.get("rows_page_2") or [])
+
+    # One verification token per student/page.
+    enrollment_id = page.get("enrollment_id")
+    object_id = f"{job.id}:enrollment:{enrollment_id}" if enrollment_id else f"{job.id}:student:{page.get('student_code','')}"
+
+    rows_public = []
+    for r in (page.get("rows") or [])[:80]:
+        if not isinstance(r, dict):
+            continue
+
+        if is_preschool:
+            row_type = str(r.get("row_type") or "").strip().upper()
+            if row_type in {"SUBJECT", "DIMENSION"}:
+                rows_public.append({"row_type": row_type, "title": r.get("title", "")})
             else:
                 rows_public.append(
                     {
-                        "title": r.get("title", ""),
-                        "absences": r.get("absences", ""),
-                        "p1_score": r.get("p1_score", ""),
-                        "p2_score": r.get("p2_score", ""),
-                        "p3_score": r.get("p3_score", ""),
-                        "p4_score": r.get("p4_score", ""),
-                        "final_score": r.get("final_score", ""),
-                        "p1_scale": r.get("p1_scale", ""),
-                        "p2_scale": r.get("p2_scale", ""),
-                        "p3_scale": r.get("p3_scale", ""),
-                        "p4_scale": r.get("p4_scale", ""),
-                        "final_scale": r.get("final_scale", ""),
+                        "row_type": "ACHIEVEMENT",
+                        "title": r.get("description", "") or r.get("title", ""),
+                        "label": r.get("label", ""),
                     }
                 )
+        else:
+            rows_public.append(
+                {
+                    "title": r.get("title", ""),
+                    "absences": r.get("absences", ""),
+                    "p1_score": r.get("p1_score", ""),
+                    "p2_score": r.get("p2_score", ""),
+                    "p3_score": r.get("p3_score", ""),
+                    "p4_score": r.get("p4_score", ""),
+                    "final_score": r.get("final_score", ""),
+                    "p1_scale": r.get("p1_scale", ""),
+                    "p2_scale": r.get("p2_scale", ""),
+                    "p3_scale": r.get("p3_scale", ""),
+                    "p4_scale": r.get("p4_scale", ""),
+                    "final_scale": r.get("final_scale", ""),
+                }
+            )
+
+    public_payload = sanitize_public_payload(
+        VerifiableDocument.DocType.REPORT_CARD,
+        {
+            "title": f"Boletín / Informe académico: {str(page.get('student_name','')).strip()} - {str(page.get('period_name','')).strip()} - {str(page.get('year_name','')).strip()}",
+            "student_name": page.get("student_name", ""),
+            "group_name": page.get("group_name", ""),
+            "period_name": page.get("period_name", ""),
+            "year_name": page.get("year_name", ""),
+            "rows": rows_public,
+            "final_status": page.get("final_status", ""),
+        },
+    )
 
-        vdoc = get_or_create_for_report_job(
-            job_id=job.id,
+    vdoc = VerifiableDocument.objects.filter(
+        doc_type=VerifiableDocument.DocType.REPORT_CARD,
+        object_type="ReportJobPage",
+        object_id=str(object_id),
+    ).first()
+    if vdoc:
+        if public_payload and (vdoc.public_payload or {}) != public_payload:
+            vdoc.public_payload = public_payload
+            vdoc.save(update_fields=["public_payload", "updated_at"])
+    else:
+        vdoc = VerifiableDocument.create_with_unique_token(
             doc_type=VerifiableDocument.DocType.REPORT_CARD,
-            public_payload={
-                "title": f"Boletín / Informe académico: {ctx.get('student_name','').strip()} - {ctx.get('period_name','').strip()} - {ctx.get('year_name','')}",
-                "student_name": ctx.get("student_name", ""),
-                "group_name": ctx.get("group_name", ""),
-                "period_name": ctx.get("period_name", ""),
-                "year_name": ctx.get("year_name", ""),
-                "rows": rows_public,
-                "final_status": getattr(enrollment, "final_status", "") or "",
-            },
+            public_payload=public_payload,
+            object_type="ReportJobPage",
+            object_id=str(object_id),
         )
-        verify_url = _coerce_public_absolute_url(job, build_public_verify_url(vdoc.token))
+
+    verify_url = _coerce_public_absolute_url(job, build_public_verify_url(vdoc.token))
+    verify_url_prefix = ""
+    try:
+        marker = f"{vdoc.token}/"
+        if verify_url and marker in verify_url:
+            verify_url_prefix = verify_url.split(marker)[0].rstrip("/") + "/"
+    except Exception:
         verify_url_prefix = ""
-        try:
-            marker = f"{vdoc.token}/"
-            if verify_url and marker in verify_url:
-                verify_url_prefix = verify_url.split(marker)[0].rstrip("/") + "/"
-        except Exception:
-            verify_url_prefix = ""
-        ctx["verify_url"] = verify_url
-        ctx["verify_token"] = vdoc.token
-        ctx["verify_url_prefix"] = verify_url_prefix
-        ctx["qr_image_src"] = _qr_png_data_uri(verify_url) if verify_url else ""
-        if is_preschool:
-            return render_to_string("students/reports/academic_period_report_preschool_pdf.html", ctx)
-        return render_to_string("students/reports/academic_period_report_pdf.html", ctx)
 
-    if job.report_type == ReportJob.ReportType.ACADEMIC_PERIOD_GROUP:
-        from academic.models import Group  # noqa: PLC0415
+    page["verify_url"] = verify_url
+    page["verify_token"] = vdoc.token
+    page["verify_url_prefix"] = verify_url_prefix
+    page["qr_image_src"] = _qr_png_data_uri(verify_url) if verify_url else ""
+    return page
 
-        group_id = (job.params or {}).get("group_id")
-        period_id = (job.params or {}).get("period_id")
 
-        group = Group.objects.select_related("academic_year", "director", "grade", "grade__level").get(id=group_id)
-        period = Period.objects.select_related("academic_year").get(id=period_id)
+def _dummy_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    from core.models import Institution  # noqa: PLC0415
 
-        group_level_type = None
+    institution = Institution.objects.first() or Institution(name="")
+    return (
+        "reports/dummy_report.html",
+        {
+            "job": job,
+            "user": job.created_by,
+            "params": job.params,
+            "institution": institution,
+        },
+    )
+
+
+def _academic_period_enrollment_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    enrollment_id = (job.params or {}).get("enrollment_id")
+    period_id = (job.params or {}).get("period_id")
+
+    enrollment = Enrollment.objects.select_related(
+        "student",
+        "student__user",
+        "grade",
+        "grade__level",
+        "group",
+        "group__grade",
+        "group__grade__level",
+        "group__director",
+        "academic_year",
+    ).get(id=enrollment_id)
+    period = Period.objects.select_related("academic_year").get(id=period_id)
+
+    from verification.models import VerifiableDocument  # noqa: PLC0415
+    from verification.services import build_public_verify_url, get_or_create_for_report_job  # noqa: PLC0415
+
+    level_type = None
+    try:
+        level_type = getattr(getattr(getattr(enrollment.grade, "level", None), "level_type", None), "upper", lambda: None)()
+    except Exception:
+        level_type = None
+    if not level_type:
         try:
-            group_level_type = getattr(getattr(getattr(group.grade, "level", None), "level_type", None), "upper", lambda: None)()
+            level_type = getattr(
+                getattr(getattr(getattr(enrollment.group, "grade", None), "level", None), "level_type", None),
+                "upper",
+                lambda: None,
+            )()
         except Exception:
-            group_level_type = None
-
-        is_preschool_group = group_level_type in {"PRESCHOOL", "PREESCOLAR"}
-
-        enrollments = (
-            Enrollment.objects.select_related(
-                "student",
-                "student__user",
-                "grade",
-                "grade__level",
-                "group",
-                "group__director",
-                "academic_year",
-            )
-            .filter(group_id=group.id, academic_year_id=period.academic_year_id, status="ACTIVE")
-            .order_by("student__user__last_name", "student__user__first_name", "student__user__id")
+            level_type = None
+
+    is_preschool = level_type in {"PRESCHOOL", "PREESCOLAR"}
+    if is_preschool:
+        ctx = build_preschool_academic_period_report_context(
+            enrollment=enrollment,
+            period=period,
+            report_context=_shared_report_context(report_context, period.academic_year_id),
+        )
+    else:
+        ctx = build_academic_period_report_context(
+            enrollment=enrollment,
+            period=period,
+            report_context=_shared_report_context(report_context, period.academic_year_id),
         )
-        from verification.models import VerifiableDocument  # noqa: PLC0415
-        from verification.payload_policy import sanitize_public_payload  # noqa: PLC0415
-        from verification.services import build_public_verify_url  # noqa: PLC0415
 
-        if is_preschool_group:
-            ctx = build_preschool_academic_period_group_report_context(enrollments=enrollments, period=period)
-        else:
-            ctx = build_academic_period_group_report_context(enrollments=enrollments, period=period)
-
-        pages_to_fit = ctx.get("pages") or []
-        if isinstance(pages_to_fit, list):
-            fitted_pages = []
-            for page in pages_to_fit:
-                if not isinstance(page, dict):
-                    continue
-                fitted_pages.append(
-                    layout_report_to_two_pages(
-                        page,
-                        template_name=(
-                            "students/reports/academic_period_report_preschool_pdf.html"
-                            if is_preschool_group
-                            else "students/reports/academic_period_report_pdf.html"
-                        ),
-                        is_preschool=is_preschool_group,
-                    )
-                )
-                if not is_preschool_group and fitted_pages:
-                    fitted_pages[-1]["rows_page_1"] = group_report_rows_for_visual_blocks(
-                        fitted_pages[-1].get("rows_page_1") or []
-                    )
-                    fitted_pages[-1]["rows_page_2"] = group_report_rows_for_visual_blocks(
-                        fitted_pages[-1].get("rows_page_2") or []
-                    )
-            ctx["pages"] = fitted_pages
-
-        # One verification token per student/page.
-        pages = ctx.get("pages") or []
-        if isinstance(pages, list):
-            for page in pages:
-                if not isinstance(page, dict):
-                    continue
-
-                enrollment_id = page.get("enrollment_id")
-                object_id = f"{job.id}:enrollment:{enrollment_id}" if enrollment_id else f"{job.id}:student:{page.get('student_code','')}"
-
-                rows_public = []
-                for r in (page.get("rows") or [])[:80]:
-                    if not isinstance(r, dict):
-                        continue
-
-                    if is_preschool_group:
-                        row_type = str(r.get("row_type") or "").strip().upper()
-                        if row_type in {"SUBJECT", "DIMENSION"}:
-                            rows_public.append({"row_type": row_type, "title": r.get("title", "")})
-                        else:
-                            rows_public.append(
-                                {
-                                    "row_type": "ACHIEVEMENT",
-                                    "title": r.get("description", "") or r.get("title", ""),
-                                    "label": r.get("label", ""),
-                                }
-                            )
-                    else:
-                        rows_public.append(
-                            {
-                                "title": r.get("title", ""),
-                                "absences": r.get("absences", ""),
-                                "p1_score": r.get("p1_score", ""),
-                                "p2_score": r.get("p2_score", ""),
-                                "p3_score": r.get("p3_score", ""),
-                                "p4_score": r.get("p4_score", ""),
-                                "final_score": r.get("final_score", ""),
-                                "p1_scale": r.get("p1_scale", ""),
-                                "p2_scale": r.get("p2_scale", ""),
-                                "p3_scale": r.get("p3_scale", ""),
-                                "p4_scale": r.get("p4_scale", ""),
-                                "final_scale": r.get("final_scale", ""),
-                            }
-                        )
-
-                public_payload = sanitize_public_payload(
-                    VerifiableDocument.DocType.REPORT_CARD,
+    ctx = layout_report_to_two_pages(
+        ctx,
+        template_name=(
+            "students/reports/academic_period_report_preschool_pdf.html"
+            if is_preschool
+            else "students/reports/academic_period_report_pdf.html"
+        ),
+        is_preschool=is_preschool,
+    )
+    if not is_preschool:
+        ctx["rows_page_1"] = group_report_rows_for_visual_blocks(ctx.get("rows_page_1") or [])
+        ctx["rows_page_2"] = group_report_rows_for_visual_blocks(ctx.get("rows_page_2") or [])
+
+    rows_public = []
+    for r in (ctx.get("rows") or [])[:80]:
+        if not isinstance(r, dict):
+            continue
+        if is_preschool:
+            row_type = str(r.get("row_type") or "").strip().upper()
+            if row_type in {"SUBJECT", "DIMENSION"}:
+                rows_public.append({"row_type": row_type, "title": r.get("title", "")})
+            else:
+                rows_public.append(
                     {
-                        "title": f"Boletín / Informe académico: {str(page.get('student_name','')).strip()} - {str(page.get('period_name','')).strip()} - {str(page.get('year_name','')).strip()}",
-                        "student_name": page.get("student_name", ""),
-                        "group_name": page.get("group_name", ""),
-                        "period_name": page.get("period_name", ""),
-                        "year_name": page.get("year_name", ""),
-                        "rows": rows_public,
-                        "final_status": page.get("final_status", ""),
-                    },
+                        "row_type": "ACHIEVEMENT",
+                        "title": r.get("description", "") or r.get("title", ""),
+                        "label": r.get("label", ""),
+                    }
                 )
+        else:
+            rows_public.append(
+                {
+                    "title": r.get("title", ""),
+                    "absences": r.get("absences", ""),
+                    "p1_score": r.get("p1_score", ""),
+                    "p2_score": r.get("p2_score", ""),
+                    "p3_score": r.get("p3_score", ""),
+                    "p4_score": r.get("p4_score", ""),
+                    "final_score": r.get("final_score", ""),
+                    "p1_scale": r.get("p1_scale", ""),
+                    "p2_scale": r.get("p2_scale", ""),
+                    "p3_scale": r.get("p3_scale", ""),
+                    "p4_scale": r.get("p4_scale", ""),
+                    "final_scale": r.get("final_scale", ""),
+                }
+            )
 
-                vdoc = VerifiableDocument.objects.filter(
-                    doc_type=VerifiableDocument.DocType.REPORT_CARD,
-                    object_type="ReportJobPage",
-                    object_id=str(object_id),
-                ).first()
-                if vdoc:
-                    if public_payload and (vdoc.public_payload or {}) != public_payload:
-                        vdoc.public_payload = public_payload
-                        vdoc.save(update_fields=["public_payload", "updated_at"])
-                else:
-                    vdoc = VerifiableDocument.create_with_unique_token(
-                        doc_type=VerifiableDocument.DocType.REPORT_CARD,
-                        public_payload=public_payload,
-                        object_type="ReportJobPage",
-                        object_id=str(object_id),
-                    )
-
-                verify_url = _coerce_public_absolute_url(job, build_public_verify_url(vdoc.token))
-                verify_url_prefix = ""
-                try:
-                    marker = f"{vdoc.token}/"
-                    if verify_url and marker in verify_url:
-                        verify_url_prefix = verify_url.split(marker)[0].rstrip("/") + "/"
-                except Exception:
-                    verify_url_prefix = ""
+    vdoc = get_or_create_for_report_job(
+        job_id=job.id,
+        doc_type=VerifiableDocument.DocType.REPORT_CARD,
+        public_payload={
+            "title": f"Boletín / Informe académico: {ctx.get('student_name','').strip()} - {ctx.get('period_name','').strip()} - {ctx.get('year_name','')}",
+            "student_name": ctx.get("student_name", ""),
+            "group_name": ctx.get("group_name", ""),
+            "period_name": ctx.get("period_name", ""),
+            "year_name": ctx.get("year_name", ""),
+            "rows": rows_public,
+            "final_status": getattr(enrollment, "final_status", "") or "",
+        },
+    )
+    verify_url = _coerce_public_absolute_url(job, build_public_verify_url(vdoc.token))
+    verify_url_prefix = ""
+    try:
+        marker = f"{vdoc.token}/"
+        if verify_url and marker in verify_url:
+            verify_url_prefix = verify_url.split(marker)[0].rstrip("/") + "/"
+    except Exception:
+        verify_url_prefix = ""
+    ctx["verify_url"] = verify_url
+    ctx["verify_token"] = vdoc.token
+    ctx["verify_url_prefix"] = verify_url_prefix
+    ctx["qr_image_src"] = _qr_png_data_uri(verify_url) if verify_url else ""
+    if is_preschool:
+        return "students/reports/academic_period_report_preschool_pdf.html", ctx
+    return "students/reports/academic_period_report_pdf.html", ctx
+
+
+def _discipline_case_acta_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    from discipline.models import DisciplineCase  # noqa: PLC0415
+
+    case_id = (job.params or {}).get("case_id")
+    case = DisciplineCase.objects.get(id=case_id)
+    ctx = build_case_acta_context(case=case, generated_by=job.created_by)
+    return "discipline/case_acta.html", ctx
+
+
+def _academic_commission_acta_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    from academic.models import CommissionStudentDecision  # noqa: PLC0415
+
+    decision_id = (job.params or {}).get("decision_id")
+    decision = (
+        CommissionStudentDecision.objects.select_related(
+            "commission",
+            "commission__period",
+            "commission__academic_year",
+            "enrollment",
+            "enrollment__student",
+            "enrollment__student__user",
+            "enrollment__grade",
+            "enrollment__group",
+            "enrollment__group__director",
+            "enrollment__campus",
+            "enrollment__campus__institution",
+            "commitment_acta",
+        )
+        .get(id=decision_id)
+    )
+    ctx = build_commitment_acta_context(decision=decision, generated_by=job.created_by)
+    return "academic/reports/commission_commitment_acta.html", ctx
 
-                page["verify_url"] = verify_url
-                page["verify_token"] = vdoc.token
-                page["verify_url_prefix"] = verify_url_prefix
-                page["qr_image_src"] = _qr_png_data_uri(verify_url) if verify_url else ""
 
-        if is_preschool_group:
-            return render_to_string("students/reports/academic_period_report_group_preschool_pdf.html", ctx)
-        return render_to_string("students/reports/academic_period_report_group_pdf.html", ctx)
+def _academic_commission_group_acta_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    from academic.models import Commission  # noqa: PLC0415
 
-    if job.report_type == ReportJob.ReportType.ACADEMIC_PERIOD_SABANA:
-        from academic.models import Group  # noqa: PLC0415
+    commission_id = (job.params or {}).get("commission_id")
+    commission = (
+        Commission.objects.select_related("institution", "academic_year", "period", "group", "group__grade", "group__director")
+        .get(id=commission_id)
+    )
+    ai_blocks = _resolve_group_acta_ai_blocks_for_job(commission=commission)
+    ctx = build_commission_group_acta_context(
+        commission=commission,
+        generated_by=job.created_by,
+        ai_blocks=ai_blocks,
+    )
+    return "academic/reports/commission_group_acta.html", ctx
 
-        group_id = (job.params or {}).get("group_id")
-        period_id = (job.params or {}).get("period_id")
 
-        group = Group.objects.select_related("academic_year", "director", "grade").get(id=group_id)
-        period = Period.objects.select_related("academic_year").get(id=period_id)
+def _attendance_manual_sheet_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    from academic.models import Group  # noqa: PLC0415
 
-        ctx = build_academic_period_sabana_context(group=group, period=period)
-        return render_to_string("students/reports/academic_period_sabana_pdf.html", ctx)
-
-    if job.report_type == ReportJob.ReportType.DISCIPLINE_CASE_ACTA:
-        from discipline.models import DisciplineCase  # noqa: PLC0415
-
-        case_id = (job.params or {}).get("case_id")
-        case = DisciplineCase.objects.get(id=case_id)
-        ctx = build_case_acta_context(case=case, generated_by=job.created_by)
-        return render_to_string("discipline/case_acta.html", ctx)
-
-    if job.report_type == ReportJob.ReportType.ACADEMIC_COMMISSION_ACTA:
-        from academic.models import CommissionStudentDecision  # noqa: PLC0415
-
-        decision_id = (job.params or {}).get("decision_id")
-        decision = (
-            CommissionStudentDecision.objects.select_related(
-                "commission",
-                "commission__period",
-                "commission__academic_year",
-                "enrollment",
-                "enrollment__student",
-                "enrollment__student__user",
-                "enrollment__grade",
-                "enrollment__group",
-                "enrollment__group__director",
-                "enrollment__campus",
-                "enrollment__campus__institution",
-                "commitment_acta",
-            )
-            .get(id=decision_id)
-        )
-        ctx = build_commitment_acta_context(decision=decision, generated_by=job.created_by)
-        return render_to_string("academic/reports/commission_commitment_acta.html", ctx)
+    group_id = (job.params or {}).get("group_id")
+    cols = int((job.params or {}).get("columns") or 24)
+    cols = max(1, min(cols, 40))
+    group = Group.objects.select_related("grade", "academic_year", "director").get(id=group_id)
+    ctx = build_attendance_manual_sheet_context(group=group, user=job.created_by, columns=cols)
+    return "attendance/reports/attendance_manual_sheet_pdf.html", ctx
 
-    if job.report_type == ReportJob.ReportType.ACADEMIC_COMMISSION_GROUP_ACTA:
-        from academic.models import Commission  # noqa: PLC0415
 
-        commission_id = (job.params or {}).get("commission_id")
-        commission = (
-            Commission.objects.select_related("institution", "academic_year", "period", "group", "group__grade", "group__director")
-            .get(id=commission_id)
-        )
-        ai_blocks = _resolve_group_acta_ai_blocks_for_job(commission=commission)
-        ctx = build_commission_group_acta_context(
-            commission=commission,
-            generated_by=job.created_by,
-            ai_blocks=ai_blocks,
-        )
-        return render_to_string("academic/reports/commission_group_acta.html", ctx)
+def _enrollment_list_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    params = job.params or {}
+    year_id = params.get("year_id")
+    grade_id = params.get("grade_id")
+    group_id = params.get("group_id")
+    ctx = build_enrollment_list_report_context(
+        year_id=int(year_id) if year_id not in (None, "") else None,
+        grade_id=int(grade_id) if grade_id not in (None, "") else None,
+        group_id=int(group_id) if group_id not in (None, "") else None,
+    )
+    return "students/reports/enrollment_list_pdf.html", ctx
 
-    if job.report_type == ReportJob.ReportType.ATTENDANCE_MANUAL_SHEET:
-        from academic.models import Group  # noqa: PLC0415
 
-        group_id = (job.params or {}).get("group_id")
-        cols = int((job.params or {}).get("columns") or 24)
-        cols = max(1, min(cols, 40))
-        group = Group.objects.select_related("grade", "academic_year", "director").get(id=group_id)
-        ctx = build_attendance_manual_sheet_context(group=group, user=job.created_by, columns=cols)
-        return render_to_string("attendance/reports/attendance_manual_sheet_pdf.html", ctx)
+def _family_directory_by_group_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    ctx = build_family_directory_by_group_report_context()
+    return "students/reports/family_directory_by_group_pdf.html", ctx
 
-    if job.report_type == ReportJob.ReportType.ENROLLMENT_LIST:
-        params = job.params or {}
-        year_id = params.get("year_id")
-        grade_id = params.get("grade_id")
-        group_id = params.get("group_id")
-        ctx = build_enrollment_list_report_context(
-            year_id=int(year_id) if year_id not in (None, "") else None,
-            grade_id=int(grade_id) if grade_id not in (None, "") else None,
-            group_id=int(group_id) if group_id not in (None, "") else None,
-        )
-        return render_to_string("students/reports/enrollment_list_pdf.html", ctx)
 
-    if job.report_type == ReportJob.ReportType.FAMILY_DIRECTORY_BY_GROUP:
-        ctx = build_family_directory_by_group_report_context()
-        return render_to_string("students/reports/family_directory_by_group_pdf.html", ctx)
+def _grade_report_sheet_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    from academic.models import Group  # noqa: PLC0415
 
-    if job.report_type == ReportJob.ReportType.GRADE_REPORT_SHEET:
-        from academic.models import Group  # noqa: PLC0415
+    params = job.params or {}
+    group_id = params.get("group_id")
+    period_id = params.get("period_id")
+    columns = int(params.get("columns") or 3)
+    subject_name = str(params.get("subject_name") or "")
+    teacher_name = str(params.get("teacher_name") or "")
+
+    group = Group.objects.select_related("grade", "academic_year", "director").get(id=group_id)
+    ctx = build_grade_report_sheet_context(
+        group=group,
+        user=job.created_by,
+        columns=columns,
+        period_id=int(period_id) if period_id not in (None, "") else None,
+        subject_name=subject_name,
+        teacher_name=teacher_name,
+    )
+    return "academic/reports/grade_report_sheet_pdf.html", ctx
 
-        params = job.params or {}
-        group_id = params.get("group_id")
-        period_id = params.get("period_id")
-        columns = int(params.get("columns") or 3)
-        subject_name = str(params.get("subject_name") or "")
-        teacher_name = str(params.get("teacher_name") or "")
-
-        group = Group.objects.select_related("grade", "academic_year", "director").get(id=group_id)
-        ctx = build_grade_report_sheet_context(
-            group=group,
-            user=job.created_by,
-            columns=columns,
-            period_id=int(period_id) if period_id not in (None, "") else None,
-            subject_name=subject_name,
-            teacher_name=teacher_name,
-        )
-        return render_to_string("academic/reports/grade_report_sheet_pdf.html", ctx)
 
-    if job.report_type == ReportJob.ReportType.TEACHER_STATISTICS_AI:
-        from core.models import Institution  # noqa: PLC0415
+def _teacher_statistics_ai_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    from core.models import Institution  # noqa: PLC0415
 
-        params = job.params or {}
-        institution = Institution.objects.first() or Institution(name="")
+    params = job.params or {}
+    institution = Institution.objects.first() or Institution(name="")
 
-        return render_to_string(
-            "teachers/reports/teacher_statistics_ai_pdf.html",
-            {
-                "institution": institution,
-                "year_name": str(params.get("year_name") or ""),
-                "period_name": str(params.get("period_name") or ""),
-                "grade_name": str(params.get("grade_name") or ""),
-                "group_name": str(params.get("group_name") or ""),
-                "report_date": str(params.get("report_date") or ""),
-                "teacher_name": str(params.get("teacher_name") or ""),
-                "analysis_html": str(params.get("analysis_html") or ""),
-            },
-        )
+    return (
+        "teachers/reports/teacher_statistics_ai_pdf.html",
+        {
+            "institution": institution,
+            "year_name": str(params.get("year_name") or ""),
+            "period_name": str(params.get("period_name") or ""),
+            "grade_name": str(params.get("grade_name") or ""),
+            "group_name": str(params.get("group_name") or ""),
+            "report_date": str(params.get("report_date") or ""),
+            "teacher_name": str(params.get("teacher_name") or ""),
+            "analysis_html": str(params.get("analysis_html") or ""),
+        },
+    )
 
-    if job.report_type == ReportJob.ReportType.CLASS_PLAN:
-        from academic.models import ClassPlan  # noqa: PLC0415
-        from core.models import Institution  # noqa: PLC0415
 
-        params = job.params or {}
-        plan_id = params.get("class_plan_id")
-        if not plan_id:
-            raise ValueError("class_plan_id is required")
-
-        plan = ClassPlan.objects.select_related(
-            "period",
-            "topic",
-            "teacher_assignment",
-            "teacher_assignment__teacher",
-            "teacher_assignment__group",
-            "teacher_assignment__group__grade",
-            "teacher_assignment__academic_load",
-            "teacher_assignment__academic_load__subject",
-            "teacher_assignment__academic_load__subject__area",
-        ).get(id=plan_id)
-
-        institution = Institution.objects.first() or Institution(name="")
-        return render_to_string(
-            "academic/reports/class_plan_pdf.html",
-            _build_class_plan_pdf_context(institution=institution, plan=plan),
-        )
+def _class_plan_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    from academic.models import ClassPlan  # noqa: PLC0415
+    from core.models import Institution  # noqa: PLC0415
 
-    if job.report_type == ReportJob.ReportType.STUDY_CERTIFICATION:
-        from core.models import Institution  # noqa: PLC0415
+    params = job.params or {}
+    plan_id = params.get("class_plan_id")
+    if not plan_id:
+        raise ValueError("class_plan_id is required")
+
+    plan = ClassPlan.objects.select_related(
+        "period",
+        "topic",
+        "teacher_assignment",
+        "teacher_assignment__teacher",
+        "teacher_assignment__group",
+        "teacher_assignment__group__grade",
+        "teacher_assignment__academic_load",
+        "teacher_assignment__academic_load__subject",
+        "teacher_assignment__academic_load__subject__area",
+    ).get(id=plan_id)
+
+    institution = Institution.objects.first() or Institution(name="")
+    return (
+        "academic/reports/class_plan_pdf.html",
+        _build_class_plan_pdf_context(institution=institution, plan=plan),
+    )
 
-        params = job.params or {}
-        enrollment_id = params.get("enrollment_id")
-        enrollment = Enrollment.objects.select_related(
-            "student",
-            "student__user",
-            "grade",
-            "group",
-            "academic_year",
-            "campus",
-        ).get(id=enrollment_id)
 
-        institution = Institution.objects.first() or Institution(name="")
-        student = enrollment.student
-        student_user = student.user
-        campus = enrollment.campus
+def _study_certification_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    from core.models import Institution  # noqa: PLC0415
 
+    params = job.params or {}
+    enrollment_id = params.get("enrollment_id")
+    enrollment = Enrollment.objects.select_related(
+        "student",
+        "student__user",
+        "grade",
+        "group",
+        "academic_year",
+        "campus",
+    ).get(id=enrollment_id)
+
+    institution = Institution.objects.first() or Institution(name="")
+    student = enrollment.student
+    student_user = student.user
+    campus = enrollment.campus
+
+    signer_name = ""
+    try:
+        if getattr(institution, "rector_id", None):
+            signer_name = institution.rector.get_full_name()  # type: ignore[union-attr]
+    except Exception:
         signer_name = ""
-        try:
-            if getattr(institution, "rector_id", None):
-                signer_name = institution.rector.get_full_name()  # type: ignore[union-attr]
-        except Exception:
-            signer_name = ""
 
-        from verification.models import VerifiableDocument  # noqa: PLC0415
-        from verification.services import build_public_verify_url, get_or_create_for_report_job  # noqa: PLC0415
+    from verification.models import VerifiableDocument  # noqa: PLC0415
+    from verification.services import build_public_verify_url, get_or_create_for_report_job  # noqa: PLC0415
 
-        ctx = {
-            "institution": institution,
-            "student_full_name": student_user.get_full_name(),
-            "document_type": student.document_type or "Documento",
-            "document_number": student.document_number or "",
-            "grade_name": getattr(enrollment.grade, "name", "") or str(enrollment.grade),
-            "group_name": getattr(enrollment.group, "name", "") if enrollment.group else "",
-            "academic_year": getattr(enrollment.academic_year, "year", "") or str(enrollment.academic_year),
-            "issue_date": date.today(),
-            "place": (getattr(campus, "municipality", "") or "").strip() if campus else "",
-            "signer_name": signer_name,
-            "signer_role": "Rector(a)",
-        }
+    ctx = {
+        "institution": institution,
+        "student_full_name": student_user.get_full_name(),
+        "document_type": student.document_type or "Documento",
+        "document_number": student.document_number or "",
+        "grade_name": getattr(enrollment.grade, "name", "") or str(enrollment.grade),
+        "group_name": getattr(enrollment.group, "name", "") if enrollment.group else "",
+        "academic_year": getattr(enrollment.academic_year, "year", "") or str(enrollment.academic_year),
+        "issue_date": date.today(),
+        "place": (getattr(campus, "municipality", "") or "").strip() if campus else "",
+        "signer_name": signer_name,
+        "signer_role": "Rector(a)",
+    }
 
-        vdoc = get_or_create_for_report_job(
-            job_id=job.id,
-            doc_type=VerifiableDocument.DocType.STUDY_CERTIFICATION,
-            public_payload={
-                "title": f"Certificación académica: {ctx.get('student_full_name','').strip()} - {ctx.get('academic_year','')}",
-                "student_full_name": ctx.get("student_full_name", ""),
-                "document_number": ctx.get("document_number", ""),
-                "grade_name": ctx.get("grade_name", ""),
-                "group_name": ctx.get("group_name", ""),
-                "academic_year": ctx.get("academic_year", ""),
-            },
-        )
-        verify_url = _coerce_public_absolute_url(job, build_public_verify_url(vdoc.token))
+    vdoc = get_or_create_for_report_job(
+        job_id=job.id,
+        doc_type=VerifiableDocument.DocType.STUDY_CERTIFICATION,
+        public_payload={
+            "title": f"Certificación académica: {ctx.get('student_full_name','').strip()} - {ctx.get('academic_year','')}",
+            "student_full_name": ctx.get("student_full_name", ""),
+            "document_number": ctx.get("document_number", ""),
+            "grade_name": ctx.get("grade_name", ""),
+            "group_name": ctx.get("group_name", ""),
+            "academic_year": ctx.get("academic_year", ""),
+        },
+    )
+    verify_url = _coerce_public_absolute_url(job, build_public_verify_url(vdoc.token))
+    verify_url_prefix = ""
+    try:
+        marker = f"{vdoc.token}/"
+        if verify_url and marker in verify_url:
+            verify_url_prefix = verify_url.split(marker)[0].rstrip("/") + "/"
+    except Exception:
         verify_url_prefix = ""
-        try:
-            marker = f"{vdoc.token}/"
-            if verify_url and marker in verify_url:
-                verify_url_prefix = verify_url.split(marker)[0].rstrip("/") + "/"
-        except Exception:
-            verify_url_prefix = ""
-        ctx["verify_url"] = verify_url
-        ctx["verify_token"] = vdoc.token
-        ctx["verify_url_prefix"] = verify_url_prefix
-        ctx["qr_image_src"] = _qr_png_data_uri(verify_url) if verify_url else ""
-        return render_to_string("students/reports/study_certification_pdf.html", ctx)
+    ctx["verify_url"] = verify_url
+    ctx["verify_token"] = vdoc.token
+    ctx["verify_url_prefix"] = verify_url_prefix
+    ctx["qr_image_src"] = _qr_png_data_uri(verify_url) if verify_url else ""
+    return "students/reports/study_certification_pdf.html", ctx
 
-    if job.report_type == ReportJob.ReportType.OBSERVER_REPORT:
-        from core.models import Institution  # noqa: PLC0415
-        from students.models import Student, FamilyMember, ObserverAnnotation  # noqa: PLC0415
 
-        params = job.params or {}
-        student_id = params.get("student_id")
-        student = Student.objects.select_related("user").get(pk=student_id)
-
-        # Prefer active enrollment to resolve campus/institution.
-        current_enrollment = (
-            Enrollment.objects.select_related(
-                "academic_year",
-                "grade",
-                "group",
-                "campus",
-                "campus__institution",
-            )
-            .filter(student=student, status="ACTIVE")
-            .order_by("-academic_year__year", "-id")
-            .first()
-        )
-        campus = getattr(current_enrollment, "campus", None) if current_enrollment else None
-        institution = getattr(campus, "institution", None) if campus else None
-        if institution is None:
-            institution = Institution.objects.first() or Institution()
+def _observer_report_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    from core.models import Institution  # noqa: PLC0415
+    from students.models import Student, FamilyMember, ObserverAnnotation  # noqa: PLC0415
 
-        user = job.created_by
-        role = getattr(user, "role", None)
+    params = job.params or {}
+    student_id = params.get("student_id")
+    student = Student.objects.select_related("user").get(pk=student_id)
 
-        # Families/enrollments.
-        family_members = list(
-            FamilyMember.objects.filter(student=student).select_related("user").order_by("-is_main_guardian", "id")
-        )
-        enrollments = list(
-            Enrollment.objects.select_related("academic_year", "grade", "group", "campus")
-            .filter(student=student)
-            .order_by("-academic_year__year", "-id")
+    # Prefer active enrollment to resolve campus/institution.
+    current_enrollment = (
+        Enrollment.objects.select_related(
+            "academic_year",
+            "grade",
+            "group",
+            "campus",
+            "campus__institution",
         )
+        .filter(student=student, status="ACTIVE")
+        .order_by("-academic_year__year", "-id")
+        .first()
+    )
+    campus = getattr(current_enrollment, "campus", None) if current_enrollment else None
+    institution = getattr(campus, "institution", None) if campus else None
+    if institution is None:
+        institution = Institution.objects.first() or Institution()
 
-        # Disciplina: match the visibility rules from students.views.StudentViewSet.observer_report.
-        from discipline.models import DisciplineCase  # noqa: PLC0415
-        from academic.models import AcademicYear, Group, TeacherAssignment  # noqa: PLC0415
-
-        cases_qs = (
-            DisciplineCase.objects.select_related(
-                "enrollment",
-                "enrollment__academic_year",
-                "enrollment__grade",
-                "enrollment__group",
-                "created_by",
-            )
-            .prefetch_related("events")
-            .filter(student=student)
-            .order_by("-occurred_at", "-id")
+    user = job.created_by
+    role = getattr(user, "role", None)
+
+    # Families/enrollments.
+    family_members = list(
+        FamilyMember.objects.filter(student=student).select_related("user").order_by("-is_main_guardian", "id")
+    )
+    enrollments = list(
+        Enrollment.objects.select_related("academic_year", "grade", "group", "campus")
+        .filter(student=student)
+        .order_by("-academic_year__year", "-id")
+    )
+
+    # Disciplina: match the visibility rules from students.views.StudentViewSet.observer_report.
+    from discipline.models import DisciplineCase  # noqa: PLC0415
+    from academic.models import AcademicYear, Group, TeacherAssignment  # noqa: PLC0415
+
+    cases_qs = (
+        DisciplineCase.objects.select_related(
+            "enrollment",
+            "enrollment__academic_year",
+            "enrollment__grade",
+            "enrollment__group",
+            "created_by",
         )
+        .prefetch_related("events")
+        .filter(student=student)
+        .order_by("-occurred_at", "-id")
+    )
 
-        if role == "TEACHER":
-            active_year = AcademicYear.objects.filter(status="ACTIVE").first()
-            directed_groups = Group.objects.filter(director=user)
-            if active_year:
-                directed_groups = directed_groups.filter(academic_year=active_year)
+    if role == "TEACHER":
+        active_year = AcademicYear.objects.filter(status="ACTIVE").first()
+        directed_groups = Group.objects.filter(director=user)
+        if active_year:
+            directed_groups = directed_groups.filter(academic_year=active_year)
 
-            if active_year:
-                assigned_group_ids = set(
-                    TeacherAssignment.objects.filter(teacher=user, academic_year=active_year).values_list(
-                        "group_id", flat=True
-                    )
+        if active_year:
+            assigned_group_ids = set(
+                TeacherAssignment.objects.filter(teacher=user, academic_year=active_year).values_list(
+                    "group_id", flat=True
                 )
-            else:
-                assigned_group_ids = set(TeacherAssignment.objects.filter(teacher=user).values_list("group_id", flat=True))
+            )
+        else:
+            assigned_group_ids = set(TeacherAssignment.objects.filter(teacher=user).values_list("group_id", flat=True))
 
-            allowed_group_ids = set(directed_groups.values_list("id", flat=True)) | assigned_group_ids
-            if not allowed_group_ids:
-                cases_qs = cases_qs.none()
-            else:
-                cases_qs = cases_qs.filter(enrollment__group_id__in=allowed_group_ids).distinct()
-        elif role in {"ADMIN", "SUPERADMIN", "COORDINATOR", "SECRETARY"}:
-            cases_qs = cases_qs
-        elif role == "PARENT":
-            is_guardian = FamilyMember.objects.filter(student=student, user=user).exists()
-            if not is_guardian:
-                cases_qs = cases_qs.none()
-        elif role == "STUDENT":
-            if getattr(student, "user_id", None) != getattr(user, "id", None):
-                cases_qs = cases_qs.none()
+        allowed_group_ids = set(directed_groups.values_list("id", flat=True)) | assigned_group_ids
+        if not allowed_group_ids:
+            cases_qs = cases_qs.none()
         else:
+            cases_qs = cases_qs.filter(enrollment__group_id__in=allowed_group_ids).distinct()
+    elif role in {"ADMIN", "SUPERADMIN", "COORDINATOR", "SECRETARY"}:
+        cases_qs = cases_qs
+    elif role == "PARENT":
+        is_guardian = FamilyMember.objects.filter(student=student, user=user).exists()
+        if not is_guardian:
+            cases_qs = cases_qs.none()
+    elif role == "STUDENT":
+        if getattr(student, "user_id", None) != getattr(user, "id", None):
             cases_qs = cases_qs.none()
+    else:
+        cases_qs = cases_qs.none()
 
-        def _full_name(u) -> str:
-            try:
-                return u.get_full_name() or getattr(u, "username", "") or ""
-            except Exception:
-                return ""
-
-        def _dt(value):
-            return value or None
-
-        def _discipline_severity_meta(manual_severity: str | None):
-            sev = (manual_severity or "MINOR").strip().upper()
-            if sev == "VERY_MAJOR":
-                return {
-                    "label": "Llamado de Atención (Gravísima)",
-                    "badge_bg": "#fee2e2",
-                    "badge_text": "#b91c1c",
-                    "border": "#ef4444",
-                }
-            if sev == "MAJOR":
-                return {
-                    "label": "Llamado de Atención (Grave)",
-                    "badge_bg": "#fee2e2",
-                    "badge_text": "#b91c1c",
-                    "border": "#ef4444",
-                }
+    def _full_name(u) -> str:
+        try:
+            return u.get_full_name() or getattr(u, "username", "") or ""
+        except Exception:
+            return ""
+
+    def _dt(value):
+        return value or None
+
+    def _discipline_severity_meta(manual_severity: str | None):
+        sev = (manual_severity or "MINOR").strip().upper()
+        if sev == "VERY_MAJOR":
+            return {
+                "label": "Llamado de Atención (Gravísima)",
+                "badge_bg": "#fee2e2",
+                "badge_text": "#b91c1c",
+                "border": "#ef4444",
+            }
+        if sev == "MAJOR":
             return {
-                "label": "Llamado de Atención (Leve)",
-                "badge_bg": "#fef3c7",
-                "badge_text": "#92400e",
-                "border": "#eab308",
+                "label": "Llamado de Atención (Grave)",
+                "badge_bg": "#fee2e2",
+                "badge_text": "#b91c1c",
+                "border": "#ef4444",
             }
+        return {
+            "label": "Llamado de Atención (Leve)",
+            "badge_bg": "#fef3c7",
+            "badge_text": "#92400e",
+            "border": "#eab308",
+        }
 
-        def _annotation_meta(annotation_type: str | None):
-            t = (annotation_type or "OBSERVATION").strip().upper()
-            if t == "ALERT":
-                return {
-                    "label": "Anotación (Alerta)",
-                    "badge_bg": "#fee2e2",
-                    "badge_text": "#b91c1c",
-                    "border": "#ef4444",
-                }
-            if t == "PRAISE":
-                return {
-                    "label": "Anotación (Felicitación)",
-                    "badge_bg": "#dcfce7",
-                    "badge_text": "#166534",
-                    "border": "#22c55e",
-                }
-            if t == "COMMITMENT":
-                return {
-                    "label": "Anotación (Compromiso)",
-                    "badge_bg": "#e0f2fe",
-                    "badge_text": "#075985",
-                    "border": "#0ea5e9",
-                }
+    def _annotation_meta(annotation_type: str | None):
+        t = (annotation_type or "OBSERVATION").strip().upper()
+        if t == "ALERT":
+            return {
+                "label": "Anotación (Alerta)",
+                "badge_bg": "#fee2e2",
+                "badge_text": "#b91c1c",
+                "border": "#ef4444",
+            }
+        if t == "PRAISE":
+            return {
+                "label": "Anotación (Felicitación)",
+                "badge_bg": "#dcfce7",
+                "badge_text": "#166534",
+                "border": "#22c55e",
+            }
+        if t == "COMMITMENT":
             return {
-                "label": "Anotación",
-                "badge_bg": "#fef3c7",
-                "badge_text": "#92400e",
-                "border": "#eab308",
+                "label": "Anotación (Compromiso)",
+                "badge_bg": "#e0f2fe",
+                "badge_text": "#075985",
+                "border": "#0ea5e9",
             }
+        return {
+            "label": "Anotación",
+            "badge_bg": "#fef3c7",
+            "badge_text": "#92400e",
+            "border": "#eab308",
+        }
 
-        discipline_entries = []
-        for case in list(cases_qs):
-            enrollment = getattr(case, "enrollment", None)
-            academic_year = None
-            grade_name = ""
-            group_name = ""
-            try:
-                academic_year = getattr(getattr(enrollment, "academic_year", None), "year", None)
-                grade_name = getattr(getattr(enrollment, "grade", None), "name", "") or ""
-                group_name = getattr(getattr(enrollment, "group", None), "name", "") or ""
-            except Exception:
-                pass
-
-            events_out = []
-            try:
-                for ev in list(case.events.all()):
-                    event_type_label = ""
-                    try:
-                        event_type_label = ev.get_event_type_display()  # type: ignore[attr-defined]
-                    except Exception:
-                        event_type_label = ev.event_type
-
-                    events_out.append(
-                        {
-                            "id": ev.id,
-                            "event_type": ev.event_type,
-                            "event_type_label": event_type_label,
-                            "text": ev.text,
-                            "created_at": _dt(ev.created_at),
-                            "created_by_name": _full_name(getattr(ev, "created_by", None)),
-                        }
-                    )
-            except Exception:
-                events_out = []
+    discipline_entries = []
+    for case in list(cases_qs):
+        enrollment = getattr(case, "enrollment", None)
+        academic_year = None
+        grade_name = ""
+        group_name = ""
+        try:
+            academic_year = getattr(getattr(enrollment, "academic_year", None), "year", None)
+            grade_name = getattr(getattr(enrollment, "grade", None), "name", "") or ""
+            group_name = getattr(getattr(enrollment, "group", None), "name", "") or ""
+        except Exception:
+            pass
 
-            discipline_entries.append(
-                {
-                    "id": case.id,
-                    "occurred_at": _dt(case.occurred_at),
-                    "location": case.location,
-                    "manual_severity": case.manual_severity,
-                    "severity": _discipline_severity_meta(getattr(case, "manual_severity", None)),
-                    "law_1620_type": case.law_1620_type,
-                    "status": case.status,
-                    "academic_year": academic_year,
-                    "grade_name": grade_name,
-                    "group_name": group_name,
-                    "narrative": case.narrative,
-                    "decision_text": case.decision_text,
-                    "created_by_name": _full_name(getattr(case, "created_by", None)),
-                    "created_at": _dt(case.created_at),
-                    "events": events_out,
-                }
-            )
+        events_out = []
+        try:
+            for ev in list(case.events.all()):
+                event_type_label = ""
+                try:
+                    event_type_label = ev.get_event_type_display()  # type: ignore[attr-defined]
+                except Exception:
+                    event_type_label = ev.event_type
 
-        observer_number = f"{getattr(student, 'pk', 0):010d}"
-        observer_number_display = str(getattr(student, "pk", "") or "")
-        student_user = student.user
-        student_full_name = (student_user.get_full_name() or "").strip()
+                events_out.append(
+                    {
+                        "id": ev.id,
+                        "event_type": ev.event_type,
+                        "event_type_label": event_type_label,
+                        "text": ev.text,
+                        "created_at": _dt(ev.created_at),
+                        "created_by_name": _full_name(getattr(ev, "created_by", None)),
+                    }
+                )
+        except Exception:
+            events_out = []
 
-        # Observer annotations.
-        annotations_qs = (
-            ObserverAnnotation.objects.select_related("period", "period__academic_year", "created_by", "updated_by")
-            .filter(student=student, is_deleted=False)
-            .order_by("-created_at", "-id")
+        discipline_entries.append(
+            {
+                "id": case.id,
+                "occurred_at": _dt(case.occurred_at),
+                "location": case.location,
+                "manual_severity": case.manual_severity,
+                "severity": _discipline_severity_meta(getattr(case, "manual_severity", None)),
+                "law_1620_type": case.law_1620_type,
+                "status": case.status,
+                "academic_year": academic_year,
+                "grade_name": grade_name,
+                "group_name": group_name,
+                "narrative": case.narrative,
+                "decision_text": case.decision_text,
+                "created_by_name": _full_name(getattr(case, "created_by", None)),
+                "created_at": _dt(case.created_at),
+                "events": events_out,
+            }
         )
-        if role == "PARENT" and not FamilyMember.objects.filter(student=student, user=user).exists():
-            annotations_qs = annotations_qs.none()
-        if role == "STUDENT" and getattr(student, "user_id", None) != getattr(user, "id", None):
-            annotations_qs = annotations_qs.none()
-
-        observer_annotations = []
-        for a in list(annotations_qs):
-            period = getattr(a, "period", None)
-            annotation_type_label = ""
-            try:
-                annotation_type_label = a.get_annotation_type_display()  # type: ignore[attr-defined]
-            except Exception:
-                annotation_type_label = str(a.annotation_type or "")
-
-            observer_annotations.append(
-                {
-                    "id": a.id,
-                    "period": {
-                        "id": a.period_id,
-                        "name": getattr(period, "name", "") if period else "",
-                        "academic_year": getattr(getattr(period, "academic_year", None), "year", None) if period else None,
-                        "is_closed": bool(getattr(period, "is_closed", False)) if period else False,
-                    }
-                    if a.period_id
-                    else None,
-                    "annotation_type": a.annotation_type,
-                    "annotation_type_label": annotation_type_label,
-                    "meta": _annotation_meta(getattr(a, "annotation_type", None)),
-                    "title": a.title,
-                    "text": a.text,
-                    "commitments": a.commitments,
-                    "commitment_due_date": _dt(a.commitment_due_date),
-                    "commitment_responsible": a.commitment_responsible,
-                    "is_automatic": bool(a.is_automatic),
-                    "created_at": _dt(a.created_at),
-                    "updated_at": _dt(a.updated_at),
-                    "created_by_name": _full_name(getattr(a, "created_by", None)),
-                    "updated_by_name": _full_name(getattr(a, "updated_by", None)),
-                }
-            )
 
-        # Build the same merged timeline used by the web preview.
-        timeline = []
-        for entry in discipline_entries:
-            ts = entry.get("occurred_at") or entry.get("created_at")
-            timeline.append({"kind": "discipline", "ts": ts, "entry": entry})
-        for ann in observer_annotations:
-            ts = ann.get("created_at")
-            timeline.append({"kind": "observer_annotation", "ts": ts, "annotation": ann})
-        timeline.sort(key=lambda r: (r.get("ts") is not None, r.get("ts")), reverse=True)
+    observer_number = f"{getattr(student, 'pk', 0):010d}"
+    observer_number_display = str(getattr(student, "pk", "") or "")
+    student_user = student.user
+    student_full_name = (student_user.get_full_name() or "").strip()
 
-        academic_year_label = ""
+    # Observer annotations.
+    annotations_qs = (
+        ObserverAnnotation.objects.select_related("period", "period__academic_year", "created_by", "updated_by")
+        .filter(student=student, is_deleted=False)
+        .order_by("-created_at", "-id")
+    )
+    if role == "PARENT" and not FamilyMember.objects.filter(student=student, user=user).exists():
+        annotations_qs = annotations_qs.none()
+    if role == "STUDENT" and getattr(student, "user_id", None) != getattr(user, "id", None):
+        annotations_qs = annotations_qs.none()
+
+    observer_annotations = []
+    for a in list(annotations_qs):
+        period = getattr(a, "period", None)
+        annotation_type_label = ""
         try:
-            if current_enrollment and getattr(getattr(current_enrollment, "academic_year", None), "year", None):
-                academic_year_label = str(current_enrollment.academic_year.year)
+            annotation_type_label = a.get_annotation_type_display()  # type: ignore[attr-defined]
         except Exception:
-            academic_year_label = ""
-
-        from verification.models import VerifiableDocument  # noqa: PLC0415
-        from verification.services import build_public_verify_url, get_or_create_for_report_job  # noqa: PLC0415
-
-        vdoc = get_or_create_for_report_job(
-            job_id=job.id,
-            doc_type=VerifiableDocument.DocType.OBSERVER_REPORT,
-            public_payload={
-                "title": f"Observador del estudiante: {student_full_name}",
-                "student_full_name": student_full_name,
-                "document_number": getattr(student, "document_number", "") or "",
-                "observer_number": observer_number,
-                "academic_year": academic_year_label,
-            },
+            annotation_type_label = str(a.annotation_type or "")
+
+        observer_annotations.append(
+            {
+                "id": a.id,
+                "period": {
+                    "id": a.period_id,
+                    "name": getattr(period, "name", "") if period else "",
+                    "academic_year": getattr(getattr(period, "academic_year", None), "year", None) if period else None,
+                    "is_closed": bool(getattr(period, "is_closed", False)) if period else False,
+                }
+                if a.period_id
+                else None,
+                "annotation_type": a.annotation_type,
+                "annotation_type_label": annotation_type_label,
+                "meta": _annotation_meta(getattr(a, "annotation_type", None)),
+                "title": a.title,
+                "text": a.text,
+                "commitments": a.commitments,
+                "commitment_due_date": _dt(a.commitment_due_date),
+                "commitment_responsible": a.commitment_responsible,
+                "is_automatic": bool(a.is_automatic),
+                "created_at": _dt(a.created_at),
+                "updated_at": _dt(a.updated_at),
+                "created_by_name": _full_name(getattr(a, "created_by", None)),
+                "updated_by_name": _full_name(getattr(a, "updated_by", None)),
+            }
         )
-        verify_url = _coerce_public_absolute_url(job, build_public_verify_url(vdoc.token))
+
+    # Build the same merged timeline used by the web preview.
+    timeline = []
+    for entry in discipline_entries:
+        ts = entry.get("occurred_at") or entry.get("created_at")
+        timeline.append({"kind": "discipline", "ts": ts, "entry": entry})
+    for ann in observer_annotations:
+        ts = ann.get("created_at")
+        timeline.append({"kind": "observer_annotation", "ts": ts, "annotation": ann})
+    timeline.sort(key=lambda r: (r.get("ts") is not None, r.get("ts")), reverse=True)
+
+    academic_year_label = ""
+    try:
+        if current_enrollment and getattr(getattr(current_enrollment, "academic_year", None), "year", None):
+            academic_year_label = str(current_enrollment.academic_year.year)
+    except Exception:
+        academic_year_label = ""
+
+    from verification.models import VerifiableDocument  # noqa: PLC0415
+    from verification.services import build_public_verify_url, get_or_create_for_report_job  # noqa: PLC0415
+
+    vdoc = get_or_create_for_report_job(
+        job_id=job.id,
+        doc_type=VerifiableDocument.DocType.OBSERVER_REPORT,
+        public_payload={
+            "title": f"Observador del estudiante: {student_full_name}",
+            "student_full_name": student_full_name,
+            "document_number": getattr(student, "document_number", "") or "",
+            "observer_number": observer_number,
+            "academic_year": academic_year_label,
+        },
+    )
+    verify_url = _coerce_public_absolute_url(job, build_public_verify_url(vdoc.token))
+    verify_url_prefix = ""
+    try:
+        marker = f"{vdoc.token}/"
+        if verify_url and marker in verify_url:
+            verify_url_prefix = verify_url.split(marker)[0].rstrip("/") + "/"
+    except Exception:
         verify_url_prefix = ""
-        try:
-            marker = f"{vdoc.token}/"
-            if verify_url and marker in verify_url:
-                verify_url_prefix = verify_url.split(marker)[0].rstrip("/") + "/"
-        except Exception:
-            verify_url_prefix = ""
 
+    logo_url = None
+    try:
+        if getattr(institution, "logo", None) and getattr(institution.logo, "url", None):
+            logo_url = institution.logo.url
+    except Exception:
         logo_url = None
-        try:
-            if getattr(institution, "logo", None) and getattr(institution.logo, "url", None):
-                logo_url = institution.logo.url
-        except Exception:
-            logo_url = None
 
+    student_photo_url = None
+    try:
+        if getattr(student, "photo", None) and getattr(student.photo, "url", None):
+            student_photo_url = student.photo.url
+    except Exception:
         student_photo_url = None
-        try:
-            if getattr(student, "photo", None) and getattr(student.photo, "url", None):
-                student_photo_url = student.photo.url
-        except Exception:
-            student_photo_url = None
 
-        header_line3 = getattr(institution, "pdf_header_line3", "") or ""
+    header_line3 = getattr(institution, "pdf_header_line3", "") or ""
+    header_line3_display = header_line3
+    try:
+        if header_line3.strip() == "DANE: 223675000297 NIT: 900003571-2":
+            header_line3_display = "ee_22367500029701@sedcordoba.gov.co"
+    except Exception:
         header_line3_display = header_line3
+
+    ctx = {
+        "generated_at": datetime.now(),
+        "observer_number": observer_number,
+        "observer_number_display": observer_number_display,
+        "institution": {
+            "name": getattr(institution, "name", "") or "",
+            "dane_code": getattr(institution, "dane_code", "") or "",
+            "nit": getattr(institution, "nit", "") or "",
+            "pdf_header_line1": getattr(institution, "pdf_header_line1", "") or "",
+            "pdf_header_line2": getattr(institution, "pdf_header_line2", "") or "",
+            "pdf_header_line3": header_line3,
+            "pdf_header_line3_display": header_line3_display,
+            "logo_url": logo_url,
+        },
+        "campus": {
+            "name": getattr(campus, "name", "") if campus else "",
+            "municipality": getattr(campus, "municipality", "") if campus else "",
+        },
+        "student": {
+            "id": student.pk,
+            "full_name": student_full_name,
+            "first_name": getattr(student_user, "first_name", "") or "",
+            "last_name": getattr(student_user, "last_name", "") or "",
+            "document_type": getattr(student, "document_type", "") or "",
+            "document_number": getattr(student, "document_number", "") or "",
+            "birth_date": _dt(getattr(student, "birth_date", None)),
+            "place_of_issue": getattr(student, "place_of_issue", "") or "",
+            "neighborhood": getattr(student, "neighborhood", "") or "",
+            "address": getattr(student, "address", "") or "",
+            "blood_type": getattr(student, "blood_type", "") or "",
+            "stratum": getattr(student, "stratum", "") or "",
+            "sisben_score": getattr(student, "sisben_score", "") or "",
+            "photo_url": student_photo_url,
+        },
+        "family_members": [
+            {
+                "id": fm.id,
+                "relationship": fm.relationship,
+                "full_name": fm.full_name,
+                "document_number": fm.document_number,
+                "phone": fm.phone,
+                "email": fm.email,
+                "is_main_guardian": fm.is_main_guardian,
+            }
+            for fm in family_members
+        ],
+        "enrollments": [
+            {
+                "id": e.id,
+                "academic_year": getattr(getattr(e, "academic_year", None), "year", None),
+                "grade_name": getattr(getattr(e, "grade", None), "name", "") or "",
+                "group_name": getattr(getattr(e, "group", None), "name", "") or "",
+                "campus_name": getattr(getattr(e, "campus", None), "name", "") or "",
+                "status": e.status,
+                "status_label": (e.get_status_display() if hasattr(e, "get_status_display") else e.status),
+                "final_status": e.final_status,
+                "enrolled_at": _dt(getattr(e, "enrolled_at", None)),
+            }
+            for e in enrollments
+        ],
+        "discipline_entries": discipline_entries,
+        "observer_annotations": observer_annotations,
+        "timeline": timeline,
+        "verify_url": verify_url,
+        "verify_token": vdoc.token,
+        "verify_url_prefix": verify_url_prefix,
+        "qr_image_src": _qr_png_data_uri(verify_url) if verify_url else "",
+    }
+    return "students/reports/observer_report_pdf.html", ctx
+
+
+def _certificate_studies_document(
+    job: ReportJob, report_context: ReportGenerationContext | None = None
+) -> tuple[str, dict]:
+    from core.models import Institution  # noqa: PLC0415
+    from students.models import CertificateIssue  # noqa: PLC0415
+
+    params = job.params or {}
+    certificate_uuid = str(params.get("certificate_uuid") or "").strip()
+    verify_url = str(params.get("verify_url") or "").strip()
+    verify_token = str(params.get("verify_token") or "").strip()
+    verify_url = re.sub(r"/\s+", "/", verify_url)
+    verify_url_prefix = ""
+    try:
+        marker = f"{verify_token}/"
+        if verify_token and verify_url and marker in verify_url:
+            verify_url_prefix = verify_url.split(marker)[0].rstrip("/") + "/"
+    except Exception:
+        verify_url_prefix = ""
+
+    issue = CertificateIssue.objects.select_related("enrollment", "enrollment__grade", "enrollment__campus").get(
+        uuid=certificate_uuid
+    )
+    payload = issue.payload or {}
+    institution = Institution.objects.first() or Institution()
+
+    issue_date_raw = payload.get("issue_date")
+    issue_date: date
+    if isinstance(issue_date_raw, date):
+        issue_date = issue_date_raw
+        # datetime is also a date, but keep it as date.
+        if isinstance(issue_date_raw, datetime):
+            issue_date = issue_date_raw.date()
+    else:
         try:
-            if header_line3.strip() == "DANE: 223675000297 NIT: 900003571-2":
-                header_line3_display = "ee_22367500029701@sedcordoba.gov.co"
+            issue_date = datetime.strptime(str(issue_date_raw or ""), "%Y-%m-%d").date()
         except Exception:
-            header_line3_display = header_line3
+            issue_date = date.today()
 
-        ctx = {
-            "generated_at": datetime.now(),
-            "observer_number": observer_number,
-            "observer_number_display": observer_number_display,
-            "institution": {
-                "name": getattr(institution, "name", "") or "",
-                "dane_code": getattr(institution, "dane_code", "") or "",
-                "nit": getattr(institution, "nit", "") or "",
-                "pdf_header_line1": getattr(institution, "pdf_header_line1", "") or "",
-                "pdf_header_line2": getattr(institution, "pdf_header_line2", "") or "",
-                "pdf_header_line3": header_line3,
-                "pdf_header_line3_display": header_line3_display,
-                "logo_url": logo_url,
-            },
-            "campus": {
-                "name": getattr(campus, "name", "") if campus else "",
-                "municipality": getattr(campus, "municipality", "") if campus else "",
-            },
-            "student": {
-                "id": student.pk,
-                "full_name": student_full_name,
-                "first_name": getattr(student_user, "first_name", "") or "",
-                "last_name": getattr(student_user, "last_name", "") or "",
-                "document_type": getattr(student, "document_type", "") or "",
-                "document_number": getattr(student, "document_number", "") or "",
-                "birth_date": _dt(getattr(student, "birth_date", None)),
-                "place_of_issue": getattr(student, "place_of_issue", "") or "",
-                "neighborhood": getattr(student, "neighborhood", "") or "",
-                "address": getattr(student, "address", "") or "",
-                "blood_type": getattr(student, "blood_type", "") or "",
-                "stratum": getattr(student, "stratum", "") or "",
-                "sisben_score": getattr(student, "sisben_score", "") or "",
-                "photo_url": student_photo_url,
-            },
-            "family_members": [
-                {
-                    "id": fm.id,
-                    "relationship": fm.relationship,
-                    "full_name": fm.full_name,
-                    "document_number": fm.document_number,
-                    "phone": fm.phone,
-                    "email": fm.email,
-                    "is_main_guardian": fm.is_main_guardian,
-                }
-                for fm in family_members
-            ],
-            "enrollments": [
-                {
-                    "id": e.id,
-                    "academic_year": getattr(getattr(e, "academic_year", None), "year", None),
-                    "grade_name": getattr(getattr(e, "grade", None), "name", "") or "",
-                    "group_name": getattr(getattr(e, "group", None), "name", "") or "",
-                    "campus_name": getattr(getattr(e, "campus", None), "name", "") or "",
-                    "status": e.status,
-                    "status_label": (e.get_status_display() if hasattr(e, "get_status_display") else e.status),
-                    "final_status": e.final_status,
-                    "enrolled_at": _dt(getattr(e, "enrolled_at", None)),
-                }
-                for e in enrollments
-            ],
-            "discipline_entries": discipline_entries,
-            "observer_annotations": observer_annotations,
-            "timeline": timeline,
-            "verify_url": verify_url,
-            "verify_token": vdoc.token,
-            "verify_url_prefix": verify_url_prefix,
-            "qr_image_src": _qr_png_data_uri(verify_url) if verify_url else "",
-        }
-        return render_to_string("students/reports/observer_report_pdf.html", ctx)
+    ctx = {
+        "institution": institution,
+        "student_full_name": payload.get("student_full_name") or "",
+        "document_type": payload.get("document_type") or "Documento",
+        "document_number": payload.get("document_number") or "",
+        "academic_year": payload.get("academic_year") or "",
+        "grade_name": payload.get("grade_name") or "",
+        "academic_level": payload.get("academic_level") or "",
+        "rows": payload.get("rows") or [],
+        "conduct": payload.get("conduct") or "BUENA",
+        "final_status": payload.get("final_status") or "APROBADO",
+        "issue_date": issue_date,
+        "signer_name": payload.get("signer_name") or "",
+        "signer_role": payload.get("signer_role") or "",
+        "verify_url": verify_url,
+        "verify_token": verify_token,
+        "verify_url_prefix": verify_url_prefix,
+        "qr_image_src": _qr_png_data_uri(verify_url) if verify_url else "",
+        "seal_hash": issue.seal_hash,
+    }
+    return "students/reports/certificate_studies_pdf.html", ctx
 
-    if job.report_type == ReportJob.ReportType.CERTIFICATE_STUDIES:
-        from core.models import Institution  # noqa: PLC0415
-        from students.models import CertificateIssue  # noqa: PLC0415
 
-        params = job.params or {}
-        certificate_uuid = str(params.get("certificate_uuid") or "").strip()
-        verify_url = str(params.get("verify_url") or "").strip()
-        verify_token = str(params.get("verify_token") or "").strip()
-        verify_url = re.sub(r"/\s+", "/", verify_url)
-        verify_url_prefix = ""
+PDF_CONTENT_TYPE = "application/pdf"
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class ReportBuilder(ABC):
+    """Builds the HTML of one report type in phases.
+
+    - `load`: the bulk queries of the whole job, run once;
+    - `render`: yields standalone HTML documents of at most `units_per_document` units
+      (students, carnets...), calling `on_unit(done, total)` after each unit so the
+      runner can report progress and stop a canceled job between units;
+    - `finalize`: side effects once the PDF is stored.
+
+    `units_per_document()` returning None means the report is a single document.
+    """
+
+    def units_per_document(self) -> int | None:
+        return None
+
+    @abstractmethod
+    def load(self, job: ReportJob, *, report_context: ReportGenerationContext | None = None) -> Any: ...
+
+    @abstractmethod
+    def render(
+        self,
+        job: ReportJob,
+        data: Any,
+        *,
+        units_per_document: int | None = None,
+        on_unit: Callable[[int, int], None] | None = None,
+    ) -> Iterator[str]: ...
+
+    def output_content_type(self, job: ReportJob) -> str:
+        return PDF_CONTENT_TYPE
+
+    def write_output(self, job: ReportJob, data: Any, out_path: Path) -> None:
+        """Write a non-PDF output (see `output_content_type`) straight from the loaded data.
+
+        Only builders whose `output_content_type` can be something other than PDF
+        override it.
+        """
+
+        raise ValueError(f"{type(self).__name__} only produces PDF output (report_type: {job.report_type})")
+
+    def finalize(self, job: ReportJob, *, relpath: str, out_filename: str) -> None:
+        return None
+
+
+class TemplateReportBuilder(ReportBuilder):
+    """Single-document report: `document(job, report_context)` returns `(template_name, ctx)`."""
+
+    def __init__(self, document: Callable[..., tuple[str, dict]]):
+        self.document = document
+
+    def load(self, job: ReportJob, *, report_context: ReportGenerationContext | None = None) -> tuple[str, dict]:
+        return self.document(job, report_context)
+
+    def render(self, job, data, *, units_per_document=None, on_unit=None) -> Iterator[str]:
+        template_name, ctx = data
+        html = render_to_string(template_name, ctx)
+        if on_unit is not None:
+            on_unit(1, 1)
+        yield html
+
+
+class CertificateStudiesBuilder(TemplateReportBuilder):
+    def finalize(self, job: ReportJob, *, relpath: str, out_filename: str) -> None:
         try:
-            marker = f"{verify_token}/"
-            if verify_token and verify_url and marker in verify_url:
-                verify_url_prefix = verify_url.split(marker)[0].rstrip("/") + "/"
+            from students.models import CertificateIssue  # noqa: PLC0415
+
+            params = job.params or {}
+            cu = str(params.get("certificate_uuid") or "").strip()
+            issue = CertificateIssue.objects.filter(uuid=cu).first()
+            if issue:
+                issue.pdf_private_relpath = relpath
+                issue.pdf_private_filename = out_filename
+                issue.status = CertificateIssue.STATUS_ISSUED
+                issue.save(update_fields=["pdf_private_relpath", "pdf_private_filename", "status"])
         except Exception:
-            verify_url_prefix = ""
+            # Never break job success due to certificate bookkeeping.
+            pass
+
 
-        issue = CertificateIssue.objects.select_related("enrollment", "enrollment__grade", "enrollment__campus").get(
-            uuid=certificate_uuid
+class AcademicPeriodSabanaBuilder(ReportBuilder):
+    """Sábana of a group: one grade matrix feeds both the PDF and the XLSX output."""
+
+    def load(self, job: ReportJob, *, report_context: ReportGenerationContext | None = None) -> SabanaMatrix:
+        from academic.models import Group  # noqa: PLC0415
+
+        group_id = (job.params or {}).get("group_id")
+        period_id = (job.params or {}).get("period_id")
+
+        group = Group.objects.select_related("academic_year", "director", "grade").get(id=group_id)
+        period = Period.objects.select_related("academic_year").get(id=period_id)
+
+        return load_academic_period_sabana_matrix(
+            group=group,
+            period=period,
+            report_context=_shared_report_context(report_context, period.academic_year_id),
         )
-        payload = issue.payload or {}
-        institution = Institution.objects.first() or Institution()
 
-        issue_date_raw = payload.get("issue_date")
-        issue_date: date
-        if isinstance(issue_date_raw, date):
-            issue_date = issue_date_raw
-            # datetime is also a date, but keep it as date.
-            if isinstance(issue_date_raw, datetime):
-                issue_date = issue_date_raw.date()
-        else:
-            try:
-                issue_date = datetime.strptime(str(issue_date_raw or ""), "%Y-%m-%d").date()
-            except Exception:
-                issue_date = date.today()
+    def render(self, job, data, *, units_per_document=None, on_unit=None) -> Iterator[str]:
+        ctx = build_academic_period_sabana_context(group=data.group, period=data.period, matrix=data)
+        html = render_to_string("students/reports/academic_period_sabana_pdf.html", ctx)
+        if on_unit is not None:
+            on_unit(1, 1)
+        yield html
 
-        ctx = {
-            "institution": institution,
-            "student_full_name": payload.get("student_full_name") or "",
-            "document_type": payload.get("document_type") or "Documento",
-            "document_number": payload.get("document_number") or "",
-            "academic_year": payload.get("academic_year") or "",
-            "grade_name": payload.get("grade_name") or "",
-            "academic_level": payload.get("academic_level") or "",
-            "rows": payload.get("rows") or [],
-            "conduct": payload.get("conduct") or "BUENA",
-            "final_status": payload.get("final_status") or "APROBADO",
-            "issue_date": issue_date,
-            "signer_name": payload.get("signer_name") or "",
-            "signer_role": payload.get("signer_role") or "",
-            "verify_url": verify_url,
-            "verify_token": verify_token,
-            "verify_url_prefix": verify_url_prefix,
-            "qr_image_src": _qr_png_data_uri(verify_url) if verify_url else "",
-            "seal_hash": issue.seal_hash,
-        }
-        return render_to_string("students/reports/certificate_studies_pdf.html", ctx)
+    def output_content_type(self, job: ReportJob) -> str:
+        if str((job.params or {}).get("format") or "").lower() == "xlsx":
+            return XLSX_CONTENT_TYPE
+        return PDF_CONTENT_TYPE
+
+    def write_output(self, job: ReportJob, data: SabanaMatrix, out_path: Path) -> None:
+        write_academic_period_sabana_xlsx(data, out_path)
 
-    if job.report_type == ReportJob.ReportType.ELECTION_CENSUS_QR:
-        return _render_election_census_qr_html(job)
 
-    raise ValueError(f"Unsupported report_type: {job.report_type}")
+class AcademicPeriodGroupBuilder(ReportBuilder):
+    """Boletines of a whole group; each student's pages are fitted and verified lazily."""
+
+    def units_per_document(self) -> int | None:
+        return max(1, int(getattr(settings, "REPORT_PDF_CHUNK_STUDENTS", 10)))
+
+    def load(self, job: ReportJob, *, report_context: ReportGenerationContext | None = None) -> dict:
+        return _academic_period_group_data(job, report_context=report_context)
+
+    def render(self, job, data, *, units_per_document=None, on_unit=None) -> Iterator[str]:
+        is_preschool = data["is_preschool"]
+        template_name = (
+            "students/reports/academic_period_report_group_preschool_pdf.html"
+            if is_preschool
+            else "students/reports/academic_period_report_group_pdf.html"
+        )
+        pages = data["pages"]
+        size = units_per_document or len(pages) or 1
+        for start in range(0, max(len(pages), 1), size):
+            fitted = []
+            for page in pages[start : start + size]:
+                fitted.append(_finish_group_report_page(job, page, is_preschool=is_preschool))
+                if on_unit is not None:
+                    on_unit(start + len(fitted), len(pages))
+            yield render_to_string(template_name, {**data["ctx"], "pages": fitted})
+
+
+class ElectionCensusQrBuilder(ReportBuilder):
+    def units_per_document(self) -> int | None:
+        size = int(getattr(settings, "REPORT_PDF_CHUNK_CARDS", 120))
+        # Whole pages of carnets: every chunk starts a new page, so a chunk ending on a
+        # half-filled page would leave a gap in the middle of the printed sheets.
+        per_page = _ELECTION_QR_CARDS_PER_PAGE
+        return max(per_page, size - size % per_page)
+
+    def load(self, job: ReportJob, *, report_context: ReportGenerationContext | None = None) -> dict:
+        return _election_census_qr_data(job)
+
+    def render(self, job, data, *, units_per_document=None, on_unit=None) -> Iterator[str]:
+        return _election_census_qr_documents(data, cards_per_chunk=units_per_document, on_unit=on_unit)
+
+
+REPORT_BUILDERS: dict[str, ReportBuilder] = {
+    ReportJob.ReportType.DUMMY: TemplateReportBuilder(_dummy_document),
+    ReportJob.ReportType.ACADEMIC_PERIOD_ENROLLMENT: TemplateReportBuilder(_academic_period_enrollment_document),
+    ReportJob.ReportType.ACADEMIC_PERIOD_GROUP: AcademicPeriodGroupBuilder(),
+    ReportJob.ReportType.ACADEMIC_PERIOD_SABANA: AcademicPeriodSabanaBuilder(),
+    ReportJob.ReportType.DISCIPLINE_CASE_ACTA: TemplateReportBuilder(_discipline_case_acta_document),
+    ReportJob.ReportType.ACADEMIC_COMMISSION_ACTA: TemplateReportBuilder(_academic_commission_acta_document),
+    ReportJob.ReportType.ACADEMIC_COMMISSION_GROUP_ACTA: TemplateReportBuilder(_academic_commission_group_acta_document),
+    ReportJob.ReportType.ATTENDANCE_MANUAL_SHEET: TemplateReportBuilder(_attendance_manual_sheet_document),
+    ReportJob.ReportType.ENROLLMENT_LIST: TemplateReportBuilder(_enrollment_list_document),
+    ReportJob.ReportType.FAMILY_DIRECTORY_BY_GROUP: TemplateReportBuilder(_family_directory_by_group_document),
+    ReportJob.ReportType.GRADE_REPORT_SHEET: TemplateReportBuilder(_grade_report_sheet_document),
+    ReportJob.ReportType.TEACHER_STATISTICS_AI: TemplateReportBuilder(_teacher_statistics_ai_document),
+    ReportJob.ReportType.CLASS_PLAN: TemplateReportBuilder(_class_plan_document),
+    ReportJob.ReportType.STUDY_CERTIFICATION: TemplateReportBuilder(_study_certification_document),
+    ReportJob.ReportType.OBSERVER_REPORT: TemplateReportBuilder(_observer_report_document),
+    ReportJob.ReportType.CERTIFICATE_STUDIES: CertificateStudiesBuilder(_certificate_studies_document),
+    ReportJob.ReportType.ELECTION_CENSUS_QR: ElectionCensusQrBuilder(),
+}
+
+
+def get_report_builder(report_type: str) -> ReportBuilder:
+    try:
+        return REPORT_BUILDERS[report_type]
+    except KeyError:
+        raise ValueError(f"Unsupported report_type: {report_type}") from None
+
+
+def _report_html_chunks(
+    job: ReportJob,
+    *,
+    report_context: ReportGenerationContext | None = None,
+    on_unit: Callable[[int, int], None] | None = None,
+) -> Iterator[str] | None:
+    """Standalone HTML documents for reports whose size grows with the number of students.
+
+    Loading happens here; units are rendered lazily as the documents are consumed.
+    Returns None for report types that are rendered as a single document.
+    """
+
+    builder = get_report_builder(job.report_type)
+    size = builder.units_per_document()
+    if size is None:
+        return None
+    data = builder.load(job, report_context=report_context)
+    return builder.render(job, data, units_per_document=size, on_unit=on_unit)
+
+
+def _render_report_html(
+    job: ReportJob,
+    *,
+    report_context: ReportGenerationContext | None = None,
+    on_unit: Callable[[int, int], None] | None = None,
+) -> str:
+    builder = get_report_builder(job.report_type)
+    data = builder.load(job, report_context=report_context)
+    return next(iter(builder.render(job, data, on_unit=on_unit)))
+
+
+class _ReportJobCanceled(Exception):
+    """Raised between render units once the job has been canceled."""
+
+
+class _UnitProgress:
+    """`on_unit` callback mapping rendered units onto `job.progress` in [start, end].
+
+    Progress is saved (and cancellation checked) only when the integer percentage moves.
+    """
+
+    def __init__(self, job: ReportJob, *, start: int, end: int):
+        self.job = job
+        self.start = start
+        self.end = end
+        self.progress = start
+
+    def __call__(self, done: int, total: int) -> None:
+        progress = self.start + (self.end - self.start) * min(done, total) // max(total, 1)
+        if progress <= self.progress:
+            return
+        self.progress = progress
+        self.job.set_progress(progress)
+        self.job.refresh_from_db(fields=["status"])
+        if self.job.status == ReportJob.Status.CANCELED:
+            raise _ReportJobCanceled(self.job.id)
 
 
 def _coerce_public_absolute_url(job: ReportJob, value: str) -> str:
@@ -1532,20 +1898,137 @@ def _coerce_public_absolute_url(job: ReportJob, value: str) -> str:
 
 def _qr_png_data_uri(text: str) -> str:
     # Avoid temp files; embed QR as a data URI.
+    return qr_png_data_uri(text)
+
+
+def _report_output_filename(job: ReportJob) -> str:
+    """Deterministic per params, so jobs asking for the same document share a path."""
+
+    if job.report_type == ReportJob.ReportType.ACADEMIC_PERIOD_ENROLLMENT:
+        params = job.params or {}
+        return f"informe-academico-enrollment-{params.get('enrollment_id')}-period-{params.get('period_id')}.pdf"
+    elif job.report_type == ReportJob.ReportType.ACADEMIC_PERIOD_GROUP:
+        params = job.params or {}
+        return f"informe-academico-grupo-{params.get('group_id')}-period-{params.get('period_id')}.pdf"
+    elif job.report_type == ReportJob.ReportType.ACADEMIC_PERIOD_SABANA:
+        params = job.params or {}
+        extension = "xlsx" if str(params.get("format") or "").lower() == "xlsx" else "pdf"
+        return f"sabana-notas-grupo-{params.get('group_id')}-period-{params.get('period_id')}.{extension}"
+    elif job.report_type == ReportJob.ReportType.DISCIPLINE_CASE_ACTA:
+        params = job.params or {}
+        return f"caso-{params.get('case_id')}-acta.pdf"
+    elif job.report_type == ReportJob.ReportType.ACADEMIC_COMMISSION_ACTA:
+        params = job.params or {}
+        return f"comision-acta-decision-{params.get('decision_id')}.pdf"
+    elif job.report_type == ReportJob.ReportType.ACADEMIC_COMMISSION_GROUP_ACTA:
+        params = job.params or {}
+        return f"comision-grupal-{params.get('commission_id')}.pdf"
+    elif job.report_type == ReportJob.ReportType.ATTENDANCE_MANUAL_SHEET:
+        params = job.params or {}
+        return f"planilla_asistencia_grupo-{params.get('group_id')}.pdf"
+    elif job.report_type == ReportJob.ReportType.ENROLLMENT_LIST:
+        params = job.params or {}
+        y = params.get("year_id") or "actual"
+        g = params.get("grade_id") or "all"
+        gr = params.get("group_id") or "all"
+        return f"reporte_matriculados_y{y}_g{g}_gr{gr}.pdf"
+    elif job.report_type == ReportJob.ReportType.FAMILY_DIRECTORY_BY_GROUP:
+        return "directorio_padres_por_grado_grupo.pdf"
+    elif job.report_type == ReportJob.ReportType.GRADE_REPORT_SHEET:
+        params = job.params or {}
+        gid = params.get("group_id")
+        pid = params.get("period_id") or ""
+        return f"planilla_notas_grupo-{gid}_periodo-{pid}.pdf".replace(" ", "_")
+    elif job.report_type == ReportJob.ReportType.TEACHER_STATISTICS_AI:
+        params = job.params or {}
+        y = str(params.get("year_name") or "").strip() or "anio"
+        p = str(params.get("period_name") or "").strip() or "periodo"
+        return f"analisis_ia_{y}_{p}.pdf".replace(" ", "_")
+    elif job.report_type == ReportJob.ReportType.CLASS_PLAN:
+        params = job.params or {}
+        plan_id = params.get("class_plan_id")
+        from academic.models import ClassPlan  # noqa: PLC0415
+
+        plan = ClassPlan.objects.select_related("topic").filter(id=plan_id).first()
+        return _build_class_plan_pdf_filename(plan) if plan is not None else f"Plan_de_Clase_Tema_{plan_id}.pdf"
+    elif job.report_type == ReportJob.ReportType.STUDY_CERTIFICATION:
+        params = job.params or {}
+        enrollment_id = params.get("enrollment_id")
+        return f"certificacion_academica_enrollment-{enrollment_id}.pdf".replace(" ", "_")
+    elif job.report_type == ReportJob.ReportType.OBSERVER_REPORT:
+        params = job.params or {}
+        student_id = params.get("student_id")
+        return f"observador_estudiante-{student_id}.pdf".replace(" ", "_")
+    elif job.report_type == ReportJob.ReportType.CERTIFICATE_STUDIES:
+        params = job.params or {}
+        cu = str(params.get("certificate_uuid") or "")
+        return f"certificado_estudios_{cu}.pdf".replace(" ", "_")
+    elif job.report_type == ReportJob.ReportType.ELECTION_CENSUS_QR:
+        params = job.params or {}
+        process_id = params.get("process_id") or "0"
+        group_suffix = (str(params.get("group_filter") or "todos")).replace(" ", "_")
+        return f"carnes_electorales_proceso-{process_id}_grupo-{group_suffix}.pdf"
+    else:
+        return f"report_{job.id}.pdf"
+
+
+
+def _reusable_report_output(job: ReportJob, *, relpath: str, out_path: Path) -> ReportJob | None:
+    """The job that last rendered `relpath`, if it was rendered from the same inputs.
+
+    Jobs with the same params write to the same path, so only the latest render can be
+    trusted to match its fingerprint: an older job's file may have been overwritten.
+    """
+
+    if not job.input_fingerprint or not getattr(settings, "REPORT_RESULT_REUSE_ENABLED", True):
+        return None
+
+    latest = (
+        ReportJob.objects.filter(
+            output_relpath=relpath,
+            status=ReportJob.Status.SUCCEEDED,
+            reused_from__isnull=True,
+            output_rendered_at__isnull=False,
+        )
+        .exclude(id=job.id)
+        .order_by("-output_rendered_at", "-id")
+        .first()
+    )
+    if latest is None or latest.input_fingerprint != job.input_fingerprint:
+        return None
+
+    max_age_hours = int(getattr(settings, "REPORT_RESULT_REUSE_MAX_AGE_HOURS", 24))
+    if latest.output_rendered_at < timezone.now() - timedelta(hours=max_age_hours):
+        return None
+
     try:
-        import qrcode  # noqa: PLC0415
-        from io import BytesIO  # noqa: PLC0415
-
-        img = qrcode.make(text)
-        buf = BytesIO()
-        img.save(buf, format="PNG")
-        b64 = base64.b64encode(buf.getvalue()).decode("ascii")
-        return f"data:image/png;base64,{b64}"
-    except Exception:
-        return ""
+        size = out_path.stat().st_size
+    except OSError:
+        return None
+    if latest.output_size_bytes is not None and size != latest.output_size_bytes:
+        return None
+    return latest
+
+
+def _defer_for_fair_share(task, job: ReportJob) -> bool:
+    """Put a pending job back on its queue while its user is at the lane's running limit."""
+
+    if job.status != ReportJob.Status.PENDING or task.request.is_eager:
+        return False
+    delay = fair_share_delay(job)
+    if delay is None:
+        return False
+    task.apply_async(args=(job.id,), countdown=delay)
+    logger.info(
+        "report_job.deferred",
+        extra={"job_id": job.id, "report_type": job.report_type, "user_id": job.created_by_id, "countdown_s": delay},
+    )
+    return True
 
 
-@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 3})
+@shared_task(
+    bind=True, base=ReportLaneTask, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 3}
+)
 def generate_report_job_pdf(self, job_id: int) -> None:
     started_monotonic = time.monotonic()
     job = ReportJob.objects.select_related("created_by").get(id=job_id)
@@ -1566,130 +2049,118 @@ def generate_report_job_pdf(self, job_id: int) -> None:
         logger.info("report_job.skip", extra={"job_id": job.id, "status": job.status, "report_type": job.report_type})
         return
 
+    if _defer_for_fair_share(self, job):
+        return
+
     job.mark_running()
 
     def _abort_if_canceled() -> bool:
         job.refresh_from_db(fields=["status"])
         return job.status == ReportJob.Status.CANCELED
 
+    spans = SpanRecorder()
     try:
-        job.set_progress(10)
-        if _abort_if_canceled():
+        out_dir_rel = f"{settings.PRIVATE_REPORTS_DIR}".strip("/")
+        out_filename = _report_output_filename(job)
+        relpath = str(Path(out_dir_rel) / out_filename)
+
+        base_root = Path(settings.PRIVATE_STORAGE_ROOT)
+        out_path = _safe_join_private(base_root, relpath)
+
+        with spans.stage("fingerprint"):
+            try:
+                job.input_fingerprint = report_input_fingerprint(job)
+            except Exception:  # noqa: BLE001
+                logger.warning("report_job.fingerprint_failed", extra={"job_id": job.id}, exc_info=True)
+                job.input_fingerprint = None
+            if job.input_fingerprint:
+                job.save(update_fields=["input_fingerprint"])
+
+            source = _reusable_report_output(job, relpath=relpath, out_path=out_path)
+        if source is not None:
+            job.mark_succeeded(
+                output_relpath=relpath,
+                output_filename=out_filename,
+                output_size_bytes=source.output_size_bytes,
+                content_type=source.output_content_type,
+                reused_from=source,
+            )
+            spans.output_size_bytes = source.output_size_bytes
+            job.add_event(event_type="TIMINGS", meta={**spans.as_meta(), "reused": True})
+            logger.info(
+                "report_job.reused",
+                extra={
+                    "job_id": job.id,
+                    "report_type": job.report_type,
+                    "reused_from": source.id,
+                    "duration_s": round(time.monotonic() - started_monotonic, 3),
+                },
+            )
             return
-        html = _render_report_html(job)
 
-        job.set_progress(40)
+        job.set_progress(10)
         if _abort_if_canceled():
             return
+        builder = get_report_builder(job.report_type)
+        content_type = builder.output_content_type(job)
+        layout_stats = LayoutMeasureStats()
+        if content_type != PDF_CONTENT_TYPE:
+            # Spreadsheet outputs are written straight from the loaded data, no WeasyPrint.
+            with spans.stage("write"):
+                data = builder.load(job, report_context=_batch_report_context(job))
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                builder.write_output(job, data, out_path)
+        else:
+            with spans.stage("html"), collect_layout_measure_stats(layout_stats):
+                report_context = _batch_report_context(job)
+                html_chunks = _report_html_chunks(
+                    job, report_context=report_context, on_unit=_UnitProgress(job, start=40, end=90)
+                )
+                html = _render_report_html(job, report_context=report_context) if html_chunks is None else ""
 
-        from reports.weasyprint_utils import render_pdf_bytes_from_html  # noqa: PLC0415
-
-        out_dir_rel = f"{settings.PRIVATE_REPORTS_DIR}".strip("/")
-
-        if job.report_type == ReportJob.ReportType.ACADEMIC_PERIOD_ENROLLMENT:
-            params = job.params or {}
-            out_filename = (
-                f"informe-academico-enrollment-{params.get('enrollment_id')}-period-{params.get('period_id')}.pdf"
-            )
-        elif job.report_type == ReportJob.ReportType.ACADEMIC_PERIOD_GROUP:
-            params = job.params or {}
-            out_filename = f"informe-academico-grupo-{params.get('group_id')}-period-{params.get('period_id')}.pdf"
-        elif job.report_type == ReportJob.ReportType.ACADEMIC_PERIOD_SABANA:
-            params = job.params or {}
-            out_filename = f"sabana-notas-grupo-{params.get('group_id')}-period-{params.get('period_id')}.pdf"
-        elif job.report_type == ReportJob.ReportType.DISCIPLINE_CASE_ACTA:
-            params = job.params or {}
-            out_filename = f"caso-{params.get('case_id')}-acta.pdf"
-        elif job.report_type == ReportJob.ReportType.ACADEMIC_COMMISSION_ACTA:
-            params = job.params or {}
-            out_filename = f"comision-acta-decision-{params.get('decision_id')}.pdf"
-        elif job.report_type == ReportJob.ReportType.ACADEMIC_COMMISSION_GROUP_ACTA:
-            params = job.params or {}
-            out_filename = f"comision-grupal-{params.get('commission_id')}.pdf"
-        elif job.report_type == ReportJob.ReportType.ATTENDANCE_MANUAL_SHEET:
-            params = job.params or {}
-            out_filename = f"planilla_asistencia_grupo-{params.get('group_id')}.pdf"
-        elif job.report_type == ReportJob.ReportType.ENROLLMENT_LIST:
-            params = job.params or {}
-            y = params.get("year_id") or "actual"
-            g = params.get("grade_id") or "all"
-            gr = params.get("group_id") or "all"
-            out_filename = f"reporte_matriculados_y{y}_g{g}_gr{gr}.pdf"
-        elif job.report_type == ReportJob.ReportType.FAMILY_DIRECTORY_BY_GROUP:
-            out_filename = "directorio_padres_por_grado_grupo.pdf"
-        elif job.report_type == ReportJob.ReportType.GRADE_REPORT_SHEET:
-            params = job.params or {}
-            gid = params.get("group_id")
-            pid = params.get("period_id") or ""
-            out_filename = f"planilla_notas_grupo-{gid}_periodo-{pid}.pdf".replace(" ", "_")
-        elif job.report_type == ReportJob.ReportType.TEACHER_STATISTICS_AI:
-            params = job.params or {}
-            y = str(params.get("year_name") or "").strip() or "anio"
-            p = str(params.get("period_name") or "").strip() or "periodo"
-            out_filename = f"analisis_ia_{y}_{p}.pdf".replace(" ", "_")
-        elif job.report_type == ReportJob.ReportType.CLASS_PLAN:
-            params = job.params or {}
-            plan_id = params.get("class_plan_id")
-            from academic.models import ClassPlan  # noqa: PLC0415
+            job.set_progress(40)
+            if _abort_if_canceled():
+                return
 
-            plan = ClassPlan.objects.select_related("topic").filter(id=plan_id).first()
-            out_filename = _build_class_plan_pdf_filename(plan) if plan is not None else f"Plan_de_Clase_Tema_{plan_id}.pdf"
-        elif job.report_type == ReportJob.ReportType.STUDY_CERTIFICATION:
-            params = job.params or {}
-            enrollment_id = params.get("enrollment_id")
-            out_filename = f"certificacion_academica_enrollment-{enrollment_id}.pdf".replace(" ", "_")
-        elif job.report_type == ReportJob.ReportType.OBSERVER_REPORT:
-            params = job.params or {}
-            student_id = params.get("student_id")
-            out_filename = f"observador_estudiante-{student_id}.pdf".replace(" ", "_")
-        elif job.report_type == ReportJob.ReportType.CERTIFICATE_STUDIES:
-            params = job.params or {}
-            cu = str(params.get("certificate_uuid") or "")
-            out_filename = f"certificado_estudios_{cu}.pdf".replace(" ", "_")
-        elif job.report_type == ReportJob.ReportType.ELECTION_CENSUS_QR:
-            params = job.params or {}
-            process_id = params.get("process_id") or "0"
-            group_suffix = (str(params.get("group_filter") or "todos")).replace(" ", "_")
-            out_filename = f"carnes_electorales_proceso-{process_id}_grupo-{group_suffix}.pdf"
-        else:
-            out_filename = f"report_{job.id}.pdf"
+            from reports.weasyprint_utils import render_pdf_bytes_from_html  # noqa: PLC0415
 
-        relpath = str(Path(out_dir_rel) / out_filename)
+            out_path.parent.mkdir(parents=True, exist_ok=True)
 
-        base_root = Path(settings.PRIVATE_STORAGE_ROOT)
-        out_path = _safe_join_private(base_root, relpath)
-        out_path.parent.mkdir(parents=True, exist_ok=True)
+            if html_chunks is None:
+                job.set_progress(70)
+                if _abort_if_canceled():
+                    return
 
-        job.set_progress(70)
-        if _abort_if_canceled():
-            return
+            # Chunks are generated lazily, so two-page fitting (and their HTML) also happens
+            # here, and each part is written to disk as it is rendered. Progress moves from
+            # 40 to 90 per rendered unit, and a canceled job stops before the next unit.
+            with spans.stage("pdf"), collect_layout_measure_stats(layout_stats):
+                if html_chunks is not None:
+                    from reports.weasyprint_utils import write_pdf_from_html_chunks  # noqa: PLC0415
 
-        pdf_bytes = render_pdf_bytes_from_html(html=html, base_url=str(settings.BASE_DIR))
-        out_path.write_bytes(pdf_bytes)
+                    write_pdf_from_html_chunks(chunks=html_chunks, out_path=out_path, base_url=str(settings.BASE_DIR))
+                    pdf_bytes = None
+                else:
+                    pdf_bytes = render_pdf_bytes_from_html(html=html, base_url=str(settings.BASE_DIR))
+            if pdf_bytes is not None:
+                with spans.stage("write"):
+                    out_path.write_bytes(pdf_bytes)
 
         job.set_progress(95)
         if _abort_if_canceled():
             return
 
         size = out_path.stat().st_size if out_path.exists() else None
-        job.mark_succeeded(output_relpath=relpath, output_filename=out_filename, output_size_bytes=size)
+        job.mark_succeeded(
+            output_relpath=relpath, output_filename=out_filename, output_size_bytes=size, content_type=content_type
+        )
 
-        # Side effects for certain reports.
-        if job.report_type == ReportJob.ReportType.CERTIFICATE_STUDIES:
-            try:
-                from students.models import CertificateIssue  # noqa: PLC0415
+        builder.finalize(job, relpath=relpath, out_filename=out_filename)
 
-                params = job.params or {}
-                cu = str(params.get("certificate_uuid") or "").strip()
-                issue = CertificateIssue.objects.filter(uuid=cu).first()
-                if issue:
-                    issue.pdf_private_relpath = relpath
-                    issue.pdf_private_filename = out_filename
-                    issue.status = CertificateIssue.STATUS_ISSUED
-                    issue.save(update_fields=["pdf_private_relpath", "pdf_private_filename", "status"])
-            except Exception:
-                # Never break job success due to certificate bookkeeping.
-                pass
+        if layout_stats.reports:
+            job.add_event(event_type="LAYOUT_MEASURE", meta=layout_stats.as_meta())
+        spans.output_size_bytes = size
+        job.add_event(event_type="TIMINGS", meta=spans.as_meta())
 
         duration_s = round(time.monotonic() - started_monotonic, 3)
         logger.info(
@@ -1699,9 +2170,16 @@ def generate_report_job_pdf(self, job_id: int) -> None:
                 "report_type": job.report_type,
                 "duration_s": duration_s,
                 "output_size_bytes": size,
+                "layout_renders": layout_stats.renders,
+                "layout_cache_hits": layout_stats.cache_hits,
+                "layout_reports": layout_stats.reports,
+                "stages": {span.name: round(span.wall_s, 3) for span in spans.spans},
             },
         )
 
+    except _ReportJobCanceled:
+        logger.info("report_job.canceled", extra={"job_id": job.id, "report_type": job.report_type})
+
     except SoftTimeLimitExceeded:
         # Worker hit the CELERY_TASK_SOFT_TIME_LIMIT (default 10 min).
         # Mark the job as failed so the frontend receives a clean FAILED status
@@ -1762,3 +2240,221 @@ def generate_report_job_pdf(self, job_id: int) -> None:
             },
         )
         raise
+
+
+BATCH_PROGRESS_FANOUT = 5
+BATCH_PROGRESS_CHILDREN_DONE = 90
+_TERMINAL_STATUSES = {ReportJob.Status.SUCCEEDED, ReportJob.Status.FAILED, ReportJob.Status.CANCELED}
+
+
+def _batch_group_ids(job: ReportJob) -> list[int]:
+    """Groups with active enrollments for the batch period, optionally limited to one grade."""
+
+    from academic.models import Group  # noqa: PLC0415
+
+    params = job.params or {}
+    period = Period.objects.only("id", "academic_year_id").get(id=params.get("period_id"))
+    groups = Group.objects.filter(
+        academic_year_id=period.academic_year_id,
+        id__in=Enrollment.objects.filter(
+            academic_year_id=period.academic_year_id, status="ACTIVE", group__isnull=False
+        ).values("group_id"),
+    )
+    if params.get("grade_id"):
+        groups = groups.filter(grade_id=params.get("grade_id"))
+    return list(groups.order_by("grade__ordinal", "grade__name", "name", "id").values_list("id", flat=True))
+
+
+def _update_batch_progress(parent_id: int) -> None:
+    counts = {
+        row["status"]: row["n"]
+        for row in ReportJob.objects.filter(parent_id=parent_id).values("status").annotate(n=Count("id"))
+    }
+    total = sum(counts.values())
+    if not total:
+        return
+    done = sum(n for status, n in counts.items() if status in _TERMINAL_STATUSES)
+    progress = BATCH_PROGRESS_FANOUT + (BATCH_PROGRESS_CHILDREN_DONE - BATCH_PROGRESS_FANOUT) * done // total
+    # Children finish concurrently: only ever move the bar forward.
+    ReportJob.objects.filter(id=parent_id, status=ReportJob.Status.RUNNING, progress__lt=progress).update(
+        progress=progress
+    )
+
+
+@shared_task(bind=True, base=ReportLaneTask)
+def generate_report_batch_job(self, job_id: int) -> None:
+    """Fan out one ACADEMIC_PERIOD_GROUP child per group and merge them when all finish."""
+
+    job = ReportJob.objects.select_related("created_by").get(id=job_id)
+    if job.status in {ReportJob.Status.SUCCEEDED, ReportJob.Status.CANCELED}:
+        logger.info("report_job.skip", extra={"job_id": job.id, "status": job.status, "report_type": job.report_type})
+        return
+    if job.children.exists():
+        # Redelivered message: the chord is already in flight.
+        return
+    if _defer_for_fair_share(self, job):
+        return
+
+    job.mark_running()
+    try:
+        group_ids = _batch_group_ids(job)
+        if not group_ids:
+            job.mark_failed(error_code="NO_GROUPS", error_message="No hay grupos con matrículas activas para el lote.")
+            return
+
+        params = job.params or {}
+        child_params = {
+            "period_id": params.get("period_id"),
+            "academic_year_id": params.get("academic_year_id"),
+            "public_site_url": params.get("public_site_url") or "",
+        }
+        children = ReportJob.objects.bulk_create(
+            [
+                ReportJob(
+                    created_by=job.created_by,
+                    report_type=ReportJob.ReportType.ACADEMIC_PERIOD_GROUP,
+                    params={**child_params, "group_id": group_id},
+                    parent=job,
+                    expires_at=job.expires_at,
+                )
+                for group_id in group_ids
+            ]
+        )
+        job.add_event(event_type="FANOUT", meta={"children": len(children)})
+        job.set_progress(BATCH_PROGRESS_FANOUT)
+    except Exception as exc:  # noqa: BLE001
+        job.mark_failed(error_code="BATCH_FANOUT_FAILED", error_message=str(exc))
+        logger.exception("report_job.failed", extra={"job_id": job.id, "report_type": job.report_type})
+        return
+
+    chord([generate_report_batch_part.si(child.id) for child in children])(finalize_report_batch_job.si(job.id))
+
+
+@shared_task(base=ReportLaneTask)
+def generate_report_batch_part(job_id: int) -> str:
+    """Run one child of a batch. Never raises, so a failing group cannot break the chord.
+
+    The child stores its own TIMINGS; the part's stages (the child run and the parent
+    progress update) are stored on the parent, tagged with ``batch_part_job_id``.
+    """
+
+    spans = SpanRecorder()
+    # apply() runs the task and its retries in this worker process. Retried attempts
+    # follow task_eager_propagates, so the last error can still surface here.
+    with spans.stage("part"):
+        try:
+            generate_report_job_pdf.apply(args=(job_id,), throw=False)
+        except Exception:  # noqa: BLE001
+            logger.warning("report_job.batch_part_failed", extra={"job_id": job_id}, exc_info=True)
+
+    child = ReportJob.objects.filter(id=job_id).values("parent_id", "status").first()
+    if not child:
+        return ""
+    if child["parent_id"]:
+        with spans.stage("progress"):
+            _update_batch_progress(child["parent_id"])
+        ReportJobEvent.objects.create(
+            job_id=child["parent_id"],
+            event_type="TIMINGS",
+            meta={**spans.as_meta(), "batch_part_job_id": job_id},
+        )
+    return child["status"]
+
+
+def _batch_member_name(index: int, group) -> str:
+    label = unicodedata.normalize("NFKD", _batch_group_label(group)).encode("ascii", "ignore").decode("ascii")
+    label = re.sub(r"[^A-Za-z0-9]+", "-", label).strip("-") or f"grupo-{getattr(group, 'id', index)}"
+    return f"{index:03d}_{label}.pdf"
+
+
+def _batch_group_label(group) -> str:
+    if group is None:
+        return ""
+    grade_name = (getattr(getattr(group, "grade", None), "name", "") or "").strip()
+    return " ".join(p for p in [grade_name, (group.name or "").strip()] if p)
+
+
+@shared_task(bind=True, base=ReportLaneTask)
+def finalize_report_batch_job(self, job_id: int) -> None:
+    """Chord callback: pack the children's PDFs into a ZIP or one merged PDF."""
+
+    from academic.models import Group  # noqa: PLC0415
+
+    job = ReportJob.objects.get(id=job_id)
+    if job.status != ReportJob.Status.RUNNING:
+        return
+
+    spans = SpanRecorder()
+    children = list(job.children.order_by("id"))
+    succeeded = [c for c in children if c.status == ReportJob.Status.SUCCEEDED and c.output_relpath]
+    failed = [c for c in children if c.status != ReportJob.Status.SUCCEEDED]
+    if failed:
+        job.add_event(
+            event_type="BATCH_PARTIAL",
+            level="WARNING",
+            message=f"{len(failed)} de {len(children)} grupos no se generaron.",
+            meta={"failed_group_ids": [(c.params or {}).get("group_id") for c in failed]},
+        )
+    if not succeeded:
+        job.mark_failed(error_code="BATCH_ALL_FAILED", error_message="Ningún grupo del lote se pudo generar.")
+        return
+
+    try:
+        params = job.params or {}
+        base_root = Path(settings.PRIVATE_STORAGE_ROOT)
+        with spans.stage("collect"):
+            groups_by_id = Group.objects.select_related("grade").in_bulk(
+                [(c.params or {}).get("group_id") for c in succeeded]
+            )
+            sources = [
+                (_safe_join_private(base_root, c.output_relpath), groups_by_id.get((c.params or {}).get("group_id")))
+                for c in succeeded
+            ]
+
+        scope = f"grado-{params['grade_id']}" if params.get("grade_id") else "colegio"
+        stem = f"informes-academicos-{scope}-period-{params.get('period_id')}"
+        out_dir_rel = f"{settings.PRIVATE_REPORTS_DIR}".strip("/")
+
+        if params.get("output") == "pdf":
+            from pypdf import PdfWriter  # noqa: PLC0415
+
+            out_filename = f"{stem}.pdf"
+            content_type = "application/pdf"
+            relpath = str(Path(out_dir_rel) / out_filename)
+            out_path = _safe_join_private(base_root, relpath)
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            with spans.stage("write"):
+                writer = PdfWriter()
+                for path, group in sources:
+                    writer.append(str(path), outline_item=_batch_group_label(group) or None)
+                with out_path.open("wb") as fh:
+                    writer.write(fh)
+                writer.close()
+        else:
+            out_filename = f"{stem}.zip"
+            content_type = "application/zip"
+            relpath = str(Path(out_dir_rel) / out_filename)
+            out_path = _safe_join_private(base_root, relpath)
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            # The PDFs are already compressed internally; storing them keeps the pack cheap.
+            with spans.stage("write"), zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_STORED) as zf:
+                for index, (path, group) in enumerate(sources, start=1):
+                    zf.write(path, arcname=_batch_member_name(index, group))
+
+        job.refresh_from_db(fields=["status"])
+        if job.status == ReportJob.Status.CANCELED:
+            out_path.unlink(missing_ok=True)
+            return
+
+        size = out_path.stat().st_size
+        job.mark_succeeded(
+            output_relpath=relpath,
+            output_filename=out_filename,
+            output_size_bytes=size,
+            content_type=content_type,
+        )
+        spans.output_size_bytes = size
+        job.add_event(event_type="TIMINGS", meta={**spans.as_meta(), "children": len(children)})
+    except Exception as exc:  # noqa: BLE001
+        job.mark_failed(error_code="BATCH_MERGE_FAILED", error_message=str(exc))
+        logger.exception("report_job.failed", extra={"job_id": job.id, "report_type": job.report_type})
@@ -673,4 +673,295 @@ class ReportJobApiTests(APITestCase):
 			self.assertFalse(fake_path.exists())
 			self.assertFalse(ReportJob.objects.filter(id=job.id).exists())
 
+def _blank_pdf_bytes() -> bytes:
+	from io import BytesIO  # noqa: PLC0415
+
+	from pypdf import PdfWriter  # noqa: PLC0415
+
+	writer = PdfWriter()
+	writer.add_blank_page(width=200, height=200)
+	buf = BytesIO()
+	writer.write(buf)
+	return buf.getvalue()
+
+
+class ReportBatchJobTests(APITestCase):
+	def setUp(self):
+		from academic.models import AcademicYear, Grade, Group, Period  # noqa: PLC0415
+		from students.models import Enrollment, Student  # noqa: PLC0415
+
+		User = get_user_model()
+		self.admin = User.objects.create_user(username="admin_batch", password="p1", role=User.ROLE_ADMIN)
+		year = AcademicYear.objects.create(year=2095, status=AcademicYear.STATUS_ACTIVE)
+		self.period = Period.objects.create(
+			academic_year=year, name="1", start_date="2095-01-01", end_date="2095-03-31"
+		)
+		self.grade = Grade.objects.create(name="7", ordinal=7)
+		self.groups = [
+			Group.objects.create(name=name, grade=self.grade, academic_year=year) for name in ("A", "B")
+		]
+		Group.objects.create(name="C", grade=self.grade, academic_year=year)  # sin matrículas
+		for idx, group in enumerate(self.groups):
+			student_user = User.objects.create_user(username=f"batch_s{idx}", password="p", role=User.ROLE_STUDENT)
+			Enrollment.objects.create(
+				student=Student.objects.create(user=student_user, document_number=f"BATCH-{idx}"),
+				academic_year=year,
+				grade=self.grade,
+				group=group,
+				status="ACTIVE",
+			)
+
+		tmp = tempfile.TemporaryDirectory()
+		self.addCleanup(tmp.cleanup)
+		self.private_root = Path(tmp.name)
+		storage = override_settings(
+			PRIVATE_STORAGE_ROOT=self.private_root,
+			PRIVATE_REPORTS_DIR="reports",
+			CELERY_TASK_ALWAYS_EAGER=True,
+			CELERY_TASK_EAGER_PROPAGATES=True,
+		)
+		storage.enable()
+		self.addCleanup(storage.disable)
+
+		self.client.force_authenticate(user=self.admin)
+
+	def _create_batch(self, output: str) -> ReportJob:
+		with patch("reports.views.generate_report_batch_job.delay") as mock_delay:
+			res = self.client.post(
+				"/api/reports/jobs/",
+				{
+					"report_type": "ACADEMIC_PERIOD_BATCH",
+					"params": {"period_id": self.period.id, "grade_id": self.grade.id, "output": output},
+				},
+				format="json",
+			)
+		self.assertEqual(res.status_code, 202, res.data)
+		mock_delay.assert_called_once_with(res.data["id"])
+		return ReportJob.objects.get(id=res.data["id"])
+
+	def _run(self, job: ReportJob, *, html_chunks=None) -> ReportJob:
+		from reports.tasks import generate_report_batch_job  # noqa: PLC0415
+
+		def write_pdf(*, chunks, out_path, **kwargs):
+			list(chunks)
+			Path(out_path).write_bytes(_blank_pdf_bytes())
+			return 1
+
+		with (
+			patch(
+				"reports.tasks._report_html_chunks",
+				side_effect=html_chunks or (lambda child, **kwargs: iter(["<html></html>"])),
+			),
+			patch("reports.weasyprint_utils.write_pdf_from_html_chunks", side_effect=write_pdf),
+		):
+			generate_report_batch_job.apply(args=(job.id,))
+		job.refresh_from_db()
+		return job
+
+	def test_zip_batch_fans_out_one_child_per_group(self):
+		import zipfile  # noqa: PLC0415
+
+		job = self._run(self._create_batch("zip"))
+
+		self.assertEqual(job.status, ReportJob.Status.SUCCEEDED)
+		self.assertEqual(job.progress, 100)
+		self.assertEqual(job.output_content_type, "application/zip")
+		children = list(job.children.order_by("id"))
+		self.assertEqual([c.params["group_id"] for c in children], [g.id for g in self.groups])
+		self.assertTrue(all(c.status == ReportJob.Status.SUCCEEDED for c in children))
+
+		with zipfile.ZipFile(self.private_root / job.output_relpath) as zf:
+			self.assertEqual(zf.namelist(), ["001_7-A.pdf", "002_7-B.pdf"])
+
+		# One TIMINGS per part (tagged with the child) plus the pack itself.
+		timings = list(job.events.filter(event_type="TIMINGS").order_by("id").values_list("meta", flat=True))
+		self.assertEqual(sorted(m["batch_part_job_id"] for m in timings[:-1]), [c.id for c in children])
+		self.assertTrue(all([s["name"] for s in m["stages"]] == ["part", "progress"] for m in timings[:-1]))
+		self.assertEqual([s["name"] for s in timings[-1]["stages"]], ["collect", "write"])
+		self.assertEqual(timings[-1]["output_size_bytes"], job.output_size_bytes)
+
+		# Children stay out of the job list; the batch is the visible entry.
+		listed = self.client.get("/api/reports/jobs/")
+		rows = listed.data["results"] if isinstance(listed.data, dict) else listed.data
+		self.assertEqual([r["id"] for r in rows], [job.id])
+
+	def test_merged_pdf_batch_skips_failed_groups(self):
+		from pypdf import PdfReader  # noqa: PLC0415
+
+		failing_group_id = self.groups[1].id
+
+		def html_chunks(child, **kwargs):
+			if (child.params or {}).get("group_id") == failing_group_id:
+				raise RuntimeError("boom")
+			return iter(["<html></html>"])
+
+		job = self._run(self._create_batch("pdf"), html_chunks=html_chunks)
+
+		self.assertEqual(job.status, ReportJob.Status.SUCCEEDED)
+		self.assertEqual(job.output_content_type, "application/pdf")
+		self.assertEqual(len(PdfReader(str(self.private_root / job.output_relpath)).pages), 1)
+		self.assertTrue(job.events.filter(event_type="BATCH_PARTIAL").exists())
+
+	def test_cancel_reaches_every_child(self):
+		job = self._create_batch("zip")
+		job.status = ReportJob.Status.RUNNING
+		job.save(update_fields=["status"])
+		for group in self.groups:
+			ReportJob.objects.create(
+				created_by=self.admin,
+				report_type=ReportJob.ReportType.ACADEMIC_PERIOD_GROUP,
+				params={"group_id": group.id, "period_id": self.period.id},
+				parent=job,
+			)
+
+		res = self.client.post(f"/api/reports/jobs/{job.id}/cancel/")
+		self.assertEqual(res.status_code, 200)
+		self.assertEqual(
+			set(job.children.values_list("status", flat=True)),
+			{ReportJob.Status.CANCELED},
+		)
+
+	def test_batch_requires_admin_role(self):
+		User = get_user_model()
+		teacher = User.objects.create_user(username="teacher_batch", password="p1", role=User.ROLE_TEACHER)
+		self.client.force_authenticate(user=teacher)
+		res = self.client.post(
+			"/api/reports/jobs/",
+			{"report_type": "ACADEMIC_PERIOD_BATCH", "params": {"period_id": self.period.id}},
+			format="json",
+		)
+		self.assertEqual(res.status_code, 400)
+
+class ElectionCensusChunkTests(APITestCase):
+	def test_carnets_are_split_into_standalone_documents(self):
+		from reports.tasks import _election_census_qr_html_chunks, _render_election_census_qr_html  # noqa: PLC0415
+
+		User = get_user_model()
+		admin = User.objects.create_user(username="admin_census_chunks", password="p1", role=User.ROLE_ADMIN)
+		job = ReportJob.objects.create(
+			created_by=admin,
+			report_type=ReportJob.ReportType.ELECTION_CENSUS_QR,
+			params={
+				"process_name": "Personero",
+				"year_label": "2026",
+				"rows_data": [{"manual_code": f"VOTE-{idx}", "full_name": f"Est {idx}"} for idx in range(7)],
+			},
+		)
+
+		chunks = list(_election_census_qr_html_chunks(job, cards_per_chunk=3))
+		self.assertEqual(len(chunks), 3)
+		self.assertEqual([c.count('class="card-shell"') for c in chunks], [3, 3, 1])
+		self.assertIn("<h1 class='doc-title'>", chunks[0])
+		self.assertNotIn("<h1 class='doc-title'>", chunks[1])
+		self.assertTrue(all(c.startswith("<!doctype html>") and c.endswith("</html>") for c in chunks))
+
+		single = _render_election_census_qr_html(job)
+		self.assertEqual(single.count('class="card-shell"'), 7)
+
+
+class ReportResultReuseTests(APITestCase):
+	def setUp(self):
+		from academic.models import AcademicYear, Grade, Group, Period  # noqa: PLC0415
+		from students.models import Enrollment, Student  # noqa: PLC0415
+
+		User = get_user_model()
+		self.admin = User.objects.create_user(username="admin_reuse", password="p1", role=User.ROLE_SUPERADMIN)
+		year = AcademicYear.objects.create(year=2094, status=AcademicYear.STATUS_ACTIVE)
+		self.period = Period.objects.create(
+			academic_year=year, name="1", start_date="2094-01-01", end_date="2094-03-31"
+		)
+		grade = Grade.objects.create(name="8", ordinal=8)
+		self.group = Group.objects.create(name="A", grade=grade, academic_year=year)
+		student_user = User.objects.create_user(username="reuse_s1", password="p", role=User.ROLE_STUDENT)
+		self.enrollment = Enrollment.objects.create(
+			student=Student.objects.create(user=student_user, document_number="REUSE-1"),
+			academic_year=year,
+			grade=grade,
+			group=self.group,
+			status="ACTIVE",
+		)
+
+		tmp = tempfile.TemporaryDirectory()
+		self.addCleanup(tmp.cleanup)
+		self.private_root = Path(tmp.name)
+		storage = override_settings(PRIVATE_STORAGE_ROOT=self.private_root, PRIVATE_REPORTS_DIR="reports")
+		storage.enable()
+		self.addCleanup(storage.disable)
+
+	def _run_sabana(self) -> tuple[ReportJob, MagicMock]:
+		from reports.tasks import generate_report_job_pdf  # noqa: PLC0415
+
+		job = ReportJob.objects.create(
+			created_by=self.admin,
+			report_type=ReportJob.ReportType.ACADEMIC_PERIOD_SABANA,
+			params={"group_id": self.group.id, "period_id": self.period.id},
+		)
+		with (
+			patch("reports.tasks._report_html_chunks", return_value=None),
+			patch("reports.tasks._render_report_html", return_value="<html></html>") as render_html,
+			patch("reports.weasyprint_utils.render_pdf_bytes_from_html", return_value=_blank_pdf_bytes()),
+		):
+			generate_report_job_pdf.apply(args=(job.id,))
+		job.refresh_from_db()
+		return job, render_html
+
+	def test_same_inputs_reuse_previous_output(self):
+		first, first_render = self._run_sabana()
+		second, second_render = self._run_sabana()
+
+		self.assertEqual(first.status, ReportJob.Status.SUCCEEDED)
+		self.assertTrue(first.input_fingerprint)
+		self.assertIsNone(first.reused_from_id)
+		first_render.assert_called_once()
+
+		self.assertEqual(second.status, ReportJob.Status.SUCCEEDED)
+		self.assertEqual(second.reused_from_id, first.id)
+		self.assertEqual(second.output_relpath, first.output_relpath)
+		self.assertEqual(second.output_size_bytes, first.output_size_bytes)
+		second_render.assert_not_called()
+
+	def test_changed_inputs_render_again(self):
+		first, _ = self._run_sabana()
+		self.enrollment.status = "RETIRED"
+		self.enrollment.save(update_fields=["status"])
+		second, second_render = self._run_sabana()
+
+		self.assertNotEqual(second.input_fingerprint, first.input_fingerprint)
+		self.assertIsNone(second.reused_from_id)
+		second_render.assert_called_once()
+
+	@override_settings(REPORT_RESULT_REUSE_MAX_AGE_HOURS=1)
+	def test_outputs_past_max_age_render_again(self):
+		first, _ = self._run_sabana()
+		ReportJob.objects.filter(id=first.id).update(output_rendered_at=timezone.now() - timedelta(hours=2))
+		second, second_render = self._run_sabana()
+
+		self.assertIsNone(second.reused_from_id)
+		second_render.assert_called_once()
+
+	def test_cleanup_keeps_files_still_served_by_live_jobs(self):
+		first, _ = self._run_sabana()
+		second, _ = self._run_sabana()
+		self.assertEqual(second.reused_from_id, first.id)
+		ReportJob.objects.filter(id=first.id).update(expires_at=timezone.now() - timedelta(hours=1))
+		ReportJob.objects.filter(id=second.id).update(expires_at=timezone.now() + timedelta(hours=1))
+
+		call_command("cleanup_report_jobs")
+
+		self.assertFalse(ReportJob.objects.filter(id=first.id).exists())
+		self.assertTrue((self.private_root / second.output_relpath).exists())
+
+	def test_operations_overview_reports_hit_ratio(self):
+		self._run_sabana()
+		self._run_sabana()
+		self._run_sabana()
+
+		self.client.force_authenticate(user=self.admin)
+		res = self.client.get("/api/reports/operations/jobs/overview/")
+		self.assertEqual(res.status_code, 200)
+		self.assertEqual(
+			res.data["report_jobs"]["result_reuse"],
+			{"eligible": 3, "reused": 2, "hit_ratio": 0.6667},
+		)
+
 # Create your tests here.
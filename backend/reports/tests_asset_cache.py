@@ -0,0 +1,78 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from .asset_cache import clear_local_asset_cache, image_file_data_uri, qr_png_data_uri, thumbnail_data_uri
+
+
+def _write_png(path: Path, color: str) -> None:
+    from PIL import Image
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (400, 300), color).save(path, format="PNG")
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "report-asset-tests"}}
+)
+class ReportAssetCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        clear_local_asset_cache()
+        self.addCleanup(clear_local_asset_cache)
+
+    def test_qr_is_drawn_once_per_text_and_size(self):
+        first = qr_png_data_uri("https://kampus.test/verify/abc", box_size=4, border=2)
+        self.assertTrue(first.startswith("data:image/png;base64,"))
+
+        with patch("qrcode.QRCode", side_effect=AssertionError("QR must come from the cache")):
+            self.assertEqual(qr_png_data_uri("https://kampus.test/verify/abc", box_size=4, border=2), first)
+
+        self.assertNotEqual(qr_png_data_uri("https://kampus.test/verify/abc"), first)
+
+    def test_shared_cache_serves_other_workers(self):
+        first = qr_png_data_uri("VOTE-0001")
+        # A new worker process starts with an empty local LRU.
+        clear_local_asset_cache()
+        with patch("qrcode.QRCode", side_effect=AssertionError("QR must come from the shared cache")):
+            self.assertEqual(qr_png_data_uri("VOTE-0001"), first)
+
+    def test_thumbnails_are_keyed_by_file_content(self):
+        with TemporaryDirectory() as tmp:
+            logo = Path(tmp) / "a" / "logo.png"
+            copy = Path(tmp) / "b" / "logo.png"
+            _write_png(logo, "red")
+            _write_png(copy, "red")
+
+            first = thumbnail_data_uri(logo, max_w=120, max_h=150, quality=55)
+            self.assertTrue(first.startswith("data:image/jpeg;base64,"))
+            with patch("PIL.Image.open", side_effect=AssertionError("same bytes must reuse the thumbnail")):
+                self.assertEqual(thumbnail_data_uri(copy, max_w=120, max_h=150, quality=55), first)
+
+            _write_png(logo, "blue")
+            self.assertNotEqual(thumbnail_data_uri(logo, max_w=120, max_h=150, quality=55), first)
+            self.assertNotEqual(thumbnail_data_uri(copy, max_w=60, max_h=75, quality=55), first)
+
+    def test_unreadable_sources_are_not_cached(self):
+        with TemporaryDirectory() as tmp:
+            missing = Path(tmp) / "missing.png"
+            self.assertEqual(image_file_data_uri(missing), "")
+
+            broken = Path(tmp) / "broken.png"
+            broken.write_bytes(b"not an image")
+            self.assertEqual(thumbnail_data_uri(broken, max_w=10, max_h=10, quality=50), "")
+            _write_png(broken, "green")
+            self.assertTrue(thumbnail_data_uri(broken, max_w=10, max_h=10, quality=50))
+
+    def test_local_lru_is_bounded(self):
+        from . import asset_cache
+
+        with override_settings(REPORT_ASSET_CACHE_LOCAL_MAX_BYTES=3000):
+            for idx in range(10):
+                qr_png_data_uri(f"VOTE-{idx:04d}", box_size=2, border=1)
+
+            self.assertLessEqual(asset_cache._local_assets_bytes, 3000)
+            self.assertLess(len(asset_cache._local_assets), 10)
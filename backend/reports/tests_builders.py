@@ -0,0 +1,149 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from .models import ReportJob
+from .tasks import REPORT_BUILDERS, ReportBuilder, generate_report_job_pdf, get_report_builder
+
+
+class ReportBuilderRegistryTests(TestCase):
+    def test_every_rendered_report_type_has_a_builder(self):
+        expected = set(ReportJob.ReportType.values) - {ReportJob.ReportType.ACADEMIC_PERIOD_BATCH}
+        self.assertEqual(set(REPORT_BUILDERS), expected)
+
+        with self.assertRaisesMessage(ValueError, "Unsupported report_type: NOPE"):
+            get_report_builder("NOPE")
+
+    def test_carnet_chunks_hold_whole_pages(self):
+        builder = get_report_builder(ReportJob.ReportType.ELECTION_CENSUS_QR)
+
+        with override_settings(REPORT_PDF_CHUNK_CARDS=50):
+            self.assertEqual(builder.units_per_document(), 48)
+        with override_settings(REPORT_PDF_CHUNK_CARDS=5):
+            self.assertEqual(builder.units_per_document(), 12)
+
+    def test_builders_must_implement_load_and_render(self):
+        class LoadOnlyBuilder(ReportBuilder):
+            def load(self, job, *, report_context=None):
+                return None
+
+        with self.assertRaises(TypeError):
+            LoadOnlyBuilder()
+
+        job = ReportJob(report_type=ReportJob.ReportType.DUMMY)
+        with self.assertRaisesMessage(ValueError, "TemplateReportBuilder only produces PDF output"):
+            get_report_builder(ReportJob.ReportType.DUMMY).write_output(job, None, Path("unused.xlsx"))
+
+    def test_only_growing_reports_are_split_into_documents(self):
+        chunked = {t for t, builder in REPORT_BUILDERS.items() if builder.units_per_document() is not None}
+        self.assertEqual(chunked, {ReportJob.ReportType.ACADEMIC_PERIOD_GROUP, ReportJob.ReportType.ELECTION_CENSUS_QR})
+
+
+@override_settings(REPORT_PDF_CHUNK_CARDS=3)
+class ReportBuilderProgressTests(TestCase):
+    def setUp(self):
+        # Three carnets per page keeps the chunking observable with a few rows.
+        per_page = patch("reports.tasks._ELECTION_QR_CARDS_PER_PAGE", 3)
+        per_page.start()
+        self.addCleanup(per_page.stop)
+        User = get_user_model()
+        self.admin = User.objects.create_user(username="builders_admin", password="p1", role=User.ROLE_ADMIN)
+        self.job = ReportJob.objects.create(
+            created_by=self.admin,
+            report_type=ReportJob.ReportType.ELECTION_CENSUS_QR,
+            params={
+                "process_name": "Personero",
+                "year_label": "2026",
+                "rows_data": [{"manual_code": f"VOTE-{idx}", "full_name": f"Est {idx}"} for idx in range(4)],
+            },
+        )
+
+    def _run(self, write_chunks):
+        progress = []
+        set_progress = ReportJob.set_progress
+
+        def _record(job, value):
+            progress.append(value)
+            set_progress(job, value)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with (
+                override_settings(PRIVATE_STORAGE_ROOT=Path(tmp), PRIVATE_REPORTS_DIR="reports"),
+                patch.object(ReportJob, "set_progress", _record),
+                patch("reports.weasyprint_utils.write_pdf_from_html_chunks", side_effect=write_chunks),
+            ):
+                generate_report_job_pdf.apply(args=(self.job.id,))
+        self.job.refresh_from_db()
+        return progress
+
+    def test_progress_advances_per_rendered_unit(self):
+        documents = []
+
+        def _write(*, chunks, out_path, base_url=None):
+            documents.extend(chunks)
+            out_path.write_bytes(b"%PDF-1.4\n")
+            return len(documents)
+
+        progress = self._run(_write)
+
+        self.assertEqual(self.job.status, ReportJob.Status.SUCCEEDED)
+        self.assertEqual([doc.count('class="card-shell"') for doc in documents], [3, 1])
+        # 10 → load → 40, then one step per carnet up to 90.
+        self.assertEqual(progress, [10, 40, 52, 65, 77, 90, 95])
+
+    def test_canceled_job_stops_between_units(self):
+        rendered = []
+
+        def _write(*, chunks, out_path, base_url=None):
+            for doc in chunks:
+                rendered.append(doc)
+                ReportJob.objects.filter(id=self.job.id).update(status=ReportJob.Status.CANCELED)
+            out_path.write_bytes(b"%PDF-1.4\n")
+
+        progress = self._run(_write)
+
+        self.assertEqual(self.job.status, ReportJob.Status.CANCELED)
+        self.assertEqual(len(rendered), 1)
+        self.assertEqual(progress, [10, 40, 52, 65, 77, 90])
+        self.assertFalse(self.job.events.filter(event_type="FAILED").exists())
+
+
+class SabanaXlsxJobTests(TestCase):
+    def test_xlsx_sabana_is_written_without_weasyprint(self):
+        from academic.management.commands.benchmark_promotions import seed_synthetic_school  # noqa: PLC0415
+        from academic.models import Group, Period  # noqa: PLC0415
+
+        year = seed_synthetic_school(
+            groups=1, students_per_group=3, subjects=2, periods=1, achievements_per_subject=1
+        )
+        User = get_user_model()
+        admin = User.objects.create_user(username="builders_sabana", password="p1", role=User.ROLE_ADMIN)
+        job = ReportJob.objects.create(
+            created_by=admin,
+            report_type=ReportJob.ReportType.ACADEMIC_PERIOD_SABANA,
+            params={
+                "group_id": Group.objects.get(academic_year=year).id,
+                "period_id": Period.objects.get(academic_year=year).id,
+                "format": "xlsx",
+            },
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with (
+                override_settings(PRIVATE_STORAGE_ROOT=Path(tmp), PRIVATE_REPORTS_DIR="reports"),
+                patch("reports.weasyprint_utils.render_pdf_bytes_from_html") as render_pdf,
+            ):
+                generate_report_job_pdf.apply(args=(job.id,))
+                job.refresh_from_db()
+                output = Path(tmp) / job.output_relpath
+                self.assertTrue(output.read_bytes().startswith(b"PK"))
+
+        render_pdf.assert_not_called()
+        self.assertEqual(job.status, ReportJob.Status.SUCCEEDED)
+        self.assertTrue(job.output_filename.endswith(".xlsx"))
+        self.assertEqual(
+            job.output_content_type, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .lanes import LANE_BULK, LANE_INTERACTIVE, fair_share_delay, lane_stats, report_lane
+from .models import ReportJob
+from .tasks import generate_report_job_pdf
+
+
+@override_settings(
+    CELERY_TASK_ALWAYS_EAGER=False,
+    REPORT_LANES_ENABLED=True,
+    REPORT_INTERACTIVE_QUEUE="reports_interactive",
+    REPORT_INTERACTIVE_SOFT_TIME_LIMIT=120,
+    REPORT_INTERACTIVE_TIME_LIMIT=150,
+    REPORT_INTERACTIVE_MAX_RUNNING_PER_USER=2,
+    REPORT_BULK_QUEUE="reports_bulk",
+    REPORT_BULK_SOFT_TIME_LIMIT=1200,
+    REPORT_BULK_TIME_LIMIT=1260,
+    REPORT_BULK_MAX_RUNNING_PER_USER=1,
+    REPORT_FAIR_SHARE_DEFER_SECONDS=15,
+)
+class ReportLaneTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username="lanes_admin", password="p1", role=User.ROLE_ADMIN)
+        self.other = User.objects.create_user(username="lanes_other", password="p1", role=User.ROLE_ADMIN)
+
+    def _job(self, report_type, *, user=None, **fields) -> ReportJob:
+        return ReportJob.objects.create(created_by=user or self.user, report_type=report_type, params={}, **fields)
+
+    def test_report_types_are_split_into_lanes(self):
+        self.assertEqual(report_lane(ReportJob.ReportType.CERTIFICATE_STUDIES), LANE_INTERACTIVE)
+        self.assertEqual(report_lane(ReportJob.ReportType.STUDY_CERTIFICATION), LANE_INTERACTIVE)
+        self.assertEqual(report_lane(ReportJob.ReportType.ACADEMIC_PERIOD_GROUP), LANE_BULK)
+        self.assertEqual(report_lane(ReportJob.ReportType.ELECTION_CENSUS_QR), LANE_BULK)
+        self.assertEqual(report_lane("UNKNOWN"), LANE_BULK)
+
+    def test_delay_sends_job_to_its_lane_queue_with_lane_limits(self):
+        certificate = self._job(ReportJob.ReportType.CERTIFICATE_STUDIES)
+        carnets = self._job(ReportJob.ReportType.ELECTION_CENSUS_QR)
+        child = self._job(ReportJob.ReportType.ACADEMIC_PERIOD_ENROLLMENT, parent=carnets)
+
+        with patch("celery.app.task.Task.apply_async") as send:
+            generate_report_job_pdf.delay(certificate.id)
+            generate_report_job_pdf.delay(carnets.id)
+            generate_report_job_pdf.delay(child.id)
+
+        sent = [call.kwargs for call in send.call_args_list]
+        self.assertEqual(
+            sent[0], {"queue": "reports_interactive", "soft_time_limit": 120, "time_limit": 150}
+        )
+        self.assertEqual(sent[1], {"queue": "reports_bulk", "soft_time_limit": 1200, "time_limit": 1260})
+        self.assertEqual(sent[2]["queue"], "reports_bulk")
+
+    @override_settings(REPORT_LANES_ENABLED=False)
+    def test_disabled_lanes_keep_jobs_on_the_default_queue(self):
+        certificate = self._job(ReportJob.ReportType.CERTIFICATE_STUDIES)
+
+        with patch("celery.app.task.Task.apply_async") as send:
+            generate_report_job_pdf.delay(certificate.id)
+
+        self.assertEqual(send.call_args.kwargs, {"soft_time_limit": 120, "time_limit": 150})
+
+    def test_fair_share_defers_users_over_their_lane_limit(self):
+        self._job(ReportJob.ReportType.ACADEMIC_PERIOD_SABANA, status=ReportJob.Status.RUNNING, started_at=timezone.now())
+
+        self.assertEqual(fair_share_delay(self._job(ReportJob.ReportType.ACADEMIC_PERIOD_GROUP)), 15)
+        # Other users and the interactive lane are not affected.
+        self.assertIsNone(fair_share_delay(self._job(ReportJob.ReportType.ACADEMIC_PERIOD_GROUP, user=self.other)))
+        self.assertIsNone(fair_share_delay(self._job(ReportJob.ReportType.CERTIFICATE_STUDIES)))
+
+    def test_fair_share_ignores_jobs_stuck_past_the_hard_limit(self):
+        self._job(
+            ReportJob.ReportType.ACADEMIC_PERIOD_SABANA,
+            status=ReportJob.Status.RUNNING,
+            started_at=timezone.now() - timedelta(seconds=1300),
+        )
+        self.assertIsNone(fair_share_delay(self._job(ReportJob.ReportType.ACADEMIC_PERIOD_GROUP)))
+
+    def test_lane_stats_report_depth_and_wait_per_lane(self):
+        now = timezone.now()
+        self._job(ReportJob.ReportType.CERTIFICATE_STUDIES)
+        self._job(ReportJob.ReportType.ACADEMIC_PERIOD_GROUP)
+        self._job(ReportJob.ReportType.ACADEMIC_PERIOD_SABANA)
+        started = self._job(ReportJob.ReportType.STUDY_CERTIFICATION, status=ReportJob.Status.SUCCEEDED)
+        ReportJob.objects.filter(id=started.id).update(created_at=now - timedelta(seconds=8), started_at=now)
+
+        stats = lane_stats(now=now, window_start=now - timedelta(hours=24))
+
+        self.assertEqual(stats[LANE_INTERACTIVE]["queue"], "reports_interactive")
+        self.assertEqual(stats[LANE_INTERACTIVE]["queue_depth"], 1)
+        self.assertEqual(stats[LANE_BULK]["queue_depth"], 2)
+        self.assertEqual(stats[LANE_INTERACTIVE]["started_in_window"], 1)
+        self.assertEqual(stats[LANE_INTERACTIVE]["wait_seconds_max"], 8.0)
+        self.assertIsNone(stats[LANE_BULK]["wait_seconds_avg"])
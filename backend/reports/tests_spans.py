@@ -0,0 +1,108 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from .models import ReportJob
+from .spans import SpanRecorder, record_pdf_render, render_to_string, timing_percentiles
+
+
+class SpanRecorderTests(TestCase):
+    def test_stage_collects_queries_templates_and_renders(self):
+        spans = SpanRecorder()
+        with spans.stage("html"):
+            list(ReportJob.objects.all())
+            render_to_string("students/reports/enrollment_list_pdf.html", {"rows": []})
+        with spans.stage("pdf"):
+            record_pdf_render(0.5)
+            record_pdf_render(0.25, layout_only=True)
+        # Outside a stage nothing is recorded.
+        record_pdf_render(9.0)
+
+        html, pdf = spans.spans
+        self.assertEqual(html.name, "html")
+        self.assertEqual(html.queries, 1)
+        self.assertEqual(html.templates, 1)
+        self.assertEqual((pdf.pdf_renders, pdf.pdf_render_s), (1, 0.5))
+        self.assertEqual((pdf.layout_renders, pdf.layout_render_s), (1, 0.25))
+
+        meta = spans.as_meta()
+        self.assertEqual([stage["name"] for stage in meta["stages"]], ["html", "pdf"])
+        self.assertIn("total_s", meta)
+
+    def test_stage_records_current_rss_at_start_and_end(self):
+        spans = SpanRecorder()
+        with patch("reports.spans._current_rss_kb", side_effect=[1000, 1500]):
+            with spans.stage("pdf"):
+                pass
+
+        stage = spans.as_meta()["stages"][0]
+        self.assertEqual((stage["rss_start_kb"], stage["rss_end_kb"], stage["rss_delta_kb"]), (1000, 1500, 500))
+        rows = [("DUMMY", {"total_s": 1.0, "rss_process_peak_kb": 9000, "stages": [stage]})]
+        result = timing_percentiles(rows)["DUMMY"]
+        self.assertEqual(result["stages"]["pdf"]["rss_delta_kb"], {"p50": 500, "p95": 500})
+        self.assertNotIn("rss_process_peak_kb", result)
+
+    def test_timing_percentiles_per_report_type(self):
+        rows = [
+            ("ACADEMIC_PERIOD_SABANA", {"total_s": float(i), "stages": [{"name": "pdf", "wall_s": float(i)}]})
+            for i in range(1, 21)
+        ]
+        rows.append(("CERTIFICATE_STUDIES", {"total_s": 0.4, "stages": []}))
+
+        result = timing_percentiles(rows)
+
+        sabana = result["ACADEMIC_PERIOD_SABANA"]
+        self.assertEqual(sabana["jobs"], 20)
+        self.assertEqual(sabana["total_s"], {"p50": 11.0, "p95": 20.0})
+        self.assertEqual(sabana["stages"]["pdf"]["wall_s"], {"p50": 11.0, "p95": 20.0})
+        self.assertEqual(result["CERTIFICATE_STUDIES"]["jobs"], 1)
+
+    def test_batch_parts_add_stages_but_not_jobs(self):
+        part_stage = {"name": "part", "wall_s": 2.0, "templates": 3}
+        rows = [
+            ("ACADEMIC_PERIOD_BATCH", {"total_s": 2.5, "batch_part_job_id": 7, "stages": [part_stage]}),
+            ("ACADEMIC_PERIOD_BATCH", {"total_s": 0.5, "stages": [{"name": "write", "wall_s": 0.4}]}),
+        ]
+
+        result = timing_percentiles(rows)["ACADEMIC_PERIOD_BATCH"]
+
+        self.assertEqual(result["jobs"], 1)
+        self.assertEqual(result["total_s"], {"p50": 0.5, "p95": 0.5})
+        self.assertEqual(result["stages"]["part"]["templates"], {"p50": 3, "p95": 3})
+
+
+class ReportJobTimingsTests(APITestCase):
+    def test_job_timings_are_stored_and_exposed_to_operations(self):
+        from reports.tasks import generate_report_job_pdf  # noqa: PLC0415
+
+        User = get_user_model()
+        superadmin = User.objects.create_user(username="spans_super", password="p1", role=User.ROLE_SUPERADMIN)
+        job = ReportJob.objects.create(created_by=superadmin, report_type=ReportJob.ReportType.DUMMY, params={})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with (
+                override_settings(PRIVATE_STORAGE_ROOT=Path(tmp), PRIVATE_REPORTS_DIR="reports"),
+                patch("reports.weasyprint_utils.render_pdf_bytes_from_html", return_value=b"%PDF-1.4\n"),
+            ):
+                generate_report_job_pdf.apply(args=(job.id,))
+
+        event = job.events.get(event_type="TIMINGS")
+        self.assertEqual([stage["name"] for stage in event.meta["stages"]], ["fingerprint", "html", "pdf", "write"])
+        self.assertEqual(event.meta["output_size_bytes"], len(b"%PDF-1.4\n"))
+
+        self.client.force_authenticate(user=superadmin)
+        res = self.client.get("/api/reports/operations/jobs/timings/", {"hours": 1})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["report_types"]["DUMMY"]["jobs"], 1)
+        self.assertIn("write", res.data["report_types"]["DUMMY"]["stages"])
+
+    def test_timings_require_superadmin(self):
+        User = get_user_model()
+        admin = User.objects.create_user(username="spans_admin", password="p1", role=User.ROLE_ADMIN)
+        self.client.force_authenticate(user=admin)
+        res = self.client.get("/api/reports/operations/jobs/timings/")
+        self.assertEqual(res.status_code, 403)
@@ -1,9 +1,17 @@
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 from django.test import SimpleTestCase, override_settings
 
-from .weasyprint_utils import _rewrite_local_media_urls, weasyprint_url_fetcher
+from .weasyprint_utils import (
+    WeasyPrintRenderer,
+    _rewrite_local_media_urls,
+    count_pages_from_html,
+    get_renderer,
+    weasyprint_url_fetcher,
+    write_pdf_from_html_chunks,
+)
 
 
 class WeasyPrintUrlFetcherTests(SimpleTestCase):
@@ -57,3 +65,185 @@ class WeasyPrintUrlFetcherTests(SimpleTestCase):
                 rewritten = _rewrite_local_media_urls('<img src="/media/institutions/letterheads/missing.png">')
 
         self.assertIn("data:image/png;base64,", rewritten)
+
+
+class WritePdfFromHtmlChunksTests(SimpleTestCase):
+    def _fake_document(self, written: list[str]):
+        from io import BytesIO
+
+        from pypdf import PdfWriter
+
+        class _Document:
+            def __init__(self, html):
+                self.html = html
+
+            def write_pdf(self, target, **options):
+                writer = PdfWriter()
+                writer.add_blank_page(width=100 + len(written), height=100)
+                buf = BytesIO()
+                writer.write(buf)
+                Path(target).write_bytes(buf.getvalue())
+                written.append(self.html)
+
+        return lambda *, html, base_url, extra_css: (_Document(html), {})
+
+    def test_chunks_are_rendered_one_at_a_time_and_concatenated_in_order(self):
+        from pypdf import PdfReader
+
+        written: list[str] = []
+
+        def chunks():
+            for index in range(3):
+                # The previous chunk must already be on disk before the next one is produced.
+                self.assertEqual(len(written), index)
+                yield f"<p>{index}</p>"
+
+        with TemporaryDirectory() as tmp:
+            out_path = Path(tmp) / "out" / "report.pdf"
+            with patch("reports.weasyprint_utils._weasyprint_document", side_effect=self._fake_document(written)):
+                parts = write_pdf_from_html_chunks(chunks=chunks(), out_path=out_path)
+
+            self.assertEqual(parts, 3)
+            reader = PdfReader(str(out_path))
+            self.assertEqual([float(p.mediabox.width) for p in reader.pages], [100.0, 101.0, 102.0])
+            self.assertEqual(sorted(p.name for p in out_path.parent.iterdir()), ["report.pdf"])
+
+    def test_single_chunk_is_moved_into_place(self):
+        from pypdf import PdfReader
+
+        written: list[str] = []
+        with TemporaryDirectory() as tmp:
+            out_path = Path(tmp) / "report.pdf"
+            with patch("reports.weasyprint_utils._weasyprint_document", side_effect=self._fake_document(written)):
+                parts = write_pdf_from_html_chunks(chunks=iter(["<p>x</p>"]), out_path=out_path)
+
+            self.assertEqual(parts, 1)
+            self.assertEqual(len(PdfReader(str(out_path)).pages), 1)
+
+    def test_merged_pages_are_numbered_across_chunks(self):
+        from io import BytesIO
+
+        from pypdf import PdfReader, PdfWriter
+
+        css_by_chunk: list[str] = []
+
+        class _Document:
+            def __init__(self, pages):
+                self.pages = pages
+
+            def write_pdf(self, target, **options):
+                writer = PdfWriter()
+                for _ in range(self.pages):
+                    writer.add_blank_page(width=595, height=842)
+                buf = BytesIO()
+                writer.write(buf)
+                Path(target).write_bytes(buf.getvalue())
+
+        def fake_document(*, html, base_url, extra_css):
+            css_by_chunk.append(extra_css)
+            return _Document(int(html)), {}
+
+        with TemporaryDirectory() as tmp:
+            out_path = Path(tmp) / "report.pdf"
+            with patch("reports.weasyprint_utils._weasyprint_document", side_effect=fake_document):
+                write_pdf_from_html_chunks(chunks=iter(["2", "3"]), out_path=out_path, extra_css="p { color: red; }")
+
+            footers = [page.extract_text().strip() for page in PdfReader(str(out_path)).pages]
+
+        self.assertEqual(footers, [f"Página {n} de 5" for n in range(1, 6)])
+        # WeasyPrint's own footer would restart its count in every chunk.
+        for css in css_by_chunk:
+            self.assertIn("p { color: red; }", css)
+            self.assertIn("@bottom-right { content: none; }", css)
+
+
+class CountPagesFromHtmlTests(SimpleTestCase):
+    def test_uses_layout_pass_without_writing_pdf(self):
+        class _Document:
+            def render(self, **options):
+                return type("Rendered", (), {"pages": [object(), object(), object()]})()
+
+            def write_pdf(self, *args, **kwargs):  # pragma: no cover - must not be called
+                raise AssertionError("count_pages_from_html must not serialize a PDF")
+
+        with patch(
+            "reports.weasyprint_utils._weasyprint_document",
+            return_value=(_Document(), {}),
+        ):
+            self.assertEqual(count_pages_from_html(html="<p>x</p>"), 3)
+
+
+class WeasyPrintRendererTests(SimpleTestCase):
+    def _fake_weasyprint(self):
+        created = {"css": 0, "fonts": 0}
+
+        class _CSS:
+            def __init__(self, string, font_config, url_fetcher):
+                created["css"] += 1
+                self.string = string
+                self.font_config = font_config
+
+        class _HTML:
+            def __init__(self, string, base_url, url_fetcher):
+                self.string = string
+                self.url_fetcher = url_fetcher
+
+        class _FontConfiguration:
+            def __init__(self):
+                created["fonts"] += 1
+
+        module = type("weasyprint", (), {"CSS": _CSS, "HTML": _HTML})
+        return created, patch("reports.weasyprint_utils._import_weasyprint", return_value=(module, _FontConfiguration))
+
+    def test_stylesheets_and_fonts_are_built_once_per_renderer(self):
+        created, fake = self._fake_weasyprint()
+        renderer = WeasyPrintRenderer()
+        with fake:
+            first_doc, first = renderer.document(html="<p>a</p>", base_url=None, extra_css="p { color: red; }")
+            second_doc, second = renderer.document(html="<p>b</p>", base_url=None, extra_css="p { color: red; }")
+            _, third = renderer.document(html="<p>c</p>", base_url=None, extra_css="p { color: blue; }")
+
+        self.assertEqual(created, {"css": 3, "fonts": 1})
+        self.assertEqual(first["stylesheets"], second["stylesheets"])
+        self.assertIs(first["stylesheets"][0], third["stylesheets"][0])
+        self.assertIsNot(first["stylesheets"][1], third["stylesheets"][1])
+        self.assertIs(first["font_config"], third["font_config"])
+        self.assertEqual(first_doc.url_fetcher, renderer.url_fetcher)
+        self.assertEqual(renderer.stats["stylesheet_hits"], 3)
+
+    def test_local_files_are_read_once_until_they_change(self):
+        renderer = WeasyPrintRenderer()
+        with TemporaryDirectory() as tmp_media_root:
+            logo = Path(tmp_media_root) / "institutions" / "logo.png"
+            logo.parent.mkdir(parents=True)
+            logo.write_bytes(b"v1")
+
+            with override_settings(MEDIA_URL="/media/", MEDIA_ROOT=tmp_media_root):
+                first = renderer.url_fetcher("/media/institutions/logo.png")
+                second = renderer.url_fetcher(logo.resolve().as_uri())
+                self.assertEqual(first["string"], b"v1")
+                self.assertEqual(second["string"], b"v1")
+                self.assertEqual(first["mime_type"], "image/png")
+                self.assertEqual(renderer.stats["resource_misses"], 1)
+                self.assertEqual(renderer.stats["resource_hits"], 1)
+
+                logo.write_bytes(b"v2-longer")
+                third = renderer.url_fetcher("/media/institutions/logo.png")
+
+        self.assertEqual(third["string"], b"v2-longer")
+        self.assertEqual(renderer.stats["resource_misses"], 2)
+
+    def test_missing_media_still_uses_placeholder(self):
+        renderer = WeasyPrintRenderer()
+        with TemporaryDirectory() as tmp_media_root:
+            with override_settings(MEDIA_URL="/media/", MEDIA_ROOT=tmp_media_root):
+                response = renderer.url_fetcher("/media/institutions/missing.png")
+
+        self.assertTrue(response["string"].startswith(b"\x89PNG"))
+
+    def test_renderer_is_reused_per_process(self):
+        renderer = get_renderer()
+        self.assertIs(get_renderer(), renderer)
+        with patch("reports.weasyprint_utils.os.getpid", return_value=renderer.pid + 1):
+            forked = get_renderer()
+        self.assertIsNot(forked, renderer)
@@ -9,6 +9,7 @@ from .views import (
 	OperationsDispatchRetryFailedAPIView,
 	OperationsDispatchExportAPIView,
 	OperationsPeriodicRunLogsAPIView,
+	OperationsReportTimingsAPIView,
 	OperationsRunLogsAPIView,
 	OperationsRunNowAPIView,
 	PdfHealthcheckAPIView,
@@ -23,6 +24,7 @@ urlpatterns = [
 	path("reports/health/pdf/", PdfHealthcheckAPIView.as_view(), name="reports-health-pdf"),
 	path("reports/operations/jobs/overview/", OperationsJobsOverviewAPIView.as_view(), name="reports-ops-overview"),
 	path("reports/operations/jobs/run-now/", OperationsRunNowAPIView.as_view(), name="reports-ops-run-now"),
+	path("reports/operations/jobs/timings/", OperationsReportTimingsAPIView.as_view(), name="reports-ops-timings"),
 	path("reports/operations/jobs/runs/<int:job_id>/logs/", OperationsRunLogsAPIView.as_view(), name="reports-ops-run-logs"),
 	path(
 		"reports/operations/jobs/periodic-runs/<int:run_id>/logs/",
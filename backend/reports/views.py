@@ -6,7 +6,7 @@ from io import StringIO
 
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Count
+from django.db.models import Count, Q
 
 from django.conf import settings
 from django.core.management import call_command
@@ -33,9 +33,11 @@ from notifications.tasks import (
 )
 from teachers.tasks import notify_pending_planning_teachers_task
 
+from .lanes import lane_stats
 from .models import PeriodicJobRun, PeriodicJobRuntimeConfig, ReportJob, ReportJobEvent
 from .serializers import ReportJobCreateSerializer, ReportJobSerializer
-from .tasks import _render_report_html, generate_report_job_pdf
+from .spans import timing_percentiles
+from .tasks import _render_report_html, generate_report_batch_job, generate_report_job_pdf
 from .weasyprint_utils import WeasyPrintUnavailableError, render_pdf_bytes_from_html
 from notifications.models import NotificationDispatch
 
@@ -270,6 +272,18 @@ class OperationsJobsOverviewAPIView(APIView):
 		)
 		report_counts = {row["status"]: row["total"] for row in report_counts_raw}
 
+		# Hit ratio of input-fingerprint reuse among fingerprinted jobs that finished OK.
+		reuse_counts = ReportJob.objects.filter(
+			created_at__gte=window_start,
+			status=ReportJob.Status.SUCCEEDED,
+			input_fingerprint__isnull=False,
+		).aggregate(
+			eligible=Count("id"),
+			reused=Count("id", filter=Q(reused_from__isnull=False)),
+		)
+		reuse_eligible = reuse_counts["eligible"] or 0
+		reuse_hits = reuse_counts["reused"] or 0
+
 		email_counts_raw = (
 			EmailDelivery.objects.filter(created_at__gte=window_start)
 			.values("status")
@@ -319,6 +333,12 @@ class OperationsJobsOverviewAPIView(APIView):
 					"counts_by_status": report_counts,
 					"running": report_counts.get(ReportJob.Status.RUNNING, 0),
 					"failed": report_counts.get(ReportJob.Status.FAILED, 0),
+					"result_reuse": {
+						"eligible": reuse_eligible,
+						"reused": reuse_hits,
+						"hit_ratio": round(reuse_hits / reuse_eligible, 4) if reuse_eligible else None,
+					},
+					"lanes": lane_stats(now=now, window_start=window_start),
 				},
 				"notifications": {
 					"created_last_24h": notifications_created,
@@ -397,6 +417,34 @@ class OperationsRunNowAPIView(APIView):
 		)
 
 
+class OperationsReportTimingsAPIView(APIView):
+	permission_classes = [IsSuperAdmin]
+
+	def get(self, request, *args, **kwargs):
+		try:
+			hours = int(request.query_params.get("hours") or 24 * 7)
+		except (TypeError, ValueError):
+			return Response({"detail": "hours debe ser un entero."}, status=status.HTTP_400_BAD_REQUEST)
+		hours = max(1, min(hours, 24 * 90))
+
+		now = timezone.now()
+		rows = ReportJobEvent.objects.filter(
+			event_type="TIMINGS",
+			created_at__gte=now - timedelta(hours=hours),
+		).values_list("job__report_type", "meta")
+		report_type = str(request.query_params.get("report_type") or "").strip()
+		if report_type:
+			rows = rows.filter(job__report_type=report_type)
+
+		return Response(
+			{
+				"window_hours": hours,
+				"generated_at": now,
+				"report_types": timing_percentiles(rows.iterator()),
+			}
+		)
+
+
 class OperationsRunLogsAPIView(APIView):
 	permission_classes = [IsSuperAdmin]
 
@@ -848,6 +896,9 @@ class ReportJobViewSet(viewsets.ModelViewSet):
 
 	def get_queryset(self):
 		qs = super().get_queryset()
+		if self.action == "list":
+			# Per-group children of a batch are reached through the parent job.
+			qs = qs.filter(parent__isnull=True)
 		user = self.request.user
 		if _is_admin(user) or getattr(user, "is_staff", False):
 			return qs
@@ -867,7 +918,9 @@ class ReportJobViewSet(viewsets.ModelViewSet):
 		max_active = int(getattr(settings, "REPORT_JOBS_MAX_ACTIVE_PER_USER", 3))
 		max_active_admin = int(getattr(settings, "REPORT_JOBS_MAX_ACTIVE_PER_ADMIN", 20))
 		active_limit = max_active_admin if is_admin_like else max_active
-		active_count = ReportJob.objects.filter(created_by=user, status__in=active_statuses).count()
+		active_count = ReportJob.objects.filter(
+			created_by=user, status__in=active_statuses, parent__isnull=True
+		).count()
 		if active_count >= active_limit:
 			return Response(
 				{
@@ -882,7 +935,9 @@ class ReportJobViewSet(viewsets.ModelViewSet):
 		max_per_hour_admin = int(getattr(settings, "REPORT_JOBS_MAX_CREATED_PER_HOUR_ADMIN", 300))
 		per_hour_limit = max_per_hour_admin if is_admin_like else max_per_hour
 		since = timezone.now() - timedelta(hours=1)
-		created_last_hour = ReportJob.objects.filter(created_by=user, created_at__gte=since).count()
+		created_last_hour = ReportJob.objects.filter(
+			created_by=user, created_at__gte=since, parent__isnull=True
+		).count()
 		if created_last_hour >= per_hour_limit:
 			return Response(
 				{
@@ -930,7 +985,10 @@ class ReportJobViewSet(viewsets.ModelViewSet):
 			)
 
 		# Enqueue async generation
-		generate_report_job_pdf.delay(job.id)
+		if job.report_type == ReportJob.ReportType.ACADEMIC_PERIOD_BATCH:
+			generate_report_batch_job.delay(job.id)
+		else:
+			generate_report_job_pdf.delay(job.id)
 
 		out = ReportJobSerializer(job, context={"request": request}).data
 		return Response(out, status=status.HTTP_202_ACCEPTED)
@@ -990,6 +1048,11 @@ class ReportJobViewSet(viewsets.ModelViewSet):
 		in a browser and iterate quickly without waiting for PDF rendering.
 		"""
 		job: ReportJob = self.get_object()
+		if job.report_type == ReportJob.ReportType.ACADEMIC_PERIOD_BATCH:
+			return Response(
+				{"detail": "Los lotes no tienen vista previa; usa la de cada grupo."},
+				status=status.HTTP_409_CONFLICT,
+			)
 		# Backfill the public base URL for older jobs so QR codes render as full URLs.
 		try:
 			params = job.params or {}
@@ -1,13 +1,24 @@
 from __future__ import annotations
 
 import base64
+import hashlib
 import mimetypes
+import os
 import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
 from pathlib import Path
+from typing import Any
 from urllib.parse import urlparse
+from urllib.request import url2pathname
 
 from django.conf import settings
 
+from .spans import record_pdf_render
+
 
 PDF_BASE_CSS = """
 @page {
@@ -35,6 +46,20 @@ th { background: #f8fafc; }
 """
 
 
+# Chunked documents are laid out one part at a time, so WeasyPrint's page counters
+# restart with every part: the parts are rendered without the PDF_BASE_CSS footer and
+# `_stamp_page_numbers` draws it once the merged page count is known.
+_CHUNKED_PAGE_CSS = "@page { @bottom-right { content: none; } }"
+_MM = 72 / 25.4
+_PAGE_NUMBER_FONT_SIZE = 9
+_PAGE_NUMBER_RIGHT_INSET = 12 * _MM
+# Low enough to stay inside the narrowest report margins (carnets use 6mm).
+_PAGE_NUMBER_BASELINE = 3.5 * _MM
+# Helvetica advance widths (1/1000 em) of every character of "Página N de M".
+_HELVETICA_WIDTHS = {"P": 667, "á": 556, "g": 556, "i": 222, "n": 556, "a": 556, " ": 278, "d": 556, "e": 556}
+_HELVETICA_WIDTHS.update(dict.fromkeys("0123456789", 556))
+
+
 class WeasyPrintUnavailableError(RuntimeError):
     pass
 
@@ -154,11 +179,10 @@ def _rewrite_local_media_urls(content: str) -> str:
     return css_url_pattern.sub(_css_repl, content)
 
 
-def render_pdf_bytes_from_html(*, html: str, base_url: str | None = None, extra_css: str = "") -> bytes:
-    """Render PDF bytes using WeasyPrint with safe URL fetching."""
-
+def _import_weasyprint():
     try:
-        from weasyprint import CSS, HTML  # noqa: PLC0415
+        import weasyprint  # noqa: PLC0415
+        from weasyprint.text.fonts import FontConfiguration  # noqa: PLC0415
     except (ImportError, OSError) as e:  # pragma: no cover
         raise WeasyPrintUnavailableError(
             "WeasyPrint no está disponible en este entorno (faltan dependencias del sistema, p. ej. GTK/Pango). "
@@ -166,14 +190,237 @@ def render_pdf_bytes_from_html(*, html: str, base_url: str | None = None, extra_
             "o instalar las dependencias de WeasyPrint siguiendo: "
             "https://doc.courtbouillon.org/weasyprint/stable/first_steps.html#installation"
         ) from e
+    return weasyprint, FontConfiguration
 
-    html = _rewrite_local_media_urls(html)
-    stylesheets = [CSS(string=_rewrite_local_media_urls(PDF_BASE_CSS))]
-    if extra_css:
-        stylesheets.append(CSS(string=_rewrite_local_media_urls(extra_css)))
 
-    return HTML(
-        string=html,
-        base_url=base_url,
-        url_fetcher=weasyprint_url_fetcher,
-    ).write_pdf(stylesheets=stylesheets)
+class WeasyPrintRenderer:
+    """Long-lived WeasyPrint state shared by every render of a worker.
+
+    Holds one `FontConfiguration`, the parsed base/extra stylesheets keyed by the
+    hash of their (rewritten) text, and an LRU of local files fetched during
+    rendering keyed by path + mtime + size, so logos, photos and static assets are
+    read from disk once per change instead of once per document.
+    """
+
+    STYLESHEET_CACHE_SIZE = 32
+    RESOURCE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    RESOURCE_MAX_BYTES = 8 * 1024 * 1024
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self._font_config = None
+        self._stylesheets: OrderedDict[str, Any] = OrderedDict()
+        self._resources: OrderedDict[tuple[str, int, int], tuple[bytes, str]] = OrderedDict()
+        self._resources_bytes = 0
+        self.stats = {"stylesheet_hits": 0, "stylesheet_misses": 0, "resource_hits": 0, "resource_misses": 0}
+
+    @property
+    def font_config(self):
+        if self._font_config is None:
+            _, FontConfiguration = _import_weasyprint()
+            self._font_config = FontConfiguration()
+        return self._font_config
+
+    def warm(self) -> None:
+        self.stylesheet(PDF_BASE_CSS)
+
+    def stylesheet(self, css_text: str):
+        css_text = _rewrite_local_media_urls(css_text)
+        key = hashlib.sha256(css_text.encode("utf-8")).hexdigest()
+        cached = self._stylesheets.get(key)
+        if cached is not None:
+            self._stylesheets.move_to_end(key)
+            self.stats["stylesheet_hits"] += 1
+            return cached
+
+        weasyprint, _ = _import_weasyprint()
+        stylesheet = weasyprint.CSS(string=css_text, font_config=self.font_config, url_fetcher=self.url_fetcher)
+        self.stats["stylesheet_misses"] += 1
+        self._stylesheets[key] = stylesheet
+        while len(self._stylesheets) > self.STYLESHEET_CACHE_SIZE:
+            self._stylesheets.popitem(last=False)
+        return stylesheet
+
+    def _cached_file(self, file_path: Path, *, redirected_url: str) -> dict[str, Any] | None:
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return None
+        if not file_path.is_file() or stat.st_size > self.RESOURCE_MAX_BYTES:
+            return None
+
+        key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+        cached = self._resources.get(key)
+        if cached is not None:
+            self._resources.move_to_end(key)
+            self.stats["resource_hits"] += 1
+            content, mime_type = cached
+        else:
+            content = file_path.read_bytes()
+            mime_type = mimetypes.guess_type(str(file_path))[0] or "application/octet-stream"
+            self.stats["resource_misses"] += 1
+            self._resources[key] = (content, mime_type)
+            self._resources_bytes += len(content)
+            while self._resources_bytes > self.RESOURCE_CACHE_MAX_BYTES and self._resources:
+                _, (evicted, _) = self._resources.popitem(last=False)
+                self._resources_bytes -= len(evicted)
+
+        return {"string": content, "mime_type": mime_type, "encoding": None, "redirected_url": redirected_url}
+
+    def url_fetcher(self, url: str):
+        """`weasyprint_url_fetcher` with local files served from the resource LRU."""
+
+        parsed = urlparse(url)
+        if parsed.scheme == "file":
+            file_path = Path(url2pathname(parsed.path))
+            response = self._cached_file(file_path, redirected_url=url)
+            if response is not None:
+                return response
+            return weasyprint_url_fetcher(url)
+
+        response = weasyprint_url_fetcher(url)
+        filename = response.get("filename") if isinstance(response, dict) else None
+        if filename:
+            cached = self._cached_file(Path(filename), redirected_url=response.get("redirected_url") or url)
+            if cached is not None:
+                return cached
+        return response
+
+    def document(self, *, html: str, base_url: str | None, extra_css: str):
+        weasyprint, _ = _import_weasyprint()
+        stylesheets = [self.stylesheet(PDF_BASE_CSS)]
+        if extra_css:
+            stylesheets.append(self.stylesheet(extra_css))
+
+        document = weasyprint.HTML(
+            string=_rewrite_local_media_urls(html),
+            base_url=base_url,
+            url_fetcher=self.url_fetcher,
+        )
+        return document, {"stylesheets": stylesheets, "font_config": self.font_config}
+
+
+_renderer_local = threading.local()
+
+
+def get_renderer() -> WeasyPrintRenderer:
+    """Renderer of the current worker; rebuilt after a fork so caches are never shared."""
+
+    renderer = getattr(_renderer_local, "renderer", None)
+    if renderer is None or renderer.pid != os.getpid():
+        renderer = WeasyPrintRenderer()
+        _renderer_local.renderer = renderer
+    return renderer
+
+
+def _weasyprint_document(*, html: str, base_url: str | None, extra_css: str):
+    return get_renderer().document(html=html, base_url=base_url, extra_css=extra_css)
+
+
+def render_pdf_bytes_from_html(*, html: str, base_url: str | None = None, extra_css: str = "") -> bytes:
+    """Render PDF bytes using WeasyPrint with safe URL fetching."""
+
+    started = time.perf_counter()
+    document, options = _weasyprint_document(html=html, base_url=base_url, extra_css=extra_css)
+    pdf_bytes = document.write_pdf(**options)
+    record_pdf_render(time.perf_counter() - started)
+    return pdf_bytes
+
+
+def count_pages_from_html(*, html: str, base_url: str | None = None, extra_css: str = "") -> int:
+    """Return how many pages `html` lays out to, without serializing a PDF.
+
+    Runs only WeasyPrint's layout pass (`HTML.render()`), which is what page-fitting
+    code needs; drawing and PDF serialization are skipped entirely.
+    """
+
+    started = time.perf_counter()
+    document, options = _weasyprint_document(html=html, base_url=base_url, extra_css=extra_css)
+    pages = len(document.render(**options).pages)
+    record_pdf_render(time.perf_counter() - started, layout_only=True)
+    return pages
+
+
+def write_pdf_from_html_chunks(
+    *,
+    chunks: Iterable[str],
+    out_path: Path,
+    base_url: str | None = None,
+    extra_css: str = "",
+) -> int:
+    """Render each HTML chunk as its own PDF and concatenate them into `out_path`.
+
+    Only one chunk is laid out at a time: every part is written to a temporary file
+    next to `out_path` and released before the next one is rendered. The parts are
+    then joined with pypdf, which keeps the already compressed page streams instead
+    of re-rendering, and the "Página N de M" footer is stamped over the merged pages.
+    Returns the number of parts rendered.
+    """
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    chunk_css = f"{extra_css}\n{_CHUNKED_PAGE_CSS}" if extra_css else _CHUNKED_PAGE_CSS
+
+    with tempfile.TemporaryDirectory(dir=out_path.parent, prefix=".chunks-") as tmp_dir:
+        part_paths: list[Path] = []
+        for index, html in enumerate(chunks):
+            part_path = Path(tmp_dir) / f"part-{index:05d}.pdf"
+            started = time.perf_counter()
+            document, options = _weasyprint_document(html=html, base_url=base_url, extra_css=chunk_css)
+            document.write_pdf(target=str(part_path), **options)
+            del document
+            record_pdf_render(time.perf_counter() - started)
+            part_paths.append(part_path)
+
+        if not part_paths:
+            raise ValueError("No hay contenido para generar el PDF")
+
+        from pypdf import PdfWriter  # noqa: PLC0415
+
+        writer = PdfWriter()
+        try:
+            for part_path in part_paths:
+                writer.append(str(part_path))
+            _stamp_page_numbers(writer)
+            tmp_out = Path(tmp_dir) / "merged.pdf"
+            with tmp_out.open("wb") as fh:
+                writer.write(fh)
+        finally:
+            writer.close()
+        os.replace(tmp_out, out_path)
+        return len(part_paths)
+
+
+def _stamp_page_numbers(writer) -> None:
+    """Draw the PDF_BASE_CSS footer ("Página N de M") on every page of `writer`."""
+
+    from pypdf import PageObject  # noqa: PLC0415
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject  # noqa: PLC0415
+
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+            NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+        }
+    )
+    total = len(writer.pages)
+    for number, page in enumerate(writer.pages, start=1):
+        text = f"Página {number} de {total}"
+        width = sum(_HELVETICA_WIDTHS[char] for char in text) * _PAGE_NUMBER_FONT_SIZE / 1000
+        x = float(page.mediabox.right) - _PAGE_NUMBER_RIGHT_INSET - width
+        y = float(page.mediabox.bottom) + _PAGE_NUMBER_BASELINE
+
+        content = DecodedStreamObject()
+        content.set_data(
+            # #64748b, the footer color of PDF_BASE_CSS.
+            b"BT /F1 %d Tf 0.392 0.455 0.545 rg %.2f %.2f Td (%s) Tj ET"
+            % (_PAGE_NUMBER_FONT_SIZE, x, y, text.encode("cp1252"))
+        )
+        overlay = PageObject.create_blank_page(width=page.mediabox.right, height=page.mediabox.top)
+        overlay[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+        overlay[NameObject("/Contents")] = content
+        page.merge_page(overlay)
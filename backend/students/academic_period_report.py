@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 from datetime import datetime
+from functools import cached_property
 from decimal import Decimal
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 from django.conf import settings
 from django.db.models import Count
 from django.template.loader import render_to_string
 
-from academic.grading import DEFAULT_EMPTY_SCORE, final_grade_from_achievement_scores, match_scale, weighted_average
+from academic.grading import DEFAULT_EMPTY_SCORE, FinalGradePlan, get_scale_index, weighted_average
 from academic.models import (
     Achievement,
     AchievementGrade,
@@ -19,6 +20,7 @@ from academic.models import (
     PerformanceIndicator,
     TeacherAssignment,
 )
+from academic.subject_finals import get_subject_period_finals
 from core.models import Institution
 from students.models import Enrollment
 
@@ -57,8 +59,7 @@ def _format_score(score: Optional[Decimal]) -> str:
 def _scale_name(academic_year_id: int, score: Optional[Decimal]) -> str:
     if score is None:
         return ""
-    match = match_scale(academic_year_id, Decimal(score))
-    return match.name if match else ""
+    return get_scale_index(academic_year_id).name_for(Decimal(score))
 
 
 def _indicator_level_from_scale_name(scale_name: str) -> Optional[str]:
@@ -441,14 +442,18 @@ def group_report_rows_for_visual_blocks(rows: List[Dict[str, Any]]) -> List[Dict
     return grouped
 
 
-def _teacher_assignments(group_id: int, academic_year_id: int) -> List[TeacherAssignment]:
-    return list(
-        TeacherAssignment.objects.filter(group_id=group_id, academic_year_id=academic_year_id)
+def _teacher_assignments_qs(academic_year_id: int):
+    return (
+        TeacherAssignment.objects.filter(academic_year_id=academic_year_id)
         .select_related("academic_load__subject", "academic_load__subject__area")
         .order_by("academic_load__subject__area__name", "academic_load__subject__name", "id")
     )
 
 
+def _teacher_assignments(group_id: int, academic_year_id: int) -> List[TeacherAssignment]:
+    return list(_teacher_assignments_qs(academic_year_id).filter(group_id=group_id))
+
+
 def _absences_by_ta(enrollment_id: int, period_id: int) -> Dict[int, int]:
     """Return dict mapping teacher_assignment_id -> absence count (ABSENT + TARDY) for one enrollment/period."""
     from attendance.models import AttendanceRecord  # noqa: PLC0415
@@ -481,15 +486,217 @@ def _absences_bulk(enrollment_ids: List[int], period_id: int) -> Dict[Tuple[int,
     return {(r["enrollment_id"], r["session__teacher_assignment_id"]): r["count"] for r in qs}
 
 
-def build_academic_period_report_context(enrollment: Enrollment, period: Period) -> Dict[str, Any]:
-    year_periods = _year_periods(enrollment.academic_year_id)
-    assignments = _teacher_assignments(enrollment.group_id, enrollment.academic_year_id) if enrollment.group_id else []
+class ReportGenerationContext:
+    """Datos de referencia de un año lectivo, compartidos entre los informes de varios grupos.
 
-    gradesheet_id_by_ta_period = _precompute_gradesheets(assignments, year_periods) if assignments else {}
-    achievements_by_ta_period, dim_percentage_by_id = (
-        _precompute_achievements(assignments, year_periods, enrollment.group_id)
-        if assignments and enrollment.group_id
-        else ({}, {})
+    Periodos, institución, escalas, porcentajes de dimensión, asignaciones docentes,
+    planillas y logros (con sus indicadores) se consultan una sola vez y se reutilizan
+    en cada builder que reciba el mismo contexto. Las notas y definitivas no se
+    guardan aquí: siguen leyéndose por grupo. El contexto vive lo que dura un job de
+    generación; no debe guardarse entre peticiones.
+    """
+
+    def __init__(self, academic_year_id: int):
+        self.academic_year_id = int(academic_year_id)
+        self._assignments_by_group: Dict[int, List[TeacherAssignment]] = {}
+        self._gradesheet_id_by_ta_period: Dict[Tuple[int, int], int] = {}
+        self._gradesheet_ta_ids: set[int] = set()
+        self._achievements_by_load: Dict[int, List[Achievement]] = {}
+        self._indicators_by_achievement_id: Dict[int, Dict[str, str]] = {}
+
+    @cached_property
+    def year_periods(self) -> List[Period]:
+        return _year_periods(self.academic_year_id)
+
+    @cached_property
+    def institution(self) -> Institution:
+        return Institution.objects.first() or Institution()
+
+    @cached_property
+    def scale_equivalences(self) -> str:
+        return _scale_equivalences(self.academic_year_id)
+
+    @cached_property
+    def preschool_scale_equivalences(self) -> str:
+        return _preschool_scale_equivalences(self.academic_year_id)
+
+    @cached_property
+    def dimension_percentage_by_id(self) -> Dict[int, int]:
+        return {
+            d.id: int(d.percentage)
+            for d in Dimension.objects.filter(academic_year_id=self.academic_year_id).only("id", "percentage")
+        }
+
+    def prefetch_groups(self, group_ids: Iterable[int]) -> None:
+        """Carga asignaciones, planillas y logros de varios grupos con consultas únicas."""
+
+        missing = sorted({int(g) for g in group_ids if g} - set(self._assignments_by_group))
+        if missing:
+            for group_id in missing:
+                self._assignments_by_group[group_id] = []
+            for ta in _teacher_assignments_qs(self.academic_year_id).filter(group_id__in=missing):
+                self._assignments_by_group[int(ta.group_id)].append(ta)
+
+        assignments = [ta for g in group_ids if g for ta in self._assignments_by_group.get(int(g), [])]
+        self._load_gradesheets(assignments)
+        self._load_achievements(assignments)
+
+    def teacher_assignments(self, group_id: int, *, load_grades: bool = True) -> List[TeacherAssignment]:
+        """Asignaciones del grupo; con `load_grades` también precarga sus planillas y logros."""
+
+        group_id = int(group_id)
+        if group_id not in self._assignments_by_group:
+            if load_grades:
+                self.prefetch_groups([group_id])
+            else:
+                self._assignments_by_group[group_id] = list(
+                    _teacher_assignments_qs(self.academic_year_id).filter(group_id=group_id)
+                )
+        return self._assignments_by_group[group_id]
+
+    def gradesheets(self, assignments: List[TeacherAssignment]) -> Dict[Tuple[int, int], int]:
+        """(teacher_assignment_id, period_id) -> gradesheet_id para las asignaciones dadas."""
+
+        self._load_gradesheets(assignments)
+        ta_ids = {ta.id for ta in assignments}
+        return {key: gs_id for key, gs_id in self._gradesheet_id_by_ta_period.items() if key[0] in ta_ids}
+
+    def achievements(
+        self,
+        assignments: List[TeacherAssignment],
+        group_id: int,
+    ) -> Tuple[
+        Dict[Tuple[int, int], List[Dict[str, Any]]],
+        Dict[int, int],
+    ]:
+        """Returns (achievements_by_ta_period, dimension_percentage_by_id)."""
+
+        if not assignments or not group_id:
+            return {}, {}
+        self._load_achievements(assignments)
+
+        achievements_by_ta_period: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+        for ta in assignments:
+            if not ta.academic_load_id:
+                continue
+            # Partition by period into group-specific vs global.
+            # REGLA: grupo-específico si existe; global si no.
+            # Versión batch de achievement_queryset_for_assignment_period() en academic/grading.py.
+            # Si se cambia la regla de selección, actualizar ambos sitios.
+            partition: Dict[int, Dict[str, List[Achievement]]] = {}
+            for a in self._achievements_by_load.get(ta.academic_load_id, []):
+                bucket = partition.setdefault(a.period_id, {"group": [], "global": []})
+                if a.group_id == group_id:
+                    bucket["group"].append(a)
+                elif a.group_id is None:
+                    bucket["global"].append(a)
+
+            for p in self.year_periods:
+                buckets = partition.get(p.id, {"group": [], "global": []})
+                chosen = buckets["group"] if buckets["group"] else buckets["global"]
+                achievements_by_ta_period[(ta.id, p.id)] = [
+                    {
+                        "id": a.id,
+                        "dimension_id": a.dimension_id,
+                        "dimension_name": getattr(getattr(a, "dimension", None), "name", "") or "",
+                        "percentage": int(a.percentage) if a.percentage else 1,
+                        "description": a.description or "",
+                        "indicators": self._indicators_by_achievement_id.get(a.id, {}),
+                    }
+                    for a in chosen
+                ]
+
+        return achievements_by_ta_period, self.dimension_percentage_by_id
+
+    def _load_gradesheets(self, assignments: List[TeacherAssignment]) -> None:
+        ta_ids = sorted({ta.id for ta in assignments} - self._gradesheet_ta_ids)
+        if not ta_ids:
+            return
+        self._gradesheet_ta_ids.update(ta_ids)
+        gradesheets = (
+            GradeSheet.objects.filter(
+                teacher_assignment_id__in=ta_ids,
+                period_id__in=[p.id for p in self.year_periods],
+            )
+            .only("id", "teacher_assignment_id", "period_id")
+            .order_by("id")
+        )
+        for gs in gradesheets:
+            self._gradesheet_id_by_ta_period[(gs.teacher_assignment_id, gs.period_id)] = gs.id
+
+    def _load_achievements(self, assignments: List[TeacherAssignment]) -> None:
+        load_ids = sorted(
+            {ta.academic_load_id for ta in assignments if ta.academic_load_id} - set(self._achievements_by_load)
+        )
+        if not load_ids:
+            return
+        for load_id in load_ids:
+            self._achievements_by_load[load_id] = []
+
+        loaded = list(
+            Achievement.objects.filter(
+                academic_load_id__in=load_ids,
+                period_id__in=[p.id for p in self.year_periods],
+            )
+            .select_related("dimension")
+            .only(
+                "id",
+                "academic_load_id",
+                "period_id",
+                "group_id",
+                "percentage",
+                "dimension_id",
+                "dimension__name",
+                "description",
+            )
+            .order_by("id")
+        )
+        for a in loaded:
+            self._achievements_by_load[a.academic_load_id].append(a)
+
+        if loaded:
+            for ind in (
+                PerformanceIndicator.objects.filter(achievement_id__in=[a.id for a in loaded])
+                .only("achievement_id", "level", "description")
+                .order_by("achievement_id")
+            ):
+                self._indicators_by_achievement_id.setdefault(ind.achievement_id, {})[ind.level] = (
+                    ind.description or ""
+                )
+
+
+def build_academic_period_report_context(
+    enrollment: Enrollment,
+    period: Period,
+    *,
+    report_context: Optional[ReportGenerationContext] = None,
+) -> Dict[str, Any]:
+    report_context = report_context or ReportGenerationContext(enrollment.academic_year_id)
+    year_periods = report_context.year_periods
+    assignments = report_context.teacher_assignments(enrollment.group_id) if enrollment.group_id else []
+
+    gradesheet_id_by_ta_period = report_context.gradesheets(assignments) if assignments else {}
+    achievements_by_ta_period, dim_percentage_by_id = report_context.achievements(assignments, enrollment.group_id)
+
+    peers: List[Enrollment] = []
+    if enrollment.group_id:
+        # NOTE: Don't combine select_related("student__user") with .only(...) that defers
+        # the FK field itself (Django raises: cannot be both deferred and traversed).
+        # We only need ids + group/year for ranking.
+        peers = list(
+            Enrollment.objects.filter(group_id=enrollment.group_id, academic_year_id=enrollment.academic_year_id)
+            .only("id", "group_id", "academic_year_id")
+            .order_by("id")
+        )
+    finals_by_key = (
+        _precompute_finals(
+            assignments,
+            year_periods,
+            enrollment.group_id,
+            sorted({int(enrollment.id)} | {int(p.id) for p in peers}),
+        )
+        if enrollment.group_id
+        else None
     )
 
     rows = _build_rows_for_enrollment(
@@ -501,9 +708,10 @@ def build_academic_period_report_context(enrollment: Enrollment, period: Period)
         achievements_by_ta_period=achievements_by_ta_period,
         dim_percentage_by_id=dim_percentage_by_id,
         absences_by_ta=_absences_by_ta(enrollment.id, period.id),
+        finals_by_key=finals_by_key,
     )
 
-    institution = Institution.objects.first() or Institution()
+    institution = report_context.institution
     director_name = ""
     if enrollment.group and getattr(enrollment.group, "director", None):
         director_name = enrollment.group.director.get_full_name()
@@ -516,15 +724,6 @@ def build_academic_period_report_context(enrollment: Enrollment, period: Period)
     rank_badge_label: str = ""
     exact_overall_score: str = ""
     if enrollment.group_id:
-        # NOTE: Don't combine select_related("student__user") with .only(...) that defers
-        # the FK field itself (Django raises: cannot be both deferred and traversed).
-        # We only need ids + group/year for ranking.
-        peers = list(
-            Enrollment.objects.filter(group_id=enrollment.group_id, academic_year_id=enrollment.academic_year_id)
-            .only("id", "group_id", "academic_year_id")
-            .order_by("id")
-        )
-
         peer_scores: List[Tuple[int, Optional[Decimal]]] = []
         for peer in peers:
             peer_rows = _build_rows_for_enrollment(
@@ -535,6 +734,7 @@ def build_academic_period_report_context(enrollment: Enrollment, period: Period)
                 gradesheet_id_by_ta_period=gradesheet_id_by_ta_period,
                 achievements_by_ta_period=achievements_by_ta_period,
                 dim_percentage_by_id=dim_percentage_by_id,
+                finals_by_key=finals_by_key,
             )
             peer_scores.append((peer.id, _overall_decimal_from_rows(peer_rows)))
 
@@ -572,7 +772,7 @@ def build_academic_period_report_context(enrollment: Enrollment, period: Period)
         "rank_total": rank_total,
         "rank_badge_label": rank_badge_label,
         "observations": "",
-        "scale_equivalences": _scale_equivalences(enrollment.academic_year_id),
+        "scale_equivalences": report_context.scale_equivalences,
         "performance_series": performance_series,
         "performance_chart": _performance_chart_model(performance_series),
     }
@@ -776,21 +976,23 @@ def _build_preschool_rows_for_enrollment(
     return rows
 
 
-def build_preschool_academic_period_report_context(enrollment: Enrollment, period: Period) -> Dict[str, Any]:
+def build_preschool_academic_period_report_context(
+    enrollment: Enrollment,
+    period: Period,
+    *,
+    report_context: Optional[ReportGenerationContext] = None,
+) -> Dict[str, Any]:
     """Context for a preschool qualitative report card.
 
     Uses the same *visual design* as the regular report, but a different structure.
     """
 
-    year_periods = _year_periods(enrollment.academic_year_id)
-    assignments = _teacher_assignments(enrollment.group_id, enrollment.academic_year_id) if enrollment.group_id else []
+    report_context = report_context or ReportGenerationContext(enrollment.academic_year_id)
+    year_periods = report_context.year_periods
+    assignments = report_context.teacher_assignments(enrollment.group_id) if enrollment.group_id else []
 
-    gradesheet_id_by_ta_period = _precompute_gradesheets(assignments, year_periods) if assignments else {}
-    achievements_by_ta_period, _dim_percentage_by_id = (
-        _precompute_achievements(assignments, year_periods, enrollment.group_id)
-        if assignments and enrollment.group_id
-        else ({}, {})
-    )
+    gradesheet_id_by_ta_period = report_context.gradesheets(assignments) if assignments else {}
+    achievements_by_ta_period, _dim_percentage_by_id = report_context.achievements(assignments, enrollment.group_id)
 
     rows = _build_preschool_rows_for_enrollment(
         enrollment=enrollment,
@@ -801,7 +1003,7 @@ def build_preschool_academic_period_report_context(enrollment: Enrollment, perio
         achievements_by_ta_period=achievements_by_ta_period,
     )
 
-    institution = Institution.objects.first() or Institution()
+    institution = report_context.institution
     director_name = ""
     if enrollment.group and getattr(enrollment.group, "director", None):
         director_name = enrollment.group.director.get_full_name()
@@ -818,7 +1020,7 @@ def build_preschool_academic_period_report_context(enrollment: Enrollment, perio
         "report_date": datetime.now().strftime("%d/%m/%Y"),
         "rows": rows,
         "observations": "",
-        "scale_equivalences": _preschool_scale_equivalences(enrollment.academic_year_id),
+        "scale_equivalences": report_context.preschool_scale_equivalences,
         "overall_score": "",
         "overall_scale": "",
         "rank_position": None,
@@ -845,6 +1047,8 @@ def generate_preschool_academic_period_report_pdf(enrollment: Enrollment, period
 def build_preschool_academic_period_group_report_context(
     enrollments: Iterable[Enrollment],
     period: Period,
+    *,
+    report_context: Optional[ReportGenerationContext] = None,
 ) -> Dict[str, Any]:
     enrollments = list(enrollments)
     if not enrollments:
@@ -853,15 +1057,16 @@ def build_preschool_academic_period_group_report_context(
     academic_year_id = enrollments[0].academic_year_id
     group = enrollments[0].group
 
-    year_periods = _year_periods(academic_year_id)
-    assignments = _teacher_assignments(group.id, academic_year_id) if group else []
+    report_context = report_context or ReportGenerationContext(academic_year_id)
+    year_periods = report_context.year_periods
+    assignments = report_context.teacher_assignments(group.id) if group else []
 
-    gradesheet_id_by_ta_period = _precompute_gradesheets(assignments, year_periods) if assignments else {}
+    gradesheet_id_by_ta_period = report_context.gradesheets(assignments) if assignments else {}
     achievements_by_ta_period, _dim_percentage_by_id = (
-        _precompute_achievements(assignments, year_periods, group.id) if assignments and group else ({}, {})
+        report_context.achievements(assignments, group.id) if group else ({}, {})
     )
 
-    institution = Institution.objects.first() or Institution()
+    institution = report_context.institution
     pages: List[Dict[str, Any]] = []
     for enrollment in enrollments:
         director_name = ""
@@ -900,7 +1105,7 @@ def build_preschool_academic_period_group_report_context(
                 "rank_total": None,
                 "rank_badge_label": "",
                 "observations": "",
-                "scale_equivalences": _preschool_scale_equivalences(academic_year_id),
+                "scale_equivalences": report_context.preschool_scale_equivalences,
                 "final_status": getattr(enrollment, "final_status", "") or "",
             }
         )
@@ -911,8 +1116,14 @@ def build_preschool_academic_period_group_report_context(
 def generate_preschool_academic_period_group_report_pdf(
     enrollments: Iterable[Enrollment],
     period: Period,
+    *,
+    report_context: Optional[ReportGenerationContext] = None,
 ) -> bytes:
-    ctx = build_preschool_academic_period_group_report_context(enrollments=enrollments, period=period)
+    ctx = build_preschool_academic_period_group_report_context(
+        enrollments=enrollments,
+        period=period,
+        report_context=report_context,
+    )
     pages = ctx.get("pages") or []
     if isinstance(pages, list):
         ctx["pages"] = [
@@ -932,121 +1143,22 @@ def generate_preschool_academic_period_group_report_pdf(
         raise RuntimeError("Error generating PDF") from exc
 
 
-def _precompute_achievements(
+def _precompute_finals(
     assignments: List[TeacherAssignment],
     year_periods: List[Period],
     group_id: int,
-) -> Tuple[
-    Dict[Tuple[int, int], List[Dict[str, Any]]],
-    Dict[int, int],
-]:
-    """Returns (achievements_by_ta_period, dimension_percentage_by_id)."""
-
-    academic_year_id = assignments[0].academic_year_id if assignments else None
-    if academic_year_id is None:
-        return {}, {}
-
-    period_ids = [p.id for p in year_periods]
-    load_ids = [ta.academic_load_id for ta in assignments if ta.academic_load_id]
-
-    all_achievements = list(
-        Achievement.objects.filter(academic_load_id__in=load_ids, period_id__in=period_ids)
-        .select_related("dimension")
-        .only(
-            "id",
-            "academic_load_id",
-            "period_id",
-            "group_id",
-            "percentage",
-            "dimension_id",
-            "dimension__name",
-            "description",
-        )
-        .order_by("id")
-    )
-
-    # Partition by (academic_load_id, period_id) into group-specific vs global.
-    # REGLA: grupo-específico si existe; global si no.
-    # Versión batch de achievement_queryset_for_assignment_period() en academic/grading.py.
-    # Si se cambia la regla de selección, actualizar ambos sitios.
-    partition: Dict[Tuple[int, int], Dict[str, List[Achievement]]] = {}
-    for a in all_achievements:
-        key = (a.academic_load_id, a.period_id)
-        bucket = partition.setdefault(key, {"group": [], "global": []})
-        if a.group_id == group_id:
-            bucket["group"].append(a)
-        elif a.group_id is None:
-            bucket["global"].append(a)
-
-    # Collect dimension ids used.
-    dimension_ids = set()
-    for buckets in partition.values():
-        chosen = buckets["group"] if buckets["group"] else buckets["global"]
-        for a in chosen:
-            if a.dimension_id:
-                dimension_ids.add(a.dimension_id)
-
-    # Preload performance indicators for chosen achievements.
-    chosen_achievement_ids = set()
-    for buckets in partition.values():
-        chosen = buckets["group"] if buckets["group"] else buckets["global"]
-        for a in chosen:
-            if a.id:
-                chosen_achievement_ids.add(a.id)
-
-    indicators_by_achievement_id: Dict[int, Dict[str, str]] = {}
-    if chosen_achievement_ids:
-        for ind in (
-            PerformanceIndicator.objects.filter(achievement_id__in=list(chosen_achievement_ids))
-            .only("achievement_id", "level", "description")
-            .order_by("achievement_id")
-        ):
-            indicators_by_achievement_id.setdefault(ind.achievement_id, {})[ind.level] = ind.description or ""
-
-    dim_percentage_by_id = {
-        d.id: int(d.percentage)
-        for d in Dimension.objects.filter(academic_year_id=academic_year_id, id__in=list(dimension_ids)).only(
-            "id", "percentage"
-        )
-    }
-
-    achievements_by_ta_period: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
-    for ta in assignments:
-        if not ta.academic_load_id:
-            continue
-        for p in year_periods:
-            buckets = partition.get((ta.academic_load_id, p.id), {"group": [], "global": []})
-            chosen = buckets["group"] if buckets["group"] else buckets["global"]
-            achievements_by_ta_period[(ta.id, p.id)] = [
-                {
-                    "id": a.id,
-                    "dimension_id": a.dimension_id,
-                    "dimension_name": getattr(getattr(a, "dimension", None), "name", "") or "",
-                    "percentage": int(a.percentage) if a.percentage else 1,
-                    "description": a.description or "",
-                    "indicators": indicators_by_achievement_id.get(a.id, {}),
-                }
-                for a in chosen
-            ]
-
-    return achievements_by_ta_period, dim_percentage_by_id
-
-
-def _precompute_gradesheets(
-    assignments: List[TeacherAssignment],
-    year_periods: List[Period],
-) -> Dict[Tuple[int, int], int]:
-    ta_ids = [ta.id for ta in assignments]
-    period_ids = [p.id for p in year_periods]
-    gradesheets = (
-        GradeSheet.objects.filter(teacher_assignment_id__in=ta_ids, period_id__in=period_ids)
-        .only("id", "teacher_assignment_id", "period_id")
-        .order_by("id")
+    enrollment_ids: List[int],
+) -> Dict[Tuple[int, int, int], Decimal]:
+    """(teacher_assignment_id, period_id, enrollment_id) -> definitiva, from SubjectPeriodFinal."""
+
+    if not assignments or not enrollment_ids:
+        return {}
+    return get_subject_period_finals(
+        academic_year_id=assignments[0].academic_year_id,
+        assignments=assignments,
+        periods=year_periods,
+        enrollment_ids_by_group={int(group_id): [int(eid) for eid in enrollment_ids]},
     )
-    out: Dict[Tuple[int, int], int] = {}
-    for gs in gradesheets:
-        out[(gs.teacher_assignment_id, gs.period_id)] = gs.id
-    return out
 
 
 def _build_rows_for_enrollment(
@@ -1058,12 +1170,19 @@ def _build_rows_for_enrollment(
     achievements_by_ta_period: Dict[Tuple[int, int], List[Dict[str, Any]]],
     dim_percentage_by_id: Dict[int, int],
     absences_by_ta: Optional[Dict[int, int]] = None,
+    finals_by_key: Optional[Mapping[Tuple[int, int, int], Decimal]] = None,
 ) -> List[Dict[str, Any]]:
     period_ids = [p.id for p in year_periods]
     period_index_by_id = {p.id: idx for idx, p in enumerate(year_periods)}
 
-    # Pull all grades for this enrollment across gradesheets in year periods.
-    gradesheet_ids = list(set(gradesheet_id_by_ta_period.values()))
+    # Pull grades for this enrollment. With materialized finals only the selected
+    # period is needed (indicator lines); otherwise every year period is recomputed.
+    if finals_by_key is not None:
+        gradesheet_ids = [
+            gs_id for (_ta_id, p_id), gs_id in gradesheet_id_by_ta_period.items() if p_id == selected_period.id
+        ]
+    else:
+        gradesheet_ids = list(set(gradesheet_id_by_ta_period.values()))
     grade_qs = AchievementGrade.objects.filter(enrollment_id=enrollment.id, gradesheet_id__in=gradesheet_ids).only(
         "gradesheet_id", "achievement_id", "score"
     )
@@ -1082,6 +1201,11 @@ def _build_rows_for_enrollment(
         return (total / Decimal(total_weight)).quantize(Decimal("0.01"))
 
     def compute_subject_score(ta: TeacherAssignment, p: Period) -> Tuple[Decimal, str]:
+        if finals_by_key is not None:
+            stored = finals_by_key.get((ta.id, p.id, enrollment.id))
+            if stored is not None:
+                return stored, _scale_name(enrollment.academic_year_id, stored)
+
         gs_id = gradesheet_id_by_ta_period.get((ta.id, p.id))
         achievements = achievements_by_ta_period.get((ta.id, p.id), [])
 
@@ -1089,17 +1213,11 @@ def _build_rows_for_enrollment(
             # Sin planilla o sin logros → DEFAULT_EMPTY_SCORE, igual que gradebook y promotion
             return DEFAULT_EMPTY_SCORE, _scale_name(enrollment.academic_year_id, DEFAULT_EMPTY_SCORE)
 
-        final_score = final_grade_from_achievement_scores(
-            [
-                (
-                    a.get("dimension_id"),
-                    a.get("percentage"),
-                    score_by_gs_ach.get((gs_id, int(a["id"]))),
-                )
-                for a in achievements
-            ],
+        plan = FinalGradePlan(
+            [(a.get("dimension_id"), a.get("percentage")) for a in achievements],
             dimension_percentage_by_id=dim_percentage_by_id,
         )
+        final_score = plan.final_for_row([score_by_gs_ach.get((gs_id, int(a["id"]))) for a in achievements])
         return final_score, _scale_name(enrollment.academic_year_id, final_score)
 
     rows: List[Dict[str, Any]] = []
@@ -1243,8 +1361,8 @@ def _build_rows_for_enrollment(
 
             level = None
             if score is not None:
-                scale = match_scale(enrollment.academic_year_id, Decimal(score))
-                level = _indicator_level_from_scale_name(scale.name if scale else "")
+                scale_name = get_scale_index(enrollment.academic_year_id).name_for(Decimal(score))
+                level = _indicator_level_from_scale_name(scale_name)
 
             indicators = a.get("indicators") or {}
             if level and indicators.get(level):
@@ -1331,26 +1449,14 @@ def generate_academic_period_report_pdf(enrollment: Enrollment, period: Period)
 def generate_academic_period_group_report_pdf(
     enrollments: Iterable[Enrollment],
     period: Period,
+    *,
+    report_context: Optional[ReportGenerationContext] = None,
 ) -> bytes:
-    enrollments = list(enrollments)
-    if not enrollments:
-        raise ValueError("No enrollments")
-
-    academic_year_id = enrollments[0].academic_year_id
-    group = enrollments[0].group
-
-    year_periods = _year_periods(academic_year_id)
-    assignments = _teacher_assignments(group.id, academic_year_id) if group else []
-
-    gradesheet_id_by_ta_period = _precompute_gradesheets(assignments, year_periods) if assignments else {}
-    achievements_by_ta_period, dim_percentage_by_id = (
-        _precompute_achievements(assignments, year_periods, group.id) if assignments and group else ({}, {})
+    ctx = build_academic_period_group_report_context(
+        enrollments=enrollments,
+        period=period,
+        report_context=report_context,
     )
-
-    institution = Institution.objects.first() or Institution()
-    scale_equivalences = _scale_equivalences(academic_year_id)
-
-    ctx = build_academic_period_group_report_context(enrollments=enrollments, period=period)
     pages = ctx.get("pages") or []
     if isinstance(pages, list):
         fitted_pages: List[Dict[str, Any]] = []
@@ -1377,6 +1483,8 @@ def generate_academic_period_group_report_pdf(
 def build_academic_period_group_report_context(
     enrollments: Iterable[Enrollment],
     period: Period,
+    *,
+    report_context: Optional[ReportGenerationContext] = None,
 ) -> Dict[str, Any]:
     enrollments = list(enrollments)
     if not enrollments:
@@ -1385,20 +1493,22 @@ def build_academic_period_group_report_context(
     academic_year_id = enrollments[0].academic_year_id
     group = enrollments[0].group
 
-    year_periods = _year_periods(academic_year_id)
-    assignments = _teacher_assignments(group.id, academic_year_id) if group else []
+    report_context = report_context or ReportGenerationContext(academic_year_id)
+    year_periods = report_context.year_periods
+    assignments = report_context.teacher_assignments(group.id) if group else []
 
-    gradesheet_id_by_ta_period = _precompute_gradesheets(assignments, year_periods) if assignments else {}
+    gradesheet_id_by_ta_period = report_context.gradesheets(assignments) if assignments else {}
     achievements_by_ta_period, dim_percentage_by_id = (
-        _precompute_achievements(assignments, year_periods, group.id) if assignments and group else ({}, {})
+        report_context.achievements(assignments, group.id) if group else ({}, {})
     )
 
-    institution = Institution.objects.first() or Institution()
-    scale_equivalences = _scale_equivalences(academic_year_id)
+    institution = report_context.institution
+    scale_equivalences = report_context.scale_equivalences
 
     # Bulk-fetch absences for all enrollments in a single query.
     enrollment_ids = [e.id for e in enrollments]
     bulk_absences = _absences_bulk(enrollment_ids, period.id)
+    finals_by_key = _precompute_finals(assignments, year_periods, group.id, enrollment_ids) if group else None
 
     pages: List[Dict[str, Any]] = []
     score_items: List[Tuple[int, Optional[Decimal]]] = []
@@ -1419,6 +1529,7 @@ def build_academic_period_group_report_context(
             achievements_by_ta_period=achievements_by_ta_period,
             dim_percentage_by_id=dim_percentage_by_id,
             absences_by_ta=abs_by_ta,
+            finals_by_key=finals_by_key,
         )
 
         overall_score, overall_scale = _compute_overall_from_rows(academic_year_id, rows)
@@ -1470,7 +1581,11 @@ def build_academic_period_group_report_context(
     return {"pages": pages}
 
 
-def compute_certificate_studies_rows(enrollment: Enrollment) -> List[Dict[str, Any]]:
+def compute_certificate_studies_rows(
+    enrollment: Enrollment,
+    *,
+    report_context: Optional[ReportGenerationContext] = None,
+) -> List[Dict[str, Any]]:
     """Compute final subject rows for a 'certificado de estudios'.
 
     Uses the same gradebook computation logic as the academic period report.
@@ -1484,19 +1599,20 @@ def compute_certificate_studies_rows(enrollment: Enrollment) -> List[Dict[str, A
     if not enrollment.group_id:
         return []
 
-    year_periods = _year_periods(enrollment.academic_year_id)
+    report_context = report_context or ReportGenerationContext(enrollment.academic_year_id)
+    year_periods = report_context.year_periods
     if not year_periods:
         return []
 
     # Pick the latest period available for the year as the reference.
     selected_period = year_periods[-1]
 
-    assignments = _teacher_assignments(enrollment.group_id, enrollment.academic_year_id)
+    assignments = report_context.teacher_assignments(enrollment.group_id)
     if not assignments:
         return []
 
-    gradesheet_id_by_ta_period = _precompute_gradesheets(assignments, year_periods)
-    achievements_by_ta_period, dim_percentage_by_id = _precompute_achievements(assignments, year_periods, enrollment.group_id)
+    gradesheet_id_by_ta_period = report_context.gradesheets(assignments)
+    achievements_by_ta_period, dim_percentage_by_id = report_context.achievements(assignments, enrollment.group_id)
 
     report_rows = _build_rows_for_enrollment(
         enrollment=enrollment,
@@ -1506,6 +1622,7 @@ def compute_certificate_studies_rows(enrollment: Enrollment) -> List[Dict[str, A
         gradesheet_id_by_ta_period=gradesheet_id_by_ta_period,
         achievements_by_ta_period=achievements_by_ta_period,
         dim_percentage_by_id=dim_percentage_by_id,
+        finals_by_key=_precompute_finals(assignments, year_periods, enrollment.group_id, [enrollment.id]),
     )
 
     out: List[Dict[str, Any]] = []
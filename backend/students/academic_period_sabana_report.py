@@ -4,20 +4,18 @@ from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
 
-from academic.grading import DEFAULT_EMPTY_SCORE, final_grade_from_achievement_scores, match_scale
-from academic.models import AcademicLoad, AchievementGrade, Group, Period, TeacherAssignment
-from core.models import Institution
+from academic.grading import get_scale_index
+from academic.models import AcademicLoad, Group, Period, TeacherAssignment
+from academic.subject_finals import get_subject_period_finals
 from students.models import Enrollment
 
 from .academic_period_report import (
+    ReportGenerationContext,
     _format_score,
     _group_label,
     _shift_label,
-    _precompute_achievements,
-    _precompute_gradesheets,
-    _teacher_assignments,
 )
 
 
@@ -77,48 +75,38 @@ def _student_display(enrollment: Enrollment) -> str:
     return full or (user.get_full_name() if hasattr(user, "get_full_name") else "")
 
 
-def build_academic_period_sabana_context(*, group: Group, period: Period) -> Dict[str, Any]:
-    if period.academic_year_id != group.academic_year_id:
-        raise ValueError("El periodo no corresponde al año lectivo del grupo")
+@dataclass
+class SabanaMatrix:
+    """Grade matrix of one group and period: enrollments × plan-of-study columns.
 
-    institution = Institution.objects.first() or Institution()
+    `scores[i][j]` is the definitive of `enrollments[i]` in `columns[j]` (None when the
+    subject has no teacher assignment or no final). Loaded with one query per table:
+    enrollments, academic loads, teacher assignments and materialized finals (missing
+    finals are computed for the whole group at once by the set-based engine).
+    """
 
-    institution_logo_src: str = ""
-    try:
-        if getattr(institution, "pdf_show_logo", True) and getattr(institution, "logo", None):
-            logo_field = institution.logo
-            if getattr(logo_field, "path", None) and Path(logo_field.path).exists():
-                institution_logo_src = Path(logo_field.path).resolve().as_uri()
-            elif getattr(logo_field, "url", None):
-                # Fallback: may work if WeasyPrint base_url can resolve MEDIA_URL.
-                institution_logo_src = logo_field.url
-    except Exception:
-        institution_logo_src = ""
+    group: Group
+    period: Period
+    enrollments: List[Enrollment]
+    columns: List[_Column]
+    scores: List[List[Optional[Decimal]]]
+    scale_index: Any
+    report_context: ReportGenerationContext
 
-    director_name = ""
-    try:
-        director = getattr(group, "director", None)
-        if director and hasattr(director, "get_full_name"):
-            director_name = (director.get_full_name() or "").strip()
-    except Exception:
-        director_name = ""
 
-    group_short_name = (getattr(group, "name", "") or "").strip()
-    grade_name = ""
-    try:
-        grade = getattr(group, "grade", None)
-        grade_name = (getattr(grade, "name", "") or "").strip()
-    except Exception:
-        grade_name = ""
+def load_academic_period_sabana_matrix(
+    *,
+    group: Group,
+    period: Period,
+    report_context: Optional[ReportGenerationContext] = None,
+) -> SabanaMatrix:
+    if period.academic_year_id != group.academic_year_id:
+        raise ValueError("El periodo no corresponde al año lectivo del grupo")
+
+    report_context = report_context or ReportGenerationContext(period.academic_year_id)
 
     enrollments = list(
-        Enrollment.objects.select_related(
-            "student",
-            "student__user",
-            "grade",
-            "group",
-            "academic_year",
-        )
+        Enrollment.objects.select_related("student__user")
         .filter(group_id=group.id, academic_year_id=period.academic_year_id, status="ACTIVE")
         .order_by("student__user__last_name", "student__user__first_name", "student__user__id")
     )
@@ -133,17 +121,11 @@ def build_academic_period_sabana_context(*, group: Group, period: Period) -> Dic
     # Asignación docente (si existe) para poder calcular notas. Si no hay, la columna queda en blanco.
     ta_by_load_id: Dict[int, TeacherAssignment] = {
         int(ta.academic_load_id): ta
-        for ta in _teacher_assignments(group.id, period.academic_year_id)
+        # Las definitivas materializadas bastan: no hace falta precargar planillas ni logros.
+        for ta in report_context.teacher_assignments(group.id, load_grades=False)
         if getattr(ta, "academic_load_id", None)
     }
 
-    assignments = list(ta_by_load_id.values())
-
-    gradesheet_id_by_ta_period = _precompute_gradesheets(assignments, [period]) if assignments else {}
-    achievements_by_ta_period, dim_percentage_by_id = (
-        _precompute_achievements(assignments, [period], group.id) if assignments else ({}, {})
-    )
-
     columns: List[_Column] = []
     for al in academic_loads:
         subject = getattr(al, "subject", None)
@@ -164,83 +146,110 @@ def build_academic_period_sabana_context(*, group: Group, period: Period) -> Dic
             )
         )
 
-    # Build a fast lookup of grades: (enrollment_id, gradesheet_id, achievement_id) -> score
-    enrollment_ids = [e.id for e in enrollments]
-    gradesheet_ids = list(set(gradesheet_id_by_ta_period.values()))
+    # Definitivas materializadas (SubjectPeriodFinal): (teacher_assignment_id, period_id, enrollment_id) -> score
+    enrollment_ids = [int(e.id) for e in enrollments]
+    finals_by_key = get_subject_period_finals(
+        academic_year_id=period.academic_year_id,
+        assignments=list(ta_by_load_id.values()),
+        periods=[period],
+        enrollment_ids_by_group={int(group.id): enrollment_ids},
+    )
+
+    # Sin docente asignado la asignatura existe en el plan pero su columna queda vacía.
+    scores = [
+        [
+            finals_by_key.get((col.teacher_assignment_id, period.id, enrollment_id))
+            if col.teacher_assignment_id
+            else None
+            for col in columns
+        ]
+        for enrollment_id in enrollment_ids
+    ]
+
+    return SabanaMatrix(
+        group=group,
+        period=period,
+        enrollments=enrollments,
+        columns=columns,
+        scores=scores,
+        scale_index=get_scale_index(period.academic_year_id),
+        report_context=report_context,
+    )
+
 
-    score_by_enroll_gs_ach: Dict[Tuple[int, int, int], Optional[Decimal]] = {}
-    if enrollment_ids and gradesheet_ids:
-        grade_qs = (
-            AchievementGrade.objects.filter(enrollment_id__in=enrollment_ids, gradesheet_id__in=gradesheet_ids)
-            .only("enrollment_id", "gradesheet_id", "achievement_id", "score")
-            .order_by("id")
+@dataclass(frozen=True)
+class _SabanaRow:
+    enrollment: Enrollment
+    scores: List[Optional[Decimal]]
+    scales: List[str]
+    avg_score: Optional[Decimal]
+    avg_scale: str
+    lost: int
+
+
+def _iter_sabana_rows(matrix: SabanaMatrix) -> Iterator[_SabanaRow]:
+    name_for = matrix.scale_index.name_for
+    for enrollment, scores in zip(matrix.enrollments, matrix.scores):
+        scales = [name_for(Decimal(score)) if score is not None else "" for score in scores]
+        present = [Decimal(score) for score in scores if score is not None]
+        avg_score = (sum(present) / Decimal(len(present))).quantize(Decimal("0.01")) if present else None
+        yield _SabanaRow(
+            enrollment=enrollment,
+            scores=scores,
+            scales=scales,
+            avg_score=avg_score,
+            avg_scale=name_for(avg_score),
+            lost=sum(1 for scale in scales if _grade_css_class(scale) == "grade-low"),
         )
-        for g in grade_qs:
-            score_by_enroll_gs_ach[(int(g.enrollment_id), int(g.gradesheet_id), int(g.achievement_id))] = g.score
 
-    def compute_subject_score(enrollment_id: int, teacher_assignment_id: Optional[int]) -> Tuple[Optional[Decimal], str]:
-        if not teacher_assignment_id:
-            # Sin docente asignado: la asignatura existe en el plan pero no tiene TA
-            return None, ""
 
-        gs_id = gradesheet_id_by_ta_period.get((teacher_assignment_id, period.id))
-        achievements = achievements_by_ta_period.get((teacher_assignment_id, period.id), [])
+def build_academic_period_sabana_context(
+    *,
+    group: Group,
+    period: Period,
+    report_context: Optional[ReportGenerationContext] = None,
+    matrix: Optional[SabanaMatrix] = None,
+) -> Dict[str, Any]:
+    matrix = matrix or load_academic_period_sabana_matrix(group=group, period=period, report_context=report_context)
+    institution = matrix.report_context.institution
 
-        if not gs_id or not achievements:
-            # Sin planilla o sin logros → DEFAULT_EMPTY_SCORE, igual que gradebook y promotion
-            scale = match_scale(period.academic_year_id, DEFAULT_EMPTY_SCORE)
-            return DEFAULT_EMPTY_SCORE, (scale.name if scale else "")
+    institution_logo_src: str = ""
+    try:
+        if getattr(institution, "pdf_show_logo", True) and getattr(institution, "logo", None):
+            logo_field = institution.logo
+            if getattr(logo_field, "path", None) and Path(logo_field.path).exists():
+                institution_logo_src = Path(logo_field.path).resolve().as_uri()
+            elif getattr(logo_field, "url", None):
+                # Fallback: may work if WeasyPrint base_url can resolve MEDIA_URL.
+                institution_logo_src = logo_field.url
+    except Exception:
+        institution_logo_src = ""
 
-        final_score = final_grade_from_achievement_scores(
-            [
-                (
-                    a.get("dimension_id"),
-                    a.get("percentage"),
-                    score_by_enroll_gs_ach.get((enrollment_id, int(gs_id), int(a["id"]))),
-                )
-                for a in achievements
-            ],
-            dimension_percentage_by_id=dim_percentage_by_id,
-        )
+    director_name = ""
+    try:
+        director = getattr(group, "director", None)
+        if director and hasattr(director, "get_full_name"):
+            director_name = (director.get_full_name() or "").strip()
+    except Exception:
+        director_name = ""
 
-        scale = match_scale(period.academic_year_id, Decimal(final_score))
-        return final_score, (scale.name if scale else "")
+    group_short_name = (getattr(group, "name", "") or "").strip()
+    grade_name = ""
+    try:
+        grade = getattr(group, "grade", None)
+        grade_name = (getattr(grade, "name", "") or "").strip()
+    except Exception:
+        grade_name = ""
 
     rows: List[Dict[str, Any]] = []
     student_avgs: List[Decimal] = []
     approved_count = 0
     at_risk_count = 0
 
-    for idx, enr in enumerate(enrollments, start=1):
-        scores: List[Dict[str, Any]] = []
-        present_scores: List[Decimal] = []
-        lost = 0
-
-        for col in columns:
-            score, scale_name = compute_subject_score(int(enr.id), col.teacher_assignment_id)
-            css = _grade_css_class(scale_name)
-            if score is not None:
-                present_scores.append(Decimal(score))
-            if css == "grade-low":
-                lost += 1
-
-            scores.append(
-                {
-                    "score": _format_score(score),
-                    "scale": scale_name,
-                    "css": css,
-                }
-            )
-
-        avg_score: Optional[Decimal] = None
-        if present_scores:
-            avg_score = (sum(present_scores) / Decimal(len(present_scores))).quantize(Decimal("0.01"))
-            student_avgs.append(avg_score)
-
-        avg_scale = match_scale(period.academic_year_id, Decimal(avg_score)) if avg_score is not None else None
-        avg_scale_name = avg_scale.name if avg_scale else ""
-
-        if lost == 0:
+    for idx, row in enumerate(_iter_sabana_rows(matrix), start=1):
+        if row.avg_score is not None:
+            student_avgs.append(row.avg_score)
+        if row.lost == 0:
             approved_count += 1
         else:
             at_risk_count += 1
@@ -248,14 +257,21 @@ def build_academic_period_sabana_context(*, group: Group, period: Period) -> Dic
         rows.append(
             {
                 "index": idx,
-                "student_name": _student_display(enr),
-                "scores": scores,
-                "avg_score": _format_score(avg_score),
-                "avg_scale": avg_scale_name,
-                "avg_css": _grade_css_class(avg_scale_name),
-                "lost_count": lost,
-                "lost_display": "-" if lost == 0 else str(lost),
-                "lost_css": "lost-none" if lost == 0 else "lost-some",
+                "student_name": _student_display(row.enrollment),
+                "scores": [
+                    {
+                        "score": _format_score(score),
+                        "scale": scale_name,
+                        "css": _grade_css_class(scale_name),
+                    }
+                    for score, scale_name in zip(row.scores, row.scales)
+                ],
+                "avg_score": _format_score(row.avg_score),
+                "avg_scale": row.avg_scale,
+                "avg_css": _grade_css_class(row.avg_scale),
+                "lost_count": row.lost,
+                "lost_display": "-" if row.lost == 0 else str(row.lost),
+                "lost_css": "lost-none" if row.lost == 0 else "lost-some",
             }
         )
 
@@ -263,8 +279,7 @@ def build_academic_period_sabana_context(*, group: Group, period: Period) -> Dic
     if student_avgs:
         group_avg = (sum(student_avgs) / Decimal(len(student_avgs))).quantize(Decimal("0.01"))
 
-    group_avg_scale = match_scale(period.academic_year_id, Decimal(group_avg)) if group_avg is not None else None
-    group_avg_scale_name = group_avg_scale.name if group_avg_scale else ""
+    group_avg_scale_name = matrix.scale_index.name_for(group_avg)
 
     return {
         "institution": institution,
@@ -284,7 +299,7 @@ def build_academic_period_sabana_context(*, group: Group, period: Period) -> Dic
                 "subject_name": c.subject_name,
                 "area_name": c.area_name,
             }
-            for c in columns
+            for c in matrix.columns
         ],
         "rows": rows,
         "footer": {
@@ -296,3 +311,42 @@ def build_academic_period_sabana_context(*, group: Group, period: Period) -> Dic
             "total": len(rows),
         },
     }
+
+
+def write_academic_period_sabana_xlsx(matrix: SabanaMatrix, out: Union[str, Path, BinaryIO]) -> None:
+    """Write the sábana as a spreadsheet from the same matrix the PDF uses (no WeasyPrint)."""
+
+    from openpyxl import Workbook  # noqa: PLC0415
+    from openpyxl.utils import get_column_letter  # noqa: PLC0415
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Sábana"
+
+    group = matrix.group
+    ws.append([f"Sábana de notas - {_group_label(group)}"])
+    ws.append([f"{getattr(matrix.period, 'name', '') or ''} - {getattr(group.academic_year, 'year', '')}"])
+    ws.append([])
+
+    headers = ["#", "Estudiante", *[c.subject_name for c in matrix.columns], "Promedio", "Desempeño", "Perdidas"]
+    ws.append(headers)
+
+    for idx, row in enumerate(_iter_sabana_rows(matrix), start=1):
+        ws.append(
+            [
+                idx,
+                _student_display(row.enrollment),
+                *[float(score) if score is not None else None for score in row.scores],
+                float(row.avg_score) if row.avg_score is not None else None,
+                row.avg_scale,
+                row.lost,
+            ]
+        )
+
+    ws.freeze_panes = "C5"
+    ws.column_dimensions["A"].width = 5
+    ws.column_dimensions["B"].width = 40
+    for col_idx in range(3, len(headers) + 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = 12
+
+    wb.save(out)
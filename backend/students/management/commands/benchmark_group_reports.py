@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from academic.management.commands.benchmark_promotions import seed_synthetic_school
+from academic.models import Group, Period
+from students.academic_period_report import ReportGenerationContext, build_academic_period_group_report_context
+from students.models import Enrollment
+
+
+def _strip_volatile(ctx: dict) -> list[dict]:
+    # La institución sin guardar no es comparable por igualdad; el resto del contexto sí.
+    return [{k: v for k, v in page.items() if k != "institution"} for page in ctx.get("pages") or []]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a synthetic school inside a rolled-back transaction and reports wall time and "
+        "query count of building every group's period report context, with a fresh context per "
+        "group versus one shared ReportGenerationContext."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--groups", type=int, default=40)
+        parser.add_argument("--students-per-group", type=int, default=38)
+        parser.add_argument("--subjects", type=int, default=12)
+        parser.add_argument("--periods", type=int, default=4)
+        parser.add_argument("--achievements-per-subject", type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            t0 = time.perf_counter()
+            year = seed_synthetic_school(
+                groups=options["groups"],
+                students_per_group=options["students_per_group"],
+                subjects=options["subjects"],
+                periods=options["periods"],
+                achievements_per_subject=options["achievements_per_subject"],
+            )
+            self.stdout.write(
+                f"Seeded year={year.year}: {options['groups']} groups "
+                f"in {time.perf_counter() - t0:.2f}s"
+            )
+
+            period = Period.objects.filter(academic_year=year).order_by("start_date", "id").first()
+            groups = list(Group.objects.filter(academic_year=year).order_by("id"))
+            enrollments_by_group: dict[int, list[Enrollment]] = {}
+            for enrollment in (
+                Enrollment.objects.select_related("student__user", "group", "group__grade", "academic_year")
+                .filter(academic_year=year, status="ACTIVE")
+                .order_by("id")
+            ):
+                enrollments_by_group.setdefault(enrollment.group_id, []).append(enrollment)
+
+            def run(shared: ReportGenerationContext | None) -> list:
+                if shared is not None:
+                    shared.prefetch_groups([g.id for g in groups])
+                return [
+                    _strip_volatile(
+                        build_academic_period_group_report_context(
+                            enrollments=enrollments_by_group[g.id],
+                            period=period,
+                            report_context=shared,
+                        )
+                    )
+                    for g in groups
+                    if enrollments_by_group.get(g.id)
+                ]
+
+            # Primera pasada: llena SubjectPeriodFinal para que ambas mediciones lean lo mismo.
+            run(None)
+
+            results = {}
+            for label, factory in (
+                ("per-group:", lambda: None),
+                ("shared:", lambda: ReportGenerationContext(year.id)),
+            ):
+                with CaptureQueriesContext(connection) as ctx:
+                    t0 = time.perf_counter()
+                    results[label] = run(factory())
+                    elapsed = time.perf_counter() - t0
+                self.stdout.write(f"{label:<11} {elapsed:8.3f}s  queries={len(ctx.captured_queries)}")
+
+            if results["per-group:"] == results["shared:"]:
+                self.stdout.write(self.style.SUCCESS(f"Report contexts match for {len(groups)} groups."))
+            else:
+                self.stdout.write(self.style.ERROR("Report contexts differ between per-group and shared runs."))
+
+            transaction.set_rollback(True)
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import json
+import random
+import time
+from copy import deepcopy
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from academic.management.commands.benchmark_promotions import seed_synthetic_school
+from academic.models import Period
+from students.academic_period_report import (
+    ReportGenerationContext,
+    build_academic_period_report_context,
+    build_preschool_academic_period_report_context,
+)
+from students.models import Enrollment
+from students.report_layout_model import (
+    ProfileCoefficients,
+    fit_profile_coefficients,
+    layout_model_artifact,
+    sheet_features,
+)
+from students.single_page_report_fit import (
+    LAYOUT_PROFILES,
+    _build_split_blocks,
+    _context_for_visual_measurement,
+    _count_pdf_pages,
+)
+
+
+TEMPLATES: tuple[tuple[str, bool], ...] = (
+    ("students/reports/academic_period_report_pdf.html", False),
+    ("students/reports/academic_period_report_preschool_pdf.html", True),
+)
+
+
+def _vary_text(text: str, factor: float) -> str:
+    if not text:
+        return text
+    target = max(1, int(len(text) * factor))
+    return (text * (target // len(text) + 1))[:target]
+
+
+def _vary_rows(rows: list[dict[str, Any]], rng: random.Random) -> list[dict[str, Any]]:
+    varied = []
+    for row in rows:
+        row = dict(row)
+        factor = rng.uniform(0.3, 3.0)
+        lines = row.get("lines")
+        if isinstance(lines, list) and lines:
+            lines = [_vary_text(str(line or ""), factor) for line in lines]
+            extra = rng.randint(0, 2)
+            row["lines"] = lines + lines[:extra]
+        if row.get("description"):
+            row["description"] = _vary_text(str(row["description"]), factor)
+        varied.append(row)
+    return varied
+
+
+def _pages(*, template_name: str, is_preschool: bool, base: dict[str, Any], profile: str, page_1: list, page_2: list) -> int:
+    candidate = dict(base)
+    candidate["report_layout"] = {"profile": profile, "target_pages": 2}
+    candidate["rows_page_1"] = page_1
+    candidate["rows_page_2"] = page_2
+    measured = _context_for_visual_measurement(candidate, is_preschool=is_preschool)
+    return _count_pdf_pages(template_name=template_name, context=measured)
+
+
+def _first_failure(count: int, fits) -> int | None:
+    """Smallest index in [0, count) for which `fits` is False, assuming monotonicity."""
+
+    low, high, found = 0, count - 1, None
+    while low <= high:
+        middle = (low + high) // 2
+        if fits(middle):
+            low = middle + 1
+        else:
+            found = middle
+            high = middle - 1
+    return found
+
+
+def boundary_samples(
+    context: dict[str, Any], *, template_name: str, is_preschool: bool, profile: str
+) -> list[tuple[list[float], float]]:
+    """Measure where each sheet overflows and return (features, 1.0) at those boundaries.
+
+    The sample sits halfway between the last row set that fits and the first that
+    does not, so the fitted model places the sheet capacity at 1.0.
+    """
+
+    rows = list(context.get("rows") or [])
+    blocks = _build_split_blocks(rows=rows, is_preschool=is_preschool)
+    if len(blocks) < 2:
+        return []
+
+    samples: list[tuple[list[float], float]] = []
+    ends = [block.end for block in blocks]
+    starts = [block.start for block in blocks]
+
+    def _page_1_fits(idx: int) -> bool:
+        return (
+            _pages(
+                template_name=template_name,
+                is_preschool=is_preschool,
+                base=context,
+                profile=profile,
+                page_1=rows[: ends[idx]],
+                page_2=[],
+            )
+            <= 2
+        )
+
+    overflow = _first_failure(len(ends), _page_1_fits)
+    if overflow is not None and overflow > 0:
+        fits_features = sheet_features(rows[: ends[overflow - 1]], sheet=1)
+        over_features = sheet_features(rows[: ends[overflow]], sheet=1)
+        samples.append(([(a + b) / 2 for a, b in zip(fits_features, over_features)], 1.0))
+
+    # Suffixes shrink as the start moves forward: scan starts from the end backwards.
+    reversed_starts = list(reversed(starts))
+
+    def _page_2_fits(idx: int) -> bool:
+        return (
+            _pages(
+                template_name=template_name,
+                is_preschool=is_preschool,
+                base=context,
+                profile=profile,
+                page_1=[],
+                page_2=rows[reversed_starts[idx] :],
+            )
+            <= 2
+        )
+
+    overflow = _first_failure(len(reversed_starts), _page_2_fits)
+    if overflow is not None and overflow > 0:
+        fits_features = sheet_features(rows[reversed_starts[overflow - 1] :], sheet=2)
+        over_features = sheet_features(rows[reversed_starts[overflow] :], sheet=2)
+        samples.append(([(a + b) / 2 for a, b in zip(fits_features, over_features)], 1.0))
+
+    return samples
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a synthetic school inside a rolled-back transaction, measures where each boletín "
+        "sheet overflows with WeasyPrint and writes the fitted row-height coefficients per "
+        "template and layout profile as a versioned JSON artifact."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--groups", type=int, default=2)
+        parser.add_argument("--students-per-group", type=int, default=8)
+        parser.add_argument("--subjects", type=int, default=12)
+        parser.add_argument("--achievements-per-subject", type=int, default=3)
+        parser.add_argument("--variants", type=int, default=3, help="Text-length variants per seeded report.")
+        parser.add_argument("--seed", type=int, default=7)
+        parser.add_argument("--output", default=str(getattr(settings, "REPORT_LAYOUT_MODEL_PATH", "")))
+        parser.add_argument(
+            "--if-missing", action="store_true", help="Do nothing when the output artifact already exists."
+        )
+
+    def handle(self, *args, **options):
+        output = str(options["output"] or "").strip()
+        if not output:
+            raise CommandError("Defina --output o REPORT_LAYOUT_MODEL_PATH.")
+        if options["if_missing"] and Path(output).exists():
+            self.stdout.write(f"Layout model already present at {output}; skipping.")
+            return
+
+        rng = random.Random(options["seed"])
+        samples: dict[str, dict[str, list[tuple[list[float], float]]]] = {}
+        t0 = time.perf_counter()
+
+        with transaction.atomic():
+            year = seed_synthetic_school(
+                groups=options["groups"],
+                students_per_group=options["students_per_group"],
+                subjects=options["subjects"],
+                periods=1,
+                achievements_per_subject=options["achievements_per_subject"],
+                seed=options["seed"],
+            )
+            period = Period.objects.filter(academic_year=year).order_by("start_date", "id").first()
+            enrollments = list(
+                Enrollment.objects.select_related("student__user", "group", "group__grade", "academic_year")
+                .filter(academic_year=year)
+                .order_by("id")
+            )
+            report_context = ReportGenerationContext(year.id)
+
+            for enrollment in enrollments:
+                base_contexts = {
+                    False: build_academic_period_report_context(
+                        enrollment=enrollment, period=period, report_context=report_context
+                    ),
+                    True: build_preschool_academic_period_report_context(
+                        enrollment=enrollment, period=period, report_context=report_context
+                    ),
+                }
+                for template_name, is_preschool in TEMPLATES:
+                    base = base_contexts[is_preschool]
+                    for _ in range(max(1, options["variants"])):
+                        varied = deepcopy(base)
+                        varied["rows"] = _vary_rows(list(base.get("rows") or []), rng)
+                        for profile in LAYOUT_PROFILES:
+                            samples.setdefault(template_name, {}).setdefault(profile.name, []).extend(
+                                boundary_samples(
+                                    varied,
+                                    template_name=template_name,
+                                    is_preschool=is_preschool,
+                                    profile=profile.name,
+                                )
+                            )
+
+            transaction.set_rollback(True)
+
+        fits: dict[str, dict[str, ProfileCoefficients]] = {}
+        for template_name, by_profile in samples.items():
+            for profile, profile_samples in by_profile.items():
+                if not profile_samples:
+                    continue
+                fitted = fit_profile_coefficients(profile_samples)
+                fits.setdefault(template_name, {})[profile] = fitted
+                self.stdout.write(
+                    f"{template_name} [{profile}] samples={fitted.samples} "
+                    f"residual_std={fitted.residual_std:.4f} margin={fitted.margin:.4f}"
+                )
+
+        if not fits:
+            raise CommandError("No se obtuvieron muestras: ningún boletín del corpus desborda una hoja.")
+
+        artifact = layout_model_artifact(fits, generated_at=timezone.now().isoformat())
+        path = Path(output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(artifact, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        self.stdout.write(
+            self.style.SUCCESS(f"Layout model v{artifact['version']} written to {path} in {time.perf_counter() - t0:.1f}s")
+        )
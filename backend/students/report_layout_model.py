@@ -0,0 +1,246 @@
+"""Modelo calibrado de altura de filas para el ajuste a dos hojas del boletín.
+
+El comando ``calibrate_report_layout`` mide con WeasyPrint un corpus de boletines
+sembrados y ajusta, por plantilla y perfil de layout, cuánto de una hoja ocupa cada
+tipo de fila. El resultado se guarda como un artefacto JSON versionado
+(``settings.REPORT_LAYOUT_MODEL_PATH``) que ``single_page_report_fit`` usa para
+predecir si un reparto cabe sin renderizar; sólo los casos cercanos al límite se
+miden de verdad.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+
+
+LAYOUT_MODEL_VERSION = 1
+
+# Rasgos por hoja. Las alturas se expresan como fracción del espacio libre de la
+# primera hoja (descontada la tarjeta del estudiante), así que la capacidad es 1.0;
+# `sheet_2` sólo corrige la diferencia de espacio libre de la segunda hoja (pie de
+# firmas). Sin ese anclaje el ajuste sobre los límites sería degenerado.
+FEATURES: tuple[str, ...] = (
+    "sheet_2",
+    "area",
+    "subject",
+    "single_area",
+    "achievement",
+    "other",
+    "lines",
+    "text",
+)
+
+# Margen de confianza en desviaciones estándar del residuo del ajuste (~95%).
+CONFIDENCE_Z = 2.0
+MIN_MARGIN = 0.02
+
+
+def sheet_features(rows: list[dict[str, Any]], *, sheet: int) -> list[float]:
+    counts = dict.fromkeys(FEATURES, 0.0)
+    if sheet == 2:
+        counts["sheet_2"] = 1.0
+
+    for row in rows:
+        if not isinstance(row, dict):
+            counts["other"] += 1
+            continue
+
+        row_type = str(row.get("row_type") or "").upper()
+        if row_type == "AREA":
+            counts["area"] += 1
+        elif row_type == "SUBJECT" and bool(row.get("is_single_area")):
+            counts["single_area"] += 1
+        elif row_type == "SUBJECT":
+            counts["subject"] += 1
+        elif row_type == "ACHIEVEMENT":
+            counts["achievement"] += 1
+        else:
+            counts["other"] += 1
+
+        lines = row.get("lines") or []
+        if isinstance(lines, list):
+            counts["lines"] += len(lines)
+            counts["text"] += sum(len(str(line or "")) for line in lines) / 100.0
+        counts["text"] += len(str(row.get("description") or "")) / 100.0
+
+    return [counts[name] for name in FEATURES]
+
+
+@dataclass(frozen=True)
+class SheetFitPrediction:
+    used_page_1: float
+    used_page_2: float
+    margin: float
+
+    @property
+    def fits(self) -> bool | None:
+        """True/False when confident, None when the split is too close to call."""
+
+        if self.used_page_1 + self.margin <= 1.0 and self.used_page_2 + self.margin <= 1.0:
+            return True
+        if self.used_page_1 - self.margin > 1.0 or self.used_page_2 - self.margin > 1.0:
+            return False
+        return None
+
+    @property
+    def first_page_overflows(self) -> bool | None:
+        if self.used_page_1 - self.margin > 1.0:
+            return True
+        if self.used_page_1 + self.margin <= 1.0:
+            return False
+        return None
+
+
+@dataclass(frozen=True)
+class ProfileCoefficients:
+    coefficients: tuple[float, ...]
+    residual_std: float
+    samples: int
+
+    def used(self, features: list[float]) -> float:
+        return sum(c * f for c, f in zip(self.coefficients, features))
+
+    @property
+    def margin(self) -> float:
+        return max(MIN_MARGIN, CONFIDENCE_Z * self.residual_std)
+
+
+class ReportLayoutModel:
+    def __init__(self, templates: dict[str, dict[str, ProfileCoefficients]]):
+        self.templates = templates
+
+    def predict(
+        self,
+        *,
+        template_name: str,
+        profile: str,
+        rows_page_1: list[dict[str, Any]],
+        rows_page_2: list[dict[str, Any]],
+    ) -> SheetFitPrediction | None:
+        fitted = (self.templates.get(template_name) or {}).get(profile)
+        if fitted is None:
+            return None
+        return SheetFitPrediction(
+            used_page_1=fitted.used(sheet_features(rows_page_1, sheet=1)),
+            used_page_2=fitted.used(sheet_features(rows_page_2, sheet=2)),
+            margin=fitted.margin,
+        )
+
+    @classmethod
+    def from_artifact(cls, data: dict[str, Any]) -> ReportLayoutModel:
+        if data.get("version") != LAYOUT_MODEL_VERSION or list(data.get("features") or []) != list(FEATURES):
+            raise ValueError("Artefacto de layout incompatible con esta versión")
+
+        templates: dict[str, dict[str, ProfileCoefficients]] = {}
+        for template_name, profiles in (data.get("templates") or {}).items():
+            templates[template_name] = {
+                profile: ProfileCoefficients(
+                    coefficients=tuple(float(payload["coefficients"][name]) for name in FEATURES),
+                    residual_std=float(payload["residual_std"]),
+                    samples=int(payload["samples"]),
+                )
+                for profile, payload in profiles.items()
+            }
+        return cls(templates)
+
+
+def fit_profile_coefficients(samples: list[tuple[list[float], float]], *, ridge: float = 1e-6) -> ProfileCoefficients:
+    """Least squares fit of `features · coefficients ≈ target` (normal equations)."""
+
+    if not samples:
+        raise ValueError("No samples")
+
+    size = len(FEATURES)
+    normal = [[0.0] * size for _ in range(size)]
+    rhs = [0.0] * size
+    for features, target in samples:
+        for i in range(size):
+            rhs[i] += features[i] * target
+            for j in range(size):
+                normal[i][j] += features[i] * features[j]
+    for i in range(size):
+        normal[i][i] += ridge
+
+    coefficients = _solve(normal, rhs)
+    residuals = [sum(c * f for c, f in zip(coefficients, features)) - target for features, target in samples]
+    residual_std = (sum(r * r for r in residuals) / len(residuals)) ** 0.5
+    return ProfileCoefficients(coefficients=tuple(coefficients), residual_std=residual_std, samples=len(samples))
+
+
+def _solve(matrix: list[list[float]], rhs: list[float]) -> list[float]:
+    """Gaussian elimination with partial pivoting on a small dense system."""
+
+    size = len(rhs)
+    aug = [list(matrix[i]) + [rhs[i]] for i in range(size)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(aug[r][col]))
+        aug[col], aug[pivot] = aug[pivot], aug[col]
+        if abs(aug[col][col]) < 1e-12:
+            continue
+        for r in range(col + 1, size):
+            factor = aug[r][col] / aug[col][col]
+            if factor:
+                for c in range(col, size + 1):
+                    aug[r][c] -= factor * aug[col][c]
+
+    solution = [0.0] * size
+    for r in range(size - 1, -1, -1):
+        if abs(aug[r][r]) < 1e-12:
+            continue
+        solution[r] = (aug[r][size] - sum(aug[r][c] * solution[c] for c in range(r + 1, size))) / aug[r][r]
+    return solution
+
+
+def layout_model_artifact(fits: dict[str, dict[str, ProfileCoefficients]], *, generated_at: str) -> dict[str, Any]:
+    return {
+        "version": LAYOUT_MODEL_VERSION,
+        "generated_at": generated_at,
+        "features": list(FEATURES),
+        "confidence_z": CONFIDENCE_Z,
+        "templates": {
+            template_name: {
+                profile: {
+                    "coefficients": dict(zip(FEATURES, (round(c, 6) for c in fitted.coefficients))),
+                    "residual_std": round(fitted.residual_std, 6),
+                    "samples": fitted.samples,
+                }
+                for profile, fitted in profiles.items()
+            }
+            for template_name, profiles in fits.items()
+        },
+    }
+
+
+_loaded_model: tuple[tuple[str, float], ReportLayoutModel | None] | None = None
+_loaded_model_lock = threading.Lock()
+
+
+def get_report_layout_model() -> ReportLayoutModel | None:
+    """Return the calibrated model, reloading when the artifact changes on disk."""
+
+    global _loaded_model
+
+    configured = str(getattr(settings, "REPORT_LAYOUT_MODEL_PATH", "") or "").strip()
+    if not configured:
+        return None
+    path = Path(configured)
+    try:
+        key = (str(path), path.stat().st_mtime)
+    except (OSError, ValueError):
+        return None
+
+    with _loaded_model_lock:
+        if _loaded_model is not None and _loaded_model[0] == key:
+            return _loaded_model[1]
+        try:
+            model = ReportLayoutModel.from_artifact(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError, TypeError):
+            model = None
+        _loaded_model = (key, model)
+        return model
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from copy import deepcopy
 from dataclasses import dataclass
-from io import BytesIO
 from typing import Any
 
 from django.conf import settings
-from django.template.loader import render_to_string
+from django.db import models
 
-from reports.weasyprint_utils import render_pdf_bytes_from_html
+from reports.spans import render_to_string
+from reports.weasyprint_utils import count_pages_from_html
+
+from .report_layout_model import SheetFitPrediction, get_report_layout_model
 
 
 @dataclass(frozen=True)
@@ -30,6 +39,50 @@ LAYOUT_PROFILES: tuple[LayoutProfile, ...] = (
     LayoutProfile(name="p2", split_target_ratio=0.48),
 )
 
+# Page counts already measured in this process, keyed by a fingerprint of the
+# measured context. Bounded LRU: the same layouts reappear across profiles and
+# split candidates of one report, and across identical reports of a batch.
+PAGE_COUNT_CACHE_MAX_ENTRIES = 2048
+_page_count_cache: OrderedDict[str, int] = OrderedDict()
+_page_count_cache_lock = threading.Lock()
+
+
+@dataclass
+class LayoutMeasureStats:
+    reports: int = 0
+    renders: int = 0
+    cache_hits: int = 0
+    predicted: int = 0
+
+    def as_meta(self) -> dict[str, Any]:
+        return {
+            "reports": self.reports,
+            "renders": self.renders,
+            "cache_hits": self.cache_hits,
+            "predicted": self.predicted,
+            "renders_per_report": round(self.renders / self.reports, 2) if self.reports else 0,
+        }
+
+
+_layout_measure_stats: ContextVar[LayoutMeasureStats | None] = ContextVar("layout_measure_stats", default=None)
+
+
+@contextmanager
+def collect_layout_measure_stats(stats: LayoutMeasureStats | None = None) -> Iterator[LayoutMeasureStats]:
+    """Accumulate layout measurement counters for every report fitted inside the block."""
+
+    stats = stats if stats is not None else LayoutMeasureStats()
+    token = _layout_measure_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _layout_measure_stats.reset(token)
+
+
+def clear_page_count_cache() -> None:
+    with _page_count_cache_lock:
+        _page_count_cache.clear()
+
 
 def layout_report_to_two_pages(
     report_context: dict[str, Any],
@@ -39,19 +92,31 @@ def layout_report_to_two_pages(
 ) -> dict[str, Any]:
     """Return a context distributed in exactly two pages.
 
-    The function preserves the full text and validates with real PDF rendering
-    when available, trying profile adjustments until the result is exactly
-    two pages.
+    The function preserves the full text and validates with a real WeasyPrint
+    layout pass when available, trying profile adjustments until the result is
+    exactly two pages. When a calibrated row-height model is available, splits
+    it predicts with confidence are accepted or discarded without rendering.
     """
 
+    stats = _layout_measure_stats.get()
+    if stats is not None:
+        stats.reports += 1
+
     base_context = deepcopy(report_context)
     last_candidate = deepcopy(base_context)
 
     for profile in LAYOUT_PROFILES:
         candidate = _apply_two_page_layout(base_context, profile=profile, is_preschool=is_preschool)
+        predicted_fit = _predicted_fit(template_name=template_name, candidate=candidate)
+        if predicted_fit is True:
+            return candidate
+        if predicted_fit is False:
+            last_candidate = candidate
+            continue
+
         measured_candidate = _context_for_visual_measurement(candidate, is_preschool=is_preschool)
         try:
-            pages = _count_pdf_pages(template_name=template_name, context=measured_candidate)
+            pages = _measure_pages(template_name=template_name, context=measured_candidate)
         except Exception:
             return _fallback_without_pdf_measurement(base_context, profile=profile, is_preschool=is_preschool)
         if pages == 2:
@@ -70,13 +135,86 @@ def layout_report_to_two_pages(
     return last_candidate
 
 
+def _predict_sheets(*, template_name: str, candidate: dict[str, Any]) -> SheetFitPrediction | None:
+    model = get_report_layout_model()
+    if model is None:
+        return None
+    return model.predict(
+        template_name=template_name,
+        profile=str((candidate.get("report_layout") or {}).get("profile") or ""),
+        rows_page_1=list(candidate.get("rows_page_1") or []),
+        rows_page_2=list(candidate.get("rows_page_2") or []),
+    )
+
+
+def _predicted_fit(*, template_name: str, candidate: dict[str, Any]) -> bool | None:
+    """Confident model verdict for `candidate`, or None when it has to be measured."""
+
+    prediction = _predict_sheets(template_name=template_name, candidate=candidate)
+    if prediction is None or prediction.fits is None:
+        return None
+
+    stats = _layout_measure_stats.get()
+    if stats is not None:
+        stats.predicted += 1
+    return prediction.fits
+
+
+def _measure_pages(*, template_name: str, context: dict[str, Any]) -> int:
+    """Page count for `context`, served from the fingerprint cache when possible."""
+
+    key = _context_fingerprint(template_name=template_name, context=context)
+    stats = _layout_measure_stats.get()
+
+    with _page_count_cache_lock:
+        cached = _page_count_cache.get(key)
+        if cached is not None:
+            _page_count_cache.move_to_end(key)
+    if cached is not None:
+        if stats is not None:
+            stats.cache_hits += 1
+        return cached
+
+    pages = _count_pdf_pages(template_name=template_name, context=context)
+    if stats is not None:
+        stats.renders += 1
+
+    with _page_count_cache_lock:
+        _page_count_cache[key] = pages
+        _page_count_cache.move_to_end(key)
+        while len(_page_count_cache) > PAGE_COUNT_CACHE_MAX_ENTRIES:
+            _page_count_cache.popitem(last=False)
+    return pages
+
+
 def _count_pdf_pages(*, template_name: str, context: dict[str, Any]) -> int:
     html_string = render_to_string(template_name, context)
-    pdf_bytes = render_pdf_bytes_from_html(html=html_string, base_url=str(settings.BASE_DIR))
-    from pypdf import PdfReader  # noqa: PLC0415
+    return count_pages_from_html(html=html_string, base_url=str(settings.BASE_DIR))
+
 
-    reader = PdfReader(BytesIO(pdf_bytes))
-    return len(reader.pages)
+def _fingerprint_default(value: Any) -> Any:
+    if isinstance(value, models.Model):
+        return f"{value._meta.label}:{value.pk}"
+    return str(value)
+
+
+def _context_fingerprint(*, template_name: str, context: dict[str, Any]) -> str:
+    payload = json.dumps(
+        [template_name, context],
+        sort_keys=True,
+        default=_fingerprint_default,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _first_page_overflows(*, template_name: str, measured_context: dict[str, Any]) -> bool:
+    """Whether the rows assigned to the first sheet alone already spill over it."""
+
+    probe = dict(measured_context)
+    probe["rows_page_2"] = []
+    return _measure_pages(template_name=template_name, context=probe) > 2
 
 
 def _fallback_without_pdf_measurement(
@@ -138,13 +276,87 @@ def _search_exact_two_page_layout(
     best_candidate: dict[str, Any] | None = None
     best_tuple: tuple[int, int, float, int] | None = None
 
+    # Moving the split forward only ever adds rows to the first sheet and removes them
+    # from the second, so the splits that fit in two pages form one contiguous range.
+    # Binary search finds a split inside it and then its two edges; the split kept is
+    # the best scored one of the range, as when every boundary was measured.
     for profile_index, profile in enumerate(LAYOUT_PROFILES):
         blocks = _build_split_blocks(rows=rows, is_preschool=is_preschool)
         if len(blocks) < 2:
             continue
 
-        candidate_splits = sorted(
-            (blocks[idx].start for idx in range(1, len(blocks))),
+        splits = [blocks[idx].start for idx in range(1, len(blocks))]
+
+        def fits(position: int) -> bool:
+            _, pages, _ = _evaluate_split(
+                context,
+                template_name=template_name,
+                is_preschool=is_preschool,
+                profile=profile,
+                split_index=splits[position],
+            )
+            return pages == 2
+
+        try:
+            feasible: int | None = None
+            low, high = 0, len(splits) - 1
+            while low <= high:
+                middle = (low + high) // 2
+                split_index = splits[middle]
+                candidate, pages, first_overflows = _evaluate_split(
+                    context,
+                    template_name=template_name,
+                    is_preschool=is_preschool,
+                    profile=profile,
+                    split_index=split_index,
+                )
+                if pages == 2:
+                    feasible = middle
+                    break
+
+                if pages is not None:
+                    score, _, _ = _split_score_tuple(
+                        rows=rows,
+                        blocks=blocks,
+                        split_index=split_index,
+                        target_ratio=profile.split_target_ratio,
+                        is_preschool=is_preschool,
+                    )
+                    candidate_tuple = (pages, profile_index, int(score * 1000), split_index)
+                    if best_tuple is None or candidate_tuple < best_tuple:
+                        best_tuple = candidate_tuple
+                        best_candidate = candidate
+
+                if first_overflows:
+                    high = middle - 1
+                else:
+                    low = middle + 1
+
+            if feasible is None:
+                continue
+
+            # Splits before `low` leave the second sheet overflowing and splits after
+            # `high` the first one, so the edges lie within [low, high].
+            first_fit, last_fit = feasible, feasible
+            edge_low = low
+            while edge_low < first_fit:
+                middle = (edge_low + first_fit) // 2
+                if fits(middle):
+                    first_fit = middle
+                else:
+                    edge_low = middle + 1
+            edge_high = high
+            while last_fit < edge_high:
+                middle = (last_fit + edge_high + 1) // 2
+                if fits(middle):
+                    last_fit = middle
+                else:
+                    edge_high = middle - 1
+        except Exception:
+            return None
+
+        best_split = min(
+            splits[first_fit : last_fit + 1],
             key=lambda split_index: _split_score_tuple(
                 rows=rows,
                 blocks=blocks,
@@ -153,32 +365,40 @@ def _search_exact_two_page_layout(
                 is_preschool=is_preschool,
             ),
         )
+        return _apply_two_page_layout_with_split(context, profile=profile, split_index=best_split)
 
-        for split_index in candidate_splits:
-            candidate = _apply_two_page_layout_with_split(context, profile=profile, split_index=split_index)
-            measured_candidate = _context_for_visual_measurement(candidate, is_preschool=is_preschool)
-            try:
-                pages = _count_pdf_pages(template_name=template_name, context=measured_candidate)
-            except Exception:
-                return None
+    return best_candidate
 
-            score, balance, _ = _split_score_tuple(
-                rows=rows,
-                blocks=blocks,
-                split_index=split_index,
-                target_ratio=profile.split_target_ratio,
-                is_preschool=is_preschool,
-            )
-            candidate_tuple = (pages, profile_index, int(score * 1000), split_index)
 
-            if pages == 2:
-                return candidate
+def _evaluate_split(
+    context: dict[str, Any],
+    *,
+    template_name: str,
+    is_preschool: bool,
+    profile: LayoutProfile,
+    split_index: int,
+) -> tuple[dict[str, Any], int | None, bool | None]:
+    """Return ``(candidate, pages, first_page_overflows)`` for one split.
 
-            if best_tuple is None or candidate_tuple < best_tuple:
-                best_tuple = candidate_tuple
-                best_candidate = candidate
+    ``pages`` is None when the layout model rejects the split without rendering;
+    ``first_page_overflows`` is only resolved for splits that are not two pages.
+    """
 
-    return best_candidate
+    candidate = _apply_two_page_layout_with_split(context, profile=profile, split_index=split_index)
+    predicted_fit = _predicted_fit(template_name=template_name, candidate=candidate)
+    if predicted_fit is True:
+        return candidate, 2, None
+    if predicted_fit is False:
+        prediction = _predict_sheets(template_name=template_name, candidate=candidate)
+        if prediction is not None and prediction.first_page_overflows is not None:
+            # Confidently over the limit and the model also knows which sheet spills.
+            return candidate, None, prediction.first_page_overflows
+
+    measured_candidate = _context_for_visual_measurement(candidate, is_preschool=is_preschool)
+    pages = _measure_pages(template_name=template_name, context=measured_candidate)
+    if pages == 2:
+        return candidate, 2, None
+    return candidate, pages, _first_page_overflows(template_name=template_name, measured_context=measured_candidate)
 
 
 def _apply_two_page_layout_with_split(
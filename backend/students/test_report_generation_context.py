@@ -0,0 +1,97 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from academic.management.commands.benchmark_promotions import seed_synthetic_school
+from academic.models import Group, Period
+from students.academic_period_report import (
+    ReportGenerationContext,
+    build_academic_period_group_report_context,
+    build_academic_period_report_context,
+)
+from students.academic_period_sabana_report import build_academic_period_sabana_context
+from students.models import Enrollment
+
+
+def _pages(ctx):
+    return [{k: v for k, v in page.items() if k != "institution"} for page in ctx["pages"]]
+
+
+class ReportGenerationContextTests(TestCase):
+    def setUp(self):
+        self.year = seed_synthetic_school(
+            groups=3,
+            students_per_group=4,
+            subjects=4,
+            periods=2,
+            achievements_per_subject=2,
+            fill_ratio=0.7,
+        )
+        self.period = Period.objects.filter(academic_year=self.year).order_by("start_date", "id").first()
+        self.groups = list(Group.objects.filter(academic_year=self.year).order_by("id"))
+        self.enrollments_by_group = {}
+        for enrollment in (
+            Enrollment.objects.select_related("student__user", "group", "group__grade", "academic_year")
+            .filter(academic_year=self.year)
+            .order_by("id")
+        ):
+            self.enrollments_by_group.setdefault(enrollment.group_id, []).append(enrollment)
+
+    def _build_all(self, report_context=None):
+        with CaptureQueriesContext(connection) as ctx:
+            pages = [
+                _pages(
+                    build_academic_period_group_report_context(
+                        enrollments=self.enrollments_by_group[g.id],
+                        period=self.period,
+                        report_context=report_context,
+                    )
+                )
+                for g in self.groups
+            ]
+        return pages, len(ctx.captured_queries)
+
+    def test_shared_context_matches_fresh_contexts_with_fewer_queries(self):
+        # Primera pasada: materializa las definitivas para que ambas mediciones sean comparables.
+        self._build_all()
+
+        fresh, fresh_queries = self._build_all()
+        report_context = ReportGenerationContext(self.year.id)
+        report_context.prefetch_groups([g.id for g in self.groups])
+        shared, shared_queries = self._build_all(report_context)
+
+        self.assertEqual(fresh, shared)
+        self.assertLess(shared_queries, fresh_queries)
+
+    def test_reference_data_is_loaded_once(self):
+        report_context = ReportGenerationContext(self.year.id)
+        report_context.prefetch_groups([g.id for g in self.groups])
+        report_context.year_periods
+        report_context.institution
+        report_context.scale_equivalences
+        report_context.dimension_percentage_by_id
+
+        with self.assertNumQueries(0):
+            for g in self.groups:
+                assignments = report_context.teacher_assignments(g.id)
+                self.assertEqual(len(assignments), 4)
+                report_context.gradesheets(assignments)
+                report_context.achievements(assignments, g.id)
+
+    def test_single_report_and_sabana_accept_shared_context(self):
+        group = self.groups[0]
+        enrollment = self.enrollments_by_group[group.id][0]
+        report_context = ReportGenerationContext(self.year.id)
+
+        single = build_academic_period_report_context(enrollment=enrollment, period=self.period)
+        shared = build_academic_period_report_context(
+            enrollment=enrollment, period=self.period, report_context=report_context
+        )
+        self.assertEqual(single["rows"], shared["rows"])
+        self.assertEqual(single["rank_position"], shared["rank_position"])
+
+        sabana = build_academic_period_sabana_context(group=group, period=self.period)
+        sabana_shared = build_academic_period_sabana_context(
+            group=group, period=self.period, report_context=report_context
+        )
+        self.assertEqual(sabana["rows"], sabana_shared["rows"])
@@ -0,0 +1,74 @@
+import io
+import time
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from openpyxl import load_workbook
+
+from academic.management.commands.benchmark_promotions import seed_synthetic_school
+from academic.models import Group, Period
+from students.academic_period_report import ReportGenerationContext
+from students.academic_period_sabana_report import (
+    build_academic_period_sabana_context,
+    load_academic_period_sabana_matrix,
+    write_academic_period_sabana_xlsx,
+)
+
+
+class SabanaMatrixTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.year = seed_synthetic_school(
+            groups=1,
+            students_per_group=45,
+            subjects=14,
+            periods=1,
+            achievements_per_subject=2,
+            fill_ratio=0.8,
+        )
+        cls.period = Period.objects.get(academic_year=cls.year)
+        cls.group = Group.objects.select_related("academic_year", "director", "grade").get(academic_year=cls.year)
+
+    def setUp(self):
+        # Materialize the finals so every measurement reads them from SubjectPeriodFinal.
+        load_academic_period_sabana_matrix(group=self.group, period=self.period)
+
+    def test_45x14_sabana_loads_with_constant_queries(self):
+        report_context = ReportGenerationContext(self.year.id)
+        report_context.institution
+
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            ctx = build_academic_period_sabana_context(
+                group=self.group, period=self.period, report_context=report_context
+            )
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(ctx["rows"]), 45)
+        self.assertEqual(len(ctx["columns"]), 14)
+        self.assertTrue(all(len(row["scores"]) == 14 for row in ctx["rows"]))
+        # Enrollments, academic loads, teacher assignments and finals: one query each.
+        self.assertEqual(len(queries.captured_queries), 4, [q["sql"] for q in queries.captured_queries])
+        self.assertLess(elapsed, 5.0)
+
+    def test_xlsx_reuses_the_matrix(self):
+        matrix = load_academic_period_sabana_matrix(group=self.group, period=self.period)
+        ctx = build_academic_period_sabana_context(group=self.group, period=self.period, matrix=matrix)
+
+        out = io.BytesIO()
+        with self.assertNumQueries(0):
+            write_academic_period_sabana_xlsx(matrix, out)
+
+        ws = load_workbook(io.BytesIO(out.getvalue())).active
+        header = [cell.value for cell in ws[4]]
+        self.assertEqual(header[2:16], [c["subject_name"] for c in ctx["columns"]])
+        self.assertEqual(ws.max_row, 4 + 45)
+
+        first = [cell.value for cell in ws[5]]
+        self.assertEqual(first[1], ctx["rows"][0]["student_name"])
+        self.assertEqual(
+            ["" if v is None else f"{v:.2f}" for v in first[2:16]],
+            [cell["score"] for cell in ctx["rows"][0]["scores"]],
+        )
+        self.assertEqual(first[18], ctx["rows"][0]["lost_count"])
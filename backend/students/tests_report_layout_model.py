@@ -0,0 +1,132 @@
+import json
+import random
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from students.management.commands.calibrate_report_layout import boundary_samples
+from students.report_layout_model import (
+    FEATURES,
+    ReportLayoutModel,
+    fit_profile_coefficients,
+    layout_model_artifact,
+    sheet_features,
+)
+from students.single_page_report_fit import (
+    clear_page_count_cache,
+    collect_layout_measure_stats,
+    layout_report_to_two_pages,
+)
+
+TEMPLATE = "students/reports/academic_period_report_pdf.html"
+
+# Modelo "real" de las pruebas: cada asignatura ocupa 0.1 de hoja, cada línea 0.05,
+# y la segunda hoja tiene 0.1 menos de espacio libre por el pie de firmas.
+TRUE_COEFFICIENTS = dict.fromkeys(FEATURES, 0.0) | {"sheet_2": 0.1, "subject": 0.1, "lines": 0.05}
+
+
+def _used(rows, sheet):
+    return sum(TRUE_COEFFICIENTS[name] * value for name, value in zip(FEATURES, sheet_features(rows, sheet=sheet)))
+
+
+def fake_page_count(*, template_name, context):
+    # Cada hoja que desborda añade una página.
+    pages = 2
+    pages += _used(context.get("rows_page_1") or [], 1) > 1.0
+    pages += _used(context.get("rows_page_2") or [], 2) > 1.0
+    return pages
+
+
+def _rows(count, lines=1):
+    return [{"row_type": "SUBJECT", "title": f"Asignatura {idx}", "lines": ["x" * 40] * lines} for idx in range(count)]
+
+
+def _random_rows(rng, count):
+    return [
+        {"row_type": "SUBJECT", "title": f"Asignatura {idx}", "lines": ["x" * rng.randint(10, 150)] * rng.randint(0, 4)}
+        for idx in range(count)
+    ]
+
+
+class ReportLayoutModelTests(SimpleTestCase):
+    def setUp(self):
+        clear_page_count_cache()
+        self.addCleanup(clear_page_count_cache)
+
+    def _write_model(self, tmp, fitted):
+        path = Path(tmp) / "layout.json"
+        artifact = layout_model_artifact({TEMPLATE: {"p0": fitted}}, generated_at="2026-01-01T00:00:00Z")
+        path.write_text(json.dumps(artifact), encoding="utf-8")
+        return path
+
+    def test_calibration_recovers_row_heights_from_measured_boundaries(self):
+        rng = random.Random(3)
+        samples = []
+        with patch("students.management.commands.calibrate_report_layout._count_pdf_pages", side_effect=fake_page_count):
+            for _ in range(30):
+                samples.extend(
+                    boundary_samples(
+                        {"rows": _random_rows(rng, 14)},
+                        template_name=TEMPLATE,
+                        is_preschool=False,
+                        profile="p0",
+                    )
+                )
+
+        self.assertEqual(len(samples), 60)
+        fitted = fit_profile_coefficients(samples)
+        model = ReportLayoutModel.from_artifact(
+            json.loads(json.dumps(layout_model_artifact({TEMPLATE: {"p0": fitted}}, generated_at="x")))
+        )
+        for count in (2, 4, 6):
+            rows = _random_rows(rng, count)
+            prediction = model.predict(template_name=TEMPLATE, profile="p0", rows_page_1=rows, rows_page_2=rows)
+            self.assertAlmostEqual(prediction.used_page_1, _used(rows, 1), delta=0.1)
+            self.assertAlmostEqual(prediction.used_page_2, _used(rows, 2), delta=0.1)
+
+    def test_calibration_keeps_an_existing_artifact_when_asked(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        with TemporaryDirectory() as tmp:
+            output = Path(tmp) / "model.json"
+            output.write_text("{}", encoding="utf-8")
+            with patch("students.management.commands.calibrate_report_layout.seed_synthetic_school") as seed:
+                call_command("calibrate_report_layout", "--if-missing", "--output", str(output), stdout=StringIO())
+
+            seed.assert_not_called()
+            self.assertEqual(output.read_text(encoding="utf-8"), "{}")
+
+    def test_incompatible_artifact_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ReportLayoutModel.from_artifact({"version": 999, "features": list(FEATURES), "templates": {}})
+
+    def test_confident_prediction_skips_measurement(self):
+        fitted = fit_profile_coefficients(
+            [(sheet_features(_rows(n), sheet=s), _used(_rows(n), s)) for n in range(1, 12) for s in (1, 2)]
+            + [(sheet_features(_rows(n, 2), sheet=s), _used(_rows(n, 2), s)) for n in range(1, 12) for s in (1, 2)]
+        )
+        with TemporaryDirectory() as tmp, override_settings(REPORT_LAYOUT_MODEL_PATH=str(self._write_model(tmp, fitted))):
+            with patch("students.single_page_report_fit._count_pdf_pages", side_effect=fake_page_count) as measure:
+                with collect_layout_measure_stats() as stats:
+                    laid_out = layout_report_to_two_pages({"rows": _rows(6)}, template_name=TEMPLATE, is_preschool=False)
+
+        self.assertEqual(measure.call_count, 0)
+        self.assertEqual(stats.predicted, 1)
+        self.assertEqual(len(laid_out["rows_page_1"]) + len(laid_out["rows_page_2"]), 6)
+
+    def test_near_boundary_falls_back_to_measurement(self):
+        # Una calibración ruidosa deja un margen amplio: el reparto queda "cerca del límite".
+        fitted = fit_profile_coefficients(
+            [(sheet_features(_rows(n), sheet=s), _used(_rows(n), s) + (0.2 if n % 2 else -0.2)) for n in range(1, 12) for s in (1, 2)]
+        )
+        with TemporaryDirectory() as tmp, override_settings(REPORT_LAYOUT_MODEL_PATH=str(self._write_model(tmp, fitted))):
+            with patch("students.single_page_report_fit._count_pdf_pages", side_effect=fake_page_count) as measure:
+                with collect_layout_measure_stats() as stats:
+                    layout_report_to_two_pages({"rows": _rows(12)}, template_name=TEMPLATE, is_preschool=False)
+
+        self.assertGreater(measure.call_count, 0)
+        self.assertEqual(stats.renders, measure.call_count)
@@ -1,11 +1,21 @@
 from unittest.mock import patch
 
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, override_settings
 
-from students.single_page_report_fit import _split_index_balanced, layout_report_to_two_pages
+from students.single_page_report_fit import (
+    _split_index_balanced,
+    clear_page_count_cache,
+    collect_layout_measure_stats,
+    layout_report_to_two_pages,
+)
 
 
+@override_settings(REPORT_LAYOUT_MODEL_PATH="")
 class TwoPageReportLayoutTests(SimpleTestCase):
+    def setUp(self):
+        clear_page_count_cache()
+        self.addCleanup(clear_page_count_cache)
+
     def test_short_report_is_split_in_two_pages(self):
         context = {
             "rows": [
@@ -182,9 +192,11 @@ class TwoPageReportLayoutTests(SimpleTestCase):
 
         def fake_page_count(*, template_name, context):
             profile = str((context.get("report_layout") or {}).get("profile") or "")
-            split_size = len(context.get("rows_page_1") or [])
+            first = len(context.get("rows_page_1") or [])
+            second = len(context.get("rows_page_2") or [])
 
-            if profile == "p2" and split_size == 2:
+            # Only the compact profile fits: at most 2 blocks on the first sheet and 4 on the second.
+            if profile == "p2" and first <= 2 and second <= 4:
                 return 2
             return 3
 
@@ -197,3 +209,73 @@ class TwoPageReportLayoutTests(SimpleTestCase):
 
         self.assertEqual(laid_out["report_layout"]["profile"], "p2")
         self.assertEqual(len(laid_out["rows_page_1"]), 2)
+
+    def test_exact_split_search_keeps_best_scored_split_of_fitting_range(self):
+        context = {
+            "rows": [
+                {"row_type": "SUBJECT", "title": f"Bloque {idx}", "lines": ["x" * 80]}
+                for idx in range(1, 21)
+            ]
+        }
+
+        def fake_page_count(*, template_name, context):
+            profile = str((context.get("report_layout") or {}).get("profile") or "")
+            first = len(context.get("rows_page_1") or [])
+            second = len(context.get("rows_page_2") or [])
+            # Any split from 12 to 18 rows on the first sheet fits, only in the compact profile.
+            if profile == "p2" and first <= 18 and second <= 8:
+                return 2
+            return 3
+
+        with patch("students.single_page_report_fit._count_pdf_pages", side_effect=fake_page_count):
+            laid_out = layout_report_to_two_pages(
+                context,
+                template_name="students/reports/academic_period_report_pdf.html",
+                is_preschool=False,
+            )
+
+        self.assertEqual(laid_out["report_layout"]["profile"], "p2")
+        # p2 targets 48% of the weight: the fitting split closest to it, not the first one found.
+        self.assertEqual(len(laid_out["rows_page_1"]), 12)
+
+    def test_exact_split_search_is_logarithmic_and_reuses_measurements(self):
+        context = {
+            "rows": [
+                {"row_type": "SUBJECT", "title": f"Bloque {idx}", "lines": ["x" * 80]}
+                for idx in range(1, 41)
+            ]
+        }
+        calls = []
+
+        def fake_page_count(*, template_name, context):
+            calls.append(context)
+            profile = str((context.get("report_layout") or {}).get("profile") or "")
+            first = len(context.get("rows_page_1") or [])
+            second = len(context.get("rows_page_2") or [])
+            if profile == "p2" and first <= 11 and second <= 29:
+                return 2
+            return 3
+
+        with patch("students.single_page_report_fit._count_pdf_pages", side_effect=fake_page_count):
+            with collect_layout_measure_stats() as stats:
+                laid_out = layout_report_to_two_pages(
+                    context,
+                    template_name="students/reports/academic_period_report_pdf.html",
+                    is_preschool=False,
+                )
+                again = layout_report_to_two_pages(
+                    context,
+                    template_name="students/reports/academic_period_report_pdf.html",
+                    is_preschool=False,
+                )
+
+        self.assertEqual(laid_out["report_layout"]["profile"], "p2")
+        self.assertEqual(len(laid_out["rows_page_1"]), 11)
+        self.assertEqual(again["rows_page_1"], laid_out["rows_page_1"])
+        # 39 boundaries per profile: a sequential scan would measure up to 117 layouts.
+        self.assertLess(len(calls), 40)
+        self.assertEqual(stats.reports, 2)
+        self.assertEqual(stats.renders, len(calls))
+        # The second report is served entirely from the fingerprint cache.
+        self.assertGreaterEqual(stats.cache_hits, stats.renders)
+        self.assertEqual(stats.as_meta()["renders_per_report"], round(len(calls) / 2, 2))
@@ -21,7 +21,6 @@ from urllib.parse import urlsplit, urlunsplit
 import csv
 import json
 import hashlib
-import base64
 import io
 import os
 import mimetypes
@@ -48,7 +47,7 @@ from academic.models import (
 from academic.grading import (
     DEFAULT_EMPTY_SCORE,
     final_grade_from_dimensions,
-    match_scale,
+    get_scale_index,
     weighted_average,
 )
 from core.models import Institution
@@ -95,6 +94,7 @@ from .academic_period_report import (
     generate_preschool_academic_period_report_pdf,
 )
 
+from reports.asset_cache import qr_png_data_uri
 from reports.weasyprint_utils import PDF_BASE_CSS, weasyprint_url_fetcher
 from students.reports import sort_enrollments_for_enrollment_list
 
@@ -2954,11 +2954,7 @@ def _performance_from_score(score: float) -> str:
 def _qr_data_uri(text: str) -> str:
     if not qrcode:
         return ""
-    img = qrcode.make(text)
-    buff = io.BytesIO()
-    img.save(buff, format="PNG")
-    encoded = base64.b64encode(buff.getvalue()).decode("ascii")
-    return f"data:image/png;base64,{encoded}"
+    return qr_png_data_uri(text)
 
 
 def _qr_temp_png_path(text: str) -> str:
@@ -3131,6 +3127,7 @@ def _certificate_area_rows_from_plan(
         bucket["_weighted_sum"] = Decimal(bucket.get("_weighted_sum") or Decimal("0")) + (score * w)
         bucket["_weight_sum"] = Decimal(bucket.get("_weight_sum") or Decimal("0")) + w
 
+    scale_index = get_scale_index(int(academic_year_id)) if academic_year_id else None
     out: list[dict[str, object]] = []
     for area_name in sorted(areas.keys(), key=lambda x: (x or "").lower()):
         b = areas[area_name]
@@ -3140,7 +3137,7 @@ def _certificate_area_rows_from_plan(
         if weight_sum > 0:
             avg = (weighted_sum / weight_sum).quantize(Decimal("0.01"))
             try:
-                perf = match_scale(int(academic_year_id), avg).name if academic_year_id else _performance_from_score(float(avg))
+                perf = scale_index.match(avg).name if scale_index is not None else _performance_from_score(float(avg))
             except Exception:
                 perf = _performance_from_score(float(avg))
 